@@ -62,7 +62,6 @@ import json
 import os
 import re
 import secrets
-import subprocess
 import sys
 import tempfile
 import time
@@ -70,10 +69,11 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, Callable, Any
 
+from _sdd_git import GitObjectReader
 from _sdd_state import append_telemetry, project_hash, _write_json_atomic
 
 
-_GIT_TIMEOUT = 5  # seconds — every git subprocess uses this
+_GIT_TIMEOUT = 5  # seconds — every git object lookup uses this
 _PREMORTEM_MIN_CHARS = 20
 _DIFF_MAX_CHANGED_LINES = 30
 _LEADER_TICK_INTERVAL_DEFAULT = 5.0
@@ -115,56 +115,41 @@ class AmendDecision:
 
 
 # ─────────────────────────────────────────────────────────────────
-# Git helpers — all calls bounded by _GIT_TIMEOUT, never crash
+# Git helpers — one cat-file coprocess per evaluation, every lookup
+# bounded by _GIT_TIMEOUT, never crash
 # ─────────────────────────────────────────────────────────────────
 
 
-def _run_git(cwd: Path, args: list) -> Optional[str]:
-    """Run `git` with a hard timeout. Returns stdout str or None on any failure.
-
-    Failures (missing git binary, non-zero exit, timeout, OSError) all collapse
-    to None so callers can surface a clean gate verdict rather than a stack
-    trace. Stderr is discarded — gate reasons reference the failing condition,
-    not the underlying git error text.
+def _git_text(blob: Optional[bytes]) -> Optional[str]:
+    """Decode a blob the way `git show` under text=True did: UTF-8 with
+    universal newlines. None stays None.
     """
-    try:
-        proc = subprocess.run(
-            ["git", *args],
-            cwd=str(cwd),
-            capture_output=True,
-            text=True,
-            timeout=_GIT_TIMEOUT,
-            check=False,
-        )
-    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+    if blob is None:
         return None
-    if proc.returncode != 0:
-        return None
-    return proc.stdout
+    text = blob.decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
 
 
-def _git_head_sha(cwd: Path) -> Optional[str]:
-    out = _run_git(cwd, ["rev-parse", "HEAD"])
-    if out is None:
-        return None
-    return out.strip() or None
+def _git_head_sha(git: GitObjectReader) -> Optional[str]:
+    return git.resolve("HEAD")
 
 
-def _git_show_at_sha(cwd: Path, sha: str, rel_path: str) -> Optional[str]:
+def _git_show_at_sha(git: GitObjectReader, sha: str, rel_path: str) -> Optional[str]:
     """Read file at a pinned SHA. Pinning closes the rev-parse vs show TOCTOU
-    that `HEAD:rel` had — a commit landing between the two subprocesses would
+    that `HEAD:rel` had — a commit landing between the two lookups would
     otherwise let the proposer reason against one HEAD while we validated
     against another.
     """
-    out = _run_git(cwd, ["show", f"{sha}:{rel_path}"])
-    return out  # may be "" for empty file; None on failure
+    return _git_text(git.read(f"{sha}:{rel_path}"))  # "" for empty file; None on failure
 
 
-def _git_tracked_paths_at_sha(cwd: Path, sha: str) -> Optional[set]:
-    out = _run_git(cwd, ["ls-tree", "-r", sha, "--name-only"])
-    if out is None:
-        return None
-    return {line for line in out.splitlines() if line}
+def _git_blob_at_sha(git: GitObjectReader, sha: str, rel_path: str) -> Optional[bytes]:
+    """Raw bytes of rel_path at sha when it is a tracked file there, else None.
+
+    One object lookup replaces `git ls-tree -r` + `git show`: `sha:path`
+    resolves to a blob exactly when ls-tree would list path as a file.
+    """
+    return git.read(f"{sha}:{rel_path}")
 
 
 def _sha256_hex(data: str) -> str:
@@ -295,8 +280,44 @@ def evaluate_amend_request(
     tick_start: Optional[float] = None,
     tick_interval_seconds: float = _LEADER_TICK_INTERVAL_DEFAULT,
     judge_callable: Optional[Callable[..., Any]] = None,
+    git: Optional[GitObjectReader] = None,
+) -> AmendDecision:
+    """Evaluate an amend request. See module docstring for gate semantics.
+
+    Every git read of the evaluation (HEAD, the scenario at HEAD, class A
+    blobs) goes through one `git cat-file --batch` reader. Pass `git` to
+    share a caller's reader; otherwise one is opened and closed here.
+    """
+    if git is None:
+        with GitObjectReader(cwd, timeout=_GIT_TIMEOUT) as git:
+            return _evaluate_amend_request(
+                git, cwd, scenario_rel, proposed_content, premortem,
+                evidence_artifact, base_head_sha, base_file_hash,
+                proposer_role, proposal_mtime, tick_start,
+                tick_interval_seconds, judge_callable,
+            )
+    return _evaluate_amend_request(
+        git, cwd, scenario_rel, proposed_content, premortem,
+        evidence_artifact, base_head_sha, base_file_hash, proposer_role,
+        proposal_mtime, tick_start, tick_interval_seconds, judge_callable,
+    )
+
+
+def _evaluate_amend_request(
+    git: GitObjectReader,
+    cwd: Path,
+    scenario_rel: str,
+    proposed_content: str,
+    premortem: str,
+    evidence_artifact: dict,
+    base_head_sha: str,
+    base_file_hash: str,
+    proposer_role: str,
+    proposal_mtime: Optional[float],
+    tick_start: Optional[float],
+    tick_interval_seconds: float,
+    judge_callable: Optional[Callable[..., Any]],
 ) -> AmendDecision:
-    """Evaluate an amend request. See module docstring for gate semantics."""
     cwd = Path(cwd)
     decision = AmendDecision(approved=False)
     decision.gate_verdicts = {
@@ -367,7 +388,7 @@ def evaluate_amend_request(
 
     # ─── Gate 0: STALENESS (SCEN-216, SCEN-218a) ───────────────────
     t0 = time.monotonic()
-    current_head = _git_head_sha(cwd)
+    current_head = _git_head_sha(git)
     if current_head is None:
         reason = "git HEAD unavailable"
         decision.gate_verdicts["staleness"] = "FAIL"
@@ -404,7 +425,7 @@ def evaluate_amend_request(
         decision.reason = reason
         return decision
 
-    head_content = _git_show_at_sha(cwd, current_head, scenario_rel)
+    head_content = _git_show_at_sha(git, current_head, scenario_rel)
     if head_content is None:
         reason = "scenario not present at HEAD"
         decision.gate_verdicts["staleness"] = "FAIL"
@@ -509,24 +530,21 @@ def evaluate_amend_request(
         # appear in the tree AND working-tree bytes must equal the blob at
         # the pinned SHA. Without the content match a proposer could overwrite
         # a tracked fixture and submit it as evidence (security review P1).
-        tracked = _git_tracked_paths_at_sha(cwd, current_head)
-        if tracked is None:
-            return _evidence_fail("class_a_git_unavailable")
         try:
             rel = artifact_resolved.relative_to(cwd_resolved).as_posix()
         except ValueError:
             return _evidence_fail("artifact escapes project root")
-        if rel not in tracked:
-            return _evidence_fail("class_a_path_not_tracked_at_head")
-        blob_content = _git_show_at_sha(cwd, current_head, rel)
+        blob_content = _git_blob_at_sha(git, current_head, rel)
         if blob_content is None:
-            return _evidence_fail("class_a_blob_unavailable")
+            if git.object_type(current_head) is None:
+                return _evidence_fail("class_a_git_unavailable")
+            return _evidence_fail("class_a_path_not_tracked_at_head")
         try:
             working_bytes = artifact_resolved.read_bytes()
         except OSError:
             return _evidence_fail("class_a_artifact_unreadable")
         if hashlib.sha256(working_bytes).hexdigest() != hashlib.sha256(
-            blob_content.encode("utf-8")
+            blob_content
         ).hexdigest():
             return _evidence_fail("class_a_content_diverged_from_head")
 
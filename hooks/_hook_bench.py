@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Hook latency benchmark harness — percentiles, import/logic split, baseline.
+
+Drives every Python hook registered in hooks.json through the real
+invocation chain (_subprocess_harness.invoke_hook → _run.cmd → python)
+against synthetic projects of 10 / 1k / 10k source files plus scenario
+files, cold (SDD temp state for the fixture wiped before every call) and
+warm (state primed once, then reused).
+
+Per (hook, case, size, mode) it records p50/p95/p99/mean over N runs and
+splits the p50 into interpreter startup, import time (python -X importtime
+self-time of the hook's import graph) and logic (the remainder).
+
+Results are written as JSON and compared against a committed baseline
+(hooks/bench_baseline.json) with a configurable regression tolerance.
+A metric regresses when it exceeds baseline * (1 + tolerance) AND the
+absolute delta exceeds --min-delta-ms (keeps sub-millisecond noise out).
+
+Usage:
+    python3 hooks/_hook_bench.py                       # all sizes, compare
+    python3 hooks/_hook_bench.py --sizes 10 --runs 10  # quick pass
+    python3 hooks/_hook_bench.py --write-baseline      # refresh baseline
+
+Exit code 1 when any regression is found. notify.cmd (Stop/Notification)
+is not a Python hook and is not benchmarked — it raises OS notifications.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _subprocess_harness import HOOKS_DIR, invoke_hook
+from _sdd_state import extract_session_id, project_hash
+
+HOOKS_JSON = HOOKS_DIR / "hooks.json"
+DEFAULT_BASELINE = HOOKS_DIR / "bench_baseline.json"
+DEFAULT_SIZES = (10, 1000, 10000)
+DEFAULT_RUNS = 20
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 5.0
+COMPARED_METRICS = ("p50", "p95")
+
+SESSION_ID = "hook-bench-session"
+SCENARIO_REL_DIR = "docs/specs/bench/scenarios"
+_FILES_PER_PACKAGE = 500
+
+# Keeps agent-browser-check from attempting a real npm install.
+_BENCH_ENV = {"AI_FRAMEWORK_SKIP_BROWSER_INSTALL": "1"}
+
+_SCENARIO_TEMPLATE = """\
+---
+name: bench-{i}
+created_by: manual
+created_at: 2026-04-17T10:00:00Z
+---
+
+## SCEN-{i:03d}: bench scenario {i}
+**Given**: a registered user
+**When**: POST /login with valid credentials
+**Then**: response 200 with token 'Bench{i}'
+**Evidence**: HTTP response body asserts JSON `{{"ok": true}}`
+"""
+
+
+# ─────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────
+
+def _git(args, cwd):
+    subprocess.run(
+        ["git", "-c", "user.email=bench@example.com", "-c", "user.name=bench"]
+        + args,
+        cwd=str(cwd), check=True, capture_output=True, timeout=300,
+    )
+
+
+def build_fixture(root, n_source, n_scenarios=None, git=True):
+    """Create a synthetic project under root. Returns root as Path.
+
+    Layout: src/pkg_K/mod_I.py (500 per package), tests/test_mod_I.py for
+    every tenth module, and n_scenarios (default n_source // 100, min 1)
+    scenario files under docs/specs/bench/scenarios/. Committed to a fresh
+    git repo when git is available, so scenario baselines resolve.
+    """
+    root = Path(root)
+    if n_scenarios is None:
+        n_scenarios = max(1, n_source // 100)
+    for i in range(n_source):
+        pkg = root / "src" / f"pkg_{i // _FILES_PER_PACKAGE}"
+        pkg.mkdir(parents=True, exist_ok=True)
+        (pkg / f"mod_{i}.py").write_text(
+            f"def value_{i}():\n    return {i}\n", encoding="utf-8")
+    tests = root / "tests"
+    tests.mkdir(parents=True, exist_ok=True)
+    for i in range(0, n_source, 10):
+        (tests / f"test_mod_{i}.py").write_text(
+            f"from pkg_{i // _FILES_PER_PACKAGE}.mod_{i} import value_{i}\n\n\n"
+            f"def test_value_{i}():\n    assert value_{i}() == {i}\n",
+            encoding="utf-8")
+    scen_dir = root / SCENARIO_REL_DIR
+    scen_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(n_scenarios):
+        (scen_dir / f"bench_{i}.scenarios.md").write_text(
+            _SCENARIO_TEMPLATE.format(i=i), encoding="utf-8")
+    if git and shutil.which("git"):
+        _git(["init", "-q"], root)
+        _git(["add", "-A"], root)
+        _git(["commit", "-q", "-m", "bench fixture"], root)
+    return root
+
+
+def reset_fixture_state(cwd):
+    """Wipe every SDD temp file keyed by this fixture's project hash."""
+    phash = project_hash(str(cwd))
+    tmp = Path(tempfile.gettempdir())
+    for path in tmp.glob(f"sdd-*{phash}*"):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    metrics = Path(cwd) / ".claude" / "metrics.jsonl"
+    try:
+        metrics.unlink()
+    except OSError:
+        pass
+
+
+# ─────────────────────────────────────────────────────────────────
+# CASES — one representative payload per hook path
+# ─────────────────────────────────────────────────────────────────
+
+def _edit(path, old, new):
+    return {"tool_name": "Edit",
+            "tool_input": {"file_path": str(path), "old_string": old,
+                           "new_string": new}}
+
+
+def _bash(command):
+    return {"tool_name": "Bash", "tool_input": {"command": command}}
+
+
+def _scenario_edit(fx):
+    path = Path(fx) / SCENARIO_REL_DIR / "bench_0.scenarios.md"
+    return _edit(path, "'Bench0'", "'Bench0x'")
+
+
+CASES = (
+    ("sdd-test-guard.py", "edit-source",
+     lambda fx: _edit(Path(fx) / "src/pkg_0/mod_0.py", "return 0", "return 1")),
+    ("sdd-test-guard.py", "edit-test",
+     lambda fx: _edit(Path(fx) / "tests/test_mod_0.py",
+                      "assert value_0() == 0", "assert value_0() == 0  # ok")),
+    ("sdd-test-guard.py", "edit-scenario", _scenario_edit),
+    ("sdd-test-guard.py", "bash", lambda fx: _bash("ls -la")),
+    ("sdd-test-guard.py", "bash-commit", lambda fx: _bash("git commit -m bench")),
+    ("sdd-auto-test.py", "edit-source",
+     lambda fx: _edit(Path(fx) / "src/pkg_0/mod_0.py", "return 0", "return 1")),
+    ("session-start.py", "startup", lambda fx: {"source": "startup"}),
+    ("agent-browser-check.py", "startup", lambda fx: {"source": "startup"}),
+    ("task-completed.py", "subagent", lambda fx: {"task_subject": "bench"}),
+    ("teammate-idle.py", "idle", lambda fx: {"teammate_name": "bench"}),
+    ("subagent-start.py", "start", lambda fx: {"agent_type": "general-purpose"}),
+    ("constraint-reinforcement.py", "prompt", lambda fx: {"prompt": "bench"}),
+    ("hook-dispatch.py", "session-start",
+     lambda fx: {"hook_event_name": "SessionStart", "source": "startup"}),
+)
+
+
+def _dispatch_handlers(event):
+    """Handler scripts hook-dispatch.py runs for event (module body only)."""
+    from _hook_runtime import load_hook
+    return load_hook("hook-dispatch.py").HANDLERS.get(event, ())
+
+
+def registered_hook_scripts():
+    """Python entry points registered in hooks.json (via _run.cmd).
+
+    hook-dispatch.py counts itself plus every handler it runs for the
+    event named after it on the command line.
+    """
+    data = json.loads(HOOKS_JSON.read_text(encoding="utf-8"))
+    scripts = set()
+    for groups in data["hooks"].values():
+        for group in groups:
+            for hook in group.get("hooks", []):
+                tokens = hook["command"].replace('"', "").split()
+                for i, token in enumerate(tokens):
+                    if not token.endswith(".py"):
+                        continue
+                    name = Path(token).name
+                    scripts.add(name)
+                    if name == "hook-dispatch.py" and i + 1 < len(tokens):
+                        scripts.update(_dispatch_handlers(tokens[i + 1]))
+    return sorted(scripts)
+
+
+# ─────────────────────────────────────────────────────────────────
+# IMPORT PROFILE
+# ─────────────────────────────────────────────────────────────────
+
+# Loads the hook module by path without running main().
+_IMPORT_LOADER = (
+    "import importlib.util as u, sys; "
+    "s = u.spec_from_file_location('hook_under_test', sys.argv[1]); "
+    "m = u.module_from_spec(s); s.loader.exec_module(m)"
+)
+_IMPORT_BASELINE = "import importlib.util"
+
+
+def _importtime(code, *args):
+    """Run code under -X importtime. Returns {module: self_us}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-B", "-c", code, *args],
+        capture_output=True, text=True, timeout=30, cwd=str(HOOKS_DIR),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import failed: {result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def hook_import_profile(script):
+    """{module: self_us} for modules the hook adds beyond the loader."""
+    baseline = _importtime(_IMPORT_BASELINE)
+    loaded = _importtime(_IMPORT_LOADER, str(HOOKS_DIR / script))
+    return {m: us for m, us in loaded.items() if m not in baseline}
+
+
+def hook_import_ms(script, runs=3):
+    return statistics.median(
+        sum(hook_import_profile(script).values()) / 1000.0 for _ in range(runs)
+    )
+
+
+def startup_ms(runs=10):
+    """p50 of bash + bare interpreter startup — the floor of any hook call."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(["bash", "-c", f'exec "{sys.executable}" -B -c pass'],
+                       capture_output=True, timeout=30)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return percentile(samples, 50)
+
+
+# ─────────────────────────────────────────────────────────────────
+# STATISTICS + COMPARISON
+# ─────────────────────────────────────────────────────────────────
+
+def percentile(samples, q):
+    """Nearest-rank percentile (q in 0..100). Empty input → 0.0."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "p50": round(percentile(samples, 50), 3),
+        "p95": round(percentile(samples, 95), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "mean": round(statistics.fmean(samples), 3) if samples else 0.0,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE,
+            min_delta_ms=DEFAULT_MIN_DELTA_MS, metrics=COMPARED_METRICS):
+    """Regressions of results vs baseline. Returns list of dicts.
+
+    Keys present on only one side are ignored — new cases have no
+    baseline yet, retired cases have nothing to compare.
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    for key, current in sorted(results.get("results", {}).items()):
+        reference = base_results.get(key)
+        if not reference:
+            continue
+        for metric in metrics:
+            cur, ref = current.get(metric), reference.get(metric)
+            if cur is None or ref is None:
+                continue
+            if cur > ref * (1.0 + tolerance) and cur - ref > min_delta_ms:
+                regressions.append({
+                    "key": key, "metric": metric,
+                    "baseline_ms": ref, "current_ms": cur,
+                    "ratio": round(cur / ref, 3) if ref else None,
+                })
+    return regressions
+
+
+# ─────────────────────────────────────────────────────────────────
+# RUNNER
+# ─────────────────────────────────────────────────────────────────
+
+def _measure(script, payload, cwd, runs, cold):
+    samples = []
+    if not cold:
+        invoke_hook(script, payload, env=_BENCH_ENV, timeout=60)  # prime
+    for _ in range(runs):
+        if cold:
+            reset_fixture_state(cwd)
+        _, _, _, elapsed_ms = invoke_hook(script, payload, env=_BENCH_ENV,
+                                          timeout=60)
+        samples.append(elapsed_ms)
+    return samples
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, runs=DEFAULT_RUNS, cases=CASES,
+                   modes=("cold", "warm"), log=None):
+    """Run every case at every size and mode. Returns the results dict."""
+    floor_ms = startup_ms()
+    import_ms = {script: hook_import_ms(script)
+                 for script in sorted({c[0] for c in cases})}
+    results = {}
+    for size in sizes:
+        root = Path(tempfile.mkdtemp(prefix=f"sdd-bench-{size}-"))
+        try:
+            build_fixture(root, size)
+            cwd = str(root)
+            for script, case, make_payload in cases:
+                payload = dict(make_payload(cwd))
+                payload.setdefault("cwd", cwd)
+                payload.setdefault("session_id", SESSION_ID)
+                for mode in modes:
+                    reset_fixture_state(cwd)
+                    samples = _measure(script, payload, cwd, runs,
+                                       cold=(mode == "cold"))
+                    stats = summarize(samples)
+                    stats["startup_ms"] = round(floor_ms, 3)
+                    stats["import_ms"] = round(import_ms[script], 3)
+                    stats["logic_ms"] = round(
+                        max(0.0, stats["p50"] - floor_ms - import_ms[script]), 3)
+                    key = f"{script}:{case}:{size}:{mode}"
+                    results[key] = stats
+                    if log:
+                        log(f"{key:55s} p50={stats['p50']:8.1f} "
+                            f"p95={stats['p95']:8.1f} p99={stats['p99']:8.1f} "
+                            f"import={stats['import_ms']:6.1f} "
+                            f"logic={stats['logic_ms']:6.1f}")
+        finally:
+            reset_fixture_state(str(root))
+            shutil.rmtree(root, ignore_errors=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "runs": runs,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "session_id": extract_session_id({"session_id": SESSION_ID}),
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated fixture sizes (source files)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--tolerance", type=float, default=float(
+        os.environ.get("SDD_BENCH_TOLERANCE", DEFAULT_TOLERANCE)))
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument("--write-baseline", action="store_true",
+                        help="write results to --baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s.strip())
+    results = run_benchmarks(sizes=sizes, runs=args.runs,
+                             log=lambda line: print(line, file=sys.stderr))
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n",
+                                 encoding="utf-8")
+    if args.write_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2) + "\n",
+                                       encoding="utf-8")
+        print(f"baseline written: {args.baseline}")
+        return 0
+
+    try:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        print(f"no baseline at {args.baseline}; results in {args.output}")
+        return 0
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for r in regressions:
+        print(f"REGRESSION {r['key']} {r['metric']}: "
+              f"{r['baseline_ms']:.1f}ms → {r['current_ms']:.1f}ms (x{r['ratio']})")
+    print(f"{len(results['results'])} measurements, {len(regressions)} regressions "
+          f"(tolerance {args.tolerance:.0%}); results in {args.output}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
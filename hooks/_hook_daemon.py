@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""Opt-in persistent hook daemon — keeps hook modules warm between events.
+
+Every hook event normally spawns a fresh interpreter that re-imports the
+_sdd_* stack and starts with cold caches (project_hash,
+detect_coverage_command, _project_config_cache, compiled regexes). With
+SDD_HOOK_DAEMON=1 in the environment, _run.cmd runs this file as a thin
+client instead: it forwards hook name, stdin, the environment variables
+hooks read (_forwarded_env) and cwd over a per-user unix socket to a
+long-lived server that dispatches through _hook_runtime.run_hook().
+
+Fallback is the contract: when the daemon is absent, stale, or anything
+goes wrong, the client execs (or spawns) the hook exactly like _run.cmd
+does without the daemon. A missing daemon is started in the background
+for the next event; the current event never waits for it.
+
+Server lifecycle:
+    - One daemon per user + plugin install (socket name carries a
+      checksum of the hooks directory). A flock held for the daemon's
+      lifetime makes concurrent auto-starts race-free.
+    - Socket lives in a private directory: $XDG_RUNTIME_DIR, else
+      `sdd-hookd-{uid}` in the temp dir, created 0700 and used only when
+      it is ours and closed to others. The socket itself is 0600. The
+      client connects only to a socket owned by its uid and, where
+      SO_PEERCRED exists, answered by a process of its uid — a hook
+      verdict from anyone else would decide allow/deny.
+    - Exits after HOOK_DAEMON_IDLE_SECONDS without requests, or when any
+      hooks/*.py changes on disk (plugin update) — the request that
+      notices answers "fallback" so nothing runs against stale code.
+    - Every request runs in a forked child (run_hook swaps process-global
+      state, so threads are out), so one session's slow guard or
+      TaskCompleted gate never holds up another's hooks. The parent
+      imports every hook module at start, so children start warm;
+      caches a child fills die with it.
+
+Extra _run.cmd arguments (e.g. hook-dispatch.py's event name) are
+forwarded and become the hook's sys.argv[1:].
+
+Wire format: 4-byte big-endian length + UTF-8 JSON, one request and one
+response per connection.
+
+Client imports are kept minimal (os, sys, socket, json) — the client is
+the part that still pays interpreter startup on every event.
+"""
+import json
+import os
+import socket
+import sys
+import zlib
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_CONNECT_TIMEOUT = 0.5  # seconds; a live daemon accepts immediately
+_MAX_MESSAGE = 64 * 1024 * 1024
+
+# Environment the client forwards: what hooks read, and what decides
+# which test runner their commands resolve to. Everything else (tokens,
+# API keys) stays in the client; the served hook sees the daemon's own.
+_FORWARDED_ENV_PREFIXES = ("CLAUDE_", "SDD_", "_SDD_")
+_FORWARDED_ENV_KEYS = frozenset({
+    "PATH", "HOME", "TMPDIR", "TEMP", "TMP", "CI", "PHASE7_PERF",
+    "VIRTUAL_ENV", "PYTHONPATH",
+})
+
+
+def _is_forwarded(key):
+    return key in _FORWARDED_ENV_KEYS or key.startswith(_FORWARDED_ENV_PREFIXES)
+
+
+def _forwarded_env(environ):
+    return {k: v for k, v in environ.items() if _is_forwarded(k)}
+
+
+def _private_dir(path):
+    """True when path is a directory of ours that nobody else can enter."""
+    import stat
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid()
+            and not st.st_mode & 0o077)
+
+
+def socket_path():
+    """Per-user, per-install socket path, or None when no private directory
+    is available. SDD_HOOK_DAEMON_SOCKET overrides.
+    """
+    override = os.environ.get("SDD_HOOK_DAEMON_SOCKET")
+    if override:
+        return override
+    if not hasattr(os, "getuid"):
+        return None
+    tag = zlib.crc32(HOOKS_DIR.encode("utf-8")) & 0xFFFFFFFF
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and _private_dir(runtime):
+        return os.path.join(runtime, f"sdd-hookd-{tag:08x}.sock")
+    tmp = (os.environ.get("TMPDIR") or os.environ.get("TEMP")
+           or os.environ.get("TMP") or "/tmp")
+    directory = os.path.join(tmp, f"sdd-hookd-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    if not _private_dir(directory):
+        return None  # squatted by another user, or opened up: never use it
+    return os.path.join(directory, f"{tag:08x}.sock")
+
+
+def _own_socket(path):
+    """True when path is a socket owned by this uid (lstat: no symlinks)."""
+    import stat
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def _peer_is_us(sock):
+    """SO_PEERCRED check of the daemon's uid; True where unsupported."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True
+    import struct
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                            struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1] == os.getuid()
+
+
+# ─────────────────────────────────────────────────────────────────
+# WIRE FORMAT
+# ─────────────────────────────────────────────────────────────────
+
+def _send(sock, obj):
+    payload = json.dumps(obj).encode("utf-8")
+    sock.sendall(len(payload).to_bytes(4, "big") + payload)
+
+
+def _recv_exact(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 16))
+        if not chunk:
+            raise ConnectionError("peer closed")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock):
+    size = int.from_bytes(_recv_exact(sock, 4), "big")
+    if size > _MAX_MESSAGE:
+        raise ValueError("message too large")
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+
+# ─────────────────────────────────────────────────────────────────
+# CLIENT — invoked by _run.cmd when SDD_HOOK_DAEMON=1
+# ─────────────────────────────────────────────────────────────────
+
+def _exec_hook(script, args=()):
+    """Replace this process with the plain spawn path (stdin untouched)."""
+    target = os.path.join(HOOKS_DIR, script)
+    os.execv(sys.executable, [sys.executable, "-B", target, *args])
+
+
+def _spawn_hook(script, data, args=()):
+    """Spawn path for when stdin was already consumed. Returns exit code."""
+    import subprocess
+    proc = subprocess.run(
+        [sys.executable, "-B", os.path.join(HOOKS_DIR, script), *args],
+        input=data,
+    )
+    return proc.returncode
+
+
+def start_daemon():
+    """Start a detached daemon. Never raises."""
+    try:
+        import subprocess
+        subprocess.Popen(
+            [sys.executable, "-B", os.path.abspath(__file__), "--serve"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def client_main(script, args=()):
+    """Forward one hook invocation to the daemon; fall back on any miss."""
+    args = list(args)
+    if not hasattr(socket, "AF_UNIX"):
+        _exec_hook(script, args)
+    path = socket_path()
+    if path is None:
+        _exec_hook(script, args)
+    if not os.path.lexists(path):
+        start_daemon()
+        _exec_hook(script, args)
+    if not _own_socket(path):
+        _exec_hook(script, args)  # not our daemon's: never talk to it
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(_CONNECT_TIMEOUT)
+        sock.connect(path)
+        if not _peer_is_us(sock):
+            raise PermissionError("socket served by another user")
+    except OSError:
+        sock.close()
+        start_daemon()
+        _exec_hook(script, args)
+
+    data = sys.stdin.buffer.read()
+    try:
+        sock.settimeout(None)  # hooks.json timeout bounds the whole client
+        _send(sock, {
+            "hook": script,
+            "args": args,
+            "stdin": data.decode("utf-8", errors="replace"),
+            "env": _forwarded_env(os.environ),
+            "cwd": os.getcwd(),
+        })
+        response = _recv(sock)
+    except (OSError, ValueError, ConnectionError):
+        response = {"fallback": True}
+    finally:
+        sock.close()
+
+    if response.get("fallback"):
+        sys.exit(_spawn_hook(script, data, args))
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    sys.exit(int(response.get("rc", 0)))
+
+
+# ─────────────────────────────────────────────────────────────────
+# SERVER
+# ─────────────────────────────────────────────────────────────────
+
+def _hooks_fingerprint():
+    """Latest mtime across hooks/*.py — changes on plugin update."""
+    latest = 0
+    try:
+        with os.scandir(HOOKS_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".py"):
+                    try:
+                        latest = max(latest, entry.stat().st_mtime_ns)
+                    except OSError:
+                        continue
+    except OSError:
+        pass
+    return latest
+
+
+def _payload_cwd(request):
+    """Project dir the hook will operate on (input cwd, then client cwd)."""
+    try:
+        cwd = json.loads(request.get("stdin") or "{}").get("cwd")
+    except (ValueError, AttributeError):
+        cwd = None
+    return cwd if isinstance(cwd, str) and cwd else request.get("cwd")
+
+
+def handle_request(request):
+    """Run one forwarded hook in-process. Returns the response dict."""
+    import _hook_runtime
+    script = request.get("hook")
+    if not _hook_runtime.is_hook_script(script):
+        return {"fallback": True}
+    env = request.get("env")
+    if isinstance(env, dict):
+        # Forwarded keys as the client has them (unset included); the
+        # rest from the daemon's own environment.
+        env = {**{k: v for k, v in os.environ.items() if not _is_forwarded(k)},
+               **_forwarded_env(env)}
+    else:
+        env = None
+    args = request.get("args") or []
+    if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+        return {"fallback": True}
+    _hook_runtime.refresh_project_caches(_payload_cwd(request))
+    rc, out, err = _hook_runtime.run_hook(
+        script, request.get("stdin") or "", env=env, cwd=request.get("cwd"),
+        args=args,
+    )
+    return {"rc": rc, "stdout": out, "stderr": err}
+
+
+def _reap_children():
+    """Collect forked handlers and detached children of in-process hooks."""
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        except OSError:
+            return
+        if pid == 0:
+            return
+
+
+def _answer(conn, fingerprint):
+    """Read one request and answer it. Returns False when hooks/*.py
+    changed on disk (answered "fallback").
+    """
+    try:
+        conn.settimeout(5)
+        request = _recv(conn)
+        conn.settimeout(None)
+    except (OSError, ValueError, ConnectionError):
+        conn.close()
+        return True
+
+    if _hooks_fingerprint() != fingerprint:
+        try:
+            _send(conn, {"fallback": True})
+        except OSError:
+            pass
+        conn.close()
+        return False
+
+    try:
+        response = handle_request(request)
+    except BaseException:
+        response = {"fallback": True}
+    try:
+        _send(conn, response)
+    except OSError:
+        pass
+    conn.close()
+    return True
+
+
+def _serve_connection(conn, fingerprint, inherited=()):
+    """Handle one connection. Returns False when the daemon must stop.
+
+    The whole exchange, request read included, runs in a forked child;
+    inherited fds (the listening socket, the daemon's flock) are closed
+    there so a child outliving the daemon holds neither.
+    """
+    if not hasattr(os, "fork"):
+        return _answer(conn, fingerprint)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            for fd in inherited:
+                os.close(fd)
+            _answer(conn, fingerprint)
+        except BaseException:
+            pass
+        finally:
+            os._exit(0)
+    conn.close()
+    return _hooks_fingerprint() == fingerprint
+
+
+def _preload():
+    """Import every hook module once, before any fork, so children start warm."""
+    import _hook_runtime
+    for name in sorted(os.listdir(HOOKS_DIR)):
+        if _hook_runtime.is_hook_script(name):
+            try:
+                _hook_runtime.load_hook(name)
+            except BaseException:
+                continue  # handle_request answers fallback for it
+
+
+def serve(path=None, idle_timeout=None):
+    """Run the daemon until idle, stale, or killed. Returns exit code."""
+    import fcntl
+    import time
+
+    import _sdd_config
+    if idle_timeout is None:
+        idle_timeout = _sdd_config.HOOK_DAEMON_IDLE_SECONDS
+    path = path or socket_path()
+    if path is None:
+        return 0  # no private directory: hooks keep the spawn path
+
+    try:
+        lock_fd = os.open(path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+    except OSError:
+        return 0
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(lock_fd)
+        return 0  # another daemon owns this socket
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        os.unlink(path)  # stale socket from a dead daemon
+    except FileNotFoundError:
+        pass
+    except OSError:
+        os.umask(old_umask)
+        server.close()
+        os.close(lock_fd)
+        return 0  # not ours to remove: clients keep the spawn path
+    try:
+        server.bind(path)
+    except OSError:
+        server.close()
+        os.close(lock_fd)
+        return 0
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    server.settimeout(1.0)
+
+    fingerprint = _hooks_fingerprint()
+    _preload()
+    last_request = time.monotonic()
+    try:
+        while True:
+            _reap_children()
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                if time.monotonic() - last_request > idle_timeout:
+                    return 0
+                continue
+            last_request = time.monotonic()
+            if not _serve_connection(conn, fingerprint,
+                                     inherited=(server.fileno(), lock_fd)):
+                return 0
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        os.close(lock_fd)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "--client":
+        client_main(sys.argv[2], sys.argv[3:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        sys.exit(serve())
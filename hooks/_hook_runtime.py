@@ -0,0 +1,157 @@
+"""In-process hook execution — shared by the hook daemon and dispatcher.
+
+Hook scripts are standalone programs: they read JSON from stdin, print
+JSON to stdout, write diagnostics to stderr and end with sys.exit(code).
+run_hook() reproduces that contract inside the current interpreter so a
+long-lived process can serve many events without paying interpreter
+startup + import cost on each one.
+
+Hook modules are loaded once per process (filenames contain hyphens, so
+importlib.util loads them by path) and kept in _HOOK_MODULES. Module-level
+caches (project_hash, detect_coverage_command, _project_config_cache,
+compiled regexes) therefore survive between events. refresh_project_caches()
+drops config-derived caches when the files they were derived from change.
+
+Process-global state (os.environ, cwd, sys.argv, std streams) is swapped
+for the duration of one call and restored afterwards. Calls are NOT
+thread-safe — callers serialize them.
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import traceback
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(HOOKS_DIR))
+
+_HOOK_MODULES: dict = {}
+
+# Files whose content feeds config-derived caches: .claude/config.json
+# (tier 2 overrides) and the manifests detect_coverage_command inspects.
+_CACHE_INPUT_FILES = (
+    ".claude/config.json", "package.json", "pyproject.toml", "setup.cfg",
+    "pytest.ini", "go.mod", "Cargo.toml",
+)
+_cache_fingerprints: dict[str, tuple] = {}
+
+
+def is_hook_script(script) -> bool:
+    """True when script names a hook entry point inside HOOKS_DIR.
+
+    Only bare filenames are accepted — a path separator or a private
+    (underscore) module never resolves, so a socket peer cannot make the
+    runtime execute arbitrary files.
+    """
+    if not isinstance(script, str) or not script.endswith(".py"):
+        return False
+    if "/" in script or "\\" in script or script.startswith(("_", ".")):
+        return False
+    if script.startswith("test_"):
+        return False
+    return (HOOKS_DIR / script).is_file()
+
+
+def load_hook(script):
+    """Import hook script once per process. Returns the module."""
+    module = _HOOK_MODULES.get(script)
+    if module is not None:
+        return module
+    if not is_hook_script(script):
+        raise ValueError(f"not a hook script: {script!r}")
+    name = "_hook_" + script[:-3].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, HOOKS_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _HOOK_MODULES[script] = module
+    return module
+
+
+def _fingerprint(cwd) -> tuple:
+    fp = []
+    for rel in _CACHE_INPUT_FILES:
+        try:
+            st = os.stat(os.path.join(cwd, rel))
+            fp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            fp.append(None)
+    return tuple(fp)
+
+
+def refresh_project_caches(cwd) -> bool:
+    """Drop config-derived caches when cwd's config/manifests changed.
+
+    First sighting of a cwd only records its fingerprint (caches for it
+    cannot exist yet). Returns True when caches were cleared.
+    """
+    if not cwd:
+        return False
+    fp = _fingerprint(cwd)
+    previous = _cache_fingerprints.get(cwd)
+    _cache_fingerprints[cwd] = fp
+    if previous is None or previous == fp:
+        return False
+    config = sys.modules.get("_sdd_config")
+    if config is not None:
+        config._clear_project_config_cache()
+    return True
+
+
+def _exit_code(exc: SystemExit, stderr) -> int:
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=stderr)
+    return 1
+
+
+def run_hook(script, stdin_text="", env=None, cwd=None, args=()):
+    """Run hook script's main() in-process. Returns (rc, stdout, stderr).
+
+    Mirrors the spawn contract: SystemExit maps to its exit code, an
+    uncaught exception prints a traceback and maps to 1 (non-blocking).
+    env, when given, REPLACES os.environ for the call; cwd changes the
+    working directory for the call; args become sys.argv[1:].
+    """
+    out, err = io.StringIO(), io.StringIO()
+    saved_env = dict(os.environ) if env is not None else None
+    saved_argv = sys.argv
+    saved_stdin = sys.stdin
+    saved_cwd = None
+    rc = 0
+    try:
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+        if cwd:
+            try:
+                saved_cwd = os.getcwd()
+            except OSError:
+                saved_cwd = str(HOOKS_DIR)
+            os.chdir(cwd)
+        sys.argv = [str(HOOKS_DIR / script), *args]
+        sys.stdin = io.StringIO(stdin_text or "")
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                load_hook(script).main()
+            except SystemExit as exc:
+                rc = _exit_code(exc, err)
+            except Exception:
+                traceback.print_exc(file=err)
+                rc = 1
+    finally:
+        sys.stdin = saved_stdin
+        sys.argv = saved_argv
+        if saved_cwd is not None:
+            try:
+                os.chdir(saved_cwd)
+            except OSError:
+                pass
+        if saved_env is not None:
+            os.environ.clear()
+            os.environ.update(saved_env)
+    return rc, out.getvalue(), err.getvalue()
@@ -5,7 +5,9 @@ REM On Windows: cmd.exe runs the batch portion, finds python.
 REM On Unix: the shell interprets this as a script (: is a no-op in bash).
 REM
 REM Receives script name (not full path) — resolves via %~dp0 / $SCRIPT_DIR.
-REM Usage: _run.cmd <script-name.py>
+REM Usage: _run.cmd <script-name.py> [args...]  (args forwarded to the script)
+REM Unix only: SDD_HOOK_DAEMON=1 forwards to the warm hook daemon
+REM (_hook_daemon.py), which falls back to the plain spawn path itself.
 if "%~1"=="" exit /b 0
 set "HOOK_DIR=%~dp0"
 if not exist "%HOOK_DIR%%~1" exit /b 0
@@ -14,16 +16,22 @@ where py >nul 2>&1 && goto :found_py
 echo ERROR: Python not found in PATH >&2
 exit /b 1
 :found_python
-python -B "%HOOK_DIR%%~1"
+python -B "%HOOK_DIR%%~1" %2 %3 %4
 exit /b %ERRORLEVEL%
 :found_py
-py -3 -B "%HOOK_DIR%%~1"
+py -3 -B "%HOOK_DIR%%~1" %2 %3 %4
 exit /b %ERRORLEVEL%
 CMDBLOCK
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
-[ -f "$SCRIPT_DIR/$1" ] || exit 0
+[ -n "$1" ] && [ -f "$SCRIPT_DIR/$1" ] || exit 0
+HOOK="$1"
+shift
 if command -v python3 >/dev/null 2>&1; then
-  exec python3 -B "$SCRIPT_DIR/$1"
+  PY=python3
 else
-  exec python -B "$SCRIPT_DIR/$1"
+  PY=python
 fi
+if [ "${SDD_HOOK_DAEMON:-}" = "1" ] && [ -f "$SCRIPT_DIR/_hook_daemon.py" ]; then
+  exec "$PY" -S -B "$SCRIPT_DIR/_hook_daemon.py" --client "$HOOK" "$@"
+fi
+exec "$PY" -B "$SCRIPT_DIR/$HOOK" "$@"
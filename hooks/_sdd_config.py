@@ -55,6 +55,22 @@ ACQUIRE_LOCK_BACKOFF_SECONDS = 0.1  # 100ms; total max wait ~200ms
 MAX_RERUNS = 3                  # auto-test rerun safety valve
 FAILURE_CIRCUIT_BREAKER = 3     # teammate-idle consecutive failures before halt
 
+# ─────────────────────────────────────────────────────────────────
+# COALESCING — what the auto-test worker does with edits that arrive
+# while a run is in flight. Override via .claude/config.json:
+#     {"COALESCE": "restart"}
+#   "finish"  — finish the stale run, then rerun (up to MAX_RERUNS)
+#   "restart" — wait for a quiet period before each run; when an edit
+#               lands before COALESCE_RESTART_FRACTION of the expected
+#               duration has elapsed, kill the run and start over
+# Whatever the policy, the last of the MAX_RERUNS+1 passes is never cut.
+# ─────────────────────────────────────────────────────────────────
+COALESCE_POLICIES = ("finish", "restart")
+DEFAULT_COALESCE_POLICY = "finish"
+COALESCE_QUIET_SECONDS = 0.5    # no edit for this long before a run starts
+COALESCE_QUIET_MAX_WAIT = 5.0   # a steady stream of edits delays a run at most this
+COALESCE_RESTART_FRACTION = 0.5  # past this share of the last duration, finish instead
+
 # ─────────────────────────────────────────────────────────────────
 # ADAPTIVE GATE TIMEOUT — scales test gate by historical duration
 # ─────────────────────────────────────────────────────────────────
@@ -70,6 +86,41 @@ HOOK_TIMEOUT_PRE_TOOL_USE = 5
 HOOK_TIMEOUT_POST_TOOL_USE = 10
 HOOK_TIMEOUT_TASK_COMPLETED = 300
 
+# ─────────────────────────────────────────────────────────────────
+# OUTPUT CAPTURE — bounded stdout/stderr of run_in_process_group
+# (see _sdd_stream.py). Memory per stream is fixed whatever the volume.
+# ─────────────────────────────────────────────────────────────────
+CAPTURE_HEAD_BYTES = 4 * 1024       # first bytes kept (collection errors, usage)
+CAPTURE_TAIL_BYTES = 64 * 1024      # last bytes kept (summaries, failures)
+PROGRESS_INTERVAL = 1.0             # seconds between live progress writes
+
+# ─────────────────────────────────────────────────────────────────
+# HOOK DAEMON — opt-in warm process behind _run.cmd (SDD_HOOK_DAEMON=1)
+# Env-var opt-in (not config.json): _run.cmd decides before any Python
+# runs. See hooks/_hook_daemon.py.
+# ─────────────────────────────────────────────────────────────────
+HOOK_DAEMON_IDLE_SECONDS = 1800  # 30 min without events → daemon exits
+
+# ─────────────────────────────────────────────────────────────────
+# STATE BACKEND — where shared hook state lives (see _sdd_store.py)
+#   "files"  — one JSON/marker file per record under the tmpdir (default)
+#   "sqlite" — one WAL-mode SQLite database per project
+# Override via SDD_STATE_BACKEND env var or .claude/config.json:
+#     {"STATE_BACKEND": "sqlite"}
+# PID files and runner/coverage lockfiles stay files on both backends:
+# their flock semantics ARE the liveness signal.
+# ─────────────────────────────────────────────────────────────────
+STATE_BACKENDS = ("files", "sqlite")
+DEFAULT_STATE_BACKEND = "files"
+STATE_STORE_RETENTION = 86400   # 24h — rows past this are purged (matches tmp sweep)
+STATE_STORE_BUSY_TIMEOUT = 5    # seconds a writer waits on a locked database
+
+# ─────────────────────────────────────────────────────────────────
+# BASH COMMAND CACHE — memoized shell lexing (see _sdd_shell.py)
+# ─────────────────────────────────────────────────────────────────
+SHELL_CACHE_MIN_BYTES = 1024    # shorter commands are lexed on every call
+SHELL_CACHE_ENTRIES = 64        # LRU capacity of sdd-shell-cache.json
+
 # ─────────────────────────────────────────────────────────────────
 # PHASE 8 — PER-EDIT FAST-PATH (Factory.ai-aligned test impact)
 #
@@ -84,6 +135,8 @@ HOOK_TIMEOUT_TASK_COMPLETED = 300
 #   Rung 1a: edit IS a test file           → run that test file only
 #   Rung 1b: edit IS source + session tests → run record_file_edit tests
 #   Rung 2:  edit IS source + no session   → [SDD:ORDERING] warn + stack-native impacted
+#            (pytest: coverage-context index when IMPACT_INDEX is on;
+#             pytest / node --test: static import graph otherwise)
 #   Rung 3:  no primitive / failure / fvf  → full suite (safety net)
 #   Milestone (TaskCompleted): full suite + coverage + scenarios [unchanged]
 #
@@ -109,6 +162,117 @@ FAST_PATH_FORCE_FULL_FILES = frozenset({
     "vitest.config.cjs",
 })
 
+# ─────────────────────────────────────────────────────────────────
+# DURATION HISTORY — per (command, rung) run durations behind
+# adaptive_gate_timeout and the TaskCompleted budget check (see
+# _sdd_history.py)
+# ─────────────────────────────────────────────────────────────────
+DURATION_HISTORY_SAMPLES = 20       # recent durations kept per key (p95 source)
+DURATION_EWMA_ALPHA = 0.3           # weight of the newest duration in the EWMA
+DURATION_HISTORY_MAX_COMMANDS = 64  # per-command keys kept (least recent dropped)
+
+# ─────────────────────────────────────────────────────────────────
+# HOST SCHEDULER — machine-wide slots for background test runs, shared by
+# every project, session and worktree of the user (see _sdd_slots.py).
+# Opt-in via .claude/config.json:
+#     {"HOST_SCHEDULER": true}
+# ─────────────────────────────────────────────────────────────────
+HOST_SCHEDULER_ENABLED = False      # default when config.json is silent
+HOST_CORES_PER_RUN = 2              # slots = CPU count // this (at least 1)
+HOST_MAX_LOAD = 1.0                 # 1-min load per core above which runs queue
+HOST_SLOT_MAX_WAIT = 60             # seconds queued before running anyway (<= TaskCompleted's 60 s wait)
+HOST_NICE = 10                      # niceness of background workers (ionice: best-effort 7)
+
+# ─────────────────────────────────────────────────────────────────
+# RESOURCE LIMITS — optional rlimits on every test and gate process
+# group started by run_in_process_group (see _sdd_rusage.py). Off unless
+# .claude/config.json sets them:
+#     {"RLIMIT_AS_MB": 4096, "RLIMIT_CPU_SECONDS": 900}
+# Each process of the group gets its own cap: RLIMIT_AS its address space
+# (V8 and the JVM reserve far more than they touch — size generously),
+# RLIMIT_CPU its CPU seconds (SIGXCPU past it). Applied by a `ulimit`
+# line the shell runs before the command.
+# ─────────────────────────────────────────────────────────────────
+RLIMIT_AS_MB = 0                    # 0 = no address-space cap
+RLIMIT_CPU_SECONDS = 0              # 0 = no CPU-time cap
+
+# ─────────────────────────────────────────────────────────────────
+# WARM RUNNER — pre-forked pytest server for plain `pytest <args>` runs
+# (see _sdd_warm.py). Opt-in via .claude/config.json:
+#     {"WARM_RUNNER": true}
+# Restarted whenever a conftest.py or FAST_PATH_FORCE_FULL_FILES changes.
+# ─────────────────────────────────────────────────────────────────
+WARM_RUNNER_ENABLED = False         # default when config.json is silent
+WARM_RUNNER_IDLE_SECONDS = 1800     # server exits after this long without a run
+
+# ─────────────────────────────────────────────────────────────────
+# SHARDING — parallel shards for Rung 3 full-suite background runs
+# (see _sdd_shard.py). Opt-in via .claude/config.json:
+#     {"SHARDING": true}
+# pytest / go balanced by recorded durations; jest / vitest via --shard.
+# ─────────────────────────────────────────────────────────────────
+SHARDING_ENABLED = False            # default when config.json is silent
+SHARD_MAX = 8                       # upper bound; free cores decide below it
+
+# ─────────────────────────────────────────────────────────────────
+# FAILED FIRST — the worker reruns the last run's failing tests as a
+# quick stage and publishes a partial state before the full command
+# (see _sdd_failed.py). Opt out via .claude/config.json:
+#     {"FAILED_FIRST": false}
+# ─────────────────────────────────────────────────────────────────
+FAILED_FIRST_ENABLED = True         # default when config.json is silent
+FAILED_FIRST_MAX_IDS = 50           # more failures than this → no quick stage
+FAILED_FIRST_TIMEOUT_SHARE = 0.25   # of the full timeout, until the stage has history
+FAILED_FIRST_MIN_TIMEOUT = 30       # seconds; floor of the quick stage's timeout
+
+# ─────────────────────────────────────────────────────────────────
+# RESULT CACHE — test results memoized by (command, working-tree hash)
+# for the auto-test worker and the TaskCompleted test gate (see
+# _sdd_results.py). Opt-in via .claude/config.json:
+#     {"RESULT_CACHE": true}
+# The tree hash covers source and test files plus FAST_PATH_FORCE_FULL_FILES.
+# ─────────────────────────────────────────────────────────────────
+RESULT_CACHE_ENABLED = False        # default when config.json is silent
+RESULT_CACHE_ENTRIES = 32           # most recently used results kept
+RESULT_CACHE_TTL = 86400            # 24h — older results are rerun
+RESULT_CACHE_MAX_FILES = 20000      # larger trees are not hashed → no cache
+
+# ─────────────────────────────────────────────────────────────────
+# STRUCTURED REPORTS — runner-native result files instead of scraping
+# the output tail (see _sdd_report.py): JUnit XML for pytest, --json for
+# jest/vitest, -json for go test. Opt-in via .claude/config.json:
+#     {"STRUCTURED_REPORT": true}
+# ─────────────────────────────────────────────────────────────────
+STRUCTURED_REPORT_ENABLED = False   # default when config.json is silent
+REPORT_MAX_BYTES = 32 * 1024 * 1024 # larger jest/vitest JSON reports are ignored
+REPORT_MAX_FAILURES = 5             # failures (id, location, message) kept in state
+REPORT_MESSAGE_CHARS = 200          # per-failure message cap
+
+# ─────────────────────────────────────────────────────────────────
+# IMPACT INDEX — coverage-context test selection for pytest Rung 2
+# (see _sdd_impact.py). Opt-in via .claude/config.json:
+#     {"IMPACT_INDEX": true}
+# Requires pytest-cov in the project environment.
+# ─────────────────────────────────────────────────────────────────
+IMPACT_INDEX_ENABLED = False        # default when config.json is silent
+IMPACT_INDEX_MAX_AGE = 7 * 86400    # older index → Rung 3
+IMPACT_INDEX_MAX_DRIFT = 0.5        # file changed this much since measured → Rung 3
+IMPACT_INDEX_MAX_NODEIDS = 200      # above: select test files, not nodeids
+
+# ─────────────────────────────────────────────────────────────────
+# IMPORT GRAPH — static import graph for pytest / node --test Rung 2
+# (see _sdd_imports.py). Built by the sdd-auto-test worker after a test
+# run (the only writer; edits are picked up by mtime). Opt out via
+# .claude/config.json:
+#     {"IMPORT_GRAPH": false}
+# ─────────────────────────────────────────────────────────────────
+IMPORT_GRAPH_ENABLED = True         # default when config.json is silent
+IMPORT_GRAPH_MAX_FILES = 20000      # larger trees get no graph → Rung 3
+IMPORT_GRAPH_SKIP_DIRS = frozenset({  # plus every dot-directory
+    "node_modules", "__pycache__", "venv", "site-packages",
+    "dist", "build", "coverage", "target",
+})
+
 
 # ─────────────────────────────────────────────────────────────────
 # TIER 2 — STACK PATTERNS (config-driven via .claude/config.json)
@@ -308,6 +472,127 @@ def get_scenario_discovery_roots(cwd=None) -> tuple:
     return tuple(valid)
 
 
+def get_state_backend(cwd=None) -> str:
+    """State backend name: SDD_STATE_BACKEND env, then `.claude/config.json`:
+        {"STATE_BACKEND": "sqlite"}
+
+    Unknown values fall back to DEFAULT_STATE_BACKEND. The env var wins so
+    a whole team run (all teammates share the environment) can switch at
+    once without touching the project.
+    """
+    import os as _os
+    env = _os.environ.get("SDD_STATE_BACKEND", "").strip().lower()
+    if env in STATE_BACKENDS:
+        return env
+    if cwd is None:
+        return DEFAULT_STATE_BACKEND
+    override = _load_project_config(cwd).get("STATE_BACKEND")
+    if isinstance(override, str) and override.strip().lower() in STATE_BACKENDS:
+        return override.strip().lower()
+    return DEFAULT_STATE_BACKEND
+
+
+def get_coalesce_policy(cwd=None) -> str:
+    """Coalescing policy for in-flight runs. Override via `.claude/config.json`:
+        {"COALESCE": "restart"}
+
+    Unknown values fall back to DEFAULT_COALESCE_POLICY.
+    """
+    if cwd is None:
+        return DEFAULT_COALESCE_POLICY
+    override = _load_project_config(cwd).get("COALESCE")
+    if isinstance(override, str) and override.strip().lower() in COALESCE_POLICIES:
+        return override.strip().lower()
+    return DEFAULT_COALESCE_POLICY
+
+
+def _get_bool_override(cwd, key, default) -> bool:
+    """config.json's `key` when it is a JSON boolean, else default.
+
+    Backs the on/off switches below; cwd None means no project config.
+    """
+    if cwd is None:
+        return default
+    override = _load_project_config(cwd).get(key)
+    if isinstance(override, bool):
+        return override
+    return default
+
+
+def get_impact_index_enabled(cwd=None) -> bool:
+    """Coverage-context impact index on/off. Override via `.claude/config.json`:
+        {"IMPACT_INDEX": true}
+    """
+    return _get_bool_override(cwd, "IMPACT_INDEX", IMPACT_INDEX_ENABLED)
+
+
+def get_warm_runner_enabled(cwd=None) -> bool:
+    """Warm pytest server on/off. Override via `.claude/config.json`:
+        {"WARM_RUNNER": true}
+    """
+    return _get_bool_override(cwd, "WARM_RUNNER", WARM_RUNNER_ENABLED)
+
+
+def get_result_cache_enabled(cwd=None) -> bool:
+    """Test result cache on/off. Override via `.claude/config.json`:
+        {"RESULT_CACHE": true}
+    """
+    return _get_bool_override(cwd, "RESULT_CACHE", RESULT_CACHE_ENABLED)
+
+
+def get_structured_report_enabled(cwd=None) -> bool:
+    """Structured test reports on/off. Override via `.claude/config.json`:
+        {"STRUCTURED_REPORT": true}
+    """
+    return _get_bool_override(cwd, "STRUCTURED_REPORT", STRUCTURED_REPORT_ENABLED)
+
+
+def get_host_scheduler_enabled(cwd=None) -> bool:
+    """Host-wide test scheduler on/off. Override via `.claude/config.json`:
+        {"HOST_SCHEDULER": true}
+    """
+    return _get_bool_override(cwd, "HOST_SCHEDULER", HOST_SCHEDULER_ENABLED)
+
+
+def get_resource_limits(cwd=None) -> tuple:
+    """(address-space MB, CPU seconds) caps, 0 meaning none. Override via
+    `.claude/config.json`:
+        {"RLIMIT_AS_MB": 4096, "RLIMIT_CPU_SECONDS": 900}
+
+    Only a positive JSON integer counts; anything else keeps the default.
+    """
+    limits = [RLIMIT_AS_MB, RLIMIT_CPU_SECONDS]
+    if cwd is None:
+        return tuple(limits)
+    config = _load_project_config(cwd)
+    for i, key in enumerate(("RLIMIT_AS_MB", "RLIMIT_CPU_SECONDS")):
+        value = config.get(key)
+        if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+            limits[i] = value
+    return tuple(limits)
+
+
+def get_sharding_enabled(cwd=None) -> bool:
+    """Full-suite sharding on/off. Override via `.claude/config.json`:
+        {"SHARDING": true}
+    """
+    return _get_bool_override(cwd, "SHARDING", SHARDING_ENABLED)
+
+
+def get_failed_first_enabled(cwd=None) -> bool:
+    """Failed-first quick stage on/off. Override via `.claude/config.json`:
+        {"FAILED_FIRST": false}
+    """
+    return _get_bool_override(cwd, "FAILED_FIRST", FAILED_FIRST_ENABLED)
+
+
+def get_import_graph_enabled(cwd=None) -> bool:
+    """Static import graph on/off. Override via `.claude/config.json`:
+        {"IMPORT_GRAPH": false}
+    """
+    return _get_bool_override(cwd, "IMPORT_GRAPH", IMPORT_GRAPH_ENABLED)
+
+
 def _clear_project_config_cache() -> None:
     """Reset ALL per-cwd caches that depend on project config.
 
@@ -21,6 +21,7 @@ import time
 from pathlib import Path
 
 from _sdd_state import (
+    _store,
     _tmp,
     _read_json_with_ttl,
     _write_json_atomic,
@@ -34,6 +35,7 @@ from _sdd_config import (
     get_source_extensions,
     get_test_file_patterns,
 )
+from _sdd_trace import span
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -150,7 +152,25 @@ def record_file_edit(cwd, file_path, sid=None):
     All filesystem operations are wrapped in try/except OSError so
     permission or disk errors degrade silently rather than aborting
     the Edit hook chain.
+
+    SQLite backend: the same mutation runs inside one BEGIN IMMEDIATE
+    transaction (_sdd_store.update) — no lockfile, same exclusion.
     """
+    is_test = is_test_file(file_path, cwd=cwd)
+    store = _store(cwd)
+    if store:
+        def _add(data):
+            key = "test_files" if is_test else "source_files"
+            data[key] = sorted(set(data.get(key, [])) | {file_path})
+            data.setdefault("source_files", [])
+            data.setdefault("test_files", [])
+            data["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            data["last_edit_time"] = time.time()
+            return data
+        with span("coverage_lock"):
+            store.update(cwd, "coverage", sid or "", _add)
+        return
+
     cp = coverage_path(cwd, sid)
     lockfile = Path(str(cp) + ".lock")
     try:
@@ -162,7 +182,8 @@ def record_file_edit(cwd, file_path, sid=None):
     try:
         with open(lockfile, "a+", encoding="utf-8") as lf:
             if fcntl:
-                fcntl.flock(lf, fcntl.LOCK_EX)
+                with span("coverage_lock"):
+                    fcntl.flock(lf, fcntl.LOCK_EX)
             # Read current state under exclusion (no writer can interleave)
             data = {}
             try:
@@ -178,7 +199,7 @@ def record_file_edit(cwd, file_path, sid=None):
             source_files = set(data.get("source_files", []))
             test_files = set(data.get("test_files", []))
 
-            if is_test_file(file_path, cwd=cwd):
+            if is_test:
                 test_files.add(file_path)
             else:
                 source_files.add(file_path)
@@ -200,11 +221,18 @@ def record_file_edit(cwd, file_path, sid=None):
 
 def read_coverage(cwd, max_age_seconds=14400, sid=None):
     """Read coverage state with LOCK_SH + TTL (4h). Returns dict or None."""
+    store = _store(cwd)
+    if store:
+        return store.get(cwd, "coverage", sid or "", max_age_seconds)
     return _read_json_with_ttl(coverage_path(cwd, sid), max_age_seconds, use_flock=True)
 
 
 def clear_coverage(cwd, sid=None):
     """Remove coverage state file."""
+    store = _store(cwd)
+    if store:
+        store.delete(cwd, "coverage", sid or "")
+        return
     try:
         coverage_path(cwd, sid).unlink(missing_ok=True)
     except OSError:
@@ -383,6 +411,19 @@ def _session_max_edit_time(cwd, sid=None):
     When sid is None (legacy/non-teammate), falls back to the project-wide glob
     to preserve old behavior for solo runs.
     """
+    store = _store(cwd)
+    if store:
+        if sid:
+            records = [store.get(cwd, "coverage", sid) or {}]
+        else:
+            records = store.values(cwd, "coverage")
+        max_t = 0.0
+        for data in records:
+            try:
+                max_t = max(max_t, float(data.get("last_edit_time", 0)))
+            except (ValueError, TypeError):
+                continue
+        return max_t if max_t > 0 else None
     if sid:
         # Use shared lock to avoid reading partial JSON from a concurrent
         # record_file_edit() that holds LOCK_EX and is truncating/rewriting.
@@ -479,10 +520,11 @@ def _git_changed_lines(cwd):
     Used to restrict coverage check to lines actually edited in this change.
     """
     try:
-        result = subprocess.run(
-            ["git", "diff", "HEAD", "--unified=0", "--no-color"],
-            capture_output=True, text=True, timeout=5, cwd=cwd,
-        )
+        with span("git"):
+            result = subprocess.run(
+                ["git", "diff", "HEAD", "--unified=0", "--no-color"],
+                capture_output=True, text=True, timeout=5, cwd=cwd,
+            )
         if result.returncode != 0:
             return None
     except (OSError, subprocess.TimeoutExpired):
@@ -0,0 +1,293 @@
+"""Compiled matcher for .claude/critical-paths.md.
+
+    matcher = load_matcher(cwd, ".claude/critical-paths.md")
+    if matcher and matcher.match("src/auth/login.py"): ...   # None: no patterns
+
+A path is critical when, for any pattern, one of three rules holds — the
+rules sdd-test-guard has always applied, one pattern at a time:
+
+    fnmatch   fnmatch(path, pattern); `*` crosses `/`
+    suffix    PurePosixPath(path).match(pattern): the trailing
+              components match component-wise, `*` stays inside one
+    prefix    pattern `d/**`: path is `d` or lies under `d/`
+
+compile_patterns() folds every pattern into three indexes, so a lookup
+costs O(path depth) dictionary steps plus a handful of regex matches,
+however long the list is:
+
+    trie      the fnmatch and prefix rules, keyed by the pattern's
+              leading literal directories; each node holds the glob
+              tails that start there
+    names     suffix rules whose last component is literal, keyed by
+              that basename
+    float     the remaining suffix rules
+
+Glob tails and float rules are bucketed by their literal ending (".sql"
+for `**/migrations/*.sql`): a path is only tried against the buckets it
+ends with, each one alternation regex.
+
+Absolute paths (the guard only passes repo-relative ones) fall back to
+trying each pattern in turn: PurePosixPath treats the root as a
+component of its own.
+
+The compiled form is plain JSON (regex sources, not compiled objects)
+and is cached on disk per project, keyed by the file's mtime and size,
+so an unchanged list is neither re-read nor re-translated; regexes are
+compiled lazily, only for the trie nodes and basenames a lookup visits.
+"""
+import fnmatch
+import functools
+import json
+import re
+import stat
+import sys
+from pathlib import Path, PurePosixPath
+
+# Bumped when the compiled layout changes. The interpreter version is
+# part of the key too: fnmatch.translate output differs across versions.
+_CACHE_VERSION = f"1:{sys.version_info[0]}.{sys.version_info[1]}"
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def _is_literal(component):
+    return not _GLOB_CHARS.intersection(component)
+
+
+def _class_end(pattern, i):
+    """Index of the `]` closing the class opened at pattern[i - 1], or -1.
+
+    Same bracket rules as fnmatch.translate: a leading `!` and a `]`
+    right after it are part of the set.
+    """
+    j = i
+    if j < len(pattern) and pattern[j] == "!":
+        j += 1
+    if j < len(pattern) and pattern[j] == "]":
+        j += 1
+    j = pattern.find("]", j)
+    return j
+
+
+def _component_regex(component):
+    """Regex for one path component under fnmatchcase rules.
+
+    Wildcards never match `/`, so the components of a suffix pattern can
+    be joined with `/` and matched against the whole path in one go.
+    Bracket sets are translated by fnmatch itself.
+    """
+    out, i, n = [], 0, len(component)
+    while i < n:
+        c = component[i]
+        i += 1
+        if c == "*":
+            if not out or out[-1] != "[^/]*":
+                out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and _class_end(component, i) != -1:
+            j = _class_end(component, i)
+            out.append("(?!/)" + fnmatch.translate(component[i - 1:j + 1])[:-2])
+            i = j + 1
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+def _alternation(sources):
+    return "|".join(f"(?:{s})" for s in sources)
+
+
+def _literal_ending(pattern):
+    """Text after the last wildcard or bracket: every match ends with it."""
+    return pattern[max(pattern.rfind(c) for c in "*?[]") + 1:]
+
+
+def _buckets(sources):
+    """{literal ending: alternation} from (ending, regex source) pairs."""
+    grouped = {}
+    for ending, source in sources:
+        grouped.setdefault(ending, []).append(source)
+    return {k: _alternation(v) for k, v in grouped.items()}
+
+
+def _trie_node(trie, components):
+    node = trie
+    for comp in components:
+        node = node.setdefault("c", {}).setdefault(comp, {})
+    return node
+
+
+def compile_patterns(patterns):
+    """JSON-serialisable index of patterns (see module docstring)."""
+    trie, tails, names, floating = {}, {}, {}, []
+    for pattern in patterns:
+        # fnmatch: leading literal directories go into the trie, the rest
+        # of the pattern becomes a tail regex at that node.
+        comps = pattern.split("/")
+        lead = 0
+        while lead < len(comps) - 1 and _is_literal(comps[lead]):
+            lead += 1
+        tail = "/".join(comps[lead:])
+        tails.setdefault(tuple(comps[:lead]), []).append(
+            (_literal_ending(tail), fnmatch.translate(tail)))
+
+        if pattern.endswith("/**"):
+            _trie_node(trie, pattern[:-3].rstrip("/").split("/"))["a"] = 1
+
+        # suffix: PurePosixPath drops empty and "." components.
+        parts = [p for p in comps if p and p != "."]
+        if not parts or pattern.startswith("/"):
+            continue  # never matches a relative path
+        body = "/".join(_component_regex(p) for p in parts)
+        if _is_literal(parts[-1]):
+            names.setdefault(parts[-1], []).append(f"(?:^|/){body}\\Z")
+        else:
+            floating.append((_literal_ending(parts[-1]), f"(?:^|/){body}\\Z"))
+
+    for lead, sources in tails.items():
+        _trie_node(trie, lead)["t"] = _buckets(sources)
+    return {
+        "trie": trie,
+        "names": {k: _alternation(v) for k, v in names.items()},
+        "float": _buckets(floating),
+        "patterns": list(patterns),
+    }
+
+
+class CriticalPathMatcher:
+    """Matches repo-relative POSIX paths against a compiled index."""
+
+    __slots__ = ("_index", "_compiled")
+
+    def __init__(self, index):
+        self._index = index
+        self._compiled = {}
+
+    def _rx(self, source):
+        rx = self._compiled.get(source)
+        if rx is None:
+            rx = self._compiled[source] = re.compile(source)
+        return rx
+
+    def _any(self, buckets, text, pos=0, search=False):
+        for ending, source in buckets.items():
+            if text.endswith(ending):
+                rx = self._rx(source)
+                if (rx.search(text) if search else rx.match(text, pos)):
+                    return True
+        return False
+
+    def match(self, file_rel):
+        """True if file_rel matches any pattern under any of the rules."""
+        if file_rel.startswith("/"):
+            return _match_each(file_rel, self._index["patterns"])
+        node, offset = self._index["trie"], 0
+        while True:
+            if "t" in node and self._any(node["t"], file_rel, offset):
+                return True
+            end = file_rel.find("/", offset)
+            node = node.get("c", {}).get(
+                file_rel[offset:] if end == -1 else file_rel[offset:end])
+            if node is None:
+                break
+            if node.get("a"):
+                return True
+            if end == -1:
+                break
+            offset = end + 1
+
+        parts = [p for p in file_rel.split("/") if p and p != "."]
+        if not parts:
+            return False
+        norm = "/".join(parts)
+        source = self._index["names"].get(parts[-1])
+        if source and self._rx(source).search(norm):
+            return True
+        return self._any(self._index["float"], norm, search=True)
+
+
+def _match_each(file_rel, patterns):
+    rel_path = PurePosixPath(file_rel)
+    for pattern in patterns:
+        if fnmatch.fnmatch(file_rel, pattern) or rel_path.match(pattern):
+            return True
+        if pattern.endswith("/**"):
+            prefix = pattern[:-3].rstrip("/")
+            if file_rel == prefix or file_rel.startswith(prefix + "/"):
+                return True
+    return False
+
+
+def read_patterns(path):
+    """Non-blank, non-`#` lines of a critical-paths file; [] if unreadable."""
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+    return [
+        line.strip()
+        for line in lines
+        if line.strip() and not line.strip().startswith("#")
+    ]
+
+
+@functools.lru_cache(maxsize=8)
+def matcher_for(patterns):
+    """Matcher for a tuple of patterns, compiled once per process."""
+    return CriticalPathMatcher(compile_patterns(patterns))
+
+
+def _cache_path(cwd):
+    from _sdd_state import _tmp, project_hash
+    return _tmp(f"sdd-critical-paths-{project_hash(str(cwd))}.json")
+
+
+def _read_cache(cwd):
+    from _sdd_state import _store
+    store = _store(cwd)
+    if store is not None:
+        return store.get(cwd, "critical-paths") or {}
+    try:
+        data = json.loads(_cache_path(cwd).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cache(cwd, data):
+    from _sdd_state import _store, _write_json_atomic
+    store = _store(cwd)
+    if store is not None:
+        store.put(cwd, "critical-paths", "", data)
+        return
+    _write_json_atomic(_cache_path(cwd), data, prefix="sdd-critical-paths-")
+
+
+@functools.lru_cache(maxsize=8)
+def _load(cwd, path, mtime_ns, size):
+    key = [_CACHE_VERSION, path, mtime_ns, size]
+    cached = _read_cache(cwd)
+    if cached.get("key") == key and "index" in cached:
+        index = cached["index"]
+    else:
+        patterns = read_patterns(path)
+        index = compile_patterns(patterns) if patterns else None
+        _write_cache(cwd, {"key": key, "index": index})
+    return CriticalPathMatcher(index) if index else None
+
+
+def load_matcher(cwd, rel_path):
+    """Matcher for cwd/rel_path, or None when it is missing or empty.
+
+    Served from the on-disk cache while the file's mtime and size are
+    unchanged.
+    """
+    path = Path(cwd) / rel_path
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return _load(str(cwd), str(path), st.st_mtime_ns, st.st_size)
@@ -1,8 +1,8 @@
-"""SDD facade: detect_* + re-exports from _sdd_state and _sdd_coverage.
+"""SDD facade: detect_* + lazy re-exports from _sdd_state and _sdd_coverage.
 
 This module is the primary consumer import point. Backward-compatible with
 the original 1357-LOC monolith via `from _sdd_detect import X` — all public
-names are still accessible through star re-export.
+names are still accessible, resolved on demand by __getattr__ below.
 
 Canonical implementations live in:
     - _sdd_state.py     — state I/O, locks, process mgmt, session primitives
@@ -15,10 +15,17 @@ Unique to this module:
     - detect_coverage_command      — coverage-enabled test command + report path
     - parse_test_summary           — runner output → human summary
 
+Lazy re-export: public names of _sdd_state and _sdd_coverage resolve on
+first attribute access through a module-level __getattr__ (PEP 562), so
+`from _sdd_detect import X` keeps working for every name the old star
+re-export provided, while a hook that only needs state helpers never pays
+for _sdd_coverage. _sdd_state is imported eagerly — every consumer of this
+facade needs it, and detect_test_command uses it directly.
+
 Circular-import note: `_sdd_coverage._load_coverage_report` imports
-`detect_coverage_command` lazily (inside its function body), which breaks
-the cycle at runtime. The star re-export below does not trigger the lazy
-import because it is never evaluated at module load.
+`detect_coverage_command` lazily (inside its function body), and this
+module imports _sdd_coverage names inside the functions that use them, so
+neither module triggers the other at load time.
 """
 import functools
 import json
@@ -32,20 +39,43 @@ from _sdd_config import (
     get_coverage_report_path,
 )
 
-# Explicit re-export of private helpers (star import skips underscore-prefix).
+# Explicit re-export of private helpers (__getattr__ resolves public names only).
 # Consumers: teammate-idle.py, test_sdd_detect.py, test_real_hooks.py.
 from _sdd_state import (  # noqa: F401
     _parse_utc_timestamp,
     _read_json_with_ttl,
+    _store,
     _tmp,
     _write_json_atomic,
     project_hash,
 )
 
 # Re-export public names from canonical modules (backward-compat for 67+
-# import sites across hooks/ and test_*.py). Star import intentional.
-from _sdd_state import *  # noqa: F401,F403
-from _sdd_coverage import *  # noqa: F401,F403
+# import sites across hooks/ and test_*.py). Resolved lazily: _sdd_state
+# first, then _sdd_coverage. Both share the objects they have in common, so
+# the order only decides what gets imported. Plain import statements (not
+# importlib.import_module) keep the lazy imports visible to -X importtime.
+def __getattr__(name):
+    """Resolve a re-exported public name on first access and cache it."""
+    if not name.startswith("_"):
+        import _sdd_state
+        if name in vars(_sdd_state):
+            globals()[name] = vars(_sdd_state)[name]
+            return globals()[name]
+        import _sdd_coverage
+        if name in vars(_sdd_coverage):
+            globals()[name] = vars(_sdd_coverage)[name]
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    import _sdd_coverage
+    import _sdd_state
+    names = set(globals())
+    for module in (_sdd_state, _sdd_coverage):
+        names.update(n for n in vars(module) if not n.startswith("_"))
+    return sorted(names)
 
 
 def detect_test_command(cwd):
@@ -69,9 +99,12 @@ def detect_test_command(cwd):
     cache_file = _tmp(f"sdd-test-cmd-{project_hash(cwd)}.json")
     config_path = cwd_path / ".ralph" / "config.sh"
     pkg_path = cwd_path / "package.json"
+    store = _store(cwd)
     try:
-        raw = cache_file.read_text(encoding="utf-8")
-        cache = json.loads(raw)
+        if store:
+            cache = store.get(cwd, "test-cmd") or {}
+        else:
+            cache = json.loads(cache_file.read_text(encoding="utf-8"))
         # TTL check
         if time.time() - cache.get("detected_at", 0) < _TEST_CMD_CACHE_TTL:
             # mtime invalidation
@@ -94,7 +127,10 @@ def detect_test_command(cwd):
         "pkg_mtime": pkg_mtime,
         "detected_at": time.time(),
     }
-    _write_json_atomic(cache_file, cache_data, prefix="sdd-test-cmd-")
+    if store:
+        store.put(cwd, "test-cmd", "", cache_data)
+    else:
+        _write_json_atomic(cache_file, cache_data, prefix="sdd-test-cmd-")
 
     return result
 
@@ -301,10 +337,54 @@ def parse_test_summary(output, returncode):
 import _sdd_config  # noqa: E402
 
 
+# `node --test` (built-in runner) as the test script, flags allowed between.
+_NODE_TEST_RE = re.compile(r"(?:^|[;&|]\s*)node\s[^;&|]*?--test(?![\w-])")
+
+# node flags whose value is the next word (`--import tsx`); any other
+# bare word after `node` is a test path or glob and is dropped.
+_NODE_VALUE_FLAGS = frozenset({
+    "--import", "--require", "-r", "--loader", "--experimental-loader",
+    "--env-file", "--test-reporter", "--test-reporter-destination",
+    "--test-name-pattern", "--test-skip-pattern", "--test-concurrency",
+    "--test-timeout", "--conditions", "-C",
+})
+
+
+def _node_test_command(cwd, rels):
+    """`node <flags from scripts.test> <rels>`, or None.
+
+    Keeps the script's node flags (loaders, reporters) so TS projects
+    still run, and replaces its test paths or globs with rels.
+    """
+    import shlex
+
+    from _sdd_shell import lex
+    try:
+        data = json.loads((Path(cwd) / "package.json").read_text(encoding="utf-8"))
+        script = data.get("scripts", {}).get("test", "") or ""
+    except (OSError, ValueError, AttributeError):
+        return None
+    for stmt in lex(script):
+        words = stmt.words
+        if not words or words[0] != "node" or "--test" not in words:
+            continue
+        flags, i = [], 1
+        while i < len(words):
+            word = words[i]
+            if word.startswith("-"):
+                flags.append(word)
+                if word in _NODE_VALUE_FLAGS and i + 1 < len(words):
+                    i += 1
+                    flags.append(words[i])
+            i += 1
+        return " ".join(["node"] + [shlex.quote(w) for w in flags] + list(rels))
+    return None
+
+
 def _detect_test_framework(cwd):
     """Identify the project's test framework from manifest inspection.
 
-    Returns: "pytest" | "vitest" | "jest" | "go" | "cargo" | None.
+    Returns: "pytest" | "vitest" | "jest" | "node" | "go" | "cargo" | None.
 
     `detect_test_command` returns the invocation command (e.g. `npm test`),
     which hides the underlying framework from string inspection. This
@@ -324,6 +404,8 @@ def _detect_test_framework(cwd):
                 return "vitest"
             if "jest" in script or "jest" in deps:
                 return "jest"
+            if _NODE_TEST_RE.search(script):
+                return "node"
             # npm-as-shim for pytest (ai-framework shape): scripts.test
             # runs python/pytest but no Python manifest exists. SCEN-024.
             if "pytest" in script:
@@ -365,6 +447,8 @@ def _scoped_test_command_for_test_file(cwd, test_file):
         return f"npx vitest run {rel}"
     if framework == "jest":
         return f"npx jest {rel}"
+    if framework == "node":
+        return _node_test_command(cwd, [rel])
     if framework == "go":
         pkg_dir = tf_path.parent
         try:
@@ -401,6 +485,8 @@ def cascade_impacted_test_command(cwd, changed_file, sid=None):
     SCEN-012 implements: Rung 3 gate + forced-full + Rung 1a.
     Rungs 1b / 2 stubbed; filled in SCEN-013 / SCEN-014.
     """
+    from _sdd_coverage import is_source_file, is_test_file, read_coverage
+
     if not _sdd_config.FAST_PATH_ENABLED:
         return {
             "command": None,
@@ -508,8 +594,10 @@ def _stack_native_impacted_command(cwd, changed_file):
     """Rung 2: stack-native impacted-test command for a source-file edit.
 
     Returns None when no primitive applies (caller falls to Rung 3).
-    Uses each stack's documented impacted primitive — never invents,
-    never graph-analyses beyond what the tool natively provides.
+    Uses each stack's documented impacted primitive. pytest and
+    `node --test` have none: pytest uses the coverage-context index when
+    enabled, and both fall back to the static import graph
+    (_sdd_imports) the background worker maintains.
     """
     framework = _detect_test_framework(cwd)
     if framework is None:
@@ -539,9 +627,19 @@ def _stack_native_impacted_command(cwd, changed_file):
         if pkg:
             return f"cargo test -p {pkg}"
         return None
-    # pytest requires pytest-testmon installed + prior baseline run to be
-    # useful; probing that reliably from manifests is noisy. Rung 2 for
-    # pytest returns None → Rung 3 full-suite (safer default than guessing).
+    if framework in ("pytest", "node"):
+        # No native primitive: the opt-in coverage-context index built by
+        # the background worker (IMPACT_INDEX) stands in, then the import
+        # graph. Disabled, stale or missing → None → Rung 3 full-suite.
+        if framework == "pytest":
+            from _sdd_impact import impacted_pytest_command
+            command = impacted_pytest_command(cwd, rel)
+            if command is not None:
+                return command
+        from _sdd_imports import impacted_test_files
+        tests = impacted_test_files(cwd, rel)
+        if tests:
+            return _scoped_test_command_for_session_tests(cwd, tests)
     return None
 
 
@@ -581,6 +679,8 @@ def _scoped_test_command_for_session_tests(cwd, test_files):
         return "npx vitest run " + " ".join(rels)
     if framework == "jest":
         return "npx jest " + " ".join(rels)
+    if framework == "node":
+        return _node_test_command(cwd, rels)
     if framework == "go":
         unique_pkgs = []
         seen = set()
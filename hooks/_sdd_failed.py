@@ -0,0 +1,181 @@
+"""Failed-first ordering for background test runs.
+
+    quick = quick_command(cwd, command, full_suite)
+    # "pytest 'tests/test_a.py::test_x'" | None → no quick stage
+
+After every complete run the sdd-auto-test worker records the IDs of the
+tests that failed (record()). When the next run is the same command, or
+the full suite, the worker first runs only those IDs and writes the
+result as a partial state (write_state(..., partial=True)), then runs
+the command as usual. The agent's next edit usually targets exactly
+those failures, so the PostToolUse feedback tells it whether the fix
+worked without waiting for the whole suite. Partial states never satisfy
+a gate: _try_cached_test_gate ignores them and sdd-test-guard does not
+treat a partial pass as passing.
+
+IDs by framework, read from the run's output:
+
+    pytest   nodeids of the `FAILED <nodeid>` / `ERROR <nodeid>` lines
+             of the short test summary → the command's own runner
+             (`python -m pytest`, `uv run pytest`, env assignments and
+             options kept, test paths dropped) with the nodeids; no
+             quick stage when the command does not call pytest itself
+    jest     test files of the `FAIL <file>` lines → the Rung 1b
+    vitest   command for those files
+    go       top-level `--- FAIL: TestX` names with the package of the
+             `FAIL <pkg>` line that follows → `go test -run '^(…)$' <pkgs>`
+
+Stored as {"command": …, "ids": [...]} per project
+(`sdd-failed-{hash}.json`, or the "failed-tests" kind with the SQLite
+backend). A passing run of the recorded command, or of the full suite,
+clears it; no quick stage for more than FAILED_FIRST_MAX_IDS failures.
+"""
+import json
+import re
+import shlex
+from pathlib import Path
+
+from _sdd_config import FAILED_FIRST_MAX_IDS, get_failed_first_enabled
+from _sdd_state import _store, _tmp, _write_json_atomic, project_hash
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+_PYTEST_FAILED_RE = re.compile(
+    r"^(?:FAILED|ERROR) ([^\s\[]+(?:\[.*?\])?)(?: - .*)?$", re.MULTILINE)
+_JS_FAILED_RE = re.compile(r"^\s*FAIL\s+(\S+?\.[cm]?[jt]sx?)\b", re.MULTILINE)
+_GO_LINE_RE = re.compile(r"^(?:--- FAIL: (\w+)|FAIL\s+(\S+)\s+[\d.]+s)")
+
+
+def _failed_path(cwd):
+    return _tmp(f"sdd-failed-{project_hash(str(cwd))}.json")
+
+
+def read_failed(cwd):
+    """{"command": str, "ids": [str]} from the last failing run, or {}."""
+    store = _store(cwd)
+    if store is not None:
+        data = store.get(cwd, "failed-tests") or {}
+    else:
+        try:
+            data = json.loads(_failed_path(cwd).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+    if not isinstance(data, dict) or not isinstance(data.get("ids"), list):
+        return {}
+    return data
+
+
+def _write_failed(cwd, data):
+    store = _store(cwd)
+    if store is not None:
+        if data:
+            store.put(cwd, "failed-tests", "", data)
+        else:
+            store.delete(cwd, "failed-tests")
+        return
+    if data:
+        _write_json_atomic(_failed_path(cwd), data, prefix="sdd-failed-")
+        return
+    try:
+        _failed_path(cwd).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def failing_ids(framework, output):
+    """Sorted failing test IDs for framework in output ([] if none found)."""
+    output = _ANSI_RE.sub("", output or "")
+    if framework == "pytest":
+        ids = _PYTEST_FAILED_RE.findall(output)
+    elif framework in ("jest", "vitest"):
+        ids = _JS_FAILED_RE.findall(output)
+    elif framework == "go":
+        ids, pending = [], []
+        for line in output.splitlines():
+            m = _GO_LINE_RE.match(line)
+            if m and m.group(1):
+                pending.append(m.group(1))
+            elif m:
+                ids.extend(f"{m.group(2)}:{name}" for name in pending)
+                pending = []
+    else:
+        ids = []
+    return sorted(set(ids))
+
+
+def record(cwd, command, full_suite, returncode, output, ids=None):
+    """Remember the failing IDs of a complete run of command.
+
+    ids, when given (from a structured report), replace the ones parsed
+    from output.
+    """
+    if not get_failed_first_enabled(cwd):
+        return
+    if not returncode:
+        ids = []
+    elif not ids:
+        from _sdd_detect import _detect_test_framework
+        ids = failing_ids(_detect_test_framework(cwd), output)
+    if ids:
+        _write_failed(cwd, {"command": command, "ids": ids})
+    elif full_suite or read_failed(cwd).get("command") == command:
+        _write_failed(cwd, {})
+
+
+def _pytest_runner(cwd, command):
+    """command minus its test paths, when it runs pytest itself, else None.
+
+    `uv run pytest -x tests/` → `uv run pytest -x`. A word after the
+    pytest token is dropped when it is a node id or a path that exists.
+    """
+    from _sdd_shell import lex
+    stmts = lex(command)
+    if len(stmts) != 1 or stmts[0].redirects:
+        return None
+    words = stmts[0].words
+    for i, word in enumerate(words):
+        if word.rsplit("/", 1)[-1] == "pytest":
+            end = i + 1
+            break
+        if words[i:i + 2] == ["-m", "pytest"] and i:
+            end = i + 2
+            break
+    else:
+        return None
+    root = Path(cwd)
+    kept = words[:end] + [w for w in words[end:]
+                          if w.startswith("-") or not ("::" in w or (root / w).exists())]
+    return " ".join(shlex.quote(w) for w in kept)
+
+
+def quick_command(cwd, command, full_suite):
+    """Command running only the recorded failing tests, or None."""
+    if not get_failed_first_enabled(cwd):
+        return None
+    data = read_failed(cwd)
+    ids = data.get("ids") or []
+    if not ids or len(ids) > FAILED_FIRST_MAX_IDS:
+        return None
+    if not full_suite and data.get("command") != command:
+        return None
+    from _sdd_detect import (
+        _detect_test_framework, _scoped_test_command_for_session_tests,
+    )
+    framework = _detect_test_framework(cwd)
+    if framework == "pytest":
+        runner = _pytest_runner(cwd, command)
+        quick = runner and runner + " " + " ".join(shlex.quote(i) for i in ids)
+    elif framework in ("jest", "vitest"):
+        quick = _scoped_test_command_for_session_tests(cwd, ids)
+    elif framework == "go":
+        pkgs, names = [], []
+        for test_id in ids:
+            pkg, _, name = test_id.rpartition(":")
+            if pkg not in pkgs:
+                pkgs.append(pkg)
+            if name not in names:
+                names.append(name)
+        quick = "go test -run " + shlex.quote(f"^({'|'.join(names)})$") \
+            + " " + " ".join(shlex.quote(p) for p in pkgs)
+    else:
+        quick = None
+    return quick if quick != command else None
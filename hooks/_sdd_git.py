@@ -0,0 +1,459 @@
+"""Fork-free git access for hooks.
+
+Two layers, cheapest first:
+
+  * In-process `.git` reader — head_sha(), is_linked_worktree(),
+    is_tracked(). Resolves `.git` directories and gitfiles, HEAD, loose
+    and packed refs, and index membership (index format v2–v4) by reading
+    the files directly. Anything it does not understand (reftable, split
+    or sparse index, GIT_DIR-style overrides, bare repos) answers UNKNOWN
+    and the caller falls back to its git subprocess.
+  * GitObjectReader — `git cat-file --batch` / `--batch-check`
+    coprocesses for object contents (blobs at a commit), which have to
+    be inflated by git, and for object ids and types.
+
+In-process reader
+-----------------
+
+Parsed files are cached per process by (mtime_ns, size, inode) of
+`.git/HEAD`, the ref files, `packed-refs` and `.git/index`, so a
+long-lived process (hook daemon) re-parses only after git rewrites
+them. A file modified within the last _RACY_SECONDS is never cached —
+on filesystems with coarse timestamps a same-size rewrite inside one
+tick would otherwise be missed (git's "racy clean" problem).
+
+Object reader
+-------------
+
+    with GitObjectReader(cwd) as git:
+        head = git.resolve("HEAD")
+        text = git.read(f"{head}:{rel_path}")
+
+Each `git show` / `git rev-parse` / `git ls-tree` costs a fork+exec of
+git plus repository discovery. A GitObjectReader pipelines lookups
+through two lazily started coprocesses: `git cat-file --batch` for
+read(), and `git cat-file --batch-check` for resolve() and
+object_type(), which then learn an object's id and type without git
+inflating and sending its body. An evaluation that needs HEAD plus N
+blobs pays for two processes instead of N+2.
+
+Lookups take any object expression git accepts (`HEAD`, `<sha>`,
+`<sha>:<path>`). A missing or ambiguous object answers None. Each
+lookup is bounded by `timeout` seconds: on expiry the coprocess is
+killed, the lookup answers None, and every later lookup on the same
+reader answers None without respawning — callers treat that exactly
+like a failed subprocess.run(). The reader never raises.
+
+Stdlib only.
+"""
+import os
+import re
+import struct
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from _sdd_trace import span
+
+_GIT_TIMEOUT = 5  # seconds per lookup
+_RACY_SECONDS = 2
+_MAX_SYMREF_DEPTH = 5
+
+# Any of these changes where git looks for the repository or index; the
+# in-process reader does not emulate them.
+_OVERRIDE_ENV = (
+    "GIT_DIR", "GIT_WORK_TREE", "GIT_COMMON_DIR", "GIT_INDEX_FILE",
+    "GIT_CEILING_DIRECTORIES", "GIT_NAMESPACE",
+)
+# Refs that live in the per-worktree git dir rather than the common dir.
+_PER_WORKTREE_REF_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+_OID_RE = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+_OBJECT_FORMAT_RE = re.compile(r"^\s*objectformat\s*=\s*sha256\s*$",
+                               re.IGNORECASE | re.MULTILINE)
+
+
+class _Unknown:
+    """Sentinel: the in-process reader cannot answer; ask git."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return "UNKNOWN"
+
+
+UNKNOWN = _Unknown()
+
+
+# ─────────────────────────────────────────────────────────────────
+# In-process .git reader
+# ─────────────────────────────────────────────────────────────────
+
+class _Repo:
+    __slots__ = ("worktree", "git_dir", "common_dir")
+
+    def __init__(self, worktree, git_dir, common_dir):
+        self.worktree = worktree
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+
+
+_NO_REPO = object()
+_file_cache: dict = {}  # path → ((mtime_ns, size, ino), parsed value)
+
+
+def _cached(path, parse):
+    """parse(bytes) for path, reusing the last result while the file is
+    unchanged. Raises OSError when the file cannot be read.
+    """
+    key = str(path)
+    st = os.stat(key)
+    sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+    hit = _file_cache.get(key)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+    with open(key, "rb") as f:
+        value = parse(f.read())
+    if time.time() - st.st_mtime > _RACY_SECONDS:
+        _file_cache[key] = (sig, value)
+    else:
+        _file_cache.pop(key, None)
+    return value
+
+
+def _read_gitfile(dot_git):
+    """Target dir of a `gitdir: <path>` file, or None when malformed."""
+    try:
+        text = dot_git.read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    target = Path(text[len("gitdir:"):].strip())
+    if not target.is_absolute():
+        target = dot_git.parent / target
+    return target.resolve()
+
+
+def _looks_like_git_dir(path):
+    return ((path / "HEAD").is_file() and (path / "objects").is_dir()
+            and (path / "refs").is_dir())
+
+
+def _discover(cwd):
+    """_Repo for cwd, _NO_REPO when cwd is provably outside any repo, or
+    None when discovery needs git itself.
+    """
+    if any(os.environ.get(name) for name in _OVERRIDE_ENV):
+        return None
+    try:
+        start = Path(cwd).resolve()
+    except (OSError, RuntimeError):
+        return None
+    for directory in (start, *start.parents):
+        dot_git = directory / ".git"
+        try:
+            if dot_git.is_dir():
+                git_dir = dot_git
+            elif dot_git.is_file():
+                git_dir = _read_gitfile(dot_git)
+                if git_dir is None:
+                    return None
+            elif _looks_like_git_dir(directory):
+                return None  # inside a bare repo or a git dir
+            else:
+                continue
+            if not (git_dir / "HEAD").is_file():
+                return None
+            common_dir = git_dir
+            commondir_file = git_dir / "commondir"
+            if commondir_file.is_file():
+                rel = commondir_file.read_text(encoding="utf-8").strip()
+                common_dir = (git_dir / rel).resolve()
+            return _Repo(directory, git_dir.resolve(), common_dir)
+        except (OSError, UnicodeDecodeError):
+            return None
+    return _NO_REPO
+
+
+def _parse_packed_refs(data):
+    refs = {}
+    for line in data.decode("utf-8", "replace").splitlines():
+        if not line or line[0] in "#^":
+            continue
+        oid, _, name = line.partition(" ")
+        if name:
+            refs[name.strip()] = oid
+    return refs
+
+
+def _strip(data):
+    return data.decode("utf-8", "replace").strip()
+
+
+def _resolve_ref(repo, name, depth=0):
+    """OID a ref name points at; None when it does not exist; UNKNOWN
+    when the ref store is not plain files.
+    """
+    if depth > _MAX_SYMREF_DEPTH:
+        return UNKNOWN
+    base = repo.git_dir if (name == "HEAD" or name.startswith(
+        _PER_WORKTREE_REF_PREFIXES)) else repo.common_dir
+    try:
+        content = _cached(base / name, _strip)
+    except FileNotFoundError:
+        content = None
+    except OSError:
+        return UNKNOWN
+    if content is None:
+        if name == "HEAD":
+            return UNKNOWN
+        try:
+            packed = _cached(repo.common_dir / "packed-refs", _parse_packed_refs)
+        except FileNotFoundError:
+            packed = {}
+        except OSError:
+            return UNKNOWN
+        oid = packed.get(name)
+        return oid if oid and _OID_RE.match(oid) else None
+    if content.startswith("ref:"):
+        target = content[4:].strip()
+        if not target.startswith("refs/") or ".." in target:
+            return UNKNOWN
+        return _resolve_ref(repo, target, depth + 1)
+    return content if _OID_RE.match(content) else UNKNOWN
+
+
+def head_sha(cwd):
+    """HEAD commit OID, None (no repo / unborn branch), or UNKNOWN."""
+    repo = _discover(cwd)
+    if repo is None:
+        return UNKNOWN
+    if repo is _NO_REPO:
+        return None
+    if (repo.common_dir / "reftable").is_dir():
+        return UNKNOWN
+    return _resolve_ref(repo, "HEAD")
+
+
+def is_linked_worktree(cwd):
+    """True inside a linked worktree, False in a main clone / outside a
+    repo, UNKNOWN when discovery needs git.
+    """
+    repo = _discover(cwd)
+    if repo is None:
+        return UNKNOWN
+    if repo is _NO_REPO:
+        return False
+    return repo.git_dir != repo.common_dir
+
+
+def _varint(data, pos):
+    """git's offset varint (index v4 path prefix length)."""
+    c = data[pos]
+    pos += 1
+    value = c & 0x7F
+    while c & 0x80:
+        c = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (c & 0x7F)
+    return value, pos
+
+
+def _index_parser(hash_len):
+    def parse(data):
+        """frozenset of index paths, or None for unsupported indexes."""
+        if len(data) < 12 + hash_len or data[:4] != b"DIRC":
+            return None
+        version, count = struct.unpack(">II", data[4:12])
+        if version not in (2, 3, 4):
+            return None
+        names = []
+        pos = 12
+        prev = b""
+        fixed = 40 + hash_len  # stat data + object id
+        for _ in range(count):
+            start = pos
+            mode = struct.unpack(">I", data[pos + 24:pos + 28])[0]
+            if mode >> 12 == 0o04:  # sparse-index directory entry
+                return None
+            flags = struct.unpack(">H", data[pos + fixed:pos + fixed + 2])[0]
+            pos += fixed + 2
+            if flags & 0x4000:
+                if version < 3:
+                    return None
+                pos += 2
+            if version == 4:
+                strip, pos = _varint(data, pos)
+                end = data.index(b"\0", pos)
+                name = prev[:len(prev) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                end = data.index(b"\0", pos)
+                name = data[pos:end]
+                pos = start + ((end - start + 8) & ~7)
+            names.append(name)
+            prev = name
+        stop = len(data) - hash_len
+        while pos + 8 <= stop:
+            sig = data[pos:pos + 4]
+            if sig in (b"link", b"sdir"):
+                return None  # split or sparse index: entries live elsewhere
+            pos += 8 + struct.unpack(">I", data[pos + 4:pos + 8])[0]
+        return frozenset(n.decode("utf-8", "surrogateescape") for n in names)
+    return parse
+
+
+def _hash_len(repo):
+    try:
+        config = _cached(repo.common_dir / "config",
+                         lambda d: d.decode("utf-8", "replace"))
+    except OSError:
+        return 20
+    return 32 if _OBJECT_FORMAT_RE.search(config) else 20
+
+
+def is_tracked(cwd, rel_path):
+    """True when rel_path (relative to cwd) is in the index — a file entry
+    or a directory containing one, as `git ls-files --error-unmatch`
+    reports. False when untracked or outside any repo; UNKNOWN when the
+    index cannot be read in-process.
+    """
+    repo = _discover(cwd)
+    if repo is None:
+        return UNKNOWN
+    if repo is _NO_REPO:
+        return False
+    try:
+        target = Path(os.path.normpath(Path(cwd).resolve() / rel_path))
+        target = target.relative_to(repo.worktree)
+    except (OSError, RuntimeError, ValueError):
+        return UNKNOWN
+    name = target.as_posix()
+    try:
+        names = _cached(repo.git_dir / "index", _index_parser(_hash_len(repo)))
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, IndexError, struct.error):
+        return UNKNOWN
+    if names is None:
+        return UNKNOWN
+    if name in names:
+        return True
+    prefix = name.rstrip("/") + "/"
+    return any(n.startswith(prefix) for n in names)
+
+
+# ─────────────────────────────────────────────────────────────────
+# cat-file --batch coprocess
+# ─────────────────────────────────────────────────────────────────
+
+
+class GitObjectReader:
+    """`git cat-file --batch` / `--batch-check` coprocesses shared by
+    many lookups, each started on first use.
+    """
+
+    def __init__(self, cwd, timeout: float = _GIT_TIMEOUT):
+        self.cwd = str(cwd)
+        self.timeout = timeout
+        self._procs = {}  # "--batch" / "--batch-check" → Popen
+        self._broken = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _start(self, mode):
+        if mode not in self._procs and not self._broken:
+            try:
+                self._procs[mode] = subprocess.Popen(
+                    ["git", "-C", self.cwd, "cat-file", mode],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError:
+                self._broken = True
+        return self._procs.get(mode)
+
+    def _lookup(self, spec: str, content: bool = True):
+        """(oid, type, content bytes) for spec, or None.
+
+        content=False asks --batch-check: the body is never read, and
+        comes back as None.
+        """
+        if not spec or "\n" in spec or "\r" in spec:
+            return None
+        proc = self._start("--batch" if content else "--batch-check")
+        if proc is None:
+            return None
+        watchdog = threading.Timer(self.timeout, proc.kill)
+        watchdog.start()
+        try:
+            with span("git"):
+                proc.stdin.write(spec.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                header = proc.stdout.readline().decode("utf-8", "replace")
+                parts = header.split()
+                if len(parts) != 3:
+                    if not header:
+                        raise OSError("cat-file exited")
+                    return None  # "<spec> missing" / "<spec> ambiguous"
+                oid, kind, size = parts
+                if not content:
+                    return oid, kind, None
+                body = proc.stdout.read(int(size) + 1)[:-1]
+                if len(body) != int(size):
+                    raise OSError("short read from cat-file")
+                return oid, kind, body
+        except (OSError, ValueError):
+            self._abandon()
+            return None
+        finally:
+            watchdog.cancel()
+
+    def _abandon(self):
+        self._broken = True
+        self.close()
+
+    def resolve(self, rev: str) -> Optional[str]:
+        """Object id rev names (`rev-parse` equivalent), or None."""
+        found = self._lookup(rev, content=False)
+        return found[0] if found else None
+
+    def object_type(self, spec: str) -> Optional[str]:
+        """"blob", "tree", "commit", "tag", or None when spec is missing."""
+        found = self._lookup(spec, content=False)
+        return found[1] if found else None
+
+    def read(self, spec: str) -> Optional[bytes]:
+        """Raw bytes of the blob spec names (`git show` equivalent).
+
+        None when spec is missing or names something other than a blob.
+        """
+        found = self._lookup(spec)
+        if not found or found[1] != "blob":
+            return None
+        return found[2]
+
+    def close(self):
+        """Stop the coprocesses. Safe to call repeatedly."""
+        procs, self._procs = self._procs, {}
+        for proc in procs.values():
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            try:
+                proc.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            try:
+                proc.stdout.close()
+            except OSError:
+                pass
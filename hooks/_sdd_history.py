@@ -0,0 +1,106 @@
+"""Run-duration history per (command, rung).
+
+    record_run(cwd, "pytest tests/test_a.py", "1a", 0.8)
+    predict(cwd, "pytest", "3")   # {"ewma", "p95", "n"} | None
+
+adaptive_gate_timeout used to scale the last run's duration, whatever
+ran last: a 0.8 s Rung 1a run left the next full suite a 30 s timeout,
+and one slow run tripled the next timeout. The sdd-auto-test worker and
+the TaskCompleted gates now record every finished run (a timed-out one
+counts with its timeout, a lower bound) under two keys:
+
+    "<rung>\\0<command>"   that exact command
+    "<rung>\\0*"           every command of that rung (scoped commands
+                          rarely repeat, so this is what they predict from)
+
+Each key keeps an EWMA (DURATION_EWMA_ALPHA) and the last
+DURATION_HISTORY_SAMPLES durations, from which predict() takes the p95
+(nearest rank: with 20 samples, one outlier is ignored). predict() uses
+the exact command when it has history, else the rung.
+
+Rungs are the cascade's "1a" / "1b" / "2" / "3" for the worker (the
+TaskCompleted test gate counts as "3") and "gate:<name>" for the other
+gates. Stored per project in `sdd-run-durations-{hash}.json` (kind
+"run-durations" with the SQLite backend); the
+DURATION_HISTORY_MAX_COMMANDS most recently updated per-command keys are
+kept.
+"""
+import json
+import math
+import time
+
+from _sdd_config import (
+    DURATION_EWMA_ALPHA,
+    DURATION_HISTORY_MAX_COMMANDS,
+    DURATION_HISTORY_SAMPLES,
+)
+from _sdd_state import _store, _tmp, _write_json_atomic, project_hash
+
+
+def _history_path(cwd):
+    return _tmp(f"sdd-run-durations-{project_hash(str(cwd))}.json")
+
+
+def _read(cwd):
+    store = _store(cwd)
+    if store is not None:
+        data = store.get(cwd, "run-durations") or {}
+    else:
+        try:
+            data = json.loads(_history_path(cwd).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+    keys = data.get("keys") if isinstance(data, dict) else None
+    return keys if isinstance(keys, dict) else {}
+
+
+def p95(samples):
+    """Nearest-rank 95th percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def _update(entry, seconds, now):
+    entry = dict(entry) if isinstance(entry, dict) else {}
+    old = entry.get("ewma")
+    entry["ewma"] = round(seconds if old is None
+                          else old + DURATION_EWMA_ALPHA * (seconds - old), 3)
+    entry["samples"] = (list(entry.get("samples") or []) + [round(seconds, 3)]
+                        )[-DURATION_HISTORY_SAMPLES:]
+    entry["updated"] = now
+    return entry
+
+
+def record_run(cwd, command, rung, seconds):
+    """Add one run's duration to its command's and its rung's history."""
+    if not command or seconds is None or seconds < 0:
+        return
+    now = time.time()
+
+    def _add(data):
+        keys = data.setdefault("keys", {})
+        for key in (f"{rung}\0{command}", f"{rung}\0*"):
+            keys[key] = _update(keys.get(key), seconds, now)
+        commands = sorted((k for k in keys if not k.endswith("\0*")),
+                          key=lambda k: keys[k].get("updated", 0))
+        for key in commands[:-DURATION_HISTORY_MAX_COMMANDS]:
+            del keys[key]
+        return data
+
+    store = _store(cwd)
+    if store is not None:
+        store.update(cwd, "run-durations", "", _add)
+        return
+    _write_json_atomic(_history_path(cwd), _add({"keys": _read(cwd)}),
+                       prefix="sdd-run-durations-")
+
+
+def predict(cwd, command, rung):
+    """{"ewma", "p95", "n"} for command (else its rung), or None."""
+    keys = _read(cwd)
+    for key in (f"{rung}\0{command}", f"{rung}\0*"):
+        entry = keys.get(key)
+        if isinstance(entry, dict) and entry.get("samples"):
+            return {"ewma": entry["ewma"], "p95": p95(entry["samples"]),
+                    "n": len(entry["samples"])}
+    return None
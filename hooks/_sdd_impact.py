@@ -0,0 +1,355 @@
+"""Coverage-context test impact index for pytest (Rung 2).
+
+Opt-in via `.claude/config.json`: {"IMPACT_INDEX": true}. Needs
+pytest-cov in the project's environment.
+
+Build — the sdd-auto-test worker runs pytest commands through
+instrument(), which adds `--cov=. --cov-context=test` and points
+COVERAGE_FILE at a per-project data file. After the run,
+update_index() reads the per-test contexts from that file and merges
+them into the index:
+
+    {"built_at": epoch,
+     "files": {rel_path: {"crc": per-line CRC32s of the file as measured,
+                          "cov": {nodeid: [[first, last], ...]}}}}
+
+Maintenance is incremental: tests that ran replace their own entries
+everywhere; tests that did not run keep theirs, shifted onto the new
+line numbering of any file whose content changed (difflib over the
+line CRCs).
+
+Query — impacted_pytest_command(cwd, rel) maps the lines changed in
+rel onto the index's numbering — the edit since the file was measured
+(CRC diff) plus the uncommitted lines from _git_changed_lines — and
+returns `pytest <nodeids>` for the tests covering them. When the edit
+touches only uncovered lines, every test covering the file runs.
+
+Stale index → None, and the cascade falls back to Rung 3: no index, no
+entry for the file, index older than IMPACT_INDEX_MAX_AGE, or the file
+drifted by more than IMPACT_INDEX_MAX_DRIFT from its measured content.
+"""
+import json
+import os
+import shlex
+import time
+import zlib
+from pathlib import Path
+
+from _sdd_config import (
+    IMPACT_INDEX_MAX_AGE,
+    IMPACT_INDEX_MAX_DRIFT,
+    IMPACT_INDEX_MAX_NODEIDS,
+    get_impact_index_enabled,
+)
+from _sdd_state import _store, _tmp, _write_json_atomic, project_hash
+
+# Appended to instrumented pytest runs. An empty --cov-report keeps the
+# terminal report out of the summary the worker parses.
+_COV_ARGS = "--cov=. --cov-context=test --cov-report="
+
+# pytest exits 4 on a usage error; this is how a missing pytest-cov shows.
+_COV_MISSING = "unrecognized arguments: --cov"
+
+
+def _index_path(cwd):
+    return _tmp(f"sdd-impact-{project_hash(str(cwd))}.json")
+
+
+def coverage_data_path(cwd):
+    """Where instrumented runs leave their coverage.py data file."""
+    return _tmp(f"sdd-impact-{project_hash(str(cwd))}.coverage")
+
+
+def read_index(cwd):
+    """The index dict, or {} when absent or unreadable."""
+    store = _store(cwd)
+    if store is not None:
+        return store.get(cwd, "impact-index") or {}
+    try:
+        data = json.loads(_index_path(cwd).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_index(cwd, index):
+    store = _store(cwd)
+    if store is not None:
+        store.put(cwd, "impact-index", "", index)
+        return
+    _write_json_atomic(_index_path(cwd), index, prefix="sdd-impact-")
+
+
+# ─────────────────────────────────────────────────────────────────
+# LINE BOOKKEEPING
+# ─────────────────────────────────────────────────────────────────
+
+def _line_crcs(text):
+    return [zlib.crc32(line.encode("utf-8", "surrogatepass"))
+            for line in text.splitlines()]
+
+
+def _crc_hex(crcs):
+    return "".join(f"{c:08x}" for c in crcs)
+
+
+def _crc_list(hexed):
+    return [int(hexed[i:i + 8], 16) for i in range(0, len(hexed), 8)]
+
+
+def _ranges(lines):
+    """Sorted line numbers → [[first, last], ...] runs."""
+    out = []
+    for ln in sorted(lines):
+        if out and ln == out[-1][1] + 1:
+            out[-1][1] = ln
+        else:
+            out.append([ln, ln])
+    return out
+
+
+def _lines(ranges):
+    return {ln for first, last in ranges for ln in range(first, last + 1)}
+
+
+def _opcodes(old, new):
+    from difflib import SequenceMatcher
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    return matcher, matcher.get_opcodes()
+
+
+def _remap(lines, opcodes, new_len):
+    """Shift 1-based old line numbers onto the new numbering.
+
+    Lines in an unchanged block move with it; lines in a replaced or
+    deleted block land on the block that replaced them (or its
+    neighbour), so a test keeps covering the region it exercised.
+    """
+    out = set()
+    for tag, i1, i2, j1, j2 in opcodes:
+        hit = [ln for ln in lines if i1 < ln <= i2]
+        if not hit:
+            continue
+        if tag == "equal":
+            out.update(ln - i1 + j1 for ln in hit)
+        else:
+            out.update(range(j1 + 1, max(j2, j1 + 1) + 1))
+    return {ln for ln in out if 1 <= ln <= new_len}
+
+
+def _read_text(path):
+    try:
+        return Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+# ─────────────────────────────────────────────────────────────────
+# BUILD — instrumented runs and incremental merge
+# ─────────────────────────────────────────────────────────────────
+
+def _is_pytest_command(command):
+    """A single pytest invocation (`pytest ...`, `python -m pytest ...`)."""
+    from _sdd_shell import lex
+    stmts = lex(command)
+    if len(stmts) != 1 or stmts[0].redirects:
+        return False
+    words = stmts[0].words
+    if words[:1] == ["pytest"]:
+        return True
+    return (len(words) >= 3 and Path(words[0]).name.startswith("python")
+            and words[1:3] == ["-m", "pytest"])
+
+
+def instrument(cwd, command):
+    """(command, env) collecting per-test coverage, or None.
+
+    None unless the index is enabled, command is a plain pytest run and
+    pytest-cov has not been found missing within IMPACT_INDEX_MAX_AGE.
+    """
+    if not get_impact_index_enabled(cwd) or not _is_pytest_command(command):
+        return None
+    missing_at = read_index(cwd).get("cov_missing_at", 0)
+    if time.time() - missing_at < IMPACT_INDEX_MAX_AGE:
+        return None
+    env = dict(os.environ, _SDD_RECURSION_GUARD="1",
+               COVERAGE_FILE=str(coverage_data_path(cwd)))
+    return f"{command} {_COV_ARGS}", env
+
+
+def coverage_plugin_missing(cwd, returncode, output):
+    """True (and remembered) when an instrumented run failed for want of
+    pytest-cov; the caller reruns the plain command."""
+    if returncode != 4 or _COV_MISSING not in output:
+        return False
+    index = read_index(cwd)
+    index["cov_missing_at"] = time.time()
+    _write_index(cwd, index)
+    return True
+
+
+def _numbits_lines(numbits):
+    """coverage.py numbits blob → set of line numbers."""
+    return {i * 8 + bit for i, byte in enumerate(numbits)
+            for bit in range(8) if byte & (1 << bit)}
+
+
+def read_contexts(cwd, data_file):
+    """{rel_path: {nodeid: set(lines)}} from a coverage.py data file.
+
+    Reads the SQLite schema directly (file, context, line_bits or arc)
+    so the hook does not need coverage installed. Lines run outside a
+    test (collection, imports) carry the empty context and are skipped;
+    files outside cwd are skipped.
+    """
+    import sqlite3
+    cwd_path = Path(cwd).resolve()
+    out = {}
+    try:
+        conn = sqlite3.connect(f"file:{data_file}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return out
+    try:
+        files = dict(conn.execute("SELECT id, path FROM file"))
+        contexts = dict(conn.execute("SELECT id, context FROM context"))
+        tables = {r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        rows = []
+        if "line_bits" in tables:
+            rows += [(f, c, _numbits_lines(bits)) for f, c, bits in conn.execute(
+                "SELECT file_id, context_id, numbits FROM line_bits")]
+        if "arc" in tables:
+            rows += [(f, c, {n for n in (a, b) if n > 0})
+                     for f, c, a, b in conn.execute(
+                         "SELECT file_id, context_id, fromno, tono FROM arc")]
+    except sqlite3.Error:
+        return out
+    finally:
+        conn.close()
+
+    rels = {}
+    for file_id, path in files.items():
+        p = Path(path)
+        try:
+            rels[file_id] = (p if p.is_absolute() else cwd_path / p).resolve() \
+                .relative_to(cwd_path).as_posix()
+        except (OSError, ValueError):
+            continue
+    for file_id, context_id, lines in rows:
+        rel = rels.get(file_id)
+        nodeid = (contexts.get(context_id) or "").rsplit("|", 1)[0]
+        if rel is None or not nodeid or not lines:
+            continue
+        out.setdefault(rel, {}).setdefault(nodeid, set()).update(lines)
+    return out
+
+
+def update_index(cwd, data_file=None):
+    """Merge the last instrumented run into the index. True if merged.
+
+    The data file is consumed (removed) either way.
+    """
+    data_file = Path(data_file or coverage_data_path(cwd))
+    if not data_file.is_file():
+        return False
+    try:
+        measured = read_contexts(cwd, data_file)
+    finally:
+        try:
+            data_file.unlink()
+        except OSError:
+            pass
+    if not measured:
+        return False
+
+    index = read_index(cwd)
+    files = index.get("files") if isinstance(index.get("files"), dict) else {}
+    ran = {nodeid for per_test in measured.values() for nodeid in per_test}
+    for entry in files.values():
+        entry["cov"] = {n: r for n, r in entry["cov"].items() if n not in ran}
+
+    for rel, per_test in measured.items():
+        text = _read_text(Path(cwd) / rel)
+        if text is None:
+            files.pop(rel, None)
+            continue
+        crcs = _line_crcs(text)
+        entry = files.get(rel) or {"crc": "", "cov": {}}
+        cov = entry["cov"]
+        if cov and entry["crc"] != _crc_hex(crcs):
+            _, opcodes = _opcodes(_crc_list(entry["crc"]), crcs)
+            cov = {nodeid: _ranges(_remap(_lines(r), opcodes, len(crcs)))
+                   for nodeid, r in cov.items()}
+        for nodeid, lines in per_test.items():
+            cov[nodeid] = _ranges(ln for ln in lines if ln <= len(crcs))
+        files[rel] = {"crc": _crc_hex(crcs), "cov": cov}
+
+    index["files"] = {rel: e for rel, e in files.items() if e["cov"]}
+    index["built_at"] = time.time()
+    index.pop("cov_missing_at", None)
+    _write_index(cwd, index)
+    return True
+
+
+# ─────────────────────────────────────────────────────────────────
+# QUERY — Rung 2
+# ─────────────────────────────────────────────────────────────────
+
+def impacted_tests(cwd, rel):
+    """Sorted nodeids impacted by the current edit of rel, or None if stale."""
+    index = read_index(cwd)
+    if time.time() - index.get("built_at", 0) > IMPACT_INDEX_MAX_AGE:
+        return None
+    entry = (index.get("files") or {}).get(rel)
+    text = _read_text(Path(cwd) / rel)
+    if not entry or text is None:
+        return None
+
+    old, new = _crc_list(entry["crc"]), _line_crcs(text)
+    touched, to_old = set(), {}
+    if old == new:
+        to_old = {ln: ln for ln in range(1, len(new) + 1)}
+    else:
+        matcher, opcodes = _opcodes(old, new)
+        if matcher.ratio() < 1 - IMPACT_INDEX_MAX_DRIFT:
+            return None
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                to_old.update((j1 + k + 1, i1 + k + 1) for k in range(i2 - i1))
+            elif tag == "insert":
+                touched.update(ln for ln in (i1, i1 + 1) if 1 <= ln <= len(old))
+            else:
+                touched.update(range(i1 + 1, i2 + 1))
+
+    from _sdd_coverage import _git_changed_lines
+    uncommitted = (_git_changed_lines(cwd) or {}).get(
+        str((Path(cwd) / rel).resolve()), ())
+    touched.update(to_old[ln] for ln in uncommitted if ln in to_old)
+
+    cov = entry["cov"]
+    impacted = [nodeid for nodeid, ranges in cov.items()
+                if any(first <= ln <= last for first, last in ranges
+                       for ln in touched)]
+    if not impacted:
+        impacted = list(cov)
+    existing = [n for n in impacted
+                if (Path(cwd) / n.split("::", 1)[0]).is_file()]
+    return sorted(existing) or None
+
+
+def impacted_pytest_command(cwd, rel):
+    """`pytest <nodeids>` for an edit of rel, or None (Rung 3).
+
+    More than IMPACT_INDEX_MAX_NODEIDS nodeids collapse to their test
+    files; more files than that is the full suite in all but name.
+    """
+    if not get_impact_index_enabled(cwd):
+        return None
+    tests = impacted_tests(cwd, rel)
+    if not tests:
+        return None
+    if len(tests) > IMPACT_INDEX_MAX_NODEIDS:
+        tests = sorted({t.split("::", 1)[0] for t in tests})
+        if len(tests) > IMPACT_INDEX_MAX_NODEIDS:
+            return None
+    return "pytest " + " ".join(shlex.quote(t) for t in tests)
@@ -0,0 +1,320 @@
+"""Static import graph for coverage-free Rung 2 test selection.
+
+    impacted_test_files(cwd, "app/core.py")  # ["tests/test_core.py", ...] | None
+
+The graph maps each Python and JS/TS file to the project files it
+imports:
+
+    {"built_at": epoch,
+     "files": {rel_path: [mtime_ns, size, [dep_rel_path, ...]]}}
+
+Python files are parsed with ast: `import a.b`, `from a.b import c`
+(module a.b.c when it exists, else a.b), relative imports, and
+importlib.import_module("literal") for modules whose names are not
+identifiers. Absolute modules resolve against the importing file's
+package root, then the project root, then src/. Importing a.b.c also
+depends on the a and a.b package __init__ files. A file that does not
+parse (mid-edit) falls back to a line regex.
+
+JS/TS files are scanned with one regex for `import ... from '...'`,
+`export ... from '...'`, `import('...')` and `require('...')`. Only
+relative specifiers resolve, trying the usual extensions, `index.*`,
+and the TS source behind a `.js` specifier. Package imports and
+tsconfig paths are ignored.
+
+Maintenance: refresh() walks the project and re-parses only files whose
+mtime or size changed. Only the sdd-auto-test worker runs it, after each
+test run and under the runner lock, so it is the graph's single writer;
+the PostToolUse edit path never touches the graph (an edit shows up as a
+changed mtime at the next refresh). Queries never build the graph —
+until the worker has, and for files added since, they return None and
+the cascade falls back to Rung 3.
+
+Query: a breadth-first walk over reverse edges from the changed file
+collects the test files that transitively import it. Reaching a
+conftest.py selects every test file under its directory, since pytest
+loads it without an import.
+"""
+import json
+import os
+import posixpath
+import re
+import time
+from pathlib import Path
+
+from _sdd_config import (
+    IMPORT_GRAPH_MAX_FILES,
+    IMPORT_GRAPH_SKIP_DIRS,
+    get_import_graph_enabled,
+)
+from _sdd_state import _store, _tmp, _write_json_atomic, project_hash
+
+PY_EXTENSIONS = (".py",)
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts")
+GRAPH_EXTENSIONS = frozenset(PY_EXTENSIONS + JS_EXTENSIONS)
+
+# A `.js` specifier in TS sources names the compiled file; the source
+# sits next to it under a TS extension.
+_JS_TO_TS = {".js": (".ts", ".tsx"), ".jsx": (".tsx",),
+             ".mjs": (".mts",), ".cjs": (".cts",)}
+
+_JS_IMPORT_RE = re.compile(
+    r"""(?:\bimport\s*(?:[\w$*{}\s,]+?\s*from\s*)?"""
+    r"""|\bexport\s*[\w$*{}\s,]*?\s*from\s*"""
+    r"""|\b(?:require|import)\s*\(\s*)"""
+    r"""(['"])(\.{1,2}/[^'"\n]*|\.{1,2})\1"""
+)
+
+# Fallback for Python files that do not parse.
+_PY_IMPORT_LINE_RE = re.compile(
+    r"^[ \t]*(?:from[ \t]+(\.*[\w.]*)[ \t]+import[ \t]+\(?([\w, \t*]+)"
+    r"|import[ \t]+([\w., \t]+))",
+    re.MULTILINE,
+)
+
+
+def _graph_path(cwd):
+    return _tmp(f"sdd-imports-{project_hash(str(cwd))}.json")
+
+
+def read_graph(cwd):
+    """The graph dict, or {} when it has not been built."""
+    store = _store(cwd)
+    if store is not None:
+        return store.get(cwd, "import-graph") or {}
+    try:
+        data = json.loads(_graph_path(cwd).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_graph(cwd, graph):
+    store = _store(cwd)
+    if store is not None:
+        store.put(cwd, "import-graph", "", graph)
+        return
+    _write_json_atomic(_graph_path(cwd), graph, prefix="sdd-imports-")
+
+
+# ─────────────────────────────────────────────────────────────────
+# PYTHON
+# ─────────────────────────────────────────────────────────────────
+
+def _py_imports(text):
+    """[(level, module, names)] for every import in a Python source."""
+    import ast
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return _py_imports_by_line(text)
+    out = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            out.extend((0, alias.name, ()) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            out.append((node.level, node.module or "",
+                        tuple(a.name for a in node.names if a.name != "*")))
+        elif (isinstance(node, ast.Call) and node.args
+              and isinstance(node.args[0], ast.Constant)
+              and isinstance(node.args[0].value, str)
+              and getattr(node.func, "attr",
+                          getattr(node.func, "id", None)) == "import_module"):
+            out.append((0, node.args[0].value, ()))
+    return out
+
+
+def _py_imports_by_line(text):
+    out = []
+    for m in _PY_IMPORT_LINE_RE.finditer(text):
+        if m.group(3):
+            out.extend((0, name.strip().split(" ")[0], ())
+                       for name in m.group(3).split(",") if name.strip())
+        else:
+            spec = m.group(1)
+            level = len(spec) - len(spec.lstrip("."))
+            names = tuple(n.strip().split(" ")[0]
+                          for n in m.group(2).split(",") if n.strip() not in ("", "*"))
+            out.append((level, spec[level:], names))
+    return out
+
+
+def _package_root(rel, known):
+    """Directory above the outermost package holding rel ("" = project)."""
+    parent = posixpath.dirname(rel)
+    while parent and posixpath.join(parent, "__init__.py") in known:
+        parent = posixpath.dirname(parent)
+    return parent
+
+
+def _py_module_files(base, module, known):
+    """Project files executed by importing module under base dir."""
+    parts = [p for p in module.split(".") if p]
+    if not parts:
+        init = posixpath.join(base, "__init__.py") if base else "__init__.py"
+        return [init] if init in known else []
+    stem = posixpath.join(base, *parts) if base else posixpath.join(*parts)
+    found = [f for f in (stem + ".py", posixpath.join(stem, "__init__.py"))
+             if f in known]
+    if found:
+        for i in range(1, len(parts)):
+            init = posixpath.join(base, *parts[:i], "__init__.py") if base \
+                else posixpath.join(*parts[:i], "__init__.py")
+            if init in known:
+                found.append(init)
+    return found
+
+
+def _py_deps(rel, text, known):
+    here = posixpath.dirname(rel)
+    roots = []
+    for root in (_package_root(rel, known), "", "src"):
+        if root not in roots:
+            roots.append(root)
+    deps = set()
+    for level, module, names in _py_imports(text):
+        if level:
+            base = here
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            bases = [base]
+        else:
+            bases = roots
+        for base in bases:
+            found = []
+            for name in names:
+                found += _py_module_files(base, f"{module}.{name}", known)
+            found += _py_module_files(base, module, known)
+            if found:
+                deps.update(found)
+                break
+    deps.discard(rel)
+    return deps
+
+
+# ─────────────────────────────────────────────────────────────────
+# JS / TS
+# ─────────────────────────────────────────────────────────────────
+
+def _js_deps(rel, text, known):
+    here = posixpath.dirname(rel)
+    deps = set()
+    for m in _JS_IMPORT_RE.finditer(text):
+        target = posixpath.normpath(posixpath.join(here, m.group(2)))
+        if target.startswith(".."):
+            continue
+        stem, ext = posixpath.splitext(target)
+        candidates = [target]
+        candidates += [stem + ts for ts in _JS_TO_TS.get(ext, ())]
+        candidates += [target + e for e in JS_EXTENSIONS]
+        candidates += [posixpath.join(target, "index" + e) for e in JS_EXTENSIONS]
+        for candidate in candidates:
+            if candidate in known and candidate != rel:
+                deps.add(candidate)
+                break
+    return deps
+
+
+def _deps(rel, text, known):
+    if rel.endswith(PY_EXTENSIONS):
+        return _py_deps(rel, text, known)
+    return _js_deps(rel, text, known)
+
+
+# ─────────────────────────────────────────────────────────────────
+# MAINTENANCE
+# ─────────────────────────────────────────────────────────────────
+
+def _walk(cwd):
+    """{rel: (mtime_ns, size)} for graph files, or None past the cap."""
+    out = {}
+    for dirpath, dirnames, filenames in os.walk(cwd):
+        dirnames[:] = [d for d in dirnames
+                       if d not in IMPORT_GRAPH_SKIP_DIRS and not d.startswith(".")]
+        rel_dir = os.path.relpath(dirpath, cwd).replace(os.sep, "/")
+        for name in filenames:
+            if posixpath.splitext(name)[1] not in GRAPH_EXTENSIONS:
+                continue
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+            out[rel] = (st.st_mtime_ns, st.st_size)
+            if len(out) > IMPORT_GRAPH_MAX_FILES:
+                return None
+    return out
+
+
+def _parse(cwd, rel, known):
+    try:
+        text = (Path(cwd) / rel).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return []
+    return sorted(_deps(rel, text, known))
+
+
+def refresh(cwd):
+    """Bring the graph up to date with the tree. True when written.
+
+    Only new files and files whose mtime or size changed are parsed.
+    Projects past IMPORT_GRAPH_MAX_FILES get no graph (Rung 3).
+    """
+    if not get_import_graph_enabled(cwd):
+        return False
+    stats = _walk(cwd)
+    if stats is None:
+        return False
+    old = read_graph(cwd).get("files") or {}
+    known = set(stats)
+    files = {}
+    for rel, (mtime_ns, size) in stats.items():
+        entry = old.get(rel)
+        if entry and entry[0] == mtime_ns and entry[1] == size:
+            files[rel] = entry
+        else:
+            files[rel] = [mtime_ns, size, _parse(cwd, rel, known)]
+    _write_graph(cwd, {"built_at": time.time(), "files": files})
+    return True
+
+
+# ─────────────────────────────────────────────────────────────────
+# QUERY
+# ─────────────────────────────────────────────────────────────────
+
+def impacted_test_files(cwd, rel):
+    """Sorted test files that transitively import rel, or None.
+
+    None when the graph is disabled or not built, rel is not in it, or
+    no test reaches it — the caller falls back to Rung 3.
+    """
+    if not get_import_graph_enabled(cwd):
+        return None
+    files = read_graph(cwd).get("files") or {}
+    if rel not in files:
+        return None
+    from _sdd_coverage import is_test_file
+
+    importers = {}
+    for src, entry in files.items():
+        for dep in entry[2]:
+            importers.setdefault(dep, []).append(src)
+
+    seen, queue, tests, conftest_dirs = {rel}, [rel], set(), []
+    while queue:
+        current = queue.pop()
+        if posixpath.basename(current) == "conftest.py":
+            conftest_dirs.append(posixpath.dirname(current))
+        elif current != rel and is_test_file(current, cwd=cwd):
+            tests.add(current)
+        for src in importers.get(current, ()):
+            if src not in seen:
+                seen.add(src)
+                queue.append(src)
+
+    for base in conftest_dirs:
+        prefix = f"{base}/" if base else ""
+        tests.update(f for f in files
+                     if f.startswith(prefix) and posixpath.basename(f) != "conftest.py"
+                     and is_test_file(f, cwd=cwd))
+    return sorted(tests) or None
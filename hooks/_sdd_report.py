@@ -0,0 +1,377 @@
+"""Structured test reports: runner-native result files (opt-in).
+
+    reporting = reporting_command(cwd, command)   # Reporting | None
+    rc, stdout, stderr, timed_out = run(reporting.command, ...)
+    report = read_report(cwd, reporting, rc)       # dict | None
+
+With {"STRUCTURED_REPORT": true} in .claude/config.json, the sdd-auto-test
+worker and the TaskCompleted test gate add the runner's machine-readable
+reporter to single-statement test commands and read the result from the
+report instead of scraping the kept output tail with regexes:
+
+    pytest   `-o junit_family=xunit1 --junitxml=<file>`, read with
+             iterparse one <testcase> at a time. IDs are nodeids.
+    jest     `--json --outputFile=<file>` (after `--` for `npm test`
+             whose script is a single jest/vitest call). json.load with
+             the file capped at REPORT_MAX_BYTES: the stdlib has no
+             incremental JSON reader. IDs are `<file> > <full name>`.
+    vitest   `--reporter=default --reporter=json --outputFile=<file>`
+             (same jest-compatible format).
+    go       `go test -json … > <file>`, read line by line. IDs are
+             `<pkg>:<Test>`. The runner's text output is rebuilt from the
+             events as `go test` would print it without -v (package
+             lines, plus the output of failing tests only), so summaries
+             and failed-first parsing downstream see the usual text. No
+             live progress for these runs: stdout goes to the file.
+
+A report is
+    {"counts": {"passed", "failed", "errors", "skipped"},
+     "tests": {id: [outcome, seconds]},        # outcome: p f e s
+     "failures": [{"id", "location", "message"}],  # REPORT_MAX_FAILURES
+     "units": {"pytest:<file>" | "go:<pkg>": seconds},
+     "output": rebuilt text (go) | None}
+
+read_report() returns None, and the caller keeps the regex summary, when
+the file is missing or unreadable, no test ran, or the exit code
+disagrees with it (a failing exit with no failing test: a crash in
+teardown, a coverage threshold, a build error).
+
+record_report() keeps the last report's per-test outcomes and durations
+per project (`sdd-test-report-{hash}.json`, kind "test-report" with the
+SQLite backend) and, for full-suite runs, feeds the per-file / per-package
+durations to the sharding planner.
+"""
+import json
+import os
+import re
+import shlex
+from collections import namedtuple
+
+from _sdd_config import (
+    REPORT_MAX_BYTES,
+    REPORT_MAX_FAILURES,
+    REPORT_MESSAGE_CHARS,
+    get_structured_report_enabled,
+)
+from _sdd_state import _store, _tmp, _write_json_atomic, project_hash
+
+Reporting = namedtuple("Reporting", "command path kind")
+
+_NPM_TEST = (["npm", "test"], ["pnpm", "test"], ["yarn", "test"],
+             ["npm", "run", "test"], ["pnpm", "run", "test"],
+             ["yarn", "run", "test"])
+_GO_TEST_RE = re.compile(r"^\s*go\s+test(?=\s|$)")
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+# pytest long repr: the frame that raised ends in "path.py:12: Error".
+_PYTEST_LOCATION_RE = re.compile(r"^(\S+?\.py):(\d+): ", re.MULTILINE)
+_GO_LOCATION_RE = re.compile(r"^\s+(\S+\.go):(\d+): (.*)$", re.MULTILINE)
+_JS_SKIPPED = frozenset({"pending", "skipped", "todo", "disabled"})
+
+
+def _report_path(cwd, ext):
+    return _tmp(f"sdd-run-report-{project_hash(str(cwd))}-{os.getpid()}.{ext}")
+
+
+def _test_report_path(cwd):
+    return _tmp(f"sdd-test-report-{project_hash(str(cwd))}.json")
+
+
+def _words(command):
+    from _sdd_shell import lex
+    stmts = lex(command)
+    if len(stmts) != 1 or stmts[0].redirects:
+        return None
+    return stmts[0].words
+
+
+def _npm_script_runner(cwd, words):
+    """"jest" / "vitest" when `npm test` runs exactly one of them."""
+    if words not in _NPM_TEST:
+        return None
+    try:
+        with open(os.path.join(cwd, "package.json"), encoding="utf-8") as f:
+            script = json.load(f)["scripts"]["test"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    script_words = _words(script) if isinstance(script, str) else None
+    if not script_words or script_words[0] not in ("jest", "vitest"):
+        return None
+    return script_words[0]
+
+
+# ─────────────────────────────────────────────────────────────────
+# COMMANDS
+# ─────────────────────────────────────────────────────────────────
+
+def reporting_command(cwd, command):
+    """Reporting(command with the reporter added, report path, kind), or None."""
+    if not command or not get_structured_report_enabled(cwd):
+        return None
+    words = _words(command)
+    if not words:
+        return None
+    if words[0] == "pytest" or (len(words) >= 3 and os.path.basename(words[0])
+                                .startswith("python") and words[1:3] == ["-m", "pytest"]):
+        if any(w.startswith(("--junitxml", "--junit-xml")) for w in words):
+            return None
+        path = _report_path(cwd, "xml")
+        return Reporting(f"{command} -o junit_family=xunit1 "
+                         f"--junitxml={shlex.quote(str(path))}", path, "junit")
+    runner = words[1] if words[0] == "npx" and len(words) > 1 else words[0]
+    prefix = ""
+    if runner not in ("jest", "vitest"):
+        runner = _npm_script_runner(cwd, words)
+        prefix = " --"
+    if runner in ("jest", "vitest"):
+        if any(w.startswith(("--json", "--outputFile", "--reporter")) for w in words):
+            return None
+        path = _report_path(cwd, "json")
+        flags = "--json" if runner == "jest" else "--reporter=default --reporter=json"
+        return Reporting(f"{command}{prefix} {flags} --outputFile={shlex.quote(str(path))}",
+                         path, "jest")
+    if words[:2] == ["go", "test"] and "-json" not in words and _GO_TEST_RE.match(command):
+        path = _report_path(cwd, "jsonl")
+        return Reporting(_GO_TEST_RE.sub("go test -json", command, count=1)
+                         + f" > {shlex.quote(str(path))}", path, "go-json")
+    return None
+
+
+# ─────────────────────────────────────────────────────────────────
+# PARSING
+# ─────────────────────────────────────────────────────────────────
+
+def _message(text):
+    """First non-empty line of text, ANSI-free, capped."""
+    for line in _ANSI_RE.sub("", text or "").splitlines():
+        line = line.strip()
+        if line:
+            return line[:REPORT_MESSAGE_CHARS]
+    return ""
+
+
+class _Collector:
+    """Accumulates one report's outcomes."""
+
+    def __init__(self):
+        self.counts = {"passed": 0, "failed": 0, "errors": 0, "skipped": 0}
+        self.tests = {}
+        self.failures = []
+        self.units = {}
+
+    def add(self, test_id, outcome, seconds, location="", message="", unit=None):
+        self.counts[{"p": "passed", "f": "failed", "e": "errors", "s": "skipped"}[outcome]] += 1
+        self.tests[test_id] = [outcome, round(seconds, 3)]
+        if outcome in ("f", "e") and len(self.failures) < REPORT_MAX_FAILURES:
+            self.failures.append({"id": test_id, "location": location, "message": message})
+        if unit:
+            self.units[unit] = round(self.units.get(unit, 0.0) + seconds, 3)
+
+    def report(self, output=None):
+        return {"counts": self.counts, "tests": self.tests, "failures": self.failures,
+                "units": self.units, "output": output}
+
+
+def _pytest_nodeid(case):
+    name = case.get("name") or ""
+    classname = case.get("classname") or ""
+    path = case.get("file")
+    if not path:
+        return f"{classname}::{name}" if classname else name
+    module = path[:-3].replace("/", ".") if path.endswith(".py") else path
+    cls = classname[len(module) + 1:] if classname.startswith(module + ".") else ""
+    return "::".join([path, *(cls.split(".") if cls else []), name])
+
+
+def _parse_junit(path):
+    import xml.etree.ElementTree as ET
+    collector = _Collector()
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag != "testcase":
+            continue
+        try:
+            seconds = float(elem.get("time") or 0)
+        except ValueError:
+            seconds = 0.0
+        outcome, detail = "p", None
+        for child in elem:
+            if child.tag in ("failure", "error"):
+                outcome, detail = ("f" if child.tag == "failure" else "e"), child
+                break
+            if child.tag == "skipped":
+                outcome = "s"
+        location = message = ""
+        if detail is not None:
+            text = detail.text or ""
+            found = _PYTEST_LOCATION_RE.findall(text)
+            if found:
+                location = f"{found[-1][0]}:{found[-1][1]}"
+            elif elem.get("file") and (elem.get("line") or "").isdigit():
+                location = f"{elem.get('file')}:{int(elem.get('line')) + 1}"
+            message = _message(detail.get("message") or text)
+        test_file = elem.get("file")
+        collector.add(_pytest_nodeid(elem), outcome, seconds, location, message,
+                      f"pytest:{test_file}" if test_file else None)
+        elem.clear()
+    return collector.report()
+
+
+def _parse_jest(cwd, path):
+    if os.path.getsize(path) > REPORT_MAX_BYTES:
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    collector = _Collector()
+    for suite in data.get("testResults") or []:
+        name = suite.get("name") or ""
+        rel = os.path.relpath(name, cwd).replace(os.sep, "/") if name else ""
+        cases = suite.get("assertionResults") or []
+        if not cases and suite.get("status") == "failed":
+            # The file did not load (syntax error, missing module).
+            collector.add(rel, "e", 0.0, rel, _message(suite.get("message")))
+            continue
+        for case in cases:
+            status = case.get("status")
+            outcome = "p" if status == "passed" else "s" if status in _JS_SKIPPED else "f"
+            location = message = ""
+            if outcome == "f":
+                text = "\n".join(case.get("failureMessages") or [])
+                m = re.search(re.escape(name) + r":(\d+):\d+", text) if name else None
+                line = m.group(1) if m else (case.get("location") or {}).get("line")
+                location = f"{rel}:{line}" if line else rel
+                message = _message(text)
+            collector.add(f"{rel} > {case.get('fullName') or case.get('title')}",
+                          outcome, (case.get("duration") or 0) / 1000, location, message)
+    return collector.report()
+
+
+def _parse_go_json(path):
+    from _sdd_stream import TailBuffer
+    collector = _Collector()
+    output = TailBuffer()
+    pending = {}
+    failed_pkgs = set()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                output.feed(line.encode())
+                continue
+            if not isinstance(event, dict):
+                continue
+            action, pkg, test = event.get("Action"), event.get("Package", ""), event.get("Test")
+            if action == "output":
+                text = event.get("Output") or ""
+                if not test:
+                    output.feed(text.encode())
+                elif not text.startswith("=== "):
+                    kept = pending.setdefault((pkg, test), [])
+                    kept.append(text)
+                    del kept[:-100]
+            elif action in ("pass", "fail", "skip") and test:
+                lines = pending.pop((pkg, test), [])
+                location = message = ""
+                if action == "fail":
+                    failed_pkgs.add(pkg)
+                    text = "".join(lines)
+                    output.feed(text.encode())
+                    m = _GO_LOCATION_RE.search(text)
+                    if m:
+                        location, message = f"{m.group(1)}:{m.group(2)}", \
+                            m.group(3).strip()[:REPORT_MESSAGE_CHARS]
+                outcome = {"pass": "p", "fail": "f", "skip": "s"}[action]
+                collector.add(f"{pkg}:{test}", outcome, float(event.get("Elapsed") or 0),
+                              location, message)
+            elif action in ("pass", "fail") and pkg:
+                collector.units[f"go:{pkg}"] = float(event.get("Elapsed") or 0)
+                if action == "fail" and pkg not in failed_pkgs:
+                    # Build failure or a crash outside any test.
+                    collector.add(pkg, "e", 0.0, pkg, "package failed")
+    return collector.report(output.text())
+
+
+def read_report(cwd, reporting, returncode):
+    """The run's report (see module doc), or None. Removes the file."""
+    if reporting is None:
+        return None
+    try:
+        if reporting.kind == "junit":
+            report = _parse_junit(reporting.path)
+        elif reporting.kind == "jest":
+            report = _parse_jest(cwd, reporting.path)
+        else:
+            report = _parse_go_json(reporting.path)
+    except (OSError, ValueError, SyntaxError, AttributeError, TypeError):
+        report = None
+    finally:
+        try:
+            os.unlink(reporting.path)
+        except OSError:
+            pass
+    if not report or not report["tests"]:
+        return None
+    counts = report["counts"]
+    if (returncode == 0) != (counts["failed"] + counts["errors"] == 0):
+        return None
+    return report
+
+
+# ─────────────────────────────────────────────────────────────────
+# USING A REPORT
+# ─────────────────────────────────────────────────────────────────
+
+def summary(report):
+    """"3 passed, 1 failed, 1 skipped" — passed always, the rest when non-zero."""
+    counts = report["counts"]
+    parts = [f"{counts['passed']} passed"]
+    parts += [f"{counts[word]} {word}" for word in ("failed", "errors", "skipped")
+              if counts[word]]
+    return ", ".join(parts)
+
+
+def failure_lines(report):
+    """One line per kept failure: `id (location): message`. Takes a
+    report or a state written with its failures."""
+    lines = []
+    for failure in report["failures"]:
+        where = f" ({failure['location']})" if failure["location"] \
+            and failure["location"] != failure["id"] else ""
+        text = f": {failure['message']}" if failure["message"] else ""
+        lines.append(f"{failure['id']}{where}{text}")
+    return lines
+
+
+def failing_ids(report, kind):
+    """Failing test IDs in _sdd_failed's format (nodeids, files, pkg:Test)."""
+    ids = [i for i, (outcome, _) in report["tests"].items() if outcome in ("f", "e")]
+    if kind == "jest":
+        ids = [i.split(" > ", 1)[0] for i in ids]
+    elif kind == "go-json":
+        ids = [i for i in ids if ":" in i and "/" not in i.rpartition(":")[2]]
+    return sorted(set(ids))
+
+
+def read_test_report(cwd):
+    """{"command", "tests": {id: [outcome, seconds]}} of the last report, or {}."""
+    store = _store(cwd)
+    if store is not None:
+        data = store.get(cwd, "test-report") or {}
+    else:
+        try:
+            data = json.loads(_test_report_path(cwd).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+    return data if isinstance(data, dict) else {}
+
+
+def record_report(cwd, command, report, full_suite):
+    """Keep the report's per-test results; full suites also feed sharding."""
+    data = {"command": command, "tests": report["tests"]}
+    store = _store(cwd)
+    if store is not None:
+        store.put(cwd, "test-report", "", data)
+    else:
+        _write_json_atomic(_test_report_path(cwd), data, prefix="sdd-test-report-")
+    if full_suite and report["units"]:
+        from _sdd_shard import record_durations
+        record_durations(cwd, report["units"])
@@ -0,0 +1,184 @@
+"""Content-addressed memoization of test results (opt-in).
+
+    key = result_key(cwd, command)          # None → cache off / tree too big
+    hit = lookup(cwd, key)                  # {"passing", "summary", ...} | None
+    ... run command ...
+    remember(cwd, command, key, passing, summary, raw_output, duration)
+
+With {"RESULT_CACHE": true} in .claude/config.json, the sdd-auto-test
+worker and the TaskCompleted test gate (run_gate("test", ...)) look the
+command up before running it. A tree that is byte-identical to one the
+command already ran on — after a revert, a formatting round-trip, or
+teammates converging on the same code — gets the recorded pass/fail
+result back at once instead of a rerun.
+
+The key is sha256(command, tree hash). The tree hash covers every source
+and test file (is_source_file / is_test_file, so SOURCE_EXTENSIONS and
+TEST_FILE_PATTERNS apply) and every FAST_PATH_FORCE_FULL_FILES name
+(lockfiles, stack configs), outside IMPORT_GRAPH_SKIP_DIRS and
+dot-directories. It is incremental: a per-project stat cache keeps
+{rel: [mtime_ns, size, digest]} and only files whose stat changed are
+read again. A file modified in the last _RACY_SECONDS is re-read every
+time (its mtime may not move on the next write). Anything else the tests
+depend on — installed packages outside the lockfiles, services, data
+files with other extensions — is not part of the key.
+
+remember() stores a result only if the tree hash is unchanged after the
+run, so a result is never filed under a tree it did not see. Entries
+expire after RESULT_CACHE_TTL; the RESULT_CACHE_ENTRIES most recently
+recorded are kept.
+
+Storage per project: `sdd-tree-stat-{hash}.json` and
+`sdd-results-{hash}.json` (kinds "tree-stat" and "test-results" with the
+SQLite backend).
+"""
+import hashlib
+import json
+import os
+import time
+
+from _sdd_config import (
+    FAST_PATH_FORCE_FULL_FILES,
+    IMPORT_GRAPH_SKIP_DIRS,
+    RESULT_CACHE_ENTRIES,
+    RESULT_CACHE_MAX_FILES,
+    RESULT_CACHE_TTL,
+    get_result_cache_enabled,
+)
+from _sdd_state import _store, _tmp, _write_json_atomic, project_hash
+
+_RACY_SECONDS = 2
+_READ_CHUNK = 1024 * 1024
+
+
+def _stat_path(cwd):
+    return _tmp(f"sdd-tree-stat-{project_hash(str(cwd))}.json")
+
+
+def _results_path(cwd):
+    return _tmp(f"sdd-results-{project_hash(str(cwd))}.json")
+
+
+def _read(cwd, kind, path):
+    store = _store(cwd)
+    if store is not None:
+        data = store.get(cwd, kind) or {}
+    else:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write(cwd, kind, path, data):
+    store = _store(cwd)
+    if store is not None:
+        store.put(cwd, kind, "", data)
+        return
+    _write_json_atomic(path, data, prefix=f"sdd-{kind}-")
+
+
+# ─────────────────────────────────────────────────────────────────
+# TREE HASH
+# ─────────────────────────────────────────────────────────────────
+
+def _relevant_files(cwd):
+    """{rel: os.stat_result} of the hashed files, or None past the cap."""
+    from _sdd_coverage import is_source_file, is_test_file
+    out = {}
+    for dirpath, dirnames, filenames in os.walk(cwd):
+        dirnames[:] = [d for d in dirnames
+                       if d not in IMPORT_GRAPH_SKIP_DIRS and not d.startswith(".")]
+        rel_dir = os.path.relpath(dirpath, cwd).replace(os.sep, "/")
+        for name in filenames:
+            rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+            if name not in FAST_PATH_FORCE_FULL_FILES \
+                    and not is_source_file(rel, cwd=cwd) \
+                    and not is_test_file(rel, cwd=cwd):
+                continue
+            try:
+                out[rel] = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            if len(out) > RESULT_CACHE_MAX_FILES:
+                return None
+    return out
+
+
+def _digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def tree_hash(cwd):
+    """Hash of the relevant files' paths and contents, or None."""
+    files = _relevant_files(cwd)
+    if files is None:
+        return None
+    known = _read(cwd, "tree-stat", _stat_path(cwd)).get("files") or {}
+    racy_after = (time.time() - _RACY_SECONDS) * 1e9
+    fresh, changed = {}, False
+    tree = hashlib.sha256()
+    for rel in sorted(files):
+        st = files[rel]
+        entry = known.get(rel)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            digest = entry[2]
+        else:
+            try:
+                digest = _digest(os.path.join(cwd, rel))
+            except OSError:
+                continue
+            changed = True
+        if st.st_mtime_ns < racy_after:
+            fresh[rel] = [st.st_mtime_ns, st.st_size, digest]
+        tree.update(f"{rel}\0{digest}\n".encode("utf-8", "surrogateescape"))
+    if changed or len(fresh) != len(known):
+        _write(cwd, "tree-stat", _stat_path(cwd), {"files": fresh})
+    return tree.hexdigest()
+
+
+def result_key(cwd, command):
+    """Cache key for command on the current tree, or None (cache off)."""
+    if not command or not get_result_cache_enabled(cwd):
+        return None
+    tree = tree_hash(cwd)
+    if tree is None:
+        return None
+    return hashlib.sha256(f"{command}\0{tree}".encode()).hexdigest()
+
+
+# ─────────────────────────────────────────────────────────────────
+# RESULTS
+# ─────────────────────────────────────────────────────────────────
+
+def lookup(cwd, key):
+    """Recorded result for key: {"passing", "summary", "raw_output",
+    "duration"}, or None."""
+    if key is None:
+        return None
+    entry = (_read(cwd, "test-results", _results_path(cwd)).get("entries") or {}).get(key)
+    if not isinstance(entry, dict) or time.time() - entry.get("recorded", 0) > RESULT_CACHE_TTL:
+        return None
+    return entry
+
+
+def remember(cwd, command, key, passing, summary, raw_output="", duration=None):
+    """Record a complete run's result under key, if the tree is unchanged."""
+    if key is None or result_key(cwd, command) != key:
+        return
+    data = _read(cwd, "test-results", _results_path(cwd))
+    now = time.time()
+    entries = {k: e for k, e in (data.get("entries") or {}).items()
+               if isinstance(e, dict) and now - e.get("recorded", 0) <= RESULT_CACHE_TTL}
+    entries[key] = {"passing": passing, "summary": summary,
+                    "raw_output": raw_output, "duration": duration,
+                    "recorded": now}
+    if len(entries) > RESULT_CACHE_ENTRIES:
+        newest = sorted(entries, key=lambda k: entries[k]["recorded"])
+        entries = {k: entries[k] for k in newest[-RESULT_CACHE_ENTRIES:]}
+    _write(cwd, "test-results", _results_path(cwd), {"entries": entries})
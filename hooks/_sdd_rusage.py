@@ -0,0 +1,115 @@
+"""Resource usage and optional rlimits of test and gate process groups.
+
+    usage = {}
+    rc, out, err, timed_out = run_in_process_group(cmd, cwd, t, usage=usage)
+    usage   # {"cpu_user_s", "cpu_sys_s", "max_rss_mb",
+            #  "io_read_blocks", "io_write_blocks"}  ({} when unmeasured)
+
+run_in_process_group reaps its shell with os.wait4 instead of
+Popen.wait, so the rusage it gets back is the shell's own plus that of
+every descendant the shell (or they) waited for: the whole test run,
+pytest workers and node children included. Descendants that outlive the
+shell are killed with the group and not counted. Block I/O is in
+512-byte blocks of actual storage traffic (page-cache hits are free).
+Concurrent shards are combined: CPU and I/O add up, and so do peak RSS
+values, since shards run side by side.
+
+The numbers go into test_run_end telemetry (sdd-auto-test) and a gate_run
+event per TaskCompleted gate run; the mission report ranks gates by CPU
+time from the latter.
+
+limit_prefix(cwd) returns the `ulimit -v N; ulimit -t N` line that
+run_in_process_group puts in front of the command, so the shell applies
+RLIMIT_AS_MB / RLIMIT_CPU_SECONDS (get_resource_limits) to itself and
+everything it starts; "" when neither is set. No preexec_fn: it is not
+safe to run between fork and exec when the parent has threads (the warm
+runner and the shard runner do). Never above the current hard limit.
+
+POSIX only (os.wait4, resource); elsewhere wait() falls back to
+Popen.wait and reports nothing.
+"""
+import os
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+USAGE_KEYS = ("cpu_user_s", "cpu_sys_s", "max_rss_mb",
+              "io_read_blocks", "io_write_blocks")
+
+
+def usage_from(ru):
+    """struct_rusage → usage dict (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    rss_unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "cpu_user_s": round(ru.ru_utime, 2),
+        "cpu_sys_s": round(ru.ru_stime, 2),
+        "max_rss_mb": round(ru.ru_maxrss / rss_unit, 1),
+        "io_read_blocks": ru.ru_inblock,
+        "io_write_blocks": ru.ru_oublock,
+    }
+
+
+def wait(proc, timeout=None):
+    """Popen.wait that also returns the child's usage dict (or None).
+
+    Raises subprocess.TimeoutExpired like Popen.wait; the child is then
+    still running and unreaped.
+    """
+    if not hasattr(os, "wait4"):
+        proc.wait(timeout=timeout)
+        return None
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = 0.0005
+    while True:
+        try:
+            pid, status, ru = os.wait4(proc.pid, 0 if deadline is None else os.WNOHANG)
+        except ChildProcessError:
+            # Reaped elsewhere (SIGCHLD ignored): Popen settles the code.
+            proc.wait(timeout=timeout)
+            return None
+        if pid == proc.pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return usage_from(ru)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+        time.sleep(min(delay, remaining, 0.05))
+        delay *= 2
+
+
+def combine(usages):
+    """Sum of the usage dicts of concurrent runs; {} when none measured."""
+    usages = [u for u in usages if u]
+    if not usages:
+        return {}
+    total = {key: sum(u.get(key, 0) for u in usages) for key in USAGE_KEYS}
+    for key in ("cpu_user_s", "cpu_sys_s", "max_rss_mb"):
+        total[key] = round(total[key], 2)
+    return total
+
+
+def limit_prefix(cwd):
+    """`ulimit` line applying the configured rlimits, or ""."""
+    if resource is None:
+        return ""
+    from _sdd_config import get_resource_limits
+    as_mb, cpu_s = get_resource_limits(cwd)
+    limits = []
+    # ulimit -v counts KiB, -t seconds.
+    for which, flag, value, unit in ((resource.RLIMIT_AS, "-v", as_mb * 1024, 1024),
+                                     (resource.RLIMIT_CPU, "-t", cpu_s, 1)):
+        if value <= 0:
+            continue
+        try:
+            hard = resource.getrlimit(which)[1]
+        except (OSError, ValueError):
+            continue
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard // unit)
+        limits.append(f"ulimit {flag} {value}")
+    return "; ".join(limits) + "\n" if limits else ""
@@ -40,11 +40,14 @@ import tempfile
 from pathlib import Path
 
 from _sdd_state import (
+    _store,
+    _tmp,
     _write_json_atomic,
     consume_skill_invoked,
     project_hash,
     read_skill_invoked,
 )
+from _sdd_trace import span
 
 
 SCENARIO_FILE_SUFFIX = ".scenarios.md"
@@ -371,23 +374,104 @@ def _run_git(cwd, *args):
     or None on timeout / OS error. Never raises.
     """
     try:
-        return subprocess.run(
-            ["git", "-C", str(cwd), *args],
-            capture_output=True,
-            timeout=_GIT_SUBPROCESS_TIMEOUT,
-        )
+        with span("git"):
+            return subprocess.run(
+                ["git", "-C", str(cwd), *args],
+                capture_output=True,
+                timeout=_GIT_SUBPROCESS_TIMEOUT,
+            )
     except (OSError, subprocess.TimeoutExpired):
         return None
 
 
-def scenario_baseline_hash(cwd, rel_path):
+def _baseline_cache_path(cwd):
+    """Per-project cache of first-add baselines (files backend)."""
+    return _tmp(f"sdd-scen-baseline-{project_hash(str(cwd))}.json")
+
+
+def _read_baseline_cache(cwd):
+    """{rel_path: {"commit", "sha256"}} — every cached baseline, unvalidated."""
+    store = _store(cwd)
+    if store is not None:
+        return store.get(cwd, "scen-baseline") or {}
+    try:
+        data = json.loads(_baseline_cache_path(cwd).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _update_baseline_cache(cwd, entries, drop=()):
+    """Merge entries into the cache and remove the rel paths in drop."""
+    def mutate(data):
+        for rel in drop:
+            data.pop(rel, None)
+        data.update(entries)
+        return data
+
+    store = _store(cwd)
+    if store is not None:
+        store.update(cwd, "scen-baseline", "", mutate)
+        return
+    _write_json_atomic(
+        _baseline_cache_path(cwd),
+        mutate(_read_baseline_cache(cwd)),
+        prefix="sdd-scen-baseline-",
+    )
+
+
+def _commit_reachable(cwd, commit):
+    """True when commit is an ancestor of (or equal to) HEAD."""
+    result = _run_git(cwd, "merge-base", "--is-ancestor", commit, "HEAD")
+    return result is not None and result.returncode == 0
+
+
+def _cache_entry(entry):
+    """(commit, sha256) from a cache entry, or None when malformed."""
+    if not isinstance(entry, dict):
+        return None
+    commit, digest = entry.get("commit"), entry.get("sha256")
+    if not (isinstance(commit, str) and isinstance(digest, str)):
+        return None
+    return commit, digest
+
+
+def _baseline_at(cwd, commit, rel_path, git=None):
+    """Canonical SHA256 of rel_path as stored in commit, or None.
+
+    `<commit>:./<path>` resolves against cwd, not the repository root, so
+    a project living in a subdirectory of its repo reads the right blob.
+    """
+    if git is not None:
+        blob = git.read(f"{commit}:./{rel_path}")
+    else:
+        result = _run_git(cwd, "show", f"{commit}:./{rel_path}")
+        blob = result.stdout if result is not None and result.returncode == 0 else None
+    if blob is None:
+        return None
+    return hashlib.sha256(_canon_scenario_bytes(blob)).hexdigest()
+
+
+def scenario_baseline_hash(cwd, rel_path, git=None):
     """SHA256 of the file at its first add commit (the write-once baseline).
 
+    The first-add commit and its hash never change while that commit stays
+    in HEAD's history, so both are cached per project. A cached entry is
+    trusted after one `git merge-base --is-ancestor` check; a history
+    rewrite (amend, rebase, reset past the add) makes the commit
+    unreachable and the baseline is recomputed with the full log walk.
+    `git` is an optional _sdd_git.GitObjectReader for the blob read.
+
     Returns None when:
       * git subprocess fails / times out
       * The file was never committed
       * cwd is not a git working tree
     """
+    cached = _cache_entry(_read_baseline_cache(cwd).get(rel_path))
+    if cached is not None:
+        if _commit_reachable(cwd, cached[0]):
+            return cached[1]
+
     result = _run_git(
         cwd, "log", "--diff-filter=A", "--format=%H", "--", rel_path
     )
@@ -400,16 +484,96 @@ def scenario_baseline_hash(cwd, rel_path):
         if line.strip()
     ]
     if not commits:
+        if cached is not None:
+            _update_baseline_cache(cwd, {}, drop=(rel_path,))
         return None
 
-    result = _run_git(cwd, "show", f"{commits[-1]}:{rel_path}")
+    digest = _baseline_at(cwd, commits[-1], rel_path, git)
+    if digest is not None:
+        _update_baseline_cache(
+            cwd, {rel_path: {"commit": commits[-1], "sha256": digest}})
+    return digest
+
+
+def _first_add_commits(cwd, rel_paths):
+    """{rel_path: oldest add commit} for rel_paths from one history walk.
+
+    --relative prints names relative to cwd, like rel_paths, when the
+    project is a subdirectory of the repository.
+    """
+    result = _run_git(
+        cwd, "-c", "core.quotePath=false", "log", "--diff-filter=A",
+        "--format=%x00%H", "--name-only", "--relative", "--", *rel_paths,
+    )
     if result is None or result.returncode != 0:
-        return None
-    return hashlib.sha256(_canon_scenario_bytes(result.stdout)).hexdigest()
+        return {}
+    wanted = set(rel_paths)
+    first_add = {}
+    commit = None
+    for line in result.stdout.decode("utf-8", errors="replace").splitlines():
+        if line.startswith("\0"):
+            commit = line[1:].strip()
+        elif commit and line in wanted:
+            first_add[line] = commit  # log is newest-first: keep the oldest
+    return first_add
+
+
+def prewarm_baseline_cache(cwd):
+    """Fill the baseline cache for every discovered scenario file.
+
+    Run detached at SessionStart so the first scenario edit of a session
+    does not pay for a history walk inside the PreToolUse timeout. Cached
+    entries are revalidated once per distinct commit; the rest share a
+    single `git log --diff-filter=A --name-only` walk, and their blobs
+    stream through one `git cat-file --batch` reader. Returns the number
+    of entries written.
+    """
+    root = Path(cwd).resolve()
+    rels = []
+    for path in scenario_files(cwd):
+        try:
+            rels.append(path.relative_to(root).as_posix())
+        except ValueError:
+            continue
+    if not rels:
+        return 0
+
+    cache = _read_baseline_cache(cwd)
+    known = {rel: _cache_entry(cache.get(rel)) for rel in rels}
+    reachable = {
+        commit: _commit_reachable(cwd, commit)
+        for commit in {e[0] for e in known.values() if e is not None}
+    }
+    entries = {
+        rel: {"commit": e[0], "sha256": e[1]}
+        for rel, e in known.items() if e is not None and reachable[e[0]]
+    }
+    missing = [rel for rel in rels if rel not in entries]
+    if missing:
+        from _sdd_git import GitObjectReader
+        with GitObjectReader(cwd, timeout=_GIT_SUBPROCESS_TIMEOUT) as git:
+            for rel, commit in _first_add_commits(cwd, missing).items():
+                digest = _baseline_at(cwd, commit, rel, git)
+                if digest is not None:
+                    entries[rel] = {"commit": commit, "sha256": digest}
+
+    stale = [rel for rel in cache if rel not in entries]
+    _update_baseline_cache(cwd, entries, drop=stale)
+    return len(entries)
+
 
+def current_head_sha(cwd, git=None):
+    """Current HEAD commit SHA as a hex string, or None on failure.
 
-def current_head_sha(cwd):
-    """Current HEAD commit SHA as a hex string, or None on failure."""
+    Read from .git in-process when possible; otherwise resolved through
+    `git` (an _sdd_git.GitObjectReader) when given, else `git rev-parse`.
+    """
+    from _sdd_git import UNKNOWN, head_sha
+    sha = head_sha(cwd)
+    if sha is not UNKNOWN:
+        return sha
+    if git is not None:
+        return git.resolve("HEAD")
     result = _run_git(cwd, "rev-parse", "HEAD")
     if result is None or result.returncode != 0:
         return None
@@ -468,7 +632,7 @@ def _expected_marker_hmac(cwd, scenario_rel, head_sha, gate_verdicts, judge_conf
     ).hexdigest()
 
 
-def check_amend_marker(cwd, rel_scenario_path, sid=None):
+def check_amend_marker(cwd, rel_scenario_path, sid=None, git=None):
     """Return True iff a four-gate-issued amend marker exists for this scenario.
 
     A valid marker (post-Fix-1 hardening):
@@ -500,6 +664,8 @@ def check_amend_marker(cwd, rel_scenario_path, sid=None):
 
     A new commit invalidates all prior markers (SHA mismatch). This
     enforces the "amend must be justified per-commit" invariant.
+
+    `git` is an optional _sdd_git.GitObjectReader used to resolve HEAD.
     """
     marker_dir = amend_marker_dir(cwd, rel_scenario_path)
     if marker_dir.is_symlink() or not marker_dir.is_dir():
@@ -512,7 +678,7 @@ def check_amend_marker(cwd, rel_scenario_path, sid=None):
     if not stem:
         return False
 
-    head_sha = current_head_sha(cwd)
+    head_sha = current_head_sha(cwd, git)
     if not head_sha:
         return False
 
@@ -0,0 +1,403 @@
+"""Duration-balanced parallel sharding for full-suite background runs (opt-in).
+
+    result = run_sharded(cwd, "pytest", timeout, pgid_file, should_abort)
+    # ShardedRun | None → run the command as one process
+
+With SHARDING on, the sdd-auto-test worker splits a Rung 3 full-suite
+run into N concurrent shards, each under run_in_process_group in its own
+process group, and merges them into one state:
+
+    pytest   `pytest [-opts]` with no positional arguments. Test files
+             are the ones `<command> --collect-only -q` lists, so
+             testpaths, python_files, norecursedirs and collect_ignore
+             all apply: pytest runs any file named on its command line,
+             excluded or not, so only files it collects itself may be
+             named. They are spread over the shards longest-first by
+             their recorded duration, each shard naming its files
+             (`<command> <file> ...`). No sharding when collection
+             fails or lists a path that is not relative to cwd.
+             Per-file durations come from each shard's JUnit XML.
+    go       `go test [-flags] ./...`. Packages from `go list ./...`,
+             balanced the same way; durations from the `ok`/`FAIL`
+             lines of the output.
+    jest     `npm test` (or pnpm/yarn) whose script is a single jest or
+    vitest   vitest call: the runner's own `--shard=i/N`, which balances
+             by file count. Only when the installed version has it
+             (jest 28+, vitest 0.29+).
+
+N = free cores (CPU count minus 1-minute load average), capped by
+SHARD_MAX and the number of units; below 2, no sharding.
+
+Any shard timing out kills the rest. should_abort() (a rerun was
+requested) is polled while shards run and kills them all; the run is
+then reported as aborted and no state should be written.
+
+Merging: exit code 0 only if every shard passed (pytest's 5, "no tests
+collected", counts as passed when another shard ran tests); summaries
+are summed per word ("12 passed, 1 failed"); each shard's stdout and
+stderr go out together, passing shards first, so failures land in the
+kept tail.
+"""
+import json
+import os
+import re
+import shlex
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from _sdd_config import SHARD_MAX, get_sharding_enabled
+from _sdd_state import (
+    _kill_pgid, _store, _tmp, _write_json_atomic, project_hash,
+    run_in_process_group,
+)
+
+ShardedRun = namedtuple(
+    "ShardedRun", "returncode stdout stderr timed_out summary aborted shards")
+
+# Shell commands longer than this risk MAX_ARG_STRLEN (`sh -c` gets the
+# whole command as one argument).
+_MAX_COMMAND_LEN = 100_000
+
+# Recorded durations follow each measurement half way.
+_EWMA_ALPHA = 0.5
+
+_DEFAULT_SECONDS = 1.0
+
+_COLLECT_TIMEOUT = 60
+# `--collect-only -q` lists node ids, `-qq` one "file: count" per file.
+_COLLECTED_RE = re.compile(r"^(.+?\.py)(?:::|: \d+$)", re.MULTILINE)
+
+_GO_RESULT_RE = re.compile(r"^(?:ok|FAIL)\s+(\S+)\s+([\d.]+)s", re.MULTILINE)
+_COUNT_RE = re.compile(r"(\d+)\s+([a-z]+)")
+# pytest's closing line: "==== 1 failed, 2 passed, 1 warning in 0.34s ====".
+_PYTEST_FINAL_RE = re.compile(r"^=+ (.*\d+ \w+.*?) in [\d.]+s.*=+$", re.MULTILINE)
+
+
+# ─────────────────────────────────────────────────────────────────
+# DURATIONS
+# ─────────────────────────────────────────────────────────────────
+
+def _durations_path(cwd):
+    return _tmp(f"sdd-durations-{project_hash(str(cwd))}.json")
+
+
+def read_durations(cwd):
+    """{unit key: seconds}, e.g. {"pytest:tests/test_a.py": 1.2}."""
+    store = _store(cwd)
+    if store is not None:
+        data = store.get(cwd, "test-durations") or {}
+    else:
+        try:
+            data = json.loads(_durations_path(cwd).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+    units = data.get("units") if isinstance(data, dict) else None
+    return units if isinstance(units, dict) else {}
+
+
+def record_durations(cwd, measured):
+    """Blend {unit key: seconds} into the recorded durations."""
+    if not measured:
+        return
+    def _blend(data):
+        units = data.setdefault("units", {})
+        for key, seconds in measured.items():
+            old = units.get(key)
+            units[key] = round(seconds if old is None
+                               else old + _EWMA_ALPHA * (seconds - old), 4)
+        return data
+    store = _store(cwd)
+    if store is not None:
+        store.update(cwd, "test-durations", "", _blend)
+        return
+    try:
+        data = json.loads(_durations_path(cwd).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    _write_json_atomic(_durations_path(cwd), _blend(data if isinstance(data, dict) else {}),
+                       prefix="sdd-durations-")
+
+
+def _junit_file_durations(path):
+    """{file: seconds} from a JUnit XML written with junit_family=xunit1."""
+    import xml.etree.ElementTree as ET
+    out = {}
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return out
+    for case in root.iter("testcase"):
+        name = case.get("file")
+        if not name:
+            continue
+        try:
+            out[name] = out.get(name, 0.0) + float(case.get("time") or 0)
+        except ValueError:
+            pass
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────
+# PLANNING
+# ─────────────────────────────────────────────────────────────────
+
+def shard_count(units):
+    """Concurrent shards for this many units on this host right now."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        load = 0.0
+    return max(1, min(SHARD_MAX, int(cpus - load), units))
+
+
+def balance(units, durations, n):
+    """Longest-processing-time-first: n lists of units with even totals."""
+    known = [durations[u] for u in units if u in durations]
+    default = sum(known) / len(known) if known else _DEFAULT_SECONDS
+    shards = [[] for _ in range(n)]
+    totals = [0.0] * n
+    for unit in sorted(units, key=lambda u: (-durations.get(u, default), u)):
+        i = totals.index(min(totals))
+        shards[i].append(unit)
+        totals[i] += durations.get(unit, default)
+    return shards
+
+
+def _words(command):
+    from _sdd_shell import lex
+    stmts = lex(command)
+    if len(stmts) != 1 or stmts[0].redirects:
+        return None
+    return stmts[0].words
+
+
+def _pytest_files(cwd, command):
+    """Files pytest collects for command, or None when that is unknown."""
+    import subprocess
+    try:
+        proc = subprocess.run(
+            command + " --collect-only -q", shell=True, cwd=cwd,
+            capture_output=True, text=True, timeout=_COLLECT_TIMEOUT,
+            env=dict(os.environ, _SDD_RECURSION_GUARD="1"))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if proc.returncode not in (0, 5):  # 5: no tests collected
+        return None
+    files = []
+    for match in _COLLECTED_RE.finditer(proc.stdout):
+        rel = match.group(1)
+        if not (Path(cwd) / rel).is_file():
+            return None  # rootdir above cwd: ids are not cwd-relative
+        if rel not in files:
+            files.append(rel)
+    return sorted(files)
+
+
+def _go_packages(cwd):
+    import subprocess
+    try:
+        proc = subprocess.run(["go", "list", "./..."], cwd=cwd, capture_output=True,
+                              text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return proc.stdout.split() if proc.returncode == 0 else []
+
+
+def _js_shard_supported(cwd, runner):
+    try:
+        version = json.loads((Path(cwd) / "node_modules" / runner / "package.json")
+                             .read_text(encoding="utf-8"))["version"]
+        major, minor = (int(x) for x in version.split(".")[:2])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return (major, minor) >= ((28, 0) if runner == "jest" else (0, 29))
+
+
+def _js_runner(cwd, words):
+    """"jest" / "vitest" when `npm test` runs exactly one of them."""
+    if words not in (["npm", "test"], ["pnpm", "test"], ["yarn", "test"],
+                     ["npm", "run", "test"], ["pnpm", "run", "test"],
+                     ["yarn", "run", "test"]):
+        return None
+    try:
+        script = json.loads((Path(cwd) / "package.json").read_text(
+            encoding="utf-8"))["scripts"]["test"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    script_words = _words(script) if isinstance(script, str) else None
+    if not script_words or script_words[0] not in ("jest", "vitest"):
+        return None
+    return script_words[0] if _js_shard_supported(cwd, script_words[0]) else None
+
+
+def plan(cwd, command):
+    """(framework, [(shard command, [unit keys])]) or None."""
+    words = _words(command)
+    if not words:
+        return None
+    durations = read_durations(cwd)
+
+    pytest_words = words[1:] if words[0] == "pytest" else (
+        words[3:] if len(words) >= 3 and Path(words[0]).name.startswith("python")
+        and words[1:3] == ["-m", "pytest"] else None)
+    if pytest_words is not None:
+        if any(not w.startswith("-") for w in pytest_words) \
+                or any(w.startswith("--junitxml") for w in pytest_words):
+            return None
+        if shard_count(SHARD_MAX) < 2:
+            return None  # not worth a collection pass
+        files = _pytest_files(cwd, command) or []
+        n = shard_count(len(files))
+        if n < 2:
+            return None
+        groups = balance([f"pytest:{f}" for f in files], durations, n)
+        return "pytest", [
+            (command + "".join(f" {shlex.quote(k[len('pytest:'):])}" for k in group), group)
+            for group in groups]
+
+    if words[:2] == ["go", "test"] and words[-1] == "./..." \
+            and all(w.startswith("-") for w in words[2:-1]):
+        pkgs = _go_packages(cwd)
+        n = shard_count(len(pkgs))
+        if n < 2:
+            return None
+        prefix = " ".join(shlex.quote(w) for w in words[:-1])
+        groups = balance([f"go:{p}" for p in pkgs], durations, n)
+        return "go", [(f"{prefix} " + " ".join(shlex.quote(k[3:]) for k in group), group)
+                      for group in groups]
+
+    runner = _js_runner(cwd, words)
+    if runner:
+        n = shard_count(SHARD_MAX)
+        if n < 2:
+            return None
+        return runner, [(f"{command} -- --shard={i}/{n}", []) for i in range(1, n + 1)]
+    return None
+
+
+# ─────────────────────────────────────────────────────────────────
+# RUNNING
+# ─────────────────────────────────────────────────────────────────
+
+def merge_summaries(summaries):
+    """Sum "N word" counts across shard summaries, first-seen word order."""
+    totals = {}
+    jest_style = False
+    for summary in summaries:
+        jest_style = jest_style or summary.startswith("Tests:")
+        for count, word in _COUNT_RE.findall(summary):
+            totals[word] = totals.get(word, 0) + int(count)
+    if not totals:
+        return None
+    text = ", ".join(f"{n} {w}" for w, n in totals.items())
+    return f"Tests: {text}" if jest_style else text
+
+
+def run_sharded(cwd, command, timeout, pgid_file, should_abort=None,
+                on_progress=None, usage=None):
+    """Run command as parallel shards. None when it does not shard.
+
+    pgid_file is suffixed with .<i> per shard, so kill_orphan_test_group
+    can find them all. on_progress(done, total) gets the shards' live
+    counts summed; total stays None until every shard has one. usage, if
+    given, is filled with the shards' resource usage added up
+    (_sdd_rusage.combine).
+    """
+    if not get_sharding_enabled(cwd):
+        return None
+    planned = plan(cwd, command)
+    if planned is None:
+        return None
+    framework, shards = planned
+    if any(len(cmd) > _MAX_COMMAND_LEN for cmd, _ in shards):
+        return None
+
+    junit = []
+    commands = []
+    for i, (cmd, _) in enumerate(shards):
+        if framework == "pytest":
+            junit.append(_tmp(f"sdd-shard-{project_hash(str(cwd))}-{i}.xml"))
+            cmd += f" -o junit_family=xunit1 --junitxml={junit[i]}"
+        commands.append(cmd)
+    pgid_files = [f"{pgid_file}.{i}" for i in range(len(commands))]
+    results = [None] * len(commands)
+    usages = [{} for _ in commands]
+    progress = [(0, None)] * len(commands)
+    progress_lock = threading.Lock()
+
+    def _progress(i, done, total):
+        with progress_lock:
+            progress[i] = (done, total)
+            totals = [t for _, t in progress]
+            on_progress(sum(d for d, _ in progress),
+                        None if None in totals else sum(totals))
+
+    def _run(i):
+        results[i] = run_in_process_group(
+            commands[i], cwd, timeout, pgid_file=pgid_files[i],
+            on_progress=(lambda d, t: _progress(i, d, t)) if on_progress else None,
+            usage=usages[i])
+
+    threads = [threading.Thread(target=_run, args=(i,), daemon=True)
+               for i in range(len(commands))]
+    for t in threads:
+        t.start()
+
+    def _kill_all():
+        for path in pgid_files:
+            try:
+                _kill_pgid(int(Path(path).read_text().strip()))
+            except (OSError, ValueError):
+                pass
+
+    aborted = timed_out = False
+    while any(t.is_alive() for t in threads):
+        for t in threads:
+            t.join(0.2)
+        if not timed_out and any(r is not None and r[3] for r in results):
+            timed_out = True
+            _kill_all()
+        if not aborted and not timed_out and should_abort and should_abort():
+            aborted = True
+            _kill_all()
+    for path in pgid_files:
+        Path(path).unlink(missing_ok=True)
+    if usage is not None:
+        from _sdd_rusage import combine
+        usage.update(combine(usages))
+
+    measured = {}
+    if not aborted and not timed_out:
+        for i in range(len(shards)):
+            if framework == "pytest":
+                for f, seconds in _junit_file_durations(junit[i]).items():
+                    measured[f"pytest:{f}"] = seconds
+            elif framework == "go":
+                for pkg, seconds in _GO_RESULT_RE.findall(results[i][1]):
+                    measured[f"go:{pkg}"] = float(seconds)
+        record_durations(cwd, measured)
+    for path in junit:
+        path.unlink(missing_ok=True)
+    if aborted or timed_out:
+        return ShardedRun(-1, "", "", timed_out, None, aborted, len(commands))
+
+    from _sdd_detect import parse_test_summary
+    codes = [r[0] for r in results]
+    ran = [c for c in codes if c != 5] if framework == "pytest" else codes
+    failed = [c for c in ran if c != 0]
+    rc = failed[0] if failed else (0 if ran else 5)
+    order = sorted(range(len(results)), key=lambda i: results[i][0] != 0)
+    stdout = "".join(f"── shard {i + 1}/{len(results)} ──\n{results[i][1]}{results[i][2]}"
+                     for i in order)
+    summaries = []
+    for rc_i, out, err, _ in results:
+        final = _PYTEST_FINAL_RE.findall(out) if framework == "pytest" else []
+        summaries.append(final[-1] if final
+                         else parse_test_summary((out + err).strip(), rc_i))
+    summary = merge_summaries(summaries) or parse_test_summary("", rc)
+    return ShardedRun(rc, stdout, "", False, summary, False, len(commands))
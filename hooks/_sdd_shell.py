@@ -0,0 +1,364 @@
+"""Single-pass shell lexer for Bash command classification.
+
+    for stmt in lex(command):
+        stmt.text       # statement source: quotes kept, comments and
+                        # heredoc bodies dropped
+        stmt.words      # word values with quoting removed
+        stmt.redirects  # [(op, target), ...] e.g. (">>", "out.txt")
+
+lex() walks the command once, left to right, and splits it into simple
+statements on `&&`, `||`, `|`, `|&`, `;`, `;;`, `&`, `(`, `)` and
+newlines. Quoting decides what is a separator: `;` inside "..." is data.
+`2>&1`, `&>` and `>&2` are redirections, not separators. A heredoc
+(`<<TAG`, `<<-TAG`, `<<'TAG'`) records its tag and skips the body after
+the line ends, up to the closing tag line, so the body never reaches a
+predicate. An unterminated heredoc runs to the end, as in bash. `#`
+starts a comment only at the start of a word. `$(...)` and backtick
+substitutions are lexed recursively: their statements are listed too,
+and their source stays in the enclosing statement's text.
+
+Out of scope: aliases, functions, `case` patterns (`a)` closes a
+subshell here), arithmetic `$((...))` contents, and `eval` / `sh -c`
+strings, which stay single quoted words.
+
+summarize() derives the facts sdd-test-guard needs — does the command
+run `git commit`, and which scenario-path tokens does it write — and
+memoizes them: in-process, and for commands of SHELL_CACHE_MIN_BYTES or
+more in a small LRU file (sdd-shell-cache.json in the tmpdir) keyed by
+the command's hash, since agents re-issue identical multi-KB heredoc
+scripts.
+"""
+import functools
+import hashlib
+import json
+import re
+from collections import namedtuple
+
+Statement = namedtuple("Statement", "text words redirects")
+
+# Bumped when lexing or the derived facts change, so cached entries from
+# an older hook version are ignored.
+_CACHE_VERSION = "1"
+
+# Token at a statement position. Order matters: a redirection (`2>`,
+# `&>`) wins over the separator or word it starts with. `plain` is the
+# fast path for a word with no quoting or expansion; anything else is
+# parsed part by part in _Lexer._word.
+_TOKEN_RE = re.compile(
+    r"(?P<ws>(?:[ \t\r\f\v]|\\\n)+)"
+    r"|(?P<nl>\n)"
+    r"|(?P<comment>#[^\n]*)"
+    r"|(?P<redir>\d*(?:<<<|<<-|<<|&>>|&>|>>|>\||>&|<&|<>|>|<))"
+    r"|(?P<sep>&&|\|\||;;&?|;&|\|&|[;|&()])"
+    r"|(?P<plain>[^\s'\"\\`$;&|()<>#][^\s'\"\\`$;&|()<>]*(?![^\s;&|()<>]))"
+)
+
+# One piece of a word. Unquoted runs stop at whitespace, quotes,
+# operators and the starts of expansions.
+_WORD_PART_RE = re.compile(
+    r"(?P<plain>[^\s'\"\\`$;&|()<>]+)"
+    r"|(?P<sq>'[^']*'?)"
+    r"|(?P<ansi>\$'(?:\\.|[^'\\])*'?)"
+    r"|(?P<dq>\")"
+    r"|(?P<sub>\$\()"
+    r"|(?P<bt>`(?:\\.|[^`\\])*`?)"
+    r"|(?P<esc>\\[\s\S]?)"
+    r"|(?P<dollar>\$)"
+)
+
+# Inside "...": literal runs, escapes, and the expansions that still run.
+_DQ_PART_RE = re.compile(
+    r"(?P<plain>[^\"\\`$]+)"
+    r"|(?P<esc>\\[\s\S]?)"
+    r"|(?P<sub>\$\()"
+    r"|(?P<bt>`(?:\\.|[^`\\])*`?)"
+    r"|(?P<dollar>\$)"
+    r"|(?P<end>\")"
+)
+
+
+class _Lexer:
+    """Lexer state over one command string (see lex)."""
+
+    def __init__(self, command):
+        self.src = command
+        self.statements = []
+
+    def run(self, pos, nested=False):
+        """Lex statements from pos. Returns the end position.
+
+        nested: inside `$(`; stop after the `)` that closes it.
+        """
+        src = self.src
+        end = len(src)
+        depth = 0
+        start = pos
+        words, redirects = [], []
+        text_end = None  # comment start, when the statement has one
+        heredocs = []    # tags of heredocs waiting for the end of the line
+        pending = None   # redirect op waiting for its target word
+
+        def flush(stop):
+            text = src[start:stop if text_end is None else text_end].strip()
+            if words or redirects or text:
+                self.statements.append(Statement(text, words, redirects))
+
+        while pos < end:
+            m = _TOKEN_RE.match(src, pos)
+            if m is None or m.lastgroup == "plain":
+                if m is None:
+                    value, pos = self._word(pos)
+                else:
+                    value, pos = m.group(), m.end()
+                if pending is None:
+                    words.append(value)
+                elif pending.lstrip("0123456789") in ("<<", "<<-"):
+                    heredocs.append(value)
+                    pending = None
+                else:
+                    redirects.append((pending, value))
+                    pending = None
+                continue
+            kind = m.lastgroup
+            if kind == "ws":
+                pos = m.end()
+            elif kind == "comment":
+                if text_end is None:
+                    text_end = pos
+                pos = m.end()
+            elif kind == "redir":
+                pending = m.group()
+                pos = m.end()
+            elif kind == "nl":
+                flush(pos)
+                pos = self._skip_heredocs(m.end(), heredocs)
+                heredocs = []
+                start, words, redirects, text_end, pending = pos, [], [], None, None
+            else:
+                op = m.group()
+                if nested and op == ")" and depth == 0:
+                    flush(pos)
+                    return m.end()
+                if op == "(":
+                    depth += 1
+                elif op == ")":
+                    depth -= 1
+                flush(pos)
+                pos = m.end()
+                start, words, redirects, text_end, pending = pos, [], [], None, None
+        flush(end)
+        return end
+
+    def _skip_heredocs(self, pos, tags):
+        """Position just past the bodies of heredocs opened on the last line.
+
+        The closing line is the bare tag; leading and trailing blanks are
+        allowed for `<<` as well as `<<-`.
+        """
+        for tag in tags:
+            m = re.compile(r"^[ \t]*" + re.escape(tag) + r"[ \t]*$",
+                           re.MULTILINE).search(self.src, pos)
+            if m is None:
+                return len(self.src)
+            pos = m.end() + 1
+        return pos
+
+    def _word(self, pos):
+        """Parse one word at pos. Returns (value, end)."""
+        src = self.src
+        parts = []
+        while True:
+            m = _WORD_PART_RE.match(src, pos)
+            if m is None:
+                break
+            kind = m.lastgroup
+            if kind == "plain" or kind == "dollar":
+                parts.append(m.group())
+                pos = m.end()
+            elif kind == "sq":
+                parts.append(m.group()[1:].rstrip("'"))
+                pos = m.end()
+            elif kind == "ansi":
+                parts.append(m.group()[2:].rstrip("'"))
+                pos = m.end()
+            elif kind == "esc":
+                parts.append(m.group()[1:].replace("\n", ""))
+                pos = m.end()
+            elif kind == "dq":
+                value, pos = self._double_quoted(m.end())
+                parts.append(value)
+            elif kind == "sub":
+                pos = self.run(m.end(), nested=True)
+                parts.append(src[m.start():pos])
+            else:  # bt
+                self._backtick(m.group())
+                parts.append(m.group())
+                pos = m.end()
+        if not parts:
+            # A character no token or word part accepts (e.g. non-ASCII
+            # whitespace): take it as a one-character word.
+            return src[pos], pos + 1
+        return "".join(parts), pos
+
+    def _double_quoted(self, pos):
+        """Parse the inside of "..." from pos. Returns (value, end)."""
+        src = self.src
+        parts = []
+        while pos < len(src):
+            m = _DQ_PART_RE.match(src, pos)
+            kind = m.lastgroup
+            if kind == "end":
+                return "".join(parts), m.end()
+            if kind == "esc":
+                parts.append(m.group()[1:])
+                pos = m.end()
+            elif kind == "sub":
+                pos = self.run(m.end(), nested=True)
+                parts.append(src[m.start():pos])
+            else:
+                if kind == "bt":
+                    self._backtick(m.group())
+                parts.append(m.group())
+                pos = m.end()
+        return "".join(parts), pos
+
+    def _backtick(self, token):
+        inner = token[1:-1] if token.endswith("`") and len(token) > 1 else token[1:]
+        self.statements.extend(lex(re.sub(r"\\([`$\\])", r"\1", inner)))
+
+
+def lex(command):
+    """Split command into a list of Statement (see module docstring)."""
+    if not command:
+        return []
+    lexer = _Lexer(command)
+    lexer.run(0)
+    return lexer.statements
+
+
+# ─────────────────────────────────────────────────────────────────
+# GUARD FACTS
+# ─────────────────────────────────────────────────────────────────
+
+# Scenario write verbs, matched against a statement's text.
+#
+# False-positive note (P1, fix/bash-scenarios-regex-false-positive):
+# The verb-prefixed alternatives below originally used `>` directly,
+# which greedily matched the `>` inside `2>&1`, `>&2`, and `&>`. That
+# misclassified read-only pipelines like
+#   `echo "src diffs" ; diff -r a b 2>&1 | grep -v "...docs/specs"`
+# as scenario writes. The redirect token is now narrowed to a *file*
+# redirect — not preceded by a digit (rules out `2>`, `1>`) and not
+# followed by `&` (rules out `>&2`). Numeric-fd redirects that DO
+# write to a scenario file (`echo x 1> path.scenarios.md`) are still
+# caught through the statement's redirect targets (see _write_paths).
+SCENARIO_WRITE_RE = re.compile(
+    r"(?:"
+    r"sed\s+-i"                       # in-place sed (handles -ibackup too)
+    r"|cat\s+[^|]*(?<!\d)>(?!\s*&)"   # cat > or cat << > (heredoc) — file redirect only
+    r"|\btee\b"                       # tee (with or without -a)
+    r"|\bcp\b"                        # copy into scenarios
+    r"|\bmv\b"                        # move into scenarios
+    r"|\brm\b"                        # delete scenario file
+    r"|\bln\b"                        # hardlink/symlink into scenarios
+    r"|echo\s+[^|]*(?<!\d)>(?!\s*&)"  # echo > / >> — not 2>&1, not >&2
+    r"|printf\s+[^|]*(?<!\d)>(?!\s*&)"  # printf > — not 2>&1, not >&2
+    r"|dd\s+[^|]*of="                 # dd of=
+    r")"
+)
+
+SCENARIO_PATH_TOKEN_RE = re.compile(
+    # Path-shaped token (no whitespace, no shell metachars, no quotes)
+    # that EITHER ends in `.scenarios.md` OR contains a `/scenarios/`
+    # directory segment. Anchored on a non-path boundary so substrings
+    # of larger words don't match.
+    r"(?<![\w./-])"
+    r"([\w.-]+(?:/[\w.-]+)*"
+    r"(?:/scenarios/[\w.-]+\.scenarios\.md|/scenarios/?|\.scenarios\.md))"
+    r"(?![\w./-])"
+)
+
+
+def _is_git_commit(words):
+    """`git commit` as adjacent words (`git commit-wrapper` does not count)."""
+    for i in range(len(words) - 1):
+        word = words[i]
+        if (word == "git" or word.endswith("/git")) and words[i + 1] == "commit":
+            return True
+    return False
+
+
+def _write_paths(stmt):
+    """Scenario-path tokens this statement may write."""
+    paths = []
+    if SCENARIO_WRITE_RE.search(stmt.text):
+        paths.extend(m.group(1) for m in SCENARIO_PATH_TOKEN_RE.finditer(stmt.text))
+    for op, target in stmt.redirects:
+        if ">" not in op or (op.endswith("&") and (target.isdigit() or target == "-")):
+            continue
+        paths.extend(m.group(1) for m in SCENARIO_PATH_TOKEN_RE.finditer(target))
+    return paths
+
+
+def _facts(command):
+    statements = lex(command)
+    git_commit = any(_is_git_commit(stmt.words) for stmt in statements)
+    paths = []
+    for stmt in statements:
+        for path in _write_paths(stmt):
+            if path not in paths:
+                paths.append(path)
+    return git_commit, tuple(paths)
+
+
+def _cache_path():
+    from _sdd_state import _tmp
+    return _tmp("sdd-shell-cache.json")
+
+
+def _read_cache():
+    try:
+        data = json.loads(_cache_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _cached_facts(command):
+    from _sdd_config import SHELL_CACHE_ENTRIES
+    from _sdd_state import _write_json_atomic
+    key = hashlib.sha256(
+        (_CACHE_VERSION + "\0" + command).encode("utf-8", "surrogatepass")
+    ).hexdigest()
+    cache = _read_cache()
+    hit = cache.get(key)
+    if (isinstance(hit, list) and len(hit) == 2
+            and isinstance(hit[0], bool) and isinstance(hit[1], list)):
+        if next(reversed(cache)) != key:
+            cache[key] = cache.pop(key)
+            _write_json_atomic(_cache_path(), cache, prefix="sdd-shell-")
+        return hit[0], tuple(hit[1])
+    facts = _facts(command)
+    cache.pop(key, None)
+    cache[key] = [facts[0], list(facts[1])]
+    while len(cache) > SHELL_CACHE_ENTRIES:
+        cache.pop(next(iter(cache)))
+    _write_json_atomic(_cache_path(), cache, prefix="sdd-shell-")
+    return facts
+
+
+@functools.lru_cache(maxsize=8)
+def summarize(command):
+    """(runs_git_commit, scenario_write_paths) for a Bash command.
+
+    scenario_write_paths are path-shaped tokens (see
+    SCENARIO_PATH_TOKEN_RE) from statements with a write verb, or
+    redirect targets; the caller decides which sit under a discovery
+    root. Long commands are served from the on-disk LRU.
+    """
+    if not command:
+        return False, ()
+    from _sdd_config import SHELL_CACHE_MIN_BYTES
+    if len(command) < SHELL_CACHE_MIN_BYTES:
+        return _facts(command)
+    return _cached_facts(command)
@@ -0,0 +1,215 @@
+"""Machine-wide slots for background test runs.
+
+    slot, waited, depth = acquire(cwd, rung)   # slot fd | None
+    if depth is None:
+        return          # another worker of this project is already queued
+    try:
+        ... run tests ...
+    finally:
+        release(slot)
+
+The runner lock is per project, so eight teammate worktrees (eight cwds,
+eight project hashes) could each start a full suite at once. With
+HOST_SCHEDULER on (opt-in), every sdd-auto-test worker of the user takes
+one of a fixed number of slots first, whatever its project, and only then
+the runner lock, so a TaskCompleted gate never waits on the queue:
+
+    slots    CPU count // HOST_CORES_PER_RUN, at least 1. A slot is an
+             flock on `sdd-slots-{uid}/slot-{i}.lock` in the temp
+             directory, so a crashed worker frees its slot.
+    queue    waiters drop a ticket `q-{priority}-{time_ns}-{pid}` next to
+             the slots and take a free slot only when no live ticket is
+             ahead of theirs: Rung 1a/1b first, then Rung 2, then full
+             suites (Rung 3), oldest first within a priority. Tickets of
+             dead processes are removed by whoever sees them. One
+             worker per project queues (flock on `p-{hash}.lock`); a
+             second one returns depth None at once and exits, leaving
+             the queued one to pick up the rerun marker.
+    reserve  with more than one slot, the last one is kept for Rung 1
+             runs, so a queue of full suites never blocks the run that
+             answers an edit.
+    load     while another slot is busy, a run also waits for the 1-min
+             load average to drop below HOST_MAX_LOAD per core.
+
+After HOST_SLOT_MAX_WAIT (no longer than TaskCompleted waits on a
+worker) in the queue the run goes ahead without a slot rather than never
+testing the edit. acquire() reports how long it waited
+and the queue depth it saw, for test_run_start telemetry.
+
+deprioritize(cwd) runs once in the background worker process: nice
+HOST_NICE and, on Linux with util-linux, ionice best-effort level 7. The
+test process groups inherit both; TaskCompleted gates, which an agent is
+blocked on, keep normal priority.
+
+POSIX only (fcntl); elsewhere acquire() returns no slot at once.
+"""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from _sdd_config import (
+    HOST_CORES_PER_RUN,
+    HOST_MAX_LOAD,
+    HOST_NICE,
+    HOST_SLOT_MAX_WAIT,
+    get_host_scheduler_enabled,
+)
+from _sdd_state import _tmp, project_hash
+
+_POLL_SECONDS = 0.2
+
+
+def _slots_dir():
+    return _tmp(f"sdd-slots-{os.getuid()}")
+
+
+def capacity():
+    """Number of slots on this host."""
+    return max(1, (os.cpu_count() or 1) // HOST_CORES_PER_RUN)
+
+
+def priority(rung):
+    """0 for Rung 1a/1b, 1 for Rung 2, 2 for everything else."""
+    if rung in ("1a", "1b"):
+        return 0
+    return 1 if rung == "2" else 2
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _tickets(directory):
+    """Sorted (priority, time_ns, name) of live tickets; dead ones removed."""
+    live = []
+    for name in os.listdir(directory):
+        parts = name.split("-")
+        if len(parts) != 4 or parts[0] != "q":
+            continue
+        try:
+            prio, stamp, pid = int(parts[1]), int(parts[2]), int(parts[3])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not _alive(pid):
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+            continue
+        live.append((prio, stamp, name))
+    return sorted(live)
+
+
+def _try_slot(directory, limit):
+    """(fd of a slot locked among the first limit, slots found busy)."""
+    busy = 0
+    for i in range(capacity()):
+        fd = os.open(os.path.join(directory, f"slot-{i}.lock"), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            busy += 1
+            continue
+        if i < limit:
+            return fd, busy
+        os.close(fd)
+    return None, busy
+
+
+def _overloaded():
+    try:
+        return os.getloadavg()[0] >= (os.cpu_count() or 1) * HOST_MAX_LOAD
+    except OSError:
+        return False
+
+
+def acquire(cwd, rung, max_wait=HOST_SLOT_MAX_WAIT):
+    """(slot fd or None, seconds waited, queue depth seen on arrival).
+
+    Depth is None when another worker of the same project is queued.
+    """
+    if fcntl is None or not get_host_scheduler_enabled(cwd):
+        return None, 0.0, 0
+    directory = _slots_dir()
+    try:
+        directory.mkdir(exist_ok=True)
+        queued = os.open(directory / f"p-{project_hash(str(cwd))}.lock",
+                         os.O_CREAT | os.O_RDWR, 0o644)
+    except OSError:
+        return None, 0.0, 0
+    try:
+        fcntl.flock(queued, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(queued)
+        return None, 0.0, None
+    me = (priority(rung), time.time_ns())
+    ticket = f"q-{me[0]}-{me[1]}-{os.getpid()}"
+    started = time.monotonic()
+    try:
+        (directory / ticket).touch()
+        depth = None
+        while True:
+            tickets = _tickets(directory)
+            if depth is None:
+                depth = len(tickets)
+            if not any(t[:2] < me for t in tickets):
+                slots = capacity()
+                limit = slots if me[0] == 0 or slots == 1 else slots - 1
+                fd, busy = _try_slot(directory, limit)
+                if fd is not None and busy and _overloaded():
+                    os.close(fd)
+                    fd = None
+                if fd is not None:
+                    return fd, round(time.monotonic() - started, 2), depth
+            if time.monotonic() - started >= max_wait:
+                return None, round(time.monotonic() - started, 2), depth
+            time.sleep(_POLL_SECONDS)
+    except OSError:
+        return None, round(time.monotonic() - started, 2), 0
+    finally:
+        try:
+            (directory / ticket).unlink()
+        except OSError:
+            pass
+        os.close(queued)
+
+
+def release(slot):
+    """Give a slot back (None is a no-op)."""
+    if slot is not None:
+        try:
+            os.close(slot)
+        except OSError:
+            pass
+
+
+def deprioritize(cwd):
+    """nice + ionice the current (background worker) process, best effort."""
+    if not get_host_scheduler_enabled(cwd):
+        return
+    try:
+        os.nice(HOST_NICE)
+    except (AttributeError, OSError):
+        pass
+    import shutil
+    import subprocess
+    ionice = shutil.which("ionice")
+    if ionice is None:
+        return
+    try:
+        subprocess.run([ionice, "-c", "2", "-n", "7", "-p", str(os.getpid())],
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        pass
@@ -19,6 +19,8 @@ import tempfile
 import time
 from pathlib import Path
 
+from _sdd_trace import span
+
 METRICS_FILE = ".claude/metrics.jsonl"
 METRICS_MAX_SIZE = 10 * 1024 * 1024  # 10 MiB
 METRICS_MAX_ROTATIONS = 3
@@ -77,13 +79,28 @@ def _read_json_with_ttl(path, max_age_seconds, use_flock=False):
     except (FileNotFoundError, json.JSONDecodeError, OSError):
         return None
 
+    return data if _is_fresh(data, max_age_seconds) else None
+
+
+def _is_fresh(data, max_age_seconds):
+    """TTL check on a record's "timestamp" key. Negative max age = no TTL."""
     ts = data.get("timestamp")
     if ts and max_age_seconds >= 0:
         written = _parse_utc_timestamp(ts)
         if written is not None and time.time() - written > max_age_seconds:
-            return None
+            return False
+    return True
+
+
+def _store(cwd):
+    """_sdd_store module when cwd uses the SQLite backend, else None.
 
-    return data
+    Imported lazily: the files backend (default) never loads sqlite3.
+    """
+    if not cwd:
+        return None
+    import _sdd_store
+    return _sdd_store if _sdd_store.enabled(cwd) else None
 
 
 def _write_json_atomic(path, data, prefix="sdd-"):
@@ -141,7 +158,8 @@ def _kill_pgid(pgid):
             subprocess.TimeoutExpired):
         pass
 
-def run_in_process_group(command, cwd, timeout, env=None, pgid_file=None):
+def run_in_process_group(command, cwd, timeout, env=None, pgid_file=None,
+                         on_progress=None, usage=None):
     """Run command with process group isolation for clean timeout killing.
 
     Uses start_new_session to create a new process group. On timeout,
@@ -162,46 +180,82 @@ def run_in_process_group(command, cwd, timeout, env=None, pgid_file=None):
         regression — the current call sites at task-completed.py and
         sdd-auto-test.py pass only config-resolved strings.
 
+    Output is streamed through _sdd_stream.StreamCapture: each stream
+    keeps its head and tail (CAPTURE_HEAD_BYTES / CAPTURE_TAIL_BYTES) and
+    the middle of a longer output is elided, so memory stays flat however
+    much a suite prints. on_progress(done, total), if given, receives live
+    test counts parsed from the output.
+
+    The shell is reaped with os.wait4 (_sdd_rusage): a usage dict, if
+    given, is filled with the group's CPU time, peak RSS and block I/O,
+    timed-out runs included. RLIMIT_AS_MB / RLIMIT_CPU_SECONDS from the
+    project config, when set, cap every process of the group through a
+    `ulimit` line run by the shell before the command.
+
     Returns:
         (returncode: int, stdout: str, stderr: str, timed_out: bool)
     """
     if env is None:
         env = dict(os.environ, _SDD_RECURSION_GUARD="1")
+    from _sdd_rusage import limit_prefix, wait
+    from _sdd_stream import StreamCapture
     proc = subprocess.Popen(
-        command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-        text=True, cwd=cwd, env=env, start_new_session=True,
+        limit_prefix(cwd) + command, shell=True,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=cwd, env=env, start_new_session=True,
     )
     if pgid_file:
         try:
             Path(pgid_file).write_text(str(proc.pid))
         except OSError:
             pass
+    capture = StreamCapture(proc, on_progress)
     try:
-        stdout, stderr = proc.communicate(timeout=timeout)
+        with span("process_group"):
+            measured = wait(proc, timeout)
+            stdout, stderr = capture.close()
         if pgid_file:
             try:
                 Path(pgid_file).unlink(missing_ok=True)
             except OSError:
                 pass
+        if usage is not None and measured:
+            usage.update(measured)
         return proc.returncode, stdout, stderr, False
     except subprocess.TimeoutExpired:
         _kill_process_tree(proc)
-        proc.wait()
+        measured = wait(proc)
+        capture.close()
+        if usage is not None and measured:
+            usage.update(measured)
         return -1, "", "", True
 
 
 def adaptive_gate_timeout(cwd, default=120, multiplier=3,
-                          min_timeout=30, max_timeout=300):
+                          min_timeout=30, max_timeout=300,
+                          command=None, rung=None):
     """Compute gate timeout from historical test duration.
 
-    Strategy: multiplier × last known duration, clamped to [min, max].
+    Strategy: multiplier × expected duration, clamped to [min, max].
     Automatically adapts to project size — small suites get tight
     timeouts, large suites get proportionally more time.
 
+    With command and rung, the expected duration is the larger of the
+    EWMA and the p95 of that command's history, or its rung's
+    (_sdd_history), so a quick scoped run does not shrink the next full
+    suite's timeout. Without history, or without command and rung: the
+    last known duration from the state.
+
     First run (no history): uses default (120s — aligned with background
     worker to prevent cold-start timeout spiral where gate kills the run
     before state is written, blocking the learning cycle).
     """
+    if rung is not None:
+        from _sdd_history import predict
+        predicted = predict(cwd, command, rung)
+        if predicted:
+            expected = max(predicted["ewma"], predicted["p95"])
+            return max(min_timeout, min(max_timeout, int(expected * multiplier)))
     state = read_state(cwd, max_age_seconds=7200)  # 2h history window
     if state and state.get("duration"):
         return max(min_timeout, min(max_timeout,
@@ -509,14 +563,16 @@ def kill_orphan_test_group(cwd):
 
     Safe to call unconditionally: if the PGID is dead or recycled,
     killpg returns ESRCH which is caught. Only kills processes in
-    the same process group — no collateral damage.
+    the same process group — no collateral damage. Sharded runs
+    (_sdd_shard) leave one `<pgid file>.<i>` per shard.
     """
     pgid_file = test_pgid_path(cwd)
-    try:
-        pgid = int(pgid_file.read_text().strip())
-        _kill_pgid(pgid)
-    except (FileNotFoundError, ValueError):
-        pass
+    for path in [pgid_file, *pgid_file.parent.glob(f"{pgid_file.name}.*")]:
+        try:
+            pgid = int(path.read_text().strip())
+            _kill_pgid(pgid)
+        except (OSError, ValueError):
+            pass
 
 
 def rerun_marker_path(cwd):
@@ -526,19 +582,47 @@ def rerun_marker_path(cwd):
 
 def write_rerun_marker(cwd):
     """Signal that tests should rerun after current execution."""
+    store = _store(cwd)
+    if store:
+        store.put(cwd, "rerun", "", {"requested_at": time.time()})
+        return
     try:
         rerun_marker_path(cwd).write_text(str(time.time()))
     except OSError:
         pass
 
 
+def rerun_requested_at(cwd):
+    """Epoch of the latest rerun request, or None when there is none."""
+    store = _store(cwd)
+    if store:
+        data = store.get(cwd, "rerun") or {}
+        requested = data.get("requested_at")
+    else:
+        try:
+            requested = rerun_marker_path(cwd).read_text().strip()
+        except OSError:
+            return None
+    try:
+        return float(requested)
+    except (TypeError, ValueError):
+        return None
+
+
 def has_rerun_marker(cwd):
     """Check if a rerun has been requested."""
+    store = _store(cwd)
+    if store:
+        return store.exists(cwd, "rerun")
     return rerun_marker_path(cwd).exists()
 
 
 def clear_rerun_marker(cwd):
     """Clear the rerun marker."""
+    store = _store(cwd)
+    if store:
+        store.delete(cwd, "rerun")
+        return
     try:
         rerun_marker_path(cwd).unlink(missing_ok=True)
     except OSError:
@@ -552,10 +636,11 @@ def await_test_completion(cwd, timeout=30, sid=None):
     Returns read_state() result (dict or None).
     """
     deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
-        if not is_test_running(cwd, sid):
-            return read_state(cwd, max_age_seconds=60, sid=sid)
-        time.sleep(0.5)
+    with span("await_test_completion"):
+        while time.monotonic() < deadline:
+            if not is_test_running(cwd, sid):
+                return read_state(cwd, max_age_seconds=60, sid=sid)
+            time.sleep(0.5)
     return None  # Timed out waiting
 
 
@@ -567,11 +652,26 @@ def read_state(cwd, max_age_seconds=600, sid=None):
             Prevents stale state from previous sessions causing false decisions.
         sid: Session ID hash for teammate isolation.
     """
+    store = _store(cwd)
+    if store:
+        return store.get(cwd, "state", sid or "", max_age_seconds)
     return _read_json_with_ttl(state_path(cwd, sid), max_age_seconds, use_flock=True)
 
 
-def write_state(cwd, passing, summary, sid=None, raw_output=None, started_at=None):
-    """Atomic write of test state via tmpfile + rename."""
+def write_state(cwd, passing, summary, sid=None, raw_output=None, started_at=None,
+                partial=False, cached_duration=None, failures=None):
+    """Atomic write of test state via tmpfile + rename.
+
+    partial=True marks the result of a subset run (the worker's
+    failed-first stage) while the full command is still running. It keeps
+    the last complete run's duration for adaptive_gate_timeout.
+
+    cached_duration marks a result replayed from the result cache
+    (_sdd_results): the recorded run's duration replaces the measured one.
+
+    failures: [{"id", "location", "message"}] from a structured report
+    (_sdd_report), kept for format_feedback.
+    """
     data = {
         "passing": passing,
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
@@ -582,9 +682,43 @@ def write_state(cwd, passing, summary, sid=None, raw_output=None, started_at=Non
     if started_at is not None:
         data["started_at"] = started_at
         data["duration"] = round(time.time() - started_at, 2)
+    if cached_duration is not None:
+        data["cached"] = True
+        data["duration"] = cached_duration
+    if failures:
+        data["failures"] = failures
+    if partial:
+        data["partial"] = True
+        previous = read_state(cwd, max_age_seconds=7200, sid=sid) or {}
+        if previous.get("duration") is not None:
+            data["duration"] = previous["duration"]
+    store = _store(cwd)
+    if store:
+        store.put(cwd, "state", sid or "", data)
+        return
     _write_json_atomic(state_path(cwd, sid), data, prefix="sdd-state-")
 
 
+def write_progress(cwd, command, done, total, sid=None):
+    """Record live progress of a running command in the current state.
+
+    Merged into the existing record, whose result and timestamp stay as
+    they are; with no record yet nothing is written, so a reader never
+    takes a progress-only record for a result. The next write_state
+    drops it.
+    """
+    state = read_state(cwd, max_age_seconds=-1, sid=sid)
+    if not state:
+        return
+    state["progress"] = {"command": command, "done": done, "total": total,
+                         "updated": round(time.time(), 2)}
+    store = _store(cwd)
+    if store:
+        store.put(cwd, "state", sid or "", state)
+        return
+    _write_json_atomic(state_path(cwd, sid), state, prefix="sdd-state-")
+
+
 # ─────────────────────────────────────────────────────────────────
 # EDIT TIMESTAMPS — per-session last-edit tracking for trust validation
 # ─────────────────────────────────────────────────────────────────
@@ -610,6 +744,13 @@ def read_edit_time(cwd, sid):
     """
     if not sid:
         return 0.0
+    store = _store(cwd)
+    if store:
+        data = store.get(cwd, "coverage", sid) or {}
+        try:
+            return float(data.get("last_edit_time", 0.0))
+        except (TypeError, ValueError):
+            return 0.0
     # Primary: read from coverage JSON
     try:
         cp = coverage_path(cwd, sid)
@@ -711,6 +852,10 @@ def write_skill_invoked(cwd, skill_name, sid=None, scenario_hashes=None):
     }
     if scenario_hashes is not None:
         data["scenario_hashes"] = scenario_hashes
+    store = _store(cwd)
+    if store:
+        store.put(cwd, "skill", canonical, data)
+        return
     _write_json_atomic(skill_invoked_path(cwd, canonical), data, prefix="sdd-skill-")
 
 
@@ -726,6 +871,9 @@ def read_skill_invoked(cwd, skill_name="sop-code-assist", max_age_seconds=_SKILL
         sid: Accepted for caller compatibility, ignored in path computation.
     """
     canonical = _normalize_skill_name(skill_name)
+    store = _store(cwd)
+    if store:
+        return store.get(cwd, "skill", canonical, max_age_seconds)
     return _read_json_with_ttl(
         skill_invoked_path(cwd, canonical), max_age_seconds, use_flock=True
     )
@@ -750,6 +898,9 @@ def consume_skill_invoked(cwd, skill_name, max_age_seconds=_SKILL_TTL_SECONDS):
     persistent `read_skill_invoked` semantics intact.
     """
     canonical = _normalize_skill_name(skill_name)
+    store = _store(cwd)
+    if store:
+        return store.take(cwd, "skill", canonical, max_age_seconds)
     path = skill_invoked_path(cwd, canonical)
     state = _read_json_with_ttl(path, max_age_seconds, use_flock=True)
     if state is None:
@@ -762,6 +913,19 @@ def consume_skill_invoked(cwd, skill_name, max_age_seconds=_SKILL_TTL_SECONDS):
     return state
 
 
+def clear_skill_invoked(cwd, skill_name, sid=None):
+    """Remove a skill-invocation flag (no-op when absent)."""
+    canonical = _normalize_skill_name(skill_name)
+    store = _store(cwd)
+    if store:
+        store.delete(cwd, "skill", canonical)
+        return
+    try:
+        skill_invoked_path(cwd, canonical, sid).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
 # ─────────────────────────────────────────────────────────────────
 # TEST BASELINE STATE — pre-existing failure detection for teammates
 # ─────────────────────────────────────────────────────────────────
@@ -777,24 +941,35 @@ def write_baseline(cwd, sid, passing, summary):
     Preserves the initial test state so TaskCompleted can distinguish
     pre-existing failures from new regressions.
     """
-    bp = baseline_path(cwd, sid)
-    if bp.exists():
-        return  # Write-once: preserve first baseline
     data = {
         "passing": passing,
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "summary": summary,
     }
+    store = _store(cwd)
+    if store:
+        store.put(cwd, "baseline", sid, data, only_if_absent=True)
+        return
+    bp = baseline_path(cwd, sid)
+    if bp.exists():
+        return  # Write-once: preserve first baseline
     _write_json_atomic(bp, data, prefix="sdd-baseline-")
 
 
 def read_baseline(cwd, sid, max_age_seconds=14400):
     """Read test baseline state with TTL (4h). Returns dict or None."""
+    store = _store(cwd)
+    if store:
+        return store.get(cwd, "baseline", sid, max_age_seconds)
     return _read_json_with_ttl(baseline_path(cwd, sid), max_age_seconds, use_flock=True)
 
 
 def clear_baseline(cwd, sid):
     """Remove test baseline state file."""
+    store = _store(cwd)
+    if store:
+        store.delete(cwd, "baseline", sid)
+        return
     try:
         baseline_path(cwd, sid).unlink(missing_ok=True)
     except OSError:
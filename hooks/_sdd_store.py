@@ -0,0 +1,250 @@
+"""Opt-in per-project SQLite state store (WAL mode).
+
+The default "files" backend keeps one JSON/marker file per record under
+the tmpdir, each with its own tmp+rename write and flock dance. With
+STATE_BACKEND="sqlite" (see _sdd_config.get_state_backend) the same
+records live as rows of one database per project instead:
+
+    sdd-store-{project_hash}.sqlite3   (+ -wal / -shm siblings)
+
+    entries(kind, key, data, written, expires)   PRIMARY KEY (kind, key)
+    entries_expires                               index on expires
+
+kind names the record family ("state", "coverage", "baseline", "skill",
+"rerun", "test-cmd", "scen-baseline", "amend-attempts"); key is the
+session hash, skill name, or "" for project-scoped records. data is the
+JSON document the files backend would have written, so TTL checks and
+callers are backend-agnostic.
+
+Concurrency: WAL lets readers proceed while one writer commits;
+read-modify-write records (record_file_edit, consume_skill_invoked) run
+in BEGIN IMMEDIATE transactions instead of a sidecar lockfile. Every
+sqlite3.Error degrades silently (read → None, write → no-op), matching
+the files backend's OSError handling.
+
+sqlite3 is imported on first use so hooks that never touch state (or run
+the files backend) do not pay for it.
+"""
+import json
+import os
+import time
+
+from _sdd_state import _is_fresh, _tmp, project_hash
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    " kind TEXT NOT NULL, key TEXT NOT NULL, data TEXT NOT NULL,"
+    " written REAL NOT NULL, expires REAL NOT NULL,"
+    " PRIMARY KEY (kind, key)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)",
+)
+
+# (db path, pid) → connection. Keyed by pid so a forked child (hook
+# daemon) never reuses its parent's connection.
+_connections: dict = {}
+
+
+def enabled(cwd):
+    """True when cwd's state lives in the SQLite store.
+
+    An interpreter built without sqlite3 stays on the files backend.
+    """
+    from _sdd_config import get_state_backend
+    if get_state_backend(cwd) != "sqlite":
+        return False
+    try:
+        import sqlite3  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def store_path(cwd):
+    """Path to the project's state database."""
+    return _tmp(f"sdd-store-{project_hash(cwd)}.sqlite3")
+
+
+def _connect(cwd):
+    import sqlite3
+    from _sdd_config import STATE_STORE_BUSY_TIMEOUT
+    path = str(store_path(cwd))
+    cache_key = (path, os.getpid())
+    conn = _connections.get(cache_key)
+    if conn is not None:
+        return conn
+    conn = sqlite3.connect(path, timeout=STATE_STORE_BUSY_TIMEOUT,
+                           isolation_level=None, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+    except sqlite3.Error:
+        conn.close()
+        raise
+    _connections[cache_key] = conn
+    return conn
+
+
+def close_connections():
+    """Close every cached connection (tests, or before unlinking a store)."""
+    while _connections:
+        _, conn = _connections.popitem()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _errors():
+    import sqlite3
+    return (sqlite3.Error, OSError)
+
+
+def _decode(row):
+    if row is None:
+        return None
+    try:
+        data = json.loads(row[0])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _upsert(conn, kind, key, data, now):
+    from _sdd_config import STATE_STORE_RETENTION
+    conn.execute(
+        "INSERT OR REPLACE INTO entries (kind, key, data, written, expires)"
+        " VALUES (?, ?, ?, ?, ?)",
+        (kind, key, json.dumps(data), now, now + STATE_STORE_RETENTION),
+    )
+
+
+def get(cwd, kind, key="", max_age_seconds=-1):
+    """Read one record. Returns dict or None (missing, stale, or error)."""
+    try:
+        row = _connect(cwd).execute(
+            "SELECT data FROM entries WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+    except _errors():
+        return None
+    data = _decode(row)
+    return data if data is not None and _is_fresh(data, max_age_seconds) else None
+
+
+def exists(cwd, kind, key=""):
+    """True when a record exists (regardless of age)."""
+    try:
+        row = _connect(cwd).execute(
+            "SELECT 1 FROM entries WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+    except _errors():
+        return False
+    return row is not None
+
+
+def values(cwd, kind):
+    """All records of kind (any key, any age). Returns list of dicts."""
+    try:
+        rows = _connect(cwd).execute(
+            "SELECT data FROM entries WHERE kind = ?", (kind,)
+        ).fetchall()
+    except _errors():
+        return []
+    return [d for d in map(_decode, rows) if d is not None]
+
+
+def put(cwd, kind, key, data, only_if_absent=False):
+    """Write one record. only_if_absent gives write-once semantics."""
+    try:
+        conn = _connect(cwd)
+        if only_if_absent:
+            from _sdd_config import STATE_STORE_RETENTION
+            now = time.time()
+            conn.execute(
+                "INSERT OR IGNORE INTO entries (kind, key, data, written, expires)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(data), now, now + STATE_STORE_RETENTION),
+            )
+        else:
+            _upsert(conn, kind, key, data, time.time())
+    except _errors():
+        pass
+
+
+def delete(cwd, kind, key=""):
+    """Remove one record (no-op when missing)."""
+    try:
+        _connect(cwd).execute(
+            "DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+    except _errors():
+        pass
+
+
+def update(cwd, kind, key, mutate):
+    """Read-modify-write one record in a single write transaction.
+
+    mutate(data) receives the current dict ({} when missing) and returns
+    the dict to store. Concurrent updaters serialize on the database write
+    lock, so no update is lost.
+    """
+    try:
+        conn = _connect(cwd)
+        conn.execute("BEGIN IMMEDIATE")
+    except _errors():
+        return
+    try:
+        row = conn.execute(
+            "SELECT data FROM entries WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        _upsert(conn, kind, key, mutate(_decode(row) or {}), time.time())
+        conn.execute("COMMIT")
+    except _errors():
+        try:
+            conn.execute("ROLLBACK")
+        except _errors():
+            pass
+
+
+def take(cwd, kind, key="", max_age_seconds=-1):
+    """Atomic read-and-delete. Returns the record if present and fresh.
+
+    A stale record is left in place (as the files backend does) and None
+    is returned.
+    """
+    try:
+        conn = _connect(cwd)
+        conn.execute("BEGIN IMMEDIATE")
+    except _errors():
+        return None
+    try:
+        row = conn.execute(
+            "SELECT data FROM entries WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        data = _decode(row)
+        if data is not None and _is_fresh(data, max_age_seconds):
+            conn.execute(
+                "DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+        else:
+            data = None
+        conn.execute("COMMIT")
+        return data
+    except _errors():
+        try:
+            conn.execute("ROLLBACK")
+        except _errors():
+            pass
+        return None
+
+
+def purge_expired(cwd, now=None):
+    """Delete rows past their retention (indexed). Returns rows removed."""
+    if not store_path(cwd).exists():
+        return 0
+    try:
+        cur = _connect(cwd).execute(
+            "DELETE FROM entries WHERE expires < ?",
+            (time.time() if now is None else now,))
+        return cur.rowcount
+    except _errors():
+        return 0
@@ -0,0 +1,197 @@
+"""Bounded streaming capture of a subprocess's stdout and stderr.
+
+    capture = StreamCapture(proc, on_progress)
+    stdout, stderr = capture.communicate(timeout)  # TimeoutExpired like Popen
+
+run_in_process_group reads both pipes through this instead of
+Popen.communicate(), which holds all of a run's output in memory only
+for the callers to keep the last few KB. A reader thread per pipe keeps
+the first CAPTURE_HEAD_BYTES and a ring of the last CAPTURE_TAIL_BYTES;
+what falls between is dropped as it arrives and replaced by one line:
+
+    ... [1234567 bytes omitted] ...
+
+so a hook worker's memory is the same for 10 KB or 500 MB of output.
+
+Complete lines also go through a ProgressParser, which counts finished
+tests as the run goes:
+
+    pytest   result characters of the progress lines (`..F.  [ 42%]`),
+             or one per `PASSED`/`FAILED`/… line with -v; total from
+             `collected N items` (`N selected` when deselecting)
+    TAP      `ok N` / `not ok N` lines (node --test); total from `1..N`
+    go       one per package result line (`ok`, `FAIL`, `?`)
+    jest     one per test file line (`PASS`/`FAIL <file>`, `✓ <file>`)
+    vitest
+
+and hands (done, total) to on_progress when they change, at most once
+per PROGRESS_INTERVAL. total is None until the runner prints it.
+"""
+import locale
+import os
+import re
+import threading
+import time
+
+from _sdd_config import CAPTURE_HEAD_BYTES, CAPTURE_TAIL_BYTES, PROGRESS_INTERVAL
+
+_CHUNK = 64 * 1024
+# Longest line fed to the progress parser; longer ones keep their end.
+_MAX_LINE = 4096
+# Reader threads still blocked after the process exits (a grandchild
+# holding the pipe) are abandoned after this long.
+_JOIN_GRACE = 5
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+_COLLECTED_RE = re.compile(
+    r"^collected (\d+) items?(?: / \d+ deselected)?(?: / (\d+) selected)?")
+_PYTEST_PROGRESS_RE = re.compile(r"^(.*?)\s*\[\s*\d+%\]$")
+_PYTEST_VERBOSE_RE = re.compile(r"::\S.*\s(?:PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS)$")
+_PYTEST_CHARS_RE = re.compile(r"(?:^|\s)([.FEsxX]+)$")
+_TAP_RESULT_RE = re.compile(r"^(?:not )?ok \d+\b")
+_TAP_PLAN_RE = re.compile(r"^1\.\.(\d+)$")
+_GO_PACKAGE_RE = re.compile(
+    r"^(?:ok|FAIL|\?)\s+\S+\s+(?:[\d.]+s|\(cached\)|\[no test files\])")
+_JS_FILE_RE = re.compile(r"^\s*(?:(?:PASS|FAIL)\s+|[✓❯×]\s+)\S+\.[cm]?[jt]sx?\b")
+
+
+def _decode(data):
+    """Text as Popen(text=True) would give it: locale codec, universal newlines."""
+    text = bytes(data).decode(locale.getpreferredencoding(False), errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class TailBuffer:
+    """First head_size and last tail_size bytes of a byte stream."""
+
+    def __init__(self, head_size=CAPTURE_HEAD_BYTES, tail_size=CAPTURE_TAIL_BYTES):
+        self._head_size = head_size
+        self._tail_size = tail_size
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.omitted = 0
+
+    def feed(self, chunk):
+        room = self._head_size - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        self.tail += chunk
+        excess = len(self.tail) - self._tail_size
+        if excess > 0:
+            del self.tail[:excess]
+            self.omitted += excess
+
+    def text(self):
+        if not self.omitted:
+            return _decode(self.head + self.tail)
+        return (f"{_decode(self.head)}\n... [{self.omitted} bytes omitted] ...\n"
+                f"{_decode(self.tail)}")
+
+
+def read_bounded(path):
+    """A file's text, bounded like a captured stream (head + tail only)."""
+    buffer = TailBuffer()
+    with open(path, "rb") as f:
+        buffer.feed(f.read(CAPTURE_HEAD_BYTES + CAPTURE_TAIL_BYTES))
+        skip = os.fstat(f.fileno()).st_size - f.tell() - CAPTURE_TAIL_BYTES
+        if skip > 0:
+            f.seek(skip, os.SEEK_CUR)
+            buffer.omitted += skip
+        buffer.feed(f.read(CAPTURE_TAIL_BYTES))
+    return buffer.text()
+
+
+class ProgressParser:
+    """Counts finished tests from runner output lines (see module doc)."""
+
+    def __init__(self, on_progress, interval=PROGRESS_INTERVAL):
+        self._on_progress = on_progress
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._reported = None
+        self._last = 0.0
+        self.done = 0
+        self.total = None
+
+    def feed(self, raw_line):
+        line = _ANSI_RE.sub("", raw_line[-_MAX_LINE:].decode("utf-8", "replace")).rstrip()
+        with self._lock:
+            if not self._count(line):
+                return
+            now = time.monotonic()
+            if (self.done, self.total) == self._reported or now - self._last < self._interval:
+                return
+            self._reported, self._last = (self.done, self.total), now
+            self._on_progress(self.done, self.total)
+
+    def _count(self, line):
+        m = _COLLECTED_RE.match(line)
+        if m:
+            self.total = int(m.group(2) or m.group(1))
+            return True
+        m = _PYTEST_PROGRESS_RE.match(line)
+        if m:
+            body = m.group(1)
+            if _PYTEST_VERBOSE_RE.search(body):
+                self.done += 1
+                return True
+            chars = _PYTEST_CHARS_RE.search(body)
+            if chars:
+                self.done += len(chars.group(1))
+                return True
+            return False
+        if _TAP_RESULT_RE.match(line) or _GO_PACKAGE_RE.match(line) \
+                or _JS_FILE_RE.match(line):
+            self.done += 1
+            return True
+        m = _TAP_PLAN_RE.match(line)
+        if m:
+            self.total = int(m.group(1))
+            return True
+        return False
+
+
+class StreamCapture:
+    """Drain proc.stdout and proc.stderr (binary pipes) into TailBuffers."""
+
+    def __init__(self, proc, on_progress=None):
+        self._proc = proc
+        self._parser = ProgressParser(on_progress) if on_progress else None
+        self.stdout = TailBuffer()
+        self.stderr = TailBuffer()
+        self._threads = [
+            threading.Thread(target=self._pump, args=(pipe, buffer), daemon=True)
+            for pipe, buffer in ((proc.stdout, self.stdout), (proc.stderr, self.stderr))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _pump(self, pipe, buffer):
+        read = getattr(pipe, "read1", pipe.read)
+        pending = b""
+        try:
+            while True:
+                chunk = read(_CHUNK)
+                if not chunk:
+                    break
+                buffer.feed(chunk)
+                if self._parser is not None:
+                    lines = (pending + chunk).split(b"\n")
+                    pending = lines.pop()[-_MAX_LINE:]
+                    for line in lines:
+                        self._parser.feed(line)
+        except (OSError, ValueError):
+            pass
+
+    def communicate(self, timeout):
+        """(stdout, stderr) once the process exits; TimeoutExpired first."""
+        self._proc.wait(timeout=timeout)
+        return self.close()
+
+    def close(self):
+        """Wait briefly for the readers and return what they captured."""
+        for thread in self._threads:
+            thread.join(_JOIN_GRACE)
+        return self.stdout.text(), self.stderr.text()
+
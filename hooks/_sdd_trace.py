@@ -0,0 +1,152 @@
+"""Opt-in span tracing for hook hot paths (SDD_TRACE=1).
+
+    @traced_main("sdd-test-guard")
+    def main(): ...
+
+    with span("git"):
+        subprocess.run(...)
+
+traced_main() times one hook invocation; span() times a block inside it.
+Spans nest: a span opened inside another is recorded under the joined
+path ("analyze_edit/git"), so the report can tell the git time spent on
+behalf of analyze_edit from git time elsewhere. Repeated spans aggregate
+into count / total_ms / max_ms instead of one record per call.
+
+When the hook exits (normally, via sys.exit, or by exception) one
+`hook_timing` event is appended through append_telemetry():
+
+    {"event": "hook_timing", "hook": "sdd-test-guard", "total_ms": 41.2,
+     "exit_code": 0, "spans": {"analyze_edit": {"count": 1, ...}, ...}}
+
+Disabled (the default), span() returns a shared no-op context manager
+and traced_main() adds a single env lookup per invocation. A traced_main
+nested inside another records as a span of the outer one, so one event
+covers one process — unless it is called inside an open span, which
+already times it: hook-dispatch.py wraps each in-process handler in
+span(script), and the handler's own traced_main adds no second level.
+
+Stdlib only; _sdd_state is imported at flush time, never on import.
+"""
+import functools
+import os
+import time
+
+_active = False
+_stack: list = []
+_spans: dict = {}
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self.start) * 1000
+        key = "/".join(_stack)
+        _stack.pop()
+        rec = _spans.get(key)
+        if rec is None:
+            _spans[key] = [1, elapsed, elapsed]
+        else:
+            rec[0] += 1
+            rec[1] += elapsed
+            if elapsed > rec[2]:
+                rec[2] = elapsed
+        return False
+
+
+def enabled() -> bool:
+    """True when SDD_TRACE=1 in the environment."""
+    return os.environ.get("SDD_TRACE") == "1"
+
+
+def span(name):
+    """Context manager timing a block. No-op outside a traced hook."""
+    return _Span(name) if _active else _NOOP
+
+
+def snapshot() -> dict:
+    """Current span aggregates as {path: {count, total_ms, max_ms}}."""
+    return {
+        key: {"count": c, "total_ms": round(t, 3), "max_ms": round(m, 3)}
+        for key, (c, t, m) in _spans.items()
+    }
+
+
+def _exit_code(exc):
+    if exc is None:
+        return 0
+    if isinstance(exc, SystemExit):
+        code = exc.code
+        return code if isinstance(code, int) else (0 if code is None else 1)
+    return 1
+
+
+def _flush(hook_name, total_ms, exit_code):
+    try:
+        from _sdd_state import append_telemetry
+    except ImportError:
+        return
+    cwd = os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    append_telemetry(cwd, {
+        "event": "hook_timing",
+        "hook": hook_name,
+        "total_ms": round(total_ms, 3),
+        "exit_code": exit_code,
+        "spans": snapshot(),
+    })
+
+
+def traced_main(hook_name):
+    """Decorator for a hook's main(): emit one hook_timing event per call."""
+    def decorate(main):
+        @functools.wraps(main)
+        def wrapper(*args, **kwargs):
+            global _active
+            if _active:
+                if _stack:
+                    return main(*args, **kwargs)
+                with _Span(hook_name):
+                    return main(*args, **kwargs)
+            if not enabled():
+                return main(*args, **kwargs)
+            _active = True
+            _stack.clear()
+            _spans.clear()
+            start = time.perf_counter()
+            raised = None
+            try:
+                return main(*args, **kwargs)
+            except BaseException as exc:
+                raised = exc
+                raise
+            finally:
+                _active = False
+                total_ms = (time.perf_counter() - start) * 1000
+                try:
+                    _flush(hook_name, total_ms, _exit_code(raised))
+                except Exception:
+                    pass  # tracing must never break a hook
+        return wrapper
+    return decorate
@@ -0,0 +1,383 @@
+"""Warm pre-forked pytest runner for scoped per-edit runs (opt-in).
+
+    result = run_warm(cwd, "pytest tests/test_foo.py", timeout, pgid_file)
+    # (rc, stdout, stderr, timed_out) | None → run the command cold
+
+A scoped run such as `pytest tests/test_foo.py` is mostly interpreter
+startup, plugin loading and conftest imports. With WARM_RUNNER on, the
+sdd-auto-test worker hands plain `pytest <args>` commands to a per-project
+server that has already paid for those, and forks one child per run:
+
+    server    python _sdd_warm.py --serve <cwd> <socket> <pytest dir> <watch>
+              imports pytest, its pytest11 plugins and whatever the
+              conftest.py files import, then waits on a Unix socket
+    child     os.fork() → own process group → pytest.main(args), with
+              stdout/stderr sent to files the client reads back
+
+The conftest files are executed once in a throwaway namespace only to
+warm their imports; afterwards every module from the project tree (not
+from a site-packages inside it) is dropped from sys.modules, so a child
+imports the project's own code — and the conftest — fresh from disk.
+
+The server exits, answering "stale", as soon as any conftest.py (up to
+two directories deep), FAST_PATH_FORCE_FULL_FILES entry, setup.cfg or
+tox.ini has changed since it started, and after WARM_RUNNER_IDLE_SECONDS
+without a run. run_warm() never waits for a server: with none it starts
+one in the background (unless one is still preloading) and returns None,
+so that run goes cold and a later one is warm.
+
+POSIX only (fork, AF_UNIX). The server runs under the interpreter named
+by the pytest script's shebang, else the hook's own; one that cannot
+import pytest simply exits. The socket is created under umask 077.
+"""
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+_PROTOCOL = 1
+
+# pytest reads its configuration from these too; the FAST_PATH_FORCE_FULL
+# set covers the rest (pytest.ini, pyproject.toml, lockfiles).
+_WATCH_EXTRA = ("setup.cfg", "tox.ini")
+
+# Modules warm in every server, whatever the plugins and conftests pull in.
+_PRELOAD = (
+    "_pytest.config", "_pytest.main", "_pytest.python", "_pytest.fixtures",
+    "_pytest.runner", "_pytest.terminal", "_pytest.assertion.rewrite",
+)
+
+_SHELL_CHARS = frozenset("$`*?[~")
+
+
+def supported():
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+
+# ─────────────────────────────────────────────────────────────────
+# CLIENT (sdd-auto-test worker)
+# ─────────────────────────────────────────────────────────────────
+
+def socket_path(cwd):
+    from _sdd_state import _tmp, project_hash
+    return _tmp(f"sdd-warm-{project_hash(str(cwd))}.sock")
+
+
+def warm_args(command):
+    """pytest arguments of a plain `pytest <args>` command, else None.
+
+    Only commands the shell would pass through unchanged qualify: one
+    statement, no redirects, no expansions or globs.
+    """
+    from _sdd_shell import lex
+    stmts = lex(command)
+    if len(stmts) != 1 or stmts[0].redirects:
+        return None
+    words = stmts[0].words
+    if len(words) < 2 or words[0] != "pytest":
+        return None
+    if any(_SHELL_CHARS.intersection(w) for w in words[1:]):
+        return None
+    return words[1:]
+
+
+def _project_python():
+    """(interpreter, pytest script dir) for the server, or None."""
+    import shutil
+    exe = shutil.which("pytest")
+    if exe is None:
+        return None
+    python = sys.executable
+    try:
+        with open(exe, "rb") as f:
+            first = f.readline(256)
+    except OSError:
+        first = b""
+    if first.startswith(b"#!"):
+        parts = first[2:].decode("utf-8", "replace").split()
+        if parts and Path(parts[0]).name == "env" and len(parts) > 1:
+            parts = [shutil.which(parts[1]) or ""]
+        if parts and Path(parts[0]).name.startswith("python") \
+                and os.access(parts[0], os.X_OK):
+            python = parts[0]
+    return python, os.path.dirname(exe)
+
+
+def _server_alive(cwd):
+    """True while a server (starting, serving or exiting) holds the lock."""
+    import fcntl
+    try:
+        with open(f"{socket_path(cwd)}.lock", "a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return True
+    return False
+
+
+def start_server(cwd):
+    """Spawn a detached warm server for cwd unless one is already up.
+
+    Returns immediately; a server still preloading is left alone.
+    """
+    import subprocess
+
+    from _sdd_config import FAST_PATH_FORCE_FULL_FILES, WARM_RUNNER_IDLE_SECONDS
+    if _server_alive(cwd):
+        return
+    found = _project_python()
+    if found is None:
+        return
+    python, pytest_dir = found
+    watch = sorted(FAST_PATH_FORCE_FULL_FILES | set(_WATCH_EXTRA))
+    try:
+        subprocess.Popen(
+            [python, str(Path(__file__).resolve()), "--serve", str(cwd),
+             str(socket_path(cwd)), pytest_dir, json.dumps(watch),
+             str(WARM_RUNNER_IDLE_SECONDS)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, start_new_session=True, cwd=cwd,
+            env=dict(os.environ, _SDD_RECURSION_GUARD="1"),
+        )
+    except OSError:
+        pass
+
+
+def stop_server(cwd):
+    """SIGTERM the server for cwd, if one is running."""
+    import signal
+    try:
+        pid = int(Path(f"{socket_path(cwd)}.lock").read_text().strip())
+        os.kill(pid, signal.SIGTERM)
+    except (OSError, ValueError):
+        pass
+
+
+def _request(cwd, args, timeout, pgid_file):
+    """Run args in the server. None when there is no usable server."""
+    import tempfile
+
+    from _sdd_state import _kill_pgid, _tmp
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    outputs = []
+    try:
+        sock.settimeout(5)
+        sock.connect(str(socket_path(cwd)))
+        for stream in ("stdout", "stderr"):
+            fd, path = tempfile.mkstemp(prefix=f"sdd-warm-{stream}-", dir=_tmp())
+            os.close(fd)
+            outputs.append(path)
+        sock.sendall(json.dumps({"v": _PROTOCOL, "args": args,
+                                 "stdout": outputs[0],
+                                 "stderr": outputs[1]}).encode() + b"\n")
+        reply = sock.makefile("rb")
+        started = json.loads(reply.readline() or b"{}")
+        pid = started.get("pid")
+        if not pid:
+            return None  # stale, or a server from another protocol
+        if pgid_file:
+            Path(pgid_file).write_text(str(pid))
+        sock.settimeout(timeout)
+        try:
+            done = json.loads(reply.readline() or b"{}")
+        except socket.timeout:
+            _kill_pgid(pid)
+            return -1, "", "", True
+        if "rc" not in done:
+            _kill_pgid(pid)
+            return None  # server died mid-run
+        if pgid_file:
+            Path(pgid_file).unlink(missing_ok=True)
+        from _sdd_stream import read_bounded
+        out, err = (read_bounded(p) for p in outputs)
+        return done["rc"], out, err, False
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+        for path in outputs:
+            Path(path).unlink(missing_ok=True)
+
+
+def run_warm(cwd, command, timeout, pgid_file=None):
+    """(rc, stdout, stderr, timed_out) from the warm server, or None.
+
+    None when WARM_RUNNER is off, the platform lacks fork, command is not
+    a plain `pytest <args>`, or no fresh server is up yet (one is started
+    for the next run).
+    """
+    from _sdd_config import get_warm_runner_enabled
+    if not supported() or not get_warm_runner_enabled(cwd):
+        return None
+    args = warm_args(command)
+    if args is None:
+        return None
+    result = _request(cwd, args, timeout, pgid_file)
+    if result is None:
+        start_server(cwd)
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────
+# SERVER (run under the project's interpreter; stdlib only)
+# ─────────────────────────────────────────────────────────────────
+
+def _conftests(cwd):
+    root = Path(cwd)
+    return sorted(str(p) for pattern in ("conftest.py", "*/conftest.py",
+                                         "*/*/conftest.py")
+                  for p in root.glob(pattern))
+
+
+def _fingerprint(cwd, watch):
+    sig = {}
+    for path in _conftests(cwd) + [os.path.join(cwd, n) for n in watch]:
+        try:
+            st = os.stat(path)
+            sig[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            sig[path] = None
+    return sig
+
+
+def _is_project_module(path, cwd):
+    return (path.startswith(cwd + os.sep) and "site-packages" not in path
+            and "dist-packages" not in path)
+
+
+def _preload(cwd, pytest_dir):
+    import importlib
+    sys.path[0] = pytest_dir  # as when the `pytest` script itself runs
+    import pytest  # noqa: F401 — ImportError: no pytest here, no server
+    for name in _PRELOAD:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    try:
+        from importlib.metadata import entry_points
+        for ep in entry_points(group="pytest11"):
+            try:
+                ep.load()
+            except Exception:
+                pass
+    except Exception:
+        pass
+    for path in _conftests(cwd):
+        sys.path.insert(0, os.path.dirname(path))
+        try:
+            code = compile(Path(path).read_bytes(), path, "exec")
+            exec(code, {"__name__": "_sdd_warm_conftest", "__file__": path})
+        except BaseException:
+            pass
+        finally:
+            sys.path.remove(os.path.dirname(path))
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and _is_project_module(os.path.realpath(path), cwd):
+            del sys.modules[name]
+
+
+def _child(request, *sockets):
+    """Forked child: run pytest.main and _exit with its code."""
+    rc = 3
+    try:
+        for s in sockets:
+            s.close()
+        import signal
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.setpgid(0, 0)
+        for fd, key in ((1, "stdout"), (2, "stderr")):
+            out = os.open(request[key], os.O_WRONLY | os.O_TRUNC)
+            os.dup2(out, fd)
+            os.close(out)
+        import pytest
+        sys.argv = ["pytest", *request["args"]]
+        rc = int(pytest.main(list(request["args"])))
+    except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(rc)
+
+
+def serve(cwd, sock_path, pytest_dir, watch, idle):
+    """Preload, then serve runs until stale or idle. One run at a time."""
+    import fcntl
+    import signal
+    cwd = os.path.realpath(cwd)
+    os.chdir(cwd)
+    os.umask(0o077)
+    lock = open(f"{sock_path}.lock", "a+")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return  # another server owns this project
+    lock.truncate(0)
+    lock.write(str(os.getpid()))
+    lock.flush()
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # stop_server
+    _preload(cwd, pytest_dir)
+    fingerprint = _fingerprint(cwd, watch)
+    try:
+        os.unlink(sock_path)
+    except OSError:
+        pass
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(sock_path)
+    server.listen(1)
+    server.settimeout(idle)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                return
+            with conn:
+                stream = conn.makefile("rwb")
+                try:
+                    request = json.loads(stream.readline() or b"null")
+                except ValueError:
+                    continue
+                if not isinstance(request, dict) or request.get("v") != _PROTOCOL:
+                    continue
+                if _fingerprint(cwd, watch) != fingerprint:
+                    stream.write(b'{"stale": true}\n')
+                    stream.flush()
+                    return
+                pid = os.fork()
+                if pid == 0:
+                    _child(request, server, conn)
+                try:
+                    stream.write(json.dumps({"pid": pid}).encode() + b"\n")
+                    stream.flush()
+                except OSError:
+                    pass
+                _, status = os.waitpid(pid, 0)
+                try:
+                    stream.write(json.dumps(
+                        {"rc": os.waitstatus_to_exitcode(status)}).encode() + b"\n")
+                    stream.flush()
+                except OSError:
+                    pass
+    finally:
+        server.close()
+        try:
+            os.unlink(sock_path)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--serve"]:
+    _cwd, _sock, _pytest_dir, _watch, _idle = sys.argv[2:7]
+    try:
+        serve(_cwd, _sock, _pytest_dir, json.loads(_watch), float(_idle))
+    except ImportError:
+        pass
@@ -74,6 +74,9 @@ def cleanup_all_state(cwd, sid=None):
         ])
     phash = project_hash(cwd)
     paths.append(Path(tempfile.gettempdir()) / f"sdd-test-cmd-{phash}.json")
+    paths.append(Path(tempfile.gettempdir()) / f"sdd-scen-baseline-{phash}.json")
+    store = Path(tempfile.gettempdir()) / f"sdd-store-{phash}.sqlite3"
+    paths.extend([store, f"{store}-wal", f"{store}-shm"])
 
     for p in paths:
         try:
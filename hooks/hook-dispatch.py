@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Multiplexed hook dispatcher — every handler of one event, one process.
+
+hooks.json used to register one command per handler, so an event with two
+handlers paid two interpreter startups and two copies of the same import
+graph, each re-parsing the same stdin JSON. This entry point runs every
+handler registered for the event in-process (via _hook_runtime.run_hook),
+in registration order, and merges their outputs the way Claude Code
+merges parallel hooks:
+
+    * exit 2 anywhere          → blocking. Events with a JSON block form
+                                 (PreToolUse deny, decision: block) keep
+                                 the other handlers' JSON; other events
+                                 exit 2 with the blocking stderr.
+    * exit 0 stdout (JSON)     → merged: additionalContext and
+                                 systemMessage concatenated in handler
+                                 order, permissionDecision by precedence
+                                 deny > ask > allow, continue=false wins.
+    * exit 0 plain stdout      → context for SessionStart/UserPromptSubmit
+                                 (as Claude Code treats it), else dropped.
+    * any other exit code      → non-blocking error: stdout ignored, stderr
+                                 forwarded; exit code propagates only when
+                                 no handler produced output to keep.
+
+Handlers share one interpreter: modules are imported once and module
+caches (project_hash, config, compiled regexes) are shared across them.
+
+Usage (hooks.json): _run.cmd hook-dispatch.py <EventName>
+Without an argument the event comes from stdin's hook_event_name.
+"""
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _hook_runtime  # noqa: E402
+from _sdd_trace import span, traced_main  # noqa: E402
+
+# Handlers per event, in the order hooks.json listed them.
+# Handlers run one after another under the event's single hooks.json
+# timeout, which must cover the sum of their old per-entry timeouts
+# (SessionStart: 10 s + 10 s).
+HANDLERS = {
+    "SessionStart": ("session-start.py", "agent-browser-check.py"),
+}
+
+# Events where plain (non-JSON) stdout on exit 0 becomes model context.
+_PLAIN_STDOUT_IS_CONTEXT = frozenset({"SessionStart", "UserPromptSubmit"})
+
+# Events whose block can be expressed in JSON alongside other output.
+_JSON_BLOCK_EVENTS = frozenset({
+    "PreToolUse", "PostToolUse", "UserPromptSubmit", "Stop", "SubagentStop",
+})
+
+_DECISION_PRECEDENCE = {"deny": 3, "ask": 2, "allow": 1}
+
+
+def _parse_stdout(event, stdout):
+    """Handler stdout → dict (JSON) or {"_context": text} or {}."""
+    text = stdout.strip()
+    if not text:
+        return {}
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+    if event in _PLAIN_STDOUT_IS_CONTEXT:
+        return {"_context": text}
+    return {}
+
+
+def merge_outputs(event, outputs):
+    """Merge parsed handler outputs (handler order) into one hook response."""
+    merged = {}
+    specific = {}
+    contexts = []
+    messages = []
+    block_reasons = []
+    for out in outputs:
+        if "_context" in out:
+            contexts.append(out["_context"])
+            continue
+        hso = out.get("hookSpecificOutput") or {}
+        if hso.get("additionalContext"):
+            contexts.append(hso["additionalContext"])
+        decision = hso.get("permissionDecision")
+        if decision in _DECISION_PRECEDENCE:
+            current = specific.get("permissionDecision")
+            if (current is None or _DECISION_PRECEDENCE[decision]
+                    > _DECISION_PRECEDENCE[current]):
+                specific["permissionDecision"] = decision
+                if hso.get("permissionDecisionReason"):
+                    specific["permissionDecisionReason"] = hso["permissionDecisionReason"]
+                else:
+                    specific.pop("permissionDecisionReason", None)
+        for key, value in hso.items():
+            if key not in ("hookEventName", "additionalContext",
+                           "permissionDecision", "permissionDecisionReason"):
+                specific.setdefault(key, value)
+        if out.get("systemMessage"):
+            messages.append(out["systemMessage"])
+        if out.get("decision") == "block":
+            block_reasons.append(out.get("reason", ""))
+        if out.get("continue") is False:
+            merged["continue"] = False
+            if out.get("stopReason") and "stopReason" not in merged:
+                merged["stopReason"] = out["stopReason"]
+        if out.get("suppressOutput"):
+            merged["suppressOutput"] = True
+
+    if contexts:
+        specific["additionalContext"] = "\n\n".join(contexts)
+    if specific:
+        merged["hookSpecificOutput"] = {"hookEventName": event, **specific}
+    if messages:
+        merged["systemMessage"] = "\n".join(messages)
+    if block_reasons:
+        merged["decision"] = "block"
+        merged["reason"] = "\n".join(r for r in block_reasons if r)
+    return merged
+
+
+def dispatch(event, stdin_text):
+    """Run every handler of event. Returns (rc, stdout, stderr)."""
+    results = []
+    for script in HANDLERS.get(event, ()):
+        with span(script):
+            results.append((script, *_hook_runtime.run_hook(script, stdin_text)))
+    blocking = [err for _, rc, _, err in results if rc == 2]
+    failing = [(rc, err) for _, rc, _, err in results if rc not in (0, 2)]
+    outputs = [_parse_stdout(event, out) for _, rc, out, _ in results if rc == 0]
+    printed = any(out.strip() for _, rc, out, _ in results if rc == 0)
+    merged = merge_outputs(event, outputs)
+    stderr = "".join(err for _, err in failing)
+
+    if blocking:
+        reason = "".join(blocking)
+        if not merged or event not in _JSON_BLOCK_EVENTS:
+            return 2, "", reason
+        if event == "PreToolUse":
+            hso = merged.setdefault("hookSpecificOutput", {"hookEventName": event})
+            hso["permissionDecision"] = "deny"
+            hso["permissionDecisionReason"] = reason.strip()
+        else:
+            merged["decision"] = "block"
+            merged["reason"] = "\n".join(
+                r for r in (merged.get("reason"), reason.strip()) if r)
+        return 0, json.dumps(merged) + "\n", stderr
+
+    if merged or printed:
+        return 0, json.dumps(merged) + "\n", stderr
+    if failing:
+        return failing[0][0], "", stderr
+    return 0, "", ""
+
+
+@traced_main("hook-dispatch")
+def main():
+    try:
+        stdin_text = sys.stdin.read()
+    except (OSError, ValueError):
+        stdin_text = ""
+    event = sys.argv[1] if len(sys.argv) > 1 else None
+    if not event:
+        try:
+            event = json.loads(stdin_text or "{}").get("hook_event_name")
+        except (ValueError, AttributeError):
+            event = None
+    rc, out, err = dispatch(event, stdin_text)
+    if out:
+        sys.stdout.write(out)
+    if err:
+        sys.stderr.write(err)
+    sys.exit(rc)
+
+
+if __name__ == "__main__":
+    main()
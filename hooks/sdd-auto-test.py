@@ -9,6 +9,7 @@ Single GATE_TEST, no fast/slow split. Background execution + debounce = no block
 
 State shared with sdd-test-guard.py via /tmp/ files (keyed by project hash).
 """
+import functools
 import json
 import os
 import subprocess
@@ -25,17 +26,20 @@ from _sdd_detect import (
     is_source_file, is_test_file, is_test_running,
     kill_orphan_test_group, parse_test_summary,
     pid_path, read_coverage, read_state, record_file_edit,
-    release_runner_lock, run_in_process_group, test_pgid_path,
-    write_baseline, write_rerun_marker, write_skill_invoked, write_state,
+    release_runner_lock, rerun_requested_at, run_in_process_group,
+    test_pgid_path,
+    write_baseline, write_progress, write_rerun_marker, write_skill_invoked,
+    write_state,
 )
 import _sdd_config  # noqa: E402
+from _sdd_trace import traced_main  # noqa: E402
 
 
 # ─────────────────────────────────────────────────────────────────
 # BACKGROUND EXECUTION
 # ─────────────────────────────────────────────────────────────────
 
-def run_tests_background(cwd, command, sid=None):
+def run_tests_background(cwd, command, sid=None, rung=None):
     """Fork a detached subprocess to run tests in background.
 
     Coalescing design: at most 1 test process per project at any time.
@@ -58,7 +62,8 @@ def run_tests_background(cwd, command, sid=None):
 
     try:
         proc = subprocess.Popen(
-            [sys.executable, __file__, "--run-tests", cwd, command, sid or ""],
+            [sys.executable, __file__, "--run-tests", cwd, command, sid or "",
+             rung or ""],
             stdin=subprocess.DEVNULL,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
@@ -74,61 +79,305 @@ def run_tests_background(cwd, command, sid=None):
 from _sdd_config import MAX_RERUNS as _MAX_RERUNS  # noqa: E402
 
 
-def _run_tests_worker(cwd, command, sid=None):
+def _run_command(cwd, command, timeout, pgid_file, on_progress=None,
+                 usage=None):
+    """run_in_process_group, collecting per-test coverage when the impact
+    index is enabled (IMPACT_INDEX). A run rejected for want of pytest-cov
+    is repeated plain. Otherwise plain `pytest <args>` goes to the warm
+    server when WARM_RUNNER is on and one is up (no live progress and no
+    resource usage there). Returns its result plus whether coverage was
+    taken.
+    """
+    from _sdd_impact import coverage_plugin_missing, instrument
+    instrumented = instrument(cwd, command)
+    if instrumented is not None:
+        run_command, env = instrumented
+        rc, stdout, stderr, timed_out = run_in_process_group(
+            run_command, cwd, timeout, env=env, pgid_file=pgid_file,
+            on_progress=on_progress, usage=usage)
+        if timed_out or not coverage_plugin_missing(cwd, rc, stdout + stderr):
+            return rc, stdout, stderr, timed_out, not timed_out
+    else:
+        from _sdd_warm import run_warm
+        warm = run_warm(cwd, command, timeout, pgid_file)
+        if warm is not None:
+            return (*warm, False)
+    rc, stdout, stderr, timed_out = run_in_process_group(
+        command, cwd, timeout, pgid_file=pgid_file, on_progress=on_progress,
+        usage=usage)
+    return rc, stdout, stderr, timed_out, False
+
+
+def _replay_cached_result(cwd, hit, sid, started_at):
+    """Publish a memoized result (see _sdd_results) as this run's state."""
+    write_state(cwd, hit["passing"], hit["summary"],
+                raw_output=hit.get("raw_output") or "", started_at=started_at,
+                cached_duration=hit.get("duration") or 0)
+    append_telemetry(cwd, {
+        "event": "test_run_cached",
+        "passed": hit["passing"],
+        "saved_s": hit.get("duration"),
+    })
+    if sid and not baseline_path(cwd, sid).exists():
+        write_baseline(cwd, sid, hit["passing"], hit["summary"])
+
+
+def _run_failed_first(cwd, command, full_suite, timeout, pgid_file):
+    """Failed-first stage: run the last run's failing tests on their own
+    and publish the result as a partial state, so the agent hears whether
+    its fix worked before the full command finishes.
+
+    The stage gets three times its predicted duration (history rung
+    "failed-first"), else FAILED_FIRST_TIMEOUT_SHARE of the full run's
+    timeout; never more than that timeout, never under
+    FAILED_FIRST_MIN_TIMEOUT.
+    """
+    from _sdd_failed import quick_command
+    quick = quick_command(cwd, command, full_suite)
+    if quick is None:
+        return
+    from _sdd_history import predict, record_run
+    predicted = predict(cwd, quick, "failed-first")
+    budget = max(predicted["ewma"], predicted["p95"]) * 3 if predicted \
+        else timeout * _sdd_config.FAILED_FIRST_TIMEOUT_SHARE
+    quick_timeout = int(min(timeout, max(_sdd_config.FAILED_FIRST_MIN_TIMEOUT, budget)))
+    started_at = time.time()
+    rc, stdout, stderr, timed_out, _ = _run_command(cwd, quick, quick_timeout, pgid_file)
+    record_run(cwd, quick, "failed-first", time.time() - started_at)
+    if timed_out:
+        return
+    raw = (stdout + stderr)[-4096:]
+    passing = rc == 0
+    write_state(cwd, passing, parse_test_summary(raw.strip(), rc),
+                raw_output=raw, partial=True)
+    append_telemetry(cwd, {
+        "event": "test_run_partial",
+        "passed": passing,
+        "duration_s": round(time.time() - started_at, 2),
+    })
+
+
+def _await_quiet_period(cwd):
+    """Debounce ("restart" policy): hold the run until no edit has asked
+    for one in COALESCE_QUIET_SECONDS, for COALESCE_QUIET_MAX_WAIT at most.
+    """
+    deadline = time.time() + _sdd_config.COALESCE_QUIET_MAX_WAIT
+    while True:
+        requested = rerun_requested_at(cwd)
+        now = time.time()
+        if requested is None or now >= deadline:
+            return
+        wait = requested + _sdd_config.COALESCE_QUIET_SECONDS - now
+        if wait <= 0:
+            return
+        time.sleep(min(wait, deadline - now))
+
+
+def _restart_check(cwd, started_at, command=None, rung=None):
+    """should_abort for a pass under the "restart" policy, plus the
+    expected duration (the EWMA of command's history, else the last
+    complete run's; None when unknown).
+
+    Fires when a newer edit is waiting and less than
+    COALESCE_RESTART_FRACTION of the expected duration has elapsed —
+    always, when there is no duration to compare with.
+    """
+    from _sdd_history import predict
+    predicted = predict(cwd, command, rung) if rung is not None else None
+    expected = predicted["ewma"] if predicted \
+        else (read_state(cwd, max_age_seconds=7200) or {}).get("duration")
+
+    def _check():
+        if not has_rerun_marker(cwd):
+            return False
+        return not expected or (time.time() - started_at) / expected \
+            < _sdd_config.COALESCE_RESTART_FRACTION
+    return _check, expected
+
+
+def _cancel_when(cwd, should_abort):
+    """Watch a single-process run: once should_abort() is true, kill its
+    process group through the PGID file (again on every poll, in case the
+    run had not written it yet). Returns (stop, fired) events.
+    """
+    import threading
+    stop, fired = threading.Event(), threading.Event()
+
+    def _watch():
+        while not stop.wait(0.2):
+            if fired.is_set() or should_abort():
+                fired.set()
+                kill_orphan_test_group(cwd)
+    threading.Thread(target=_watch, daemon=True).start()
+    return stop, fired
+
+
+def _run_tests_worker(cwd, command, sid=None, rung=None):
     """Coalescing worker: run tests, check for pending edits, rerun if needed.
 
     Called when script is invoked with --run-tests flag.
     Loops up to _MAX_RERUNS+1 times to cover edits that arrive during execution.
+    Each pass starts with the failed-first stage (_run_failed_first).
+    Under the "restart" coalescing policy each pass waits for a quiet
+    period first, and a pass made stale early by a newer edit is killed
+    and started over instead of finished.
     State is project-scoped; baseline is session-scoped (write-once).
+    Timeouts and the restart check come from the duration history of
+    (command, rung); rung is the cascade's, "3" or "scoped" when unknown.
+    With HOST_SCHEDULER on, the whole loop runs in one host-wide slot
+    (_sdd_slots), queued by rung before the runner lock is taken.
     """
     if has_exit_suppression(command):
         write_state(cwd, False, "gate command has exit code suppression — remove || true")
         return
 
+    full_suite = command == detect_test_command(cwd)
+    rung = rung or ("3" if full_suite else "scoped")
+    # Queue before taking the runner lock: a TaskCompleted gate that finds
+    # the lock taken waits for this worker's result, not for its place in
+    # the queue.
+    from _sdd_slots import acquire, release
+    slot, slot_wait, queue_depth = acquire(cwd, rung)
+    if queue_depth is None:
+        return  # Another worker of this project is queued; it takes the rerun marker
+
     lock_fd = acquire_runner_lock(cwd)
     if lock_fd is None:
+        release(slot)
         return  # Another worker holds the lock
 
     try:
         pgid_file = str(test_pgid_path(cwd))
-        for _ in range(_MAX_RERUNS + 1):
+        restart = _sdd_config.get_coalesce_policy(cwd) == "restart"
+        for attempt in range(_MAX_RERUNS + 1):
+            if restart:
+                _await_quiet_period(cwd)
             clear_rerun_marker(cwd)
             kill_orphan_test_group(cwd)
 
             started_at = time.time()
-            timeout = adaptive_gate_timeout(cwd, default=120, max_timeout=300)
+            from _sdd_results import lookup, remember, result_key
+            key = result_key(cwd, command)
+            hit = lookup(cwd, key)
+            if hit is not None:
+                _replay_cached_result(cwd, hit, sid, started_at)
+                if has_rerun_marker(cwd):
+                    continue
+                break
+            timeout = adaptive_gate_timeout(cwd, default=120, max_timeout=300,
+                                            command=command, rung=rung)
             append_telemetry(cwd, {
                 "event": "test_run_start",
                 "command": command,
+                "queue_depth": queue_depth,
+                "slot_wait_s": slot_wait,
             })
             try:
-                rc, stdout, stderr, timed_out = run_in_process_group(
-                    command, cwd, timeout, pgid_file=pgid_file)
+                _run_failed_first(cwd, command, full_suite, timeout, pgid_file)
+                run_started = time.time()
+                progress = functools.partial(write_progress, cwd, command)
+                # The last pass always completes, so a stream of edits
+                # cannot keep the state from ever being written.
+                should_abort = expected = None
+                if restart and attempt < _MAX_RERUNS:
+                    should_abort, expected = _restart_check(
+                        cwd, run_started, command, rung)
+                sharded = reporting = report = None
+                usage = {}
+                if full_suite:
+                    from _sdd_shard import run_sharded
+                    sharded = run_sharded(
+                        cwd, command, timeout, pgid_file,
+                        should_abort=should_abort, on_progress=progress,
+                        usage=usage)
+                if sharded is not None:
+                    aborted = sharded.aborted
+                    rc, stdout, stderr, timed_out = sharded[:4]
+                    indexed = False
+                else:
+                    from _sdd_report import read_report, reporting_command
+                    reporting = reporting_command(cwd, command)
+                    if should_abort is not None:
+                        stop, fired = _cancel_when(cwd, should_abort)
+                    try:
+                        rc, stdout, stderr, timed_out, indexed = _run_command(
+                            cwd, reporting.command if reporting else command,
+                            timeout, pgid_file, on_progress=progress,
+                            usage=usage)
+                    finally:
+                        if should_abort is not None:
+                            stop.set()
+                    report = read_report(cwd, reporting, rc)
+                    aborted = should_abort is not None and fired.is_set()
+                if aborted:
+                    # expected covers the full command, not the failed-first stage.
+                    elapsed = time.time() - run_started
+                    cancelled = {
+                        "event": "test_run_aborted",
+                        "duration_s": round(time.time() - started_at, 2),
+                        "saved_s": round(max(0.0, expected - elapsed), 2)
+                        if expected else None,
+                    }
+                    if sharded is not None:
+                        cancelled["shards"] = sharded.shards
+                    append_telemetry(cwd, cancelled)
+                    continue
+                from _sdd_history import record_run
+                record_run(cwd, command, rung, time.time() - run_started)
                 if timed_out:
                     append_telemetry(cwd, {
                         "event": "test_run_end",
                         "passed": False,
                         "duration_s": round(time.time() - started_at, 2),
+                        **usage,
                     })
                     write_state(cwd, False, f"tests timed out ({timeout}s)",
                                 started_at=started_at)
                     continue
                 raw = stdout + stderr
+                if report and report["output"] is not None:
+                    raw = report["output"] + stderr
+                from _sdd_failed import record
+                if report:
+                    from _sdd_report import failing_ids, record_report
+                    from _sdd_report import summary as report_summary
+                    record(cwd, command, full_suite, rc, raw,
+                           ids=failing_ids(report, reporting.kind))
+                    record_report(cwd, command, report, full_suite)
+                else:
+                    record(cwd, command, full_suite, rc, raw)
                 if len(raw) > 8192:
                     raw = raw[-8192:]
                 passing = rc == 0
-                summary = parse_test_summary(raw.strip(), rc)
+                if sharded is not None:
+                    summary = sharded.summary
+                elif report:
+                    summary = report_summary(report)
+                else:
+                    summary = parse_test_summary(raw.strip(), rc)
                 raw_tail = raw[-4096:] if raw else ""
                 write_state(cwd, passing, summary,
-                            raw_output=raw_tail, started_at=started_at)
-                append_telemetry(cwd, {
+                            raw_output=raw_tail, started_at=started_at,
+                            failures=report["failures"] if report else None)
+                remember(cwd, command, key, passing, summary, raw_tail,
+                         duration=round(time.time() - started_at, 2))
+                end = {
                     "event": "test_run_end",
                     "passed": passing,
                     "duration_s": round(time.time() - started_at, 2),
-                })
+                    **usage,
+                }
+                if sharded is not None:
+                    end["shards"] = sharded.shards
+                append_telemetry(cwd, end)
                 # Baseline: session-scoped, write-once
                 if sid and not baseline_path(cwd, sid).exists():
                     write_baseline(cwd, sid, passing, summary)
+                if indexed:
+                    from _sdd_impact import update_index
+                    update_index(cwd)
+                from _sdd_imports import refresh
+                refresh(cwd)
             except OSError as e:
                 append_telemetry(cwd, {
                     "event": "test_run_end",
@@ -142,6 +391,7 @@ def _run_tests_worker(cwd, command, sid=None):
             if not has_rerun_marker(cwd):
                 break
     finally:
+        release(slot)
         release_runner_lock(lock_fd, cwd)
 
 
@@ -187,6 +437,10 @@ def format_feedback(state):
     + pure-pass summary), trust the summary and render `[PASS]`. The
     inverse (`passing=True` + failure-bearing summary) is left alone:
     silencing a real failure is worse than rendering an extra one.
+
+    A partial state (failed-first stage) says which subset it covers and,
+    when it passes, that the full run is still pending. A failing state
+    with `failures` (structured report) lists them, one per line.
     """
     if not state:
         return None
@@ -201,9 +455,17 @@ def format_feedback(state):
     if not passing and _summary_indicates_pure_pass(summary):
         passing = True
     icon = "[PASS]" if passing else "[FAIL]"
-    msg = f"SDD Auto-Test {icon}: {summary}"
+    if state.get("partial"):
+        msg = f"SDD Auto-Test {icon} (previously failing tests): {summary}"
+        if passing:
+            return msg + " — full run in progress."
+    else:
+        msg = f"SDD Auto-Test {icon}: {summary}"
     if not passing:
         msg += " — fix implementation before continuing."
+        if state.get("failures"):
+            from _sdd_report import failure_lines
+            msg += "".join(f"\n  {line}" for line in failure_lines(state))
     return msg
 
 
@@ -212,13 +474,24 @@ def format_feedback(state):
 # ─────────────────────────────────────────────────────────────────
 
 def main():
-    """Hook entry point (PostToolUse). ~10ms blocking."""
+    """Hook entry point (PostToolUse). ~10ms blocking.
+
+    With --run-tests, the background worker instead. Only hook mode is
+    traced (SDD_TRACE): a worker run is not hook latency.
+    """
     # Worker mode: invoked with --run-tests
     if len(sys.argv) >= 4 and sys.argv[1] == "--run-tests":
         worker_sid = sys.argv[4] if len(sys.argv) > 4 and sys.argv[4] else None
-        _run_tests_worker(sys.argv[2], sys.argv[3], worker_sid)
+        worker_rung = sys.argv[5] if len(sys.argv) > 5 and sys.argv[5] else None
+        from _sdd_slots import deprioritize
+        deprioritize(sys.argv[2])
+        _run_tests_worker(sys.argv[2], sys.argv[3], worker_sid, worker_rung)
         return
+    _hook_main()
+
 
+@traced_main("sdd-auto-test")
+def _hook_main():
     # Hook mode: read stdin
     try:
         input_data = json.loads(sys.stdin.read())
@@ -295,17 +568,9 @@ def main():
     previous = read_state(cwd)
     msg = None
 
-    # Rung 2 signals an SDD-ordering violation; surface it to the agent
-    # as a passive context signal (Law 1: no decision to retrieve it).
-    if ordering_warning:
-        msg = (
-            "[SDD:ORDERING] source edited without session tests — "
-            "fast-path fell back to stack-native impacted command. "
-            "Author tests first to enter Rung 1b (session-scoped)."
-        )
-    elif previous and not previous.get("passing"):
+    if previous and (not previous.get("passing") or previous.get("partial")):
         msg = format_feedback(previous)
-    elif not (previous and previous.get("passing")):
+    elif not ordering_warning and not (previous and previous.get("passing")):
         # Legacy ordering nudge when fast-path is off: same signal, older phrasing
         cov = read_coverage(cwd, sid=sid)
         if cov and cov.get("source_files") and not cov.get("test_files"):
@@ -314,6 +579,17 @@ def main():
                 "Define test scenarios before continuing with implementation."
             )
 
+    # Rung 2 signals an SDD-ordering violation; surface it to the agent
+    # as a passive context signal (Law 1: no decision to retrieve it).
+    # It follows failure feedback rather than hiding it.
+    if ordering_warning:
+        ordering = (
+            "[SDD:ORDERING] source edited without session tests — "
+            "fast-path fell back to stack-native impacted command. "
+            "Author tests first to enter Rung 1b (session-scoped)."
+        )
+        msg = f"{msg}\n\n{ordering}" if msg else ordering
+
     # Telemetry: every queued run. Meta PTS-style — data before tuning.
     append_telemetry(cwd, {
         "event": "test_run_queued",
@@ -330,7 +606,7 @@ def main():
     if not is_test_running(cwd):
         command = scoped_command or detect_test_command(cwd)
         if command and not has_exit_suppression(command):
-            run_tests_background(cwd, command, sid)
+            run_tests_background(cwd, command, sid, rung=fast_path_rung)
 
     # Report feedback as additionalContext (visible to Claude, not just user)
     if msg:
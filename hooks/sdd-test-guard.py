@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """SDD Test Guard hook — holdout protection against reward hacking.
 
-PreToolUse (Edit|Write): before editing a test file, verify that tests are
-currently failing AND the edit reduces assertion count → DENY.
+PreToolUse (Edit|MultiEdit|Write): before editing a test file, verify that
+tests are currently failing AND the edit reduces assertion count → DENY.
+Only the changed hunks are compared (Write is diffed against disk once).
 
 This prevents the AI from weakening tests to make failing code appear correct.
 StrongDM: "Not M/M → fix code, never weaken scenarios."
@@ -15,6 +16,7 @@ Decision matrix:
 
 State shared with sdd-auto-test.py via /tmp/ files (keyed by project hash).
 """
+import functools
 import hashlib
 import json
 import os
@@ -22,7 +24,6 @@ import re
 import subprocess
 import sys
 import time
-from fnmatch import fnmatch
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
@@ -36,11 +37,11 @@ from _sdd_scenarios import (
     check_amend_marker, current_file_hash, has_pending_scenarios,
     scenario_baseline_hash, scenario_files,
 )
-from _sdd_state import project_hash
+from _sdd_state import _store, project_hash
 from _sdd_config import get_scenario_discovery_roots
-from _amend_protocol import (
-    AmendDecision, evaluate_amend_request, read_proposals,
-)
+from _sdd_trace import span, traced_main
+# _amend_protocol (dataclasses, difflib, hmac) is imported inside the amend
+# helpers: only scenario-file edits reach it, every other Edit skips the cost.
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -71,24 +72,31 @@ PRECISE_ASSERTION_RE = re.compile(
 
 CRITICAL_PATHS_FILE = ".claude/critical-paths.md"
 
-_TRIPLE_QUOTED_RE = re.compile(
-    r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'',
+# Single-pass scanner (see _scan_text). Triple-quoted strings,
+# single/double-quoted literals and `#` comments are classified in ONE
+# left-to-right pass — whichever construct opens first wins — so
+# `# do NOT use assert True` (comment) and
+# `msg = "expect(true).toBe(true) demo"` (literal) never reach the
+# tautology patterns. The leading lookahead lets the regex engine skip
+# every position that cannot open one of them.
+_STRIP_RE = re.compile(
+    r"(?=[\"'#])(?:"
+    r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\''              # triple-quoted
+    r'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''    # single/double-quoted
+    r"|(?<!\\)#[^\n]*)"                                    # comment
 )
 
-# Comments and single/double-quoted string literals — stripped before the
-# tautology scan so `# do NOT use assert True` (comment) and
-# `msg = "expect(true).toBe(true) demo"` (literal) don't trigger.
-# Triple-quoted bodies are handled separately (above).
-_PY_COMMENT_RE = re.compile(r"(?<!\\)#[^\n]*")
-_SQ_DQ_STRING_RE = re.compile(
-    r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'',
-)
+# ASSERTION_RE behind a first-character filter: every alternative starts
+# with one of these characters, so the counts are identical.
+_ASSERTION_SCAN_RE = re.compile(r"(?=[.adet#@])(?:" + ASSERTION_RE.pattern + r")")
 
 # Tautology patterns. A1 (SCEN-303/304):
 #   * `assert True` matches only when the statement TERMINATES (newline,
 #     end-of-string, semicolon, or `#` tail, optionally with a `, "msg"`
 #     trailer). `assert True == X` and `assert True is not None` carry
-#     real comparison semantics and must NOT match.
+#     real comparison semantics and must NOT match. The word boundary
+#     sits in a lookbehind so the pattern opens with a literal and the
+#     engine can jump between `assert` occurrences.
 #   * Patterns flagged ``scan="stripped"`` run after `_strip_docstrings`
 #     (triple-quoted strings + single/double-quoted literals + `#`
 #     comments removed). Patterns flagged ``scan="raw"`` run on the
@@ -99,7 +107,7 @@ _TAUTOLOGICAL_PATTERNS = [
     (
         "assert True",
         re.compile(
-            r"\bassert\s+True\s*"
+            r"assert(?<=\bassert)\s+True\s*"
             r"(?:,\s*[^\n;]*)?"   # optional `, "message"`
             r"\s*(?:#[^\n]*)?"     # optional `# comment` tail
             r"\s*(?:$|;|\n)",      # statement terminator
@@ -110,7 +118,7 @@ _TAUTOLOGICAL_PATTERNS = [
     (
         "assert 1 == 1",
         re.compile(
-            r"\bassert\s+1\s*==\s*1\s*"
+            r"assert(?<=\bassert)\s+1\s*==\s*1\s*"
             r"(?:,\s*[^\n;]*)?"
             r"\s*(?:#[^\n]*)?"
             r"\s*(?:$|;|\n)",
@@ -160,9 +168,10 @@ _SKIP_DECORATOR_RE = re.compile(
 # SCENARIO GUARD PATTERNS (Phase 3)
 # ─────────────────────────────────────────────────────────────────
 
-# Bash write to .claude/scenarios/ — regex matches the write verbs that
-# would bypass the Edit/Write write-once guard. Read-only commands
-# (cat, diff, grep, head, tail, less, more, file) are NOT matched.
+# Bash write to .claude/scenarios/ — _sdd_shell lexes the command into
+# statements and matches the write verbs that would bypass the Edit/Write
+# write-once guard (SCENARIO_WRITE_RE). Read-only commands (cat, diff,
+# grep, head, tail, less, more, file) are NOT matched.
 #
 # Known bypasses (out of scope for this pragmatic threat model — SPEC 3.5):
 #   * arbitrary scripts: `python -c "..."`, `perl -i`, custom binaries
@@ -173,128 +182,24 @@ _SKIP_DECORATOR_RE = re.compile(
 #     the amend-marker: raises cost, not a security boundary.
 # These are acknowledged; hardening requires the Strong threat model
 # (external scenario store + sandboxed validator — SPEC 3.5 roadmap).
-#
-# False-positive note (P1, fix/bash-scenarios-regex-false-positive):
-# The verb-prefixed alternatives below originally used `>` directly,
-# which greedily matched the `>` inside `2>&1`, `>&2`, and `&>`. That
-# misclassified read-only pipelines like
-#   `echo "src diffs" ; diff -r a b 2>&1 | grep -v "...docs/specs"`
-# as scenario writes. The redirect token is now narrowed to a *file*
-# redirect — not preceded by a digit (rules out `2>`, `1>`) and not
-# followed by `&` (rules out `>&2`). Numeric-fd redirects that DO
-# write to a scenario file (`echo x 1> path.scenarios.md`) are still
-# caught by the catch-all `>\s*...scenarios` alternative below.
-_BASH_SCENARIO_WRITE_RE = re.compile(
-    r"(?:"
-    r"sed\s+-i"                       # in-place sed (handles -ibackup too)
-    r"|cat\s+[^|]*(?<!\d)>(?!\s*&)"   # cat > or cat << > (heredoc) — file redirect only
-    r"|\btee\b"                       # tee (with or without -a)
-    r"|\bcp\b"                        # copy into scenarios
-    r"|\bmv\b"                        # move into scenarios
-    r"|\brm\b"                        # delete scenario file
-    r"|\bln\b"                        # hardlink/symlink into scenarios
-    r"|echo\s+[^|]*(?<!\d)>(?!\s*&)"  # echo > / >> — not 2>&1, not >&2
-    r"|printf\s+[^|]*(?<!\d)>(?!\s*&)"  # printf > — not 2>&1, not >&2
-    r"|dd\s+[^|]*of="                 # dd of=
-    r"|>\s*[^&|;]*/scenarios/[^/\s&|;]*\.scenarios\.md"  # any redirect to a scenario file
-    r")"
-)
-
-# git commit detection — word-boundary anchored so lookalikes
-# (`git commit-wrapper`, `my-git commit`) are excluded.
-_BASH_GIT_COMMIT_RE = re.compile(r"(?<![\w-])git\s+commit(?![\w-])")
-
-# Quoted-literal stripper: we do not want `echo "git commit"` to trip
-# the guard when inspecting a Bash command string.
-_QUOTED_LITERAL_RE = re.compile(r"'[^']*'|\"[^\"]*\"")
-
-# Heredoc body stripper (A2, SCEN-305).
-#
-# Bash heredoc grammar accepted here:
-#   ``<<TAG\n...body...\nTAG``           — unquoted tag, body inert for our purpose
-#   ``<<-TAG\n...body...\n[\t]*TAG``     — leading-tab strip variant
-#   ``<<'TAG'`` / ``<<"TAG"``            — quoted tag (no parameter expansion);
-#                                          the closing line is the bare TAG word
-#
-# Body content is replaced by spaces of equal length so command offsets
-# remain stable for any downstream regex. Stripping must precede
-# `_strip_quoted` because a heredoc body can contain unbalanced quotes
-# (``recordame: it's done``) that would otherwise confuse the
-# quoted-literal regex.
-#
-# Limitation: this is a heuristic, not a full Bash parser. Nested
-# heredocs, here-strings (``<<<``), and process substitution are
-# acknowledged out of scope (same threat-model class as `_bash_is_git_commit`
-# command-substitution false negatives — see `__no scope creep` notes).
-_HEREDOC_RE = re.compile(
-    r"<<-?\s*"                   # `<<` or `<<-`
-    r"(?P<q>['\"]?)"             # optional opening quote on tag
-    r"(?P<tag>[A-Za-z_][\w-]*)"  # tag identifier
-    r"(?P=q)"                    # matching closing quote
-    r"[^\n]*\n"                  # rest of the opening line (e.g. ` > out`)
-    r"(?P<body>(?:.*\n)*?)"      # body lines (non-greedy)
-    r"\s*(?P=tag)\b",            # closing tag line (leading ws allowed for `<<-`)
-)
-
-
-def _strip_heredocs(command):
-    """Replace each heredoc body with spaces, preserving length/offsets.
-
-    Closing tag line is also blanked so a `git commit` that legitimately
-    appears INSIDE the closing-tag line (rare) is treated as inert; in
-    practice the closing tag is `EOF` / `END` and contains no command.
-    """
-    if not command or "<<" not in command:
-        return command
-
-    def _blank(match):
-        full = match.group(0)
-        return " " * len(full)
-
-    return _HEREDOC_RE.sub(_blank, command)
-
-
-def _strip_quoted(command):
-    """Return command with single/double quoted literals replaced by spaces.
-
-    Keeps offsets stable enough for regex scans without losing comment tails.
-    Does not attempt to track shell escaping perfectly — good enough for
-    heuristic detection of `git commit` vs. `echo "git commit"`.
-    """
-    return _QUOTED_LITERAL_RE.sub(lambda m: " " * len(m.group(0)), command)
-
-
-_SCENARIO_PATH_TOKEN_RE = re.compile(
-    # Path-shaped token (no whitespace, no shell metachars, no quotes)
-    # that EITHER ends in `.scenarios.md` OR contains a `/scenarios/`
-    # directory segment. Anchored on a non-path boundary so substrings
-    # of larger words don't match.
-    r"(?<![\w./-])"
-    r"([\w.-]+(?:/[\w.-]+)*"
-    r"(?:/scenarios/[\w.-]+\.scenarios\.md|/scenarios/?|\.scenarios\.md))"
-    r"(?![\w./-])"
-)
-
-
-_BASH_STATEMENT_SEP_RE = re.compile(r"&&|\|\|?|;|\n|&(?!&)")
 
 
 def _bash_writes_scenarios(command, cwd):
     """True iff the Bash command writes into a scenario file.
 
-    Detection (A3, SCEN-306; hardened by Bundle 5):
+    Detection (A3, SCEN-306; hardened by Bundle 5), on the statements
+    _sdd_shell.lex produces:
 
-    1. Strip heredoc bodies — paths and verbs in heredoc bodies are
-       inert text data, not active commands.
-    2. Strip ``#`` comments — verbs/paths inside a shell comment are
-       documentation, not actions.
-    3. Split into statements on ``&&``, ``||``, ``|``, ``;``, ``\\n``,
-       and single ``&`` (background). A write-verb in statement A
-       combined with a scenario path in statement B does NOT trigger
-       — they must coincide in the SAME statement.
-    4. For each statement: write-verb match (``_BASH_SCENARIO_WRITE_RE``)
-       AND a path-token (``_SCENARIO_PATH_TOKEN_RE``) that sits under a
-       configured discovery root.
+    1. Heredoc bodies and ``#`` comments are dropped — paths and verbs
+       there are inert text, not active commands.
+    2. Statements split on ``&&``, ``||``, ``|``, ``;``, newlines and
+       single ``&`` (background) outside quotes. A write-verb in
+       statement A combined with a scenario path in statement B does
+       NOT trigger — they must coincide in the SAME statement.
+    3. Per statement: a write-verb match (``SCENARIO_WRITE_RE``) AND a
+       path-token (``SCENARIO_PATH_TOKEN_RE``), or a file redirect whose
+       target is a path-token. The token must sit under a configured
+       discovery root.
 
     Quoted literals are intentionally NOT stripped: ``cat > "foo.scenarios.md"``
     is a legitimate write target.
@@ -304,42 +209,28 @@ def _bash_writes_scenarios(command, cwd):
     roots = get_scenario_discovery_roots(cwd)
     if not roots:
         return False
-    stripped = _strip_heredocs(command)
-    # Drop shell `#` comments (matches the strip in `_bash_is_git_commit`).
-    stripped = re.sub(r"(?<!\\)#[^\n]*", "", stripped)
-    statements = _BASH_STATEMENT_SEP_RE.split(stripped)
-    for stmt in statements:
-        if not _BASH_SCENARIO_WRITE_RE.search(stmt):
-            continue
-        for match in _SCENARIO_PATH_TOKEN_RE.finditer(stmt):
-            token = match.group(1)
-            for root in roots:
-                normalized = root.rstrip("/") + "/"
-                if token == root or token.startswith(normalized):
-                    return True
+    from _sdd_shell import summarize
+    for token in summarize(command)[1]:
+        for root in roots:
+            normalized = root.rstrip("/") + "/"
+            if token == root or token.startswith(normalized):
+                return True
     return False
 
 
 def _bash_is_git_commit(command):
     """True iff the Bash command invokes `git commit` (variants included).
 
-    Matches: `git commit`, `git commit -m`, `git commit --amend`, etc.
-    Excludes: `git commit-wrapper`, `my-git commit`, shell comments,
-    quoted `"git commit"` literals, heredoc bodies (A2, SCEN-305).
-
-    Strip order matters:
-      1. heredoc bodies — may contain unbalanced quotes that would
-         otherwise confuse the quoted-literal regex.
-      2. quoted literals — `"git commit"` and `'git commit'` are inert.
-      3. `#` comments — `# git commit` is documentation, not a command.
+    Matches: `git commit`, `git commit -m`, `git commit --amend`, and
+    the same inside `$(...)` or backticks. Excludes: `git commit-wrapper`,
+    `my-git commit`, shell comments, quoted `"git commit"` literals,
+    heredoc bodies (A2, SCEN-305) — `git` and `commit` must be adjacent
+    words of one statement (see _sdd_shell).
     """
     if not command:
         return False
-    stripped = _strip_heredocs(command)
-    stripped = _strip_quoted(stripped)
-    # Drop shell comments (# to end of line)
-    stripped = re.sub(r"(?<!\\)#[^\n]*", "", stripped)
-    return bool(_BASH_GIT_COMMIT_RE.search(stripped))
+    from _sdd_shell import summarize
+    return summarize(command)[0]
 
 
 _WORKTREE_CACHE: dict = {}  # cwd → bool; per-process cache keyed by resolved cwd
@@ -353,6 +244,10 @@ def _is_git_worktree(cwd):
     (the shared dir, i.e. `<main>/.git`). In the main clone these are
     identical; in a linked worktree they differ.
 
+    The same answer is read from `.git` in-process first (a gitfile whose
+    gitdir has a `commondir` is a linked worktree); git is only asked
+    when the layout is one _sdd_git does not handle.
+
     Cached per-cwd — worktree identity doesn't change within a process.
     Returns False (fail-open) on any git subprocess failure: safer to
     let legitimate authoring through than to lock out a broken clone.
@@ -360,15 +255,21 @@ def _is_git_worktree(cwd):
     key = str(Path(cwd).resolve()) if cwd else ""
     if key in _WORKTREE_CACHE:
         return _WORKTREE_CACHE[key]
+    from _sdd_git import UNKNOWN, is_linked_worktree
+    result = is_linked_worktree(cwd) if cwd else UNKNOWN
+    if result is not UNKNOWN:
+        _WORKTREE_CACHE[key] = result
+        return result
     try:
-        git_dir = subprocess.run(
-            ["git", "-C", str(cwd), "rev-parse", "--git-dir"],
-            capture_output=True, text=True, timeout=3,
-        )
-        common_dir = subprocess.run(
-            ["git", "-C", str(cwd), "rev-parse", "--git-common-dir"],
-            capture_output=True, text=True, timeout=3,
-        )
+        with span("git"):
+            git_dir = subprocess.run(
+                ["git", "-C", str(cwd), "rev-parse", "--git-dir"],
+                capture_output=True, text=True, timeout=3,
+            )
+            common_dir = subprocess.run(
+                ["git", "-C", str(cwd), "rev-parse", "--git-common-dir"],
+                capture_output=True, text=True, timeout=3,
+            )
         if git_dir.returncode != 0 or common_dir.returncode != 0:
             result = False
         else:
@@ -386,15 +287,21 @@ def _is_git_worktree(cwd):
 def _is_scenario_tracked(cwd, rel):
     """True iff rel is tracked by git in cwd.
 
-    Uses `git ls-files --error-unmatch` which returns non-zero for
-    untracked paths. Fail-open on git failure (treat as tracked so we
-    don't over-block).
+    Answered from the index in-process when possible; otherwise uses
+    `git ls-files --error-unmatch` which returns non-zero for untracked
+    paths. Fail-open on git failure (treat as tracked so we don't
+    over-block).
     """
+    from _sdd_git import UNKNOWN, is_tracked
+    tracked = is_tracked(cwd, rel)
+    if tracked is not UNKNOWN:
+        return tracked
     try:
-        result = subprocess.run(
-            ["git", "-C", str(cwd), "ls-files", "--error-unmatch", rel],
-            capture_output=True, text=True, timeout=3,
-        )
+        with span("git"):
+            result = subprocess.run(
+                ["git", "-C", str(cwd), "ls-files", "--error-unmatch", rel],
+                capture_output=True, text=True, timeout=3,
+            )
         return result.returncode == 0
     except (OSError, subprocess.TimeoutExpired):
         return True
@@ -547,21 +454,34 @@ def _predict_scenario_post_edit_hash(abs_path, tool_name, tool_input):
 _AMEND_ATTEMPTS_MAX = 2
 
 
+def _amend_attempts_key(sid, scenario_rel):
+    rel_hash = hashlib.md5(scenario_rel.encode("utf-8")).hexdigest()[:12]
+    return f"{sid}-{rel_hash}"
+
+
 def _amend_attempts_path(cwd, sid, scenario_rel):
     """Per-(session,scenario) counter file. Project + sid + scenario hash
     keys ensure attempts on different scenarios in the same session do
     not collide, and attempts in different sessions stay isolated.
+
+    With the SQLite backend the counter is an "amend-attempts" record
+    under the same sid + scenario hash key instead.
     """
     if not sid:
         return None
     import tempfile
-    rel_hash = hashlib.md5(scenario_rel.encode("utf-8")).hexdigest()[:12]
     return Path(tempfile.gettempdir()) / (
-        f"sdd-amend-attempts-{project_hash(cwd)}-{sid}-{rel_hash}"
+        f"sdd-amend-attempts-{project_hash(cwd)}-"
+        f"{_amend_attempts_key(sid, scenario_rel)}"
     )
 
 
 def _read_amend_attempts(cwd, sid, scenario_rel):
+    store = _store(cwd)
+    if store is not None and sid:
+        data = store.get(cwd, "amend-attempts", _amend_attempts_key(sid, scenario_rel))
+        count = (data or {}).get("count", 0)
+        return count if isinstance(count, int) else 0
     p = _amend_attempts_path(cwd, sid, scenario_rel)
     if p is None or not p.exists():
         return 0
@@ -572,6 +492,10 @@ def _read_amend_attempts(cwd, sid, scenario_rel):
 
 
 def _reset_amend_attempts(cwd, sid, scenario_rel):
+    store = _store(cwd)
+    if store is not None and sid:
+        store.delete(cwd, "amend-attempts", _amend_attempts_key(sid, scenario_rel))
+        return
     p = _amend_attempts_path(cwd, sid, scenario_rel)
     if p is not None:
         try:
@@ -601,10 +525,20 @@ def _increment_amend_attempts(cwd, sid, scenario_rel):
     — the framework is POSIX-only in practice but the fallback prevents
     import errors on cross-platform tooling. Returns the post-increment
     value, or the pre-increment value on persistence failure.
+
+    With the SQLite backend the bump is one write transaction
+    (_sdd_store.update), which serializes concurrent callers the same way.
     """
     p = _amend_attempts_path(cwd, sid, scenario_rel)
     if p is None:
         return 0
+    store = _store(cwd)
+    if store is not None:
+        def _bump(data):
+            count = data.get("count", 0)
+            return {"count": (count if isinstance(count, int) else 0) + 1}
+        store.update(cwd, "amend-attempts", _amend_attempts_key(sid, scenario_rel), _bump)
+        return _read_amend_attempts(cwd, sid, scenario_rel)
     try:
         import fcntl
     except ImportError:
@@ -731,6 +665,7 @@ def _load_amend_request(cwd, tool_input, sid, scenario_rel):
             break
     if discovery_root is None:
         return None, None
+    from _amend_protocol import read_proposals
     try:
         candidates = read_proposals(cwd, goal, discovery_root)
     except Exception:  # noqa: BLE001 — disk fallback must not crash hook
@@ -878,7 +813,8 @@ def _write_amend_marker(cwd, scenario_rel, decision=None):
     return marker
 
 
-def _evaluate_amend_via_protocol(cwd, scenario_rel, amend_request, sid, proposal_mtime=None):
+def _evaluate_amend_via_protocol(cwd, scenario_rel, amend_request, sid, proposal_mtime=None,
+                                 git=None):
     """Run the four-gate evaluation on a hook-loaded amend_request.
 
     `proposal_mtime` MUST come from a non-proposer-controlled source:
@@ -897,6 +833,7 @@ def _evaluate_amend_via_protocol(cwd, scenario_rel, amend_request, sid, proposal
     Agent spawn, so Gate 2 fails closed by design here. The leader's
     supervision loop (Step 6) is the path that produces autonomous PASS.
     """
+    from _amend_protocol import evaluate_amend_request
     payload = amend_request or {}
     return evaluate_amend_request(
         cwd=cwd,
@@ -909,6 +846,7 @@ def _evaluate_amend_via_protocol(cwd, scenario_rel, amend_request, sid, proposal
         proposer_role=payload.get("proposer_role", "teammate"),
         proposal_mtime=proposal_mtime,
         judge_callable=None,
+        git=git,
     )
 
 
@@ -932,59 +870,187 @@ def _record_guard_trigger(cwd, category, tool_name, file_path):
 # ASSERTION COUNTING
 # ─────────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=4)
+def _scan_text(text):
+    """Scan text once for everything the guard asks of it.
+
+    Returns (assertions, precise, stripped, tautology):
+    * assertions / precise — ASSERTION_RE and PRECISE_ASSERTION_RE counts
+      over the raw text (tokens inside strings and comments still count,
+      as they always have).
+    * stripped — text with strings and comments removed by _STRIP_RE.
+    * tautology — every _TAUTOLOGICAL_PATTERNS category that matches, in
+      pattern order (see _find_tautological_test_addition).
+
+    Cached on the text so the tautology gate, analyze_edit and
+    count_precise share one scan of a large Write payload.
+    """
+    stripped = _STRIP_RE.sub("", text)
+    tautology = []
+    for category, pattern, scan in _TAUTOLOGICAL_PATTERNS:
+        match = pattern.search(stripped if scan == "stripped" else text)
+        if not match:
+            continue
+        if (
+            category == "empty test function"
+            and _empty_test_decorated_skip(text, match)
+        ):
+            continue
+        tautology.append(category)
+    return (
+        len(_ASSERTION_SCAN_RE.findall(text)),
+        len(PRECISE_ASSERTION_RE.findall(text)),
+        stripped,
+        tuple(tautology),
+    )
+
+
 def count_assertions(text):
     """Count assertion-like patterns in text."""
     if not text:
         return 0
-    return len(ASSERTION_RE.findall(text))
+    return _scan_text(text)[0]
 
 
 def count_precise(text):
     """Count assertions that compare against concrete values."""
     if not text:
         return 0
-    return len(PRECISE_ASSERTION_RE.findall(text))
+    return _scan_text(text)[1]
 
 
 # ─────────────────────────────────────────────────────────────────
 # EDIT ANALYSIS
 # ─────────────────────────────────────────────────────────────────
 
-def analyze_edit(tool_name, tool_input):
-    """Analyze an Edit or Write to determine assertion count change.
+# Unchanged lines kept around each hunk, so a tautology spanning a changed
+# and an unchanged line (`def test_x():` above a new `pass`) is still seen.
+_HUNK_CONTEXT = 3
 
-    Returns (old_count, new_count, old_text, new_text).
-    """
-    if tool_name == "Edit":
-        old_text = tool_input.get("old_string", "")
-        new_text = tool_input.get("new_string", "")
-        return count_assertions(old_text), count_assertions(new_text), old_text, new_text
+# Past this many differing lines (after trimming the common head and tail)
+# a Write is analyzed as one hunk instead of being line-diffed.
+_HUNK_DIFF_MAX_LINES = 2000
 
-    if tool_name == "Write":
-        file_path = tool_input.get("file_path", "")
-        new_text = tool_input.get("content", "")
-        new_count = count_assertions(new_text)
 
-        # Read existing file to compare
-        try:
-            old_text = Path(file_path).read_text(encoding="utf-8")
-            old_count = count_assertions(old_text)
-        except (FileNotFoundError, OSError):
-            # New file — no old assertions to compare
-            return 0, new_count, "", new_text
+def _diff_hunks(old_text, new_text):
+    """Split an old → new change into [(old_region, new_region), ...].
 
-        return old_count, new_count, old_text, new_text
+    Common leading and trailing lines are dropped first (a single
+    comparison pass), then the remaining lines are diffed with
+    _HUNK_CONTEXT lines of context per hunk. Identical texts yield [].
+    Each region keeps its line endings, so joined regions count the same
+    as the changed part of the full text.
+    """
+    if old_text == new_text:
+        return []
+    old_lines = old_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    head = 0
+    limit = min(len(old_lines), len(new_lines))
+    while head < limit and old_lines[head] == new_lines[head]:
+        head += 1
+    tail = 0
+    limit -= head
+    while tail < limit and old_lines[-1 - tail] == new_lines[-1 - tail]:
+        tail += 1
+    lo = max(head - _HUNK_CONTEXT, 0)
+    old_mid = old_lines[lo:len(old_lines) - max(tail - _HUNK_CONTEXT, 0)]
+    new_mid = new_lines[lo:len(new_lines) - max(tail - _HUNK_CONTEXT, 0)]
+    if max(len(old_mid), len(new_mid)) > _HUNK_DIFF_MAX_LINES:
+        return [("".join(old_mid), "".join(new_mid))]
+    import difflib
+    matcher = difflib.SequenceMatcher(None, old_mid, new_mid)
+    return [
+        ("".join(old_mid[group[0][1]:group[-1][2]]),
+         "".join(new_mid[group[0][3]:group[-1][4]]))
+        for group in matcher.get_grouped_opcodes(_HUNK_CONTEXT)
+    ]
 
-    return 0, 0, "", ""
 
+def _edit_hunks(tool_name, tool_input):
+    """Changed regions of an Edit, MultiEdit or Write payload.
 
-def _extract_new_text(tool_name, tool_input):
-    """Extract the newly introduced text from an Edit/Write payload."""
+    Edit and MultiEdit diff each old_string → new_string pair, so the
+    cost follows the size of the edit, not of the test file. Write diffs
+    the content against the file on disk once; a new file is one hunk.
+    Other tools yield [].
+    """
     if tool_name == "Edit":
-        return tool_input.get("new_string", "")
+        return _diff_hunks(tool_input.get("old_string") or "",
+                           tool_input.get("new_string") or "")
+    if tool_name == "MultiEdit":
+        edits = tool_input.get("edits")
+        if not isinstance(edits, list):
+            return []
+        hunks = []
+        for edit in edits:
+            if isinstance(edit, dict):
+                hunks.extend(_diff_hunks(edit.get("old_string") or "",
+                                         edit.get("new_string") or ""))
+        return hunks
     if tool_name == "Write":
-        return tool_input.get("content", "")
-    return ""
+        new_text = tool_input.get("content") or ""
+        try:
+            old_text = Path(tool_input.get("file_path", "")).read_text(
+                encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            old_text = ""
+        return _diff_hunks(old_text, new_text)
+    return []
+
+
+def analyze_edit(tool_name, tool_input, hunks=None):
+    """Analyze an Edit, MultiEdit or Write to determine assertion count change.
+
+    Only the changed hunks are counted (see _edit_hunks); pass hunks to
+    reuse ones already computed for this payload.
+
+    Returns (old_count, new_count, old_text, new_text), where the texts
+    are the old and new sides of the hunks, joined.
+    """
+    if hunks is None:
+        hunks = _edit_hunks(tool_name, tool_input)
+    old_text = "".join(old for old, _ in hunks)
+    new_text = "".join(new for _, new in hunks)
+    return count_assertions(old_text), count_assertions(new_text), old_text, new_text
+
+
+def _tautology_counts(text):
+    """{category: number of matches} of _TAUTOLOGICAL_PATTERNS in text."""
+    stripped = _scan_text(text)[2]
+    counts = {}
+    for category, pattern, scan in _TAUTOLOGICAL_PATTERNS:
+        for match in pattern.finditer(stripped if scan == "stripped" else text):
+            if (
+                category == "empty test function"
+                and _empty_test_decorated_skip(text, match)
+            ):
+                continue
+            counts[category] = counts.get(category, 0) + 1
+    return counts
+
+
+def _find_tautological_hunk(hunks):
+    """First tautology category added by a hunk, or None.
+
+    A category counts as added when the new side of a hunk has more
+    matches of it than the old side: a tautology in the context lines,
+    or rewritten in place, is pre-existing, but a second `assert True`
+    next to an unchanged one is not.
+    """
+    for old, new in hunks:
+        if not new:
+            continue
+        found = _scan_text(new)[3]
+        if not found:
+            continue
+        if not old:
+            return found[0]
+        before, after = _tautology_counts(old), _tautology_counts(new)
+        for category in found:
+            if after.get(category, 0) > before.get(category, 0):
+                return category
+    return None
 
 
 def _strip_docstrings(text):
@@ -994,20 +1060,14 @@ def _strip_docstrings(text):
     A1 (SCEN-303): pre-Fix-A1 only triple-quoted strings were stripped, so
     `# do NOT use assert True here` (comment) and `msg = "expect(true).toBe(true)"`
     (string literal) tripped the tautology gate. Stripping those constructs
-    keeps the regex limited to executable code positions. Order matters:
-    triple-quoted first (so `'''...''' # comment` keeps the docstring intact
-    rather than swallowing internal apostrophes), then `#` comments (so a
-    `#` inside a single-line string is preserved by string stripping below),
-    then single/double-quoted literals.
+    keeps the regex limited to executable code positions. _STRIP_RE
+    classifies left to right, so whichever construct opens first wins: a
+    `#` inside a string is not a comment, quotes inside a comment or a
+    docstring do not open a string.
     """
     if not text:
         return ""
-    stripped = _TRIPLE_QUOTED_RE.sub("", text)
-    # Strip quoted literals BEFORE comments so `"foo # bar"` is not
-    # truncated at the embedded `#`.
-    stripped = _SQ_DQ_STRING_RE.sub("", stripped)
-    stripped = _PY_COMMENT_RE.sub("", stripped)
-    return stripped
+    return _scan_text(text)[2]
 
 
 def _empty_test_decorated_skip(new_text, match):
@@ -1060,19 +1120,8 @@ def _find_tautological_test_addition(new_text):
     """
     if not new_text:
         return None
-    stripped = _strip_docstrings(new_text)
-    for category, pattern, scan in _TAUTOLOGICAL_PATTERNS:
-        target = stripped if scan == "stripped" else new_text
-        match = pattern.search(target)
-        if not match:
-            continue
-        if (
-            category == "empty test function"
-            and _empty_test_decorated_skip(new_text, match)
-        ):
-            continue
-        return category
-    return None
+    found = _scan_text(new_text)[3]
+    return found[0] if found else None
 
 
 def _is_tautological_test_addition(new_text):
@@ -1082,37 +1131,21 @@ def _is_tautological_test_addition(new_text):
 
 def _load_critical_paths(cwd):
     """Read critical path patterns from .claude/critical-paths.md."""
-    path = Path(cwd) / CRITICAL_PATHS_FILE
-    if not path.is_file():
-        return []
-    try:
-        lines = path.read_text(encoding="utf-8").splitlines()
-    except (OSError, UnicodeDecodeError):
-        return []
-    return [
-        line.strip()
-        for line in lines
-        if line.strip() and not line.strip().startswith("#")
-    ]
+    from _sdd_critical import read_patterns
+    return read_patterns(Path(cwd) / CRITICAL_PATHS_FILE)
 
 
 def _matches_critical_path(file_rel, patterns):
     """True if file_rel matches any configured critical-path glob."""
-    rel_path = Path(file_rel)
-    for pattern in patterns:
-        if fnmatch(file_rel, pattern) or rel_path.match(pattern):
-            return True
-        if pattern.endswith("/**"):
-            prefix = pattern[:-3].rstrip("/")
-            if file_rel == prefix or file_rel.startswith(prefix + "/"):
-                return True
-    return False
+    from _sdd_critical import matcher_for
+    return matcher_for(tuple(patterns)).match(file_rel)
 
 
 # ─────────────────────────────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────────────────────────────
 
+@traced_main("sdd-test-guard")
 def main():
     """Hook entry point (PreToolUse). ~1ms non-test, ~5ms test files."""
     try:
@@ -1167,70 +1200,106 @@ def main():
                     f"If you ARE the leader, run this action on the main "
                     f"clone (not the worktree)."
                 )
-            baseline = scenario_baseline_hash(cwd, rel)
-            if baseline is not None:
-                # Defense-in-depth: check BOTH current disk state and the
-                # predicted post-edit state. PreToolUse fires BEFORE the
-                # tool applies, so disk still equals baseline — the disk
-                # check alone cannot catch tool-driven divergence. Simulate
-                # applying tool_input to predict the post-edit hash.
-                # (Dogfood A1 surfaced this: guard silently passed.)
-                try:
-                    disk_bytes = abs_path.read_bytes()
-                except OSError:
-                    disk_bytes = None
-                malformed = _malformed_scenario_edit_reason(
-                    tool_name, tool_input, disk_bytes,
-                )
-                if malformed and not check_amend_marker(cwd, rel, sid=sid):
-                    _record_guard_trigger(cwd, "SCENARIO", tool_name, file_path)
-                    _fail(
-                        f"scenario write-once — malformed edit on {rel}\n\n"
-                        f"Simulator cannot verify: {malformed}.\n"
-                        f"Reject to preserve contract. Provide a valid edit "
-                        f"payload or invoke sop-reviewer for an amend."
+            # One `git cat-file --batch` coprocess serves every object
+            # lookup below (baseline blob, HEAD for amend markers, the
+            # amend protocol's evidence reads).
+            from _sdd_git import GitObjectReader
+            with GitObjectReader(cwd) as git:
+                baseline = scenario_baseline_hash(cwd, rel, git)
+                if baseline is not None:
+                    # Defense-in-depth: check BOTH current disk state and the
+                    # predicted post-edit state. PreToolUse fires BEFORE the
+                    # tool applies, so disk still equals baseline — the disk
+                    # check alone cannot catch tool-driven divergence. Simulate
+                    # applying tool_input to predict the post-edit hash.
+                    # (Dogfood A1 surfaced this: guard silently passed.)
+                    try:
+                        disk_bytes = abs_path.read_bytes()
+                    except OSError:
+                        disk_bytes = None
+                    malformed = _malformed_scenario_edit_reason(
+                        tool_name, tool_input, disk_bytes,
                     )
-                current = current_file_hash(abs_path)
-                disk_diverges = current is not None and current != baseline
-                predicted = _predict_scenario_post_edit_hash(
-                    abs_path, tool_name, tool_input,
-                )
-                predict_diverges = (
-                    predicted is not None and predicted != baseline
-                )
-                if disk_diverges or predict_diverges:
-                    if not check_amend_marker(cwd, rel, sid=sid):
-                        # Step 3: amend protocol intercepts divergence.
-                        # If the proposer carried an amend_request (inline
-                        # tool_input or disk fallback), evaluate it. PASS
-                        # → write marker + allow this Edit. FAIL → block
-                        # with Format R escalation.
-                        amend_request, proposal_mtime = _load_amend_request(
-                            cwd, tool_input, sid, rel,
+                    if malformed and not check_amend_marker(cwd, rel, sid=sid, git=git):
+                        _record_guard_trigger(cwd, "SCENARIO", tool_name, file_path)
+                        _fail(
+                            f"scenario write-once — malformed edit on {rel}\n\n"
+                            f"Simulator cannot verify: {malformed}.\n"
+                            f"Reject to preserve contract. Provide a valid edit "
+                            f"payload or invoke sop-reviewer for an amend."
                         )
-                        if amend_request is not None:
-                            decision = _evaluate_amend_via_protocol(
-                                cwd, rel, amend_request, sid,
-                                proposal_mtime=proposal_mtime,
+                    current = current_file_hash(abs_path)
+                    disk_diverges = current is not None and current != baseline
+                    predicted = _predict_scenario_post_edit_hash(
+                        abs_path, tool_name, tool_input,
+                    )
+                    predict_diverges = (
+                        predicted is not None and predicted != baseline
+                    )
+                    if disk_diverges or predict_diverges:
+                        if not check_amend_marker(cwd, rel, sid=sid, git=git):
+                            # Step 3: amend protocol intercepts divergence.
+                            # If the proposer carried an amend_request (inline
+                            # tool_input or disk fallback), evaluate it. PASS
+                            # → write marker + allow this Edit. FAIL → block
+                            # with Format R escalation.
+                            amend_request, proposal_mtime = _load_amend_request(
+                                cwd, tool_input, sid, rel,
                             )
-                            if decision.approved:
-                                _write_amend_marker(cwd, rel, decision=decision)
-                                _reset_amend_attempts(cwd, sid, rel)
-                                # Fall through — Edit is permitted; the
-                                # newly-written marker satisfies the next
-                                # check_amend_marker call from any peer
-                                # hook in this PreToolUse cycle.
+                            if amend_request is not None:
+                                decision = _evaluate_amend_via_protocol(
+                                    cwd, rel, amend_request, sid,
+                                    proposal_mtime=proposal_mtime, git=git,
+                                )
+                                if decision.approved:
+                                    _write_amend_marker(cwd, rel, decision=decision)
+                                    _reset_amend_attempts(cwd, sid, rel)
+                                    # Fall through — Edit is permitted; the
+                                    # newly-written marker satisfies the next
+                                    # check_amend_marker call from any peer
+                                    # hook in this PreToolUse cycle.
+                                else:
+                                    # Bump counter — a rejected amend_request
+                                    # still consumes one of the SCEN-219
+                                    # STOP-after-2 budget. Otherwise an agent
+                                    # could spam malformed proposals forever
+                                    # (Fix 5A: pre-Fix-5 the rejected branch
+                                    # incremented but never enforced the
+                                    # ceiling — agent could switch from
+                                    # no-amend to malformed-amend to bypass
+                                    # the STOP-after-2 invariant).
+                                    attempts = _increment_amend_attempts(cwd, sid, rel)
+                                    if attempts >= _AMEND_ATTEMPTS_MAX:
+                                        _record_guard_trigger(
+                                            cwd, "ATTEMPTS", tool_name, file_path,
+                                        )
+                                        append_telemetry(cwd, {
+                                            "event": "amend_attempts_exhausted",
+                                            "scenario_rel": rel,
+                                            "attempts": attempts,
+                                            "via": "rejected_amend",
+                                        })
+                                        _fail(
+                                            f"amend-proposal required — "
+                                            f"{_AMEND_ATTEMPTS_MAX} attempts exhausted on "
+                                            f"{rel}; rejected proposals consume the "
+                                            f"budget. End session and escalate via Format R.",
+                                            category="ATTEMPTS",
+                                        )
+                                    _record_guard_trigger(
+                                        cwd, "SCENARIO", tool_name, file_path,
+                                    )
+                                    _fail(
+                                        "amend protocol rejected — see escalation\n\n"
+                                        + _format_r_skeleton(rel, decision),
+                                        category="AMEND_R",
+                                    )
                             else:
-                                # Bump counter — a rejected amend_request
-                                # still consumes one of the SCEN-219
-                                # STOP-after-2 budget. Otherwise an agent
-                                # could spam malformed proposals forever
-                                # (Fix 5A: pre-Fix-5 the rejected branch
-                                # incremented but never enforced the
-                                # ceiling — agent could switch from
-                                # no-amend to malformed-amend to bypass
-                                # the STOP-after-2 invariant).
-                                attempts = _increment_amend_attempts(cwd, sid, rel)
+                                # Hook-enforced 2-attempt counter (SCEN-219):
+                                # if the same (sid, scenario_rel) has already
+                                # exhausted attempts, demand a proposal before
+                                # any further Edit.
+                                attempts = _read_amend_attempts(cwd, sid, rel)
                                 if attempts >= _AMEND_ATTEMPTS_MAX:
                                     _record_guard_trigger(
                                         cwd, "ATTEMPTS", tool_name, file_path,
@@ -1239,69 +1308,38 @@ def main():
                                         "event": "amend_attempts_exhausted",
                                         "scenario_rel": rel,
                                         "attempts": attempts,
-                                        "via": "rejected_amend",
                                     })
                                     _fail(
                                         f"amend-proposal required — "
                                         f"{_AMEND_ATTEMPTS_MAX} attempts exhausted on "
-                                        f"{rel}; rejected proposals consume the "
-                                        f"budget. End session and escalate via Format R.",
+                                        f"{rel}; construct amend_request, write to "
+                                        f".ralph/specs/<goal>/amend-proposals/, "
+                                        f"end session",
                                         category="ATTEMPTS",
                                     )
+                                # Bump counter — every divergence attempt
+                                # without an amend_request consumes one of the
+                                # SCEN-219 STOP-after-2 budget. The next call
+                                # with the same (sid, scenario_rel) hits the
+                                # `attempts >= _AMEND_ATTEMPTS_MAX` branch above.
+                                _increment_amend_attempts(cwd, sid, rel)
                                 _record_guard_trigger(
                                     cwd, "SCENARIO", tool_name, file_path,
                                 )
                                 _fail(
-                                    "amend protocol rejected — see escalation\n\n"
-                                    + _format_r_skeleton(rel, decision),
-                                    category="AMEND_R",
+                                    f"scenario write-once violation on {rel}\n\n"
+                                    f"The scenario file would diverge from its git "
+                                    f"baseline (disk_diverges={disk_diverges}, "
+                                    f"predict_diverges={predict_diverges}).\n"
+                                    f"To amend a scenario, attach an `amend_request` "
+                                    f"payload to your Edit tool_input (or write a "
+                                    f"proposal under "
+                                    f".ralph/specs/<goal>/amend-proposals/) and "
+                                    f"re-issue the Edit.\n"
+                                    f"For sop-reviewer manual amends, create an "
+                                    f"amend marker at:\n"
+                                    f"  <scenario_parent>/.amends/<name>-<HEAD_SHA>.marker"
                                 )
-                        else:
-                            # Hook-enforced 2-attempt counter (SCEN-219):
-                            # if the same (sid, scenario_rel) has already
-                            # exhausted attempts, demand a proposal before
-                            # any further Edit.
-                            attempts = _read_amend_attempts(cwd, sid, rel)
-                            if attempts >= _AMEND_ATTEMPTS_MAX:
-                                _record_guard_trigger(
-                                    cwd, "ATTEMPTS", tool_name, file_path,
-                                )
-                                append_telemetry(cwd, {
-                                    "event": "amend_attempts_exhausted",
-                                    "scenario_rel": rel,
-                                    "attempts": attempts,
-                                })
-                                _fail(
-                                    f"amend-proposal required — "
-                                    f"{_AMEND_ATTEMPTS_MAX} attempts exhausted on "
-                                    f"{rel}; construct amend_request, write to "
-                                    f".ralph/specs/<goal>/amend-proposals/, "
-                                    f"end session",
-                                    category="ATTEMPTS",
-                                )
-                            # Bump counter — every divergence attempt
-                            # without an amend_request consumes one of the
-                            # SCEN-219 STOP-after-2 budget. The next call
-                            # with the same (sid, scenario_rel) hits the
-                            # `attempts >= _AMEND_ATTEMPTS_MAX` branch above.
-                            _increment_amend_attempts(cwd, sid, rel)
-                            _record_guard_trigger(
-                                cwd, "SCENARIO", tool_name, file_path,
-                            )
-                            _fail(
-                                f"scenario write-once violation on {rel}\n\n"
-                                f"The scenario file would diverge from its git "
-                                f"baseline (disk_diverges={disk_diverges}, "
-                                f"predict_diverges={predict_diverges}).\n"
-                                f"To amend a scenario, attach an `amend_request` "
-                                f"payload to your Edit tool_input (or write a "
-                                f"proposal under "
-                                f".ralph/specs/<goal>/amend-proposals/) and "
-                                f"re-issue the Edit.\n"
-                                f"For sop-reviewer manual amends, create an "
-                                f"amend marker at:\n"
-                                f"  <scenario_parent>/.amends/<name>-<HEAD_SHA>.marker"
-                            )
 
     # ─── BASH SCENARIO MODIFICATION GUARD (Phase 3) ───────────────
     # Bash commands that write to a scenarios directory bypass Edit/Write
@@ -1353,8 +1391,10 @@ def main():
                 )
 
     if tool_name in ("Edit", "Write", "MultiEdit"):
-        patterns = _load_critical_paths(cwd)
-        if patterns:
+        # Compiled once per critical-paths.md revision (see _sdd_critical).
+        from _sdd_critical import load_matcher
+        matcher = load_matcher(cwd, CRITICAL_PATHS_FILE)
+        if matcher is not None:
             try:
                 resolved_cwd = Path(cwd).resolve(strict=False)
                 fp = Path(file_path)
@@ -1363,7 +1403,7 @@ def main():
                 rel_fp = fp.resolve(strict=False).relative_to(resolved_cwd).as_posix()
             except (ValueError, OSError):
                 rel_fp = None
-            if rel_fp and _matches_critical_path(rel_fp, patterns):
+            if rel_fp and matcher.match(rel_fp):
                 print(
                     f"SDD Guard: critical path touched — {rel_fp}\n"
                     f"Matches a pattern in {CRITICAL_PATHS_FILE}. Consider "
@@ -1408,10 +1448,9 @@ def main():
     if not is_test_file(file_path, cwd=cwd):
         sys.exit(0)
 
-    if tool_name in ("Edit", "Write"):
-        taut_kind = _find_tautological_test_addition(
-            _extract_new_text(tool_name, tool_input)
-        )
+    hunks = _edit_hunks(tool_name, tool_input)
+    if hunks:
+        taut_kind = _find_tautological_hunk(hunks)
         if taut_kind:
             _record_guard_trigger(cwd, "GATE", tool_name, file_path)
             _fail(
@@ -1428,12 +1467,15 @@ def main():
     if state is None:
         sys.exit(0)
 
-    # Tests passing → allow (refactoring is fine)
-    if state.get("passing", False):
+    # Tests passing → allow (refactoring is fine). A partial pass covers
+    # only the previously failing tests, not the suite.
+    if state.get("passing", False) and not state.get("partial"):
         sys.exit(0)
 
     # Tests failing → check assertion count and precision
-    old_count, new_count, old_text, new_text = analyze_edit(tool_name, tool_input)
+    with span("analyze_edit"):
+        old_count, new_count, old_text, new_text = analyze_edit(
+            tool_name, tool_input, hunks)
 
     if new_count < old_count:
         # DENY: reward hacking detected
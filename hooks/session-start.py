@@ -4,6 +4,8 @@
 Also cleans up orphan SDD test workers and stale temp files from
 previous sessions. Workers are detached (start_new_session=True)
 and survive terminal close — cleanup here prevents accumulation.
+Scenario baselines are pre-warmed by a detached child of this script
+(`session-start.py --prewarm-baselines <project_dir>`).
 """
 import filecmp
 import hashlib
@@ -212,6 +214,10 @@ def sync_all_files(plugin_root, project_dir):
             )
 
 
+_STORE_PREFIX = "sdd-store-"
+PREWARM_FLAG = "--prewarm-baselines"
+
+
 def cleanup_stale_sdd(max_age=86400):
     """Purge stale SDD temp files to prevent inode accumulation.
 
@@ -223,14 +229,71 @@ def cleanup_stale_sdd(max_age=86400):
     """
     tmpdir = Path(tempfile.gettempdir())
     now = time.time()
+    stores = {}  # SQLite store base path → newest mtime of db/-wal/-shm
     for f in tmpdir.glob("sdd-*"):
         if f.is_dir():
             continue
         try:
-            if now - os.stat(f).st_mtime > max_age:
+            mtime = os.stat(f).st_mtime
+            if f.name.startswith(_STORE_PREFIX):
+                # A store is removed as a unit: deleting the db while its
+                # -wal is live would replay that WAL into a fresh db.
+                base = str(f).split(".sqlite3", 1)[0] + ".sqlite3"
+                stores[base] = max(stores.get(base, 0.0), mtime)
+            elif now - mtime > max_age:
                 f.unlink(missing_ok=True)
         except OSError:
             pass
+    for base, mtime in stores.items():
+        if now - mtime <= max_age:
+            continue
+        for suffix in ("-wal", "-shm", ""):
+            try:
+                Path(base + suffix).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def purge_state_store(project_dir):
+    """Drop expired rows from the project's SQLite state store.
+
+    Only when the project uses the SQLite backend — the files backend is
+    covered by cleanup_stale_sdd(). Indexed on expires, so this stays
+    cheap regardless of how many teammates wrote to the store.
+    """
+    try:
+        from _sdd_config import get_state_backend
+        if get_state_backend(str(project_dir)) != "sqlite":
+            return
+        import _sdd_store
+        _sdd_store.purge_expired(str(project_dir))
+    except Exception:
+        pass
+
+
+def spawn_baseline_prewarm(project_dir):
+    """Warm the scenario baseline cache in a detached child process.
+
+    sdd-test-guard checks every scenario edit against the file's first-add
+    hash; computing that cold walks the full history. The child does the
+    walk once per session in the background so SessionStart returns
+    immediately. Skipped when the project has no scenario files.
+    """
+    try:
+        from _sdd_scenarios import scenario_files
+        if not scenario_files(str(project_dir)):
+            return
+        import subprocess  # lazy: the cleanup path never spawns
+        subprocess.Popen(
+            [sys.executable, "-B", str(Path(__file__).resolve()),
+             PREWARM_FLAG, str(project_dir)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except Exception:
+        pass
 
 
 def cleanup_resolved_amend_proposals(project_dir, max_age=86400):
@@ -319,6 +382,8 @@ def main():
 
     try:
         project_dir = find_project_dir()
+        purge_state_store(project_dir)
+        spawn_baseline_prewarm(project_dir)
         cleanup_resolved_amend_proposals(project_dir)
         plugin_root_env = os.environ.get("CLAUDE_PLUGIN_ROOT")
         plugin_root = Path(plugin_root_env) if plugin_root_env else find_plugin_root()
@@ -349,4 +414,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) == 3 and sys.argv[1] == PREWARM_FLAG:
+        from _sdd_scenarios import prewarm_baseline_cache
+        prewarm_baseline_cache(sys.argv[2])
+    else:
+        main()
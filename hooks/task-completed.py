@@ -32,12 +32,13 @@ sys.path.insert(0, str(Path(__file__).resolve().parent))
 from _sdd_detect import (
     acquire_runner_lock, adaptive_gate_timeout, append_telemetry,
     await_test_completion,
-    can_trust_state, clear_baseline, clear_coverage, compute_uncovered,
+    can_trust_state, clear_baseline, clear_coverage, clear_skill_invoked,
+    compute_uncovered,
     detect_coverage_command, detect_test_command, extract_session_id,
     has_exit_suppression, is_test_running, kill_orphan_test_group,
     parse_test_summary, project_hash, read_baseline, read_coverage,
     read_skill_invoked, read_state, release_runner_lock, run_in_process_group,
-    skill_invoked_path, test_pgid_path, write_state,
+    test_pgid_path, write_state,
 )
 from _sdd_scenarios import (
     parse_scenarios,
@@ -178,12 +179,21 @@ def _validate_gate_command(name, command):
     return None
 
 
+def _gate_rung(name):
+    """Duration-history rung of a gate: the test gate runs the full suite."""
+    return "3" if name == "test" else f"gate:{name}"
+
+
 def run_gate(name, command, cwd, timeout=None):
     """Run a single quality gate.
 
-    Timeout strategy: adaptive from historical test duration (3× last run,
-    clamped [30s, 300s]). Falls back to 60s on first run. Caller can
-    override with explicit timeout for budget-constrained gates.
+    Timeout strategy: adaptive from this gate's duration history (3× the
+    larger of EWMA and p95, clamped [30s, 300s]; see _sdd_history).
+    Falls back to the last run, then 120s. Caller can override with
+    explicit timeout for budget-constrained gates. Every run that was
+    not served from the result cache is added to the history and emits a
+    gate_run telemetry event with its CPU time, peak RSS and block I/O
+    (_sdd_rusage), which the mission report ranks gates by.
 
     Uses process groups via run_in_process_group() — timeout kills the
     entire process tree, preventing orphan child processes.
@@ -198,16 +208,58 @@ def run_gate(name, command, cwd, timeout=None):
     if error:
         return False, error
 
+    rung = _gate_rung(name)
     if timeout is None:
-        timeout = adaptive_gate_timeout(cwd)
+        timeout = adaptive_gate_timeout(cwd, command=command, rung=rung)
+
+    key = reporting = None
+    if name == "test":
+        # Opt-in memoization: a tree this command already ran on gets
+        # the recorded result back (see _sdd_results).
+        from _sdd_results import lookup, remember, result_key
+        key = result_key(cwd, command)
+        hit = lookup(cwd, key)
+        if hit is not None:
+            output = (hit.get("raw_output") or hit["summary"]).strip()
+            if len(output) > 800:
+                output = "...\n" + output[-800:]
+            return hit["passing"], output
+        from _sdd_report import read_report, reporting_command
+        reporting = reporting_command(cwd, command)
 
     kill_orphan_test_group(cwd)
     try:
+        started = time.time()
+        usage = {}
         rc, stdout, stderr, timed_out = run_in_process_group(
-            command, cwd, timeout, pgid_file=str(test_pgid_path(cwd)))
+            reporting.command if reporting else command, cwd, timeout,
+            pgid_file=str(test_pgid_path(cwd)), usage=usage)
+        from _sdd_history import record_run
+        record_run(cwd, command, rung, time.time() - started)
+        append_telemetry(cwd, {
+            "event": "gate_run",
+            "gate": name,
+            "passed": rc == 0 and not timed_out,
+            "timed_out": timed_out,
+            "duration_s": round(time.time() - started, 2),
+            **usage,
+        })
+        report = read_report(cwd, reporting, rc) if reporting else None
         if timed_out:
             return False, f"Gate '{name}' timed out after {timeout}s"
+        if report:
+            # Summary and failures from the runner's own report, not the tail.
+            from _sdd_report import failure_lines, summary
+            output = "\n".join([summary(report), *failure_lines(report)])
+            if key is not None:
+                remember(cwd, command, key, rc == 0, summary(report), output,
+                         duration=round(time.time() - started, 2))
+            return rc == 0, output
         output = (stdout + stderr).strip()
+        if key is not None:
+            remember(cwd, command, key, rc == 0,
+                     parse_test_summary(output, rc), output[-4096:],
+                     duration=round(time.time() - started, 2))
         # Truncate to last 800 chars for readable feedback
         if len(output) > 800:
             output = "...\n" + output[-800:]
@@ -319,6 +371,7 @@ _UNCOVERED_RESOLUTION = (
 
 
 from _sdd_config import NEGATIVE_CACHE_TTL as _NEGATIVE_CACHE_TTL  # noqa: E402
+from _sdd_trace import traced_main  # noqa: E402
 
 
 def _negative_cache_path(cwd):
@@ -449,7 +502,8 @@ def _try_cached_test_gate(cwd, sid, max_age=30):
     else:
         state = read_state(cwd, max_age_seconds=max_age)
 
-    if not state:
+    # A partial state covers only the failed-first subset of a run
+    if not state or state.get("partial"):
         return False, False, ""
 
     # Trust check: does state cover this session's edits?
@@ -772,6 +826,19 @@ def _enforce_skill_invoked(cwd, teammate_name, task_subject, sid):
     )
 
 
+def _wait_for_runner(cwd):
+    """Runner lock taken: wait for that run's result. Returns (lock_fd, state).
+
+    A partial state means only the worker's failed-first subset finished
+    (the full run was aborted or restarted): no verdict either way. The
+    lock is tried again so the gate can run fresh; state is then None.
+    """
+    state = await_test_completion(cwd, timeout=60)
+    if state and state.get("partial"):
+        return acquire_runner_lock(cwd), None
+    return None, state
+
+
 def _run_gate_loop(cwd, sid, ralph_dir, teammate_name, task_subject,
                     gates, gate_budget, gate_start):
     """Execute configured gates in order with budget + adaptive timeout.
@@ -810,13 +877,24 @@ def _run_gate_loop(cwd, sid, ralph_dir, teammate_name, task_subject,
                 category="GATE",
             )
 
-        max_gate = adaptive_gate_timeout(cwd) if gate_name == "test" else 120
+        # Sized from the gate's own duration history (never above what is
+        # left of the budget). No hard fail on a prediction: the test gate
+        # may still be served by a running worker or a cached result, and
+        # a timed-out run counts in the history at its timeout.
+        rung = _gate_rung(gate_name)
+        if gate_name == "test":
+            max_gate = adaptive_gate_timeout(cwd, command=gate_cmd, rung=rung)
+        else:
+            from _sdd_history import predict
+            max_gate = adaptive_gate_timeout(cwd, command=gate_cmd, rung=rung) \
+                if predict(cwd, gate_cmd, rung) else 120
         gate_timeout = min(max_gate, int(remaining))
 
         if gate_name == "test":
             lock_fd = acquire_runner_lock(cwd)
             if lock_fd is None:
-                state = await_test_completion(cwd, timeout=60)
+                lock_fd, state = _wait_for_runner(cwd)
+            if lock_fd is None:
                 if state and state.get("passing"):
                     continue
                 elif state:
@@ -917,10 +995,7 @@ def _teardown_success(cwd, ralph_dir, teammate_name, sid):
     """
     _atomic_update_failures(ralph_dir, teammate_name, "reset")
     for _skill in ("sop-code-assist", "sop-reviewer"):
-        try:
-            skill_invoked_path(cwd, _skill, sid).unlink(missing_ok=True)
-        except OSError:
-            pass
+        clear_skill_invoked(cwd, _skill, sid)
     if sid:
         clear_baseline(cwd, sid)
 
@@ -942,7 +1017,8 @@ def _handle_non_ralph_completion(cwd, task_subject, sid=None):
             lock_fd = acquire_runner_lock(cwd)
             if lock_fd is None:
                 # Another runner holds the lock — wait for its result
-                state = await_test_completion(cwd, timeout=60)
+                lock_fd, state = _wait_for_runner(cwd)
+            if lock_fd is None:
                 if state and state.get("passing"):
                     pass  # cached passing — continue
                 elif state:
@@ -981,6 +1057,7 @@ def _handle_non_ralph_completion(cwd, task_subject, sid=None):
 # MAIN
 # ─────────────────────────────────────────────────────────────────
 
+@traced_main("task-completed")
 def main():
     """Main hook logic."""
     try:
@@ -30,6 +30,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 from _sdd_detect import _parse_utc_timestamp
+from _sdd_trace import traced_main
 
 
 _PLUGIN_ROOT = Path(__file__).resolve().parent.parent
@@ -109,6 +110,7 @@ def read_failures(ralph_dir, max_age_seconds=7200):
     return {}
 
 
+@traced_main("teammate-idle")
 def main():
     """Main hook logic."""
     # Read input from stdin (hook protocol)
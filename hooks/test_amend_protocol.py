@@ -634,3 +634,39 @@ def test_audit_gate_fails_closed_when_telemetry_persistence_fails(repo, monkeypa
     event_names = [e.get("event") for e in persisted_events]
     assert "amend_autonomous" in event_names
     assert "amend_audit_fail" in event_names
+
+
+def test_evaluation_shares_cat_file_processes(repo, monkeypatch):
+    """HEAD, the scenario at HEAD and the class A blob are read through
+    `git cat-file --batch-check` / `--batch` coprocesses — no per-lookup
+    git forks."""
+    import _sdd_git
+
+    spawned = []
+    real_popen = _sdd_git.subprocess.Popen
+
+    def _counting_popen(cmd, *args, **kwargs):
+        spawned.append(cmd)
+        return real_popen(cmd, *args, **kwargs)
+
+    def _no_run(*_args, **_kwargs):
+        raise AssertionError("evaluation must not fork git per lookup")
+
+    monkeypatch.setattr(_sdd_git.subprocess, "Popen", _counting_popen)
+    monkeypatch.setattr(subprocess, "run", _no_run)
+    decision = evaluate_amend_request(
+        cwd=repo["cwd"],
+        scenario_rel=repo["scen_rel"],
+        proposed_content=_happy_proposed_content(repo["scen_content"]),
+        premortem="If wrong, revert via git revert; blast radius single scenario file.",
+        evidence_artifact={
+            "path": repo["scen_rel"],
+            "class": "git_tracked_at_head",
+            "metadata": {},
+        },
+        base_head_sha=repo["head_sha"],
+        base_file_hash=repo["file_hash"],
+        judge_callable=_permissive_judge,
+    )
+    assert decision.gate_verdicts.get("evidence") == "PASS"
+    assert sorted(cmd[-1] for cmd in spawned) == ["--batch", "--batch-check"]
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Unit tests for the hook latency benchmark harness (_hook_bench.py).
+
+The end-to-end benchmark run lives in test_perf_benchmarks.py behind
+PHASE7_PERF=1; these tests cover the statistics, regression comparison,
+fixture layout and hook coverage without timing anything.
+"""
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _hook_bench as bench
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(bench.percentile(samples, 50), 50)
+        self.assertEqual(bench.percentile(samples, 95), 95)
+        self.assertEqual(bench.percentile(samples, 99), 99)
+        self.assertEqual(bench.percentile(samples, 100), 100)
+
+    def test_small_and_empty_samples(self):
+        self.assertEqual(bench.percentile([7.0], 99), 7.0)
+        self.assertEqual(bench.percentile([], 50), 0.0)
+
+    def test_summarize_keys(self):
+        stats = bench.summarize([1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(stats["runs"], 4)
+        self.assertEqual(stats["p50"], 2.0)
+        self.assertEqual(stats["p99"], 4.0)
+        self.assertEqual(stats["mean"], 2.5)
+
+
+class TestCompare(unittest.TestCase):
+
+    def _doc(self, **results):
+        return {"results": results}
+
+    def test_regression_beyond_tolerance_and_delta(self):
+        base = self._doc(k={"p50": 50.0, "p95": 60.0})
+        cur = self._doc(k={"p50": 80.0, "p95": 61.0})
+        regressions = bench.compare(cur, base, tolerance=0.25, min_delta_ms=5)
+        self.assertEqual([(r["key"], r["metric"]) for r in regressions],
+                         [("k", "p50")])
+
+    def test_small_absolute_delta_is_noise(self):
+        base = self._doc(k={"p50": 2.0, "p95": 2.0})
+        cur = self._doc(k={"p50": 4.0, "p95": 4.0})
+        self.assertEqual(bench.compare(cur, base, tolerance=0.25, min_delta_ms=5), [])
+
+    def test_keys_missing_on_either_side_ignored(self):
+        base = self._doc(old={"p50": 10.0, "p95": 10.0})
+        cur = self._doc(new={"p50": 999.0, "p95": 999.0})
+        self.assertEqual(bench.compare(cur, base), [])
+
+    def test_committed_baseline_is_well_formed(self):
+        baseline = json.loads(bench.DEFAULT_BASELINE.read_text(encoding="utf-8"))
+        self.assertIn("meta", baseline)
+        for key, stats in baseline["results"].items():
+            script, case, size, mode = key.split(":")
+            self.assertIn(mode, ("cold", "warm"))
+            for metric in ("p50", "p95", "p99", "import_ms", "logic_ms"):
+                self.assertIn(metric, stats, key)
+
+
+class TestCoverage(unittest.TestCase):
+
+    def test_every_registered_python_hook_has_a_case(self):
+        covered = {script for script, _, _ in bench.CASES}
+        self.assertEqual(set(bench.registered_hook_scripts()) - covered, set())
+
+
+class TestFixture(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="sdd-bench-unit-"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_layout(self):
+        bench.build_fixture(self.root, 25, git=False)
+        sources = list((self.root / "src").rglob("mod_*.py"))
+        tests = list((self.root / "tests").glob("test_mod_*.py"))
+        scenarios = list((self.root / bench.SCENARIO_REL_DIR).glob("*.scenarios.md"))
+        self.assertEqual(len(sources), 25)
+        self.assertEqual(len(tests), 3)
+        self.assertEqual(len(scenarios), 1)
+
+    def test_case_payloads_target_existing_files(self):
+        bench.build_fixture(self.root, 10, git=False)
+        for script, case, make_payload in bench.CASES:
+            target = make_payload(str(self.root)).get("tool_input", {}).get("file_path")
+            if target:
+                self.assertTrue(Path(target).exists(), f"{script}:{case}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Tests for the opt-in hook daemon (_hook_daemon.py) and the in-process
+runtime it dispatches through (_hook_runtime.py).
+
+Contract under test: a hook served by the daemon produces the same
+(rc, stdout, stderr) as the spawn path, process-global state is restored
+after each call, and every daemon miss falls back to the spawn path.
+"""
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import unittest.mock
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _hook_daemon
+import _hook_runtime
+import _sdd_config
+from _sdd_detect import write_state
+from _subprocess_harness import cleanup_all_state, invoke_hook
+
+
+def _short_tmpdir():
+    # AF_UNIX paths are limited to ~104 bytes; keep socket dirs short.
+    return tempfile.mkdtemp(prefix="hd-", dir="/tmp")
+
+
+class TestIsHookScript(unittest.TestCase):
+
+    def test_accepts_registered_hook(self):
+        self.assertTrue(_hook_runtime.is_hook_script("sdd-test-guard.py"))
+
+    def test_rejects_paths_private_and_tests(self):
+        for name in ("../sdd-test-guard.py", "/etc/passwd.py",
+                     "_sdd_state.py", "test_sdd_state.py",
+                     "missing-hook.py", "sdd-test-guard", None):
+            self.assertFalse(_hook_runtime.is_hook_script(name), name)
+
+
+class TestRunHookInProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="sdd-hookrt-")
+
+    def tearDown(self):
+        cleanup_all_state(self.tmpdir)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_stdout_and_exit_zero(self):
+        rc, out, err = _hook_runtime.run_hook("constraint-reinforcement.py", "{}")
+        self.assertEqual(rc, 0)
+        self.assertIn("additionalContext", json.loads(out)["hookSpecificOutput"])
+
+    def test_exit_two_and_stderr_match_spawn_path(self):
+        write_state(self.tmpdir, passing=False, summary="1 failed")
+        payload = {
+            "tool_name": "Edit",
+            "tool_input": {
+                "file_path": f"{self.tmpdir}/test_foo.py",
+                "old_string": "assert x == 42\nassert y == 10",
+                "new_string": "assert x == 42",
+            },
+            "cwd": self.tmpdir,
+        }
+        rc, _, err = _hook_runtime.run_hook("sdd-test-guard.py", json.dumps(payload))
+        spawn_rc, _, spawn_err, _ = invoke_hook("sdd-test-guard.py", payload)
+        self.assertEqual(rc, 2)
+        self.assertEqual((rc, err), (spawn_rc, spawn_err))
+
+    def test_process_state_restored(self):
+        env_before = dict(os.environ)
+        cwd_before = os.getcwd()
+        stdin_before = sys.stdin
+        _hook_runtime.run_hook(
+            "constraint-reinforcement.py", "{}",
+            env={"PATH": os.environ.get("PATH", ""), "SDD_PROBE": "1"},
+            cwd=self.tmpdir,
+        )
+        self.assertEqual(dict(os.environ), env_before)
+        self.assertEqual(os.getcwd(), cwd_before)
+        self.assertIs(sys.stdin, stdin_before)
+
+    def test_module_loaded_once(self):
+        first = _hook_runtime.load_hook("constraint-reinforcement.py")
+        second = _hook_runtime.load_hook("constraint-reinforcement.py")
+        self.assertIs(first, second)
+
+    def test_args_become_argv_and_are_restored(self):
+        argv_before = sys.argv
+        rc, out, _ = _hook_runtime.run_hook(
+            "hook-dispatch.py", "{}", args=["NoSuchEvent"])
+        self.assertEqual((rc, out), (0, ""))
+        self.assertIs(sys.argv, argv_before)
+
+
+class TestRefreshProjectCaches(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="sdd-hookrt-")
+        (Path(self.tmpdir) / ".claude").mkdir()
+
+    def tearDown(self):
+        _sdd_config._clear_project_config_cache()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_config_edit_invalidates_cached_config(self):
+        cfg = Path(self.tmpdir) / ".claude" / "config.json"
+        cfg.write_text(json.dumps({"SOURCE_EXTENSIONS": [".jl"]}))
+        _hook_runtime.refresh_project_caches(self.tmpdir)
+        self.assertEqual(_sdd_config.get_source_extensions(self.tmpdir),
+                         frozenset({".jl"}))
+
+        cfg.write_text(json.dumps({"SOURCE_EXTENSIONS": [".ex", ".exs"]}))
+        os.utime(cfg, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+        self.assertTrue(_hook_runtime.refresh_project_caches(self.tmpdir))
+        self.assertEqual(_sdd_config.get_source_extensions(self.tmpdir),
+                         frozenset({".ex", ".exs"}))
+
+    def test_unchanged_files_keep_caches(self):
+        _hook_runtime.refresh_project_caches(self.tmpdir)
+        self.assertFalse(_hook_runtime.refresh_project_caches(self.tmpdir))
+
+
+class TestServeConnection(unittest.TestCase):
+
+    def test_stale_hooks_answer_fallback_and_stop(self):
+        server, client = socket.socketpair()
+        try:
+            _hook_daemon._send(client, {"hook": "constraint-reinforcement.py",
+                                        "stdin": "{}", "env": {}, "cwd": "/"})
+            keep_running = _hook_daemon._serve_connection(server, fingerprint=-1)
+            self.assertFalse(keep_running)
+            self.assertEqual(_hook_daemon._recv(client), {"fallback": True})
+        finally:
+            client.close()
+
+    def test_unknown_hook_answers_fallback(self):
+        response = _hook_daemon.handle_request({"hook": "_sdd_state.py"})
+        self.assertEqual(response, {"fallback": True})
+
+    def test_malformed_args_answer_fallback(self):
+        response = _hook_daemon.handle_request(
+            {"hook": "hook-dispatch.py", "args": "SessionStart"})
+        self.assertEqual(response, {"fallback": True})
+
+
+@unittest.skipUnless(hasattr(os, "getuid"), "POSIX only")
+class TestSocketPath(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = _short_tmpdir()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        patcher = unittest.mock.patch.dict(os.environ, {"TMPDIR": self.tmpdir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for key in ("SDD_HOOK_DAEMON_SOCKET", "XDG_RUNTIME_DIR"):
+            os.environ.pop(key, None)
+
+    def test_private_directory_created_0700(self):
+        path = _hook_daemon.socket_path()
+        directory = os.path.dirname(path)
+        self.assertEqual(directory, os.path.join(self.tmpdir, f"sdd-hookd-{os.getuid()}"))
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+    def test_open_directory_refused(self):
+        directory = os.path.join(self.tmpdir, f"sdd-hookd-{os.getuid()}")
+        os.mkdir(directory)
+        os.chmod(directory, 0o777)
+        self.assertIsNone(_hook_daemon.socket_path())
+
+    def test_runtime_dir_preferred(self):
+        os.environ["XDG_RUNTIME_DIR"] = self.tmpdir
+        self.assertEqual(os.path.dirname(_hook_daemon.socket_path()), self.tmpdir)
+
+    def test_only_own_sockets_trusted(self):
+        path = os.path.join(self.tmpdir, "s.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+        server.bind(path)
+        self.assertTrue(_hook_daemon._own_socket(path))
+        os.symlink(path, path + ".link")
+        self.assertFalse(_hook_daemon._own_socket(path + ".link"))
+        with unittest.mock.patch("os.getuid", return_value=os.getuid() + 1):
+            self.assertFalse(_hook_daemon._own_socket(path))
+
+    def test_only_hook_environment_forwarded(self):
+        env = {"PATH": "/bin", "CLAUDE_PROJECT_DIR": "/p", "SDD_TRACE": "1",
+               "ANTHROPIC_API_KEY": "secret", "GITHUB_TOKEN": "secret"}
+        self.assertEqual(_hook_daemon._forwarded_env(env),
+                         {"PATH": "/bin", "CLAUDE_PROJECT_DIR": "/p", "SDD_TRACE": "1"})
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX") and os.name != "nt",
+                     "unix sockets required")
+class TestDaemonEndToEnd(unittest.TestCase):
+    """_run.cmd → client → daemon → in-process hook."""
+
+    def setUp(self):
+        self.sockdir = _short_tmpdir()
+        self.sock = os.path.join(self.sockdir, "hookd.sock")
+        self.env = {"SDD_HOOK_DAEMON": "1", "SDD_HOOK_DAEMON_SOCKET": self.sock}
+
+    def tearDown(self):
+        proc = getattr(self, "proc", None)
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=5)
+        shutil.rmtree(self.sockdir, ignore_errors=True)
+
+    def _start_daemon(self):
+        env = dict(os.environ, SDD_HOOK_DAEMON_SOCKET=self.sock)
+        self.proc = subprocess.Popen(
+            [sys.executable, "-B", _hook_daemon.__file__, "--serve"],
+            env=env, stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.sock):
+            if time.monotonic() > deadline:
+                self.fail("daemon did not bind its socket")
+            time.sleep(0.05)
+
+    def test_daemon_output_matches_spawn_path(self):
+        self._start_daemon()
+        rc, out, err, _ = invoke_hook("constraint-reinforcement.py", {}, env=self.env)
+        spawn = invoke_hook("constraint-reinforcement.py", {})
+        self.assertEqual((rc, out, err), spawn[:3])
+
+    def test_socket_is_private(self):
+        self._start_daemon()
+        self.assertEqual(os.stat(self.sock).st_mode & 0o777, 0o600)
+
+    def test_missing_daemon_falls_back_to_spawn(self):
+        env = dict(self.env, SDD_HOOK_DAEMON_SOCKET=os.path.join(
+            self.sockdir, "missing", "hookd.sock"))
+        rc, out, _, _ = invoke_hook("constraint-reinforcement.py", {}, env=env)
+        self.assertEqual(rc, 0)
+        self.assertIn("hookSpecificOutput", json.loads(out))
+
+    def test_slow_request_does_not_block_others(self):
+        self._start_daemon()
+        slow = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(slow.close)
+        slow.connect(self.sock)  # never sends: its handler waits on it
+        started = time.monotonic()
+        rc, _, _, _ = invoke_hook("constraint-reinforcement.py", {}, env=self.env)
+        self.assertEqual(rc, 0)
+        self.assertLess(time.monotonic() - started, 4)
+
+    def test_squatted_socket_path_does_not_crash_serve(self):
+        locked = os.path.join(self.sockdir, "locked")
+        os.mkdir(locked)
+        sock = os.path.join(locked, "hookd.sock")
+        os.mkdir(sock)  # unlink() fails with an OSError other than ENOENT
+        self.assertEqual(_hook_daemon.serve(sock, idle_timeout=0), 0)
+
+    def test_second_daemon_exits_when_first_owns_socket(self):
+        self._start_daemon()
+        env = dict(os.environ, SDD_HOOK_DAEMON_SOCKET=self.sock)
+        r = subprocess.run(
+            [sys.executable, "-B", _hook_daemon.__file__, "--serve"],
+            env=env, capture_output=True, timeout=10,
+        )
+        self.assertEqual(r.returncode, 0)
+        self.assertTrue(os.path.exists(self.sock))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Tests for the multiplexed per-event dispatcher (hook-dispatch.py).
+
+Contract under test: one process runs every handler of an event and emits
+what Claude Code would have assembled from the separate processes —
+blocks win, decisions follow deny > ask > allow, context is concatenated
+in handler order.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _subprocess_harness import HOOKS_DIR, RUN_CMD, cleanup_all_state, invoke_hook
+
+dispatch_mod = import_module("hook-dispatch")
+
+
+def _pre(decision, reason=""):
+    hso = {"hookEventName": "PreToolUse", "permissionDecision": decision}
+    if reason:
+        hso["permissionDecisionReason"] = reason
+    return {"hookSpecificOutput": hso}
+
+
+def _context(event, text):
+    return {"hookSpecificOutput": {"hookEventName": event,
+                                   "additionalContext": text}}
+
+
+class _FakeHandlers:
+    """Patch HANDLERS + run_hook so each fake handler returns a fixed result."""
+
+    def __init__(self, event, results):
+        names = tuple(f"h{i}.py" for i in range(len(results)))
+        by_name = dict(zip(names, results))
+        self._patches = [
+            mock.patch.dict(dispatch_mod.HANDLERS, {event: names}),
+            mock.patch.object(dispatch_mod._hook_runtime, "run_hook",
+                              side_effect=lambda script, _stdin: by_name[script]),
+        ]
+
+    def __enter__(self):
+        for p in self._patches:
+            p.start()
+        return self
+
+    def __exit__(self, *exc):
+        for p in reversed(self._patches):
+            p.stop()
+
+
+class TestMergeOutputs(unittest.TestCase):
+
+    def test_permission_decision_precedence(self):
+        merged = dispatch_mod.merge_outputs("PreToolUse", [
+            _pre("allow", "fine"), _pre("deny", "nope"), _pre("ask", "hmm"),
+        ])
+        hso = merged["hookSpecificOutput"]
+        self.assertEqual(hso["permissionDecision"], "deny")
+        self.assertEqual(hso["permissionDecisionReason"], "nope")
+
+    def test_context_concatenated_in_handler_order(self):
+        merged = dispatch_mod.merge_outputs("SessionStart", [
+            _context("SessionStart", "first"), {"_context": "second"},
+        ])
+        self.assertEqual(merged["hookSpecificOutput"]["additionalContext"],
+                         "first\n\nsecond")
+        self.assertEqual(merged["hookSpecificOutput"]["hookEventName"],
+                         "SessionStart")
+
+    def test_block_continue_and_system_message(self):
+        merged = dispatch_mod.merge_outputs("Stop", [
+            {"systemMessage": "a"},
+            {"decision": "block", "reason": "r1", "systemMessage": "b"},
+            {"continue": False, "stopReason": "halt"},
+        ])
+        self.assertEqual(merged["decision"], "block")
+        self.assertEqual(merged["reason"], "r1")
+        self.assertEqual(merged["systemMessage"], "a\nb")
+        self.assertIs(merged["continue"], False)
+        self.assertEqual(merged["stopReason"], "halt")
+
+    def test_empty_outputs_merge_to_empty(self):
+        self.assertEqual(dispatch_mod.merge_outputs("SessionStart", [{}, {}]), {})
+
+
+class TestDispatch(unittest.TestCase):
+
+    def test_exit_two_without_json_blocks_with_stderr(self):
+        with _FakeHandlers("SessionStart", [(0, "", ""), (2, "", "stop\n")]):
+            rc, out, err = dispatch_mod.dispatch("SessionStart", "{}")
+        self.assertEqual((rc, out, err), (2, "", "stop\n"))
+
+    def test_exit_two_keeps_other_json_as_deny(self):
+        other = json.dumps(_context("PreToolUse", "note"))
+        with _FakeHandlers("PreToolUse", [(0, other, ""), (2, "", "blocked\n")]):
+            rc, out, _ = dispatch_mod.dispatch("PreToolUse", "{}")
+        hso = json.loads(out)["hookSpecificOutput"]
+        self.assertEqual(rc, 0)
+        self.assertEqual(hso["permissionDecision"], "deny")
+        self.assertEqual(hso["permissionDecisionReason"], "blocked")
+        self.assertEqual(hso["additionalContext"], "note")
+
+    def test_non_blocking_error_forwards_stderr_only(self):
+        with _FakeHandlers("SessionStart", [(1, "ignored", "boom\n")]):
+            rc, out, err = dispatch_mod.dispatch("SessionStart", "{}")
+        self.assertEqual((rc, out, err), (1, "", "boom\n"))
+
+    def test_error_does_not_drop_sibling_output(self):
+        ok = json.dumps(_context("SessionStart", "ctx"))
+        with _FakeHandlers("SessionStart", [(1, "", "boom\n"), (0, ok, "")]):
+            rc, out, err = dispatch_mod.dispatch("SessionStart", "{}")
+        self.assertEqual(rc, 0)
+        self.assertEqual(json.loads(out)["hookSpecificOutput"]["additionalContext"],
+                         "ctx")
+        self.assertEqual(err, "boom\n")
+
+    def test_plain_stdout_dropped_outside_context_events(self):
+        with _FakeHandlers("PostToolUse", [(0, "chatter", "")]):
+            _, out, _ = dispatch_mod.dispatch("PostToolUse", "{}")
+        self.assertEqual(json.loads(out), {})
+
+    def test_unknown_event_is_a_no_op(self):
+        self.assertEqual(dispatch_mod.dispatch("NoSuchEvent", "{}"), (0, "", ""))
+
+
+class TestDispatchEndToEnd(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="sdd-dispatch-")
+        subprocess.run(["git", "init", "-q", self.tmpdir], check=True)
+        self.env = {"AI_FRAMEWORK_SKIP_BROWSER_INSTALL": "1"}
+
+    def tearDown(self):
+        cleanup_all_state(self.tmpdir)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _run(self, payload, *args):
+        cmd = ["bash", str(RUN_CMD), "hook-dispatch.py", *args]
+        env = dict(os.environ, CLAUDE_PLUGIN_ROOT=str(HOOKS_DIR.parent),
+                   CLAUDE_PROJECT_DIR=self.tmpdir, **self.env)
+        return subprocess.run(cmd, input=json.dumps(payload), text=True,
+                              capture_output=True, timeout=10, env=env)
+
+    @unittest.skipIf(os.name == "nt", "bash runner")
+    def test_session_start_matches_separate_handlers(self):
+        payload = {"source": "startup", "cwd": self.tmpdir}
+        separate = [invoke_hook(script, payload, env=self.env)
+                    for script in dispatch_mod.HANDLERS["SessionStart"]]
+        expected = dispatch_mod.merge_outputs("SessionStart", [
+            dispatch_mod._parse_stdout("SessionStart", out)
+            for rc, out, _, _ in separate if rc == 0
+        ])
+        r = self._run(payload, "SessionStart")
+        self.assertEqual(r.returncode, 0, r.stderr)
+        self.assertEqual(json.loads(r.stdout), expected)
+
+    @unittest.skipIf(os.name == "nt", "bash runner")
+    def test_event_read_from_stdin_without_argument(self):
+        payload = {"hook_event_name": "SessionStart", "source": "startup",
+                   "cwd": self.tmpdir}
+        r = self._run(payload)
+        self.assertEqual(r.returncode, 0, r.stderr)
+        self.assertIsInstance(json.loads(r.stdout), dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
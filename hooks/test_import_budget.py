@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Import-time budget for every hook entry point registered in hooks.json.
+
+Each hook is loaded (module body only, main() not called) in a fresh
+interpreter under `python -X importtime`. Modules the bare loader itself
+imports are subtracted, leaving what the hook's own import graph costs.
+
+Two budgets, both recorded below:
+  * HOT_PATH_FORBIDDEN / MODULE_BUDGET — deterministic, always on. A hook
+    pulling in a module off its hot path, or growing its import graph
+    past the recorded count, fails immediately.
+  * IMPORT_BUDGET_MS — wall-clock self time, median of 5. Load-sensitive,
+    so gated behind PHASE7_PERF=1 like test_perf_benchmarks.py.
+
+Raising a budget is a reviewed change: update the number here together
+with the import that justified it.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _hook_bench import HOOKS_DIR, hook_import_profile, registered_hook_scripts
+
+_PERF_ENABLED = os.environ.get("PHASE7_PERF") == "1"
+
+# Modules that must stay off a hook's import-time path.
+HOT_PATH_FORBIDDEN = {
+    # Amend protocol only runs for scenario-file edits.
+    "sdd-test-guard.py": {"_amend_protocol", "dataclasses", "difflib"},
+    # Idle hook only needs timestamp parsing from _sdd_state.
+    "teammate-idle.py": {"_sdd_coverage"},
+    "constraint-reinforcement.py": {"_sdd_state", "_sdd_detect", "subprocess"},
+    "subagent-start.py": {"_sdd_state", "_sdd_detect", "subprocess"},
+}
+
+# Recorded module counts beyond the loader baseline (measured + ~10% slack).
+MODULE_BUDGET = {
+    "sdd-test-guard.py": 68,
+    "sdd-auto-test.py": 65,
+    "task-completed.py": 68,
+    "teammate-idle.py": 64,
+    "session-start.py": 47,
+    "subagent-start.py": 25,
+    "agent-browser-check.py": 54,
+    "constraint-reinforcement.py": 15,
+    "hook-dispatch.py": 32,
+}
+
+# Recorded self-time budgets in ms (about 2x the reference measurement).
+IMPORT_BUDGET_MS = {
+    "sdd-test-guard.py": 90,
+    "sdd-auto-test.py": 90,
+    "task-completed.py": 95,
+    "teammate-idle.py": 85,
+    "session-start.py": 50,
+    "subagent-start.py": 30,
+    "agent-browser-check.py": 55,
+    "constraint-reinforcement.py": 20,
+    "hook-dispatch.py": 45,
+}
+
+
+class TestBudgetTables(unittest.TestCase):
+
+    def test_every_registered_hook_has_a_budget(self):
+        for script in registered_hook_scripts():
+            self.assertIn(script, MODULE_BUDGET, script)
+            self.assertIn(script, IMPORT_BUDGET_MS, script)
+
+
+class TestHotPathImports(unittest.TestCase):
+    """Deterministic: which modules load, and how many."""
+
+    def test_forbidden_modules_stay_lazy(self):
+        for script, forbidden in HOT_PATH_FORBIDDEN.items():
+            with self.subTest(hook=script):
+                loaded = hook_import_profile(script)
+                self.assertFalse(forbidden & set(loaded),
+                                 f"{script} eagerly imports {forbidden & set(loaded)}")
+
+    def test_module_count_within_budget(self):
+        for script in registered_hook_scripts():
+            with self.subTest(hook=script):
+                loaded = hook_import_profile(script)
+                self.assertLessEqual(
+                    len(loaded), MODULE_BUDGET[script],
+                    f"{script} imports {len(loaded)} modules: {sorted(loaded)}",
+                )
+
+    def test_facade_resolves_coverage_names_lazily(self):
+        code = (
+            "import sys; import _sdd_detect; "
+            "assert '_sdd_coverage' not in sys.modules; "
+            "from _sdd_detect import is_test_file; "
+            "assert '_sdd_coverage' in sys.modules"
+        )
+        r = subprocess.run([sys.executable, "-B", "-c", code],
+                           capture_output=True, text=True, cwd=str(HOOKS_DIR))
+        self.assertEqual(r.returncode, 0, r.stderr)
+
+
+@pytest.mark.skipif(not _PERF_ENABLED,
+                    reason="set PHASE7_PERF=1 to run (median-of-5 importtime)")
+class TestImportTimeBudget(unittest.TestCase):
+
+    def test_import_time_within_budget(self):
+        for script in registered_hook_scripts():
+            with self.subTest(hook=script):
+                samples = [sum(hook_import_profile(script).values()) / 1000.0
+                           for _ in range(5)]
+                median = statistics.median(samples)
+                self.assertLessEqual(
+                    median, IMPORT_BUDGET_MS[script],
+                    f"{script} import self-time {median:.1f}ms "
+                    f"> budget {IMPORT_BUDGET_MS[script]}ms",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
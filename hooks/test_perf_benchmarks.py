@@ -183,5 +183,148 @@ class TestAppendTelemetryLatency(_PerfBase):
         self.assertLess(median, 5.0, f"append_telemetry median {median:.3f}ms")
 
 
+_TEST_UNIT = '''
+
+class TestWidget{i}:
+    """Docstring for widget {i} with 'quotes' and # hash."""
+
+    def test_value_{i}(self):
+        # compute the value; don't use assert True here
+        value = compute({i}, "label {i}")
+        assert value == {i}
+        assert isinstance(value, int), "value must be int"
+        self.assertEqual(format(value), '{i}')
+
+    @pytest.mark.parametrize("x", [1, 2, 3])
+    def test_param_{i}(self, x):
+        expect(result(x)).toBe(x * {i})
+'''
+
+
+class TestTestEditScanLatency(unittest.TestCase):
+    """sdd-test-guard scans a 1 MB generated test file in one cached pass.
+
+    The reference reproduces the pre-scanner path: three sequential strip
+    substitutions, the two counting findalls and the tautology patterns
+    with a leading `\\b`, each a full pass over the payload.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        import re
+        from importlib import import_module
+        cls.guard = import_module("sdd-test-guard")
+        cls.text = "".join(_TEST_UNIT.format(i=i) for i in range(2200))
+        cls.legacy_strip = [
+            re.compile(r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\''),
+            re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''),
+            re.compile(r"(?<!\\)#[^\n]*"),
+        ]
+        cls.legacy_tautology = [
+            (re.compile(p.pattern.replace(r"assert(?<=\bassert)", r"\bassert"),
+                        p.flags), scan)
+            for _, p, scan in cls.guard._TAUTOLOGICAL_PATTERNS
+        ]
+
+    def _legacy(self):
+        g, text = self.guard, self.text
+        assertions = len(g.ASSERTION_RE.findall(text))
+        precise = len(g.PRECISE_ASSERTION_RE.findall(text))
+        stripped = text
+        for pattern in self.legacy_strip:
+            stripped = pattern.sub("", stripped)
+        for pattern, scan in self.legacy_tautology:
+            pattern.search(stripped if scan == "stripped" else text)
+        return assertions, precise
+
+    def _scan(self):
+        self.guard._scan_text.cache_clear()
+        return self.guard._scan_text(self.text)[:2]
+
+    def test_single_pass_scan_at_least_1_3x_faster_at_1mb(self):
+        self.assertGreaterEqual(len(self.text), 1_000_000)
+        self.assertEqual(self._scan(), self._legacy())
+        legacy = _median_ms(self._legacy, runs=5)
+        scan = _median_ms(self._scan, runs=5)
+        print(f"\n[PHASE7_PERF] 1 MB test scan: legacy {legacy:.1f} ms, "
+              f"single pass {scan:.1f} ms", file=sys.stderr)
+        self.assertLess(scan * 1.3, legacy)
+
+
+class TestCriticalPathMatchLatency(unittest.TestCase):
+    """400 critical-path globs: compiled index vs one pattern at a time."""
+
+    def test_compiled_matcher_at_least_10x_faster(self):
+        from _sdd_critical import matcher_for
+        from test_sdd_critical import _reference
+        patterns = []
+        for i in range(100):
+            patterns += [f"services/svc{i}/internal/**", f"services/svc{i}/*.proto",
+                         f"**/gen{i}/*.pb.go", f"config/env{i}.yaml"]
+        paths = [f"services/svc{i % 100}/pkg/handler_{i}.go" for i in range(200)]
+        matcher = matcher_for(tuple(patterns))
+        self.assertEqual([matcher.match(p) for p in paths],
+                         [_reference(p, patterns) for p in paths])
+        legacy = _median_ms(lambda: [_reference(p, patterns) for p in paths], runs=5)
+        compiled = _median_ms(lambda: [matcher.match(p) for p in paths], runs=5)
+        print(f"\n[PHASE7_PERF] 200 paths x 400 globs: per-pattern {legacy:.1f} ms, "
+              f"compiled {compiled:.1f} ms", file=sys.stderr)
+        self.assertLess(compiled * 10, legacy)
+
+
+class TestWarmRunnerLatency(unittest.TestCase):
+    """Scoped pytest run: forked from the warm server vs a cold process."""
+
+    @unittest.skipUnless(shutil.which("pytest"), "pytest required")
+    def test_warm_run_at_least_2x_faster(self):
+        import _sdd_warm
+        from _sdd_config import _clear_project_config_cache
+        from _sdd_state import run_in_process_group
+        if not _sdd_warm.supported():
+            self.skipTest("fork and AF_UNIX required")
+        cwd = tempfile.mkdtemp(prefix="sdd-perf-warm-")
+        self.addCleanup(shutil.rmtree, cwd, ignore_errors=True)
+        Path(cwd, ".claude").mkdir()
+        Path(cwd, ".claude/config.json").write_text('{"WARM_RUNNER": true}')
+        Path(cwd, "conftest.py").write_text("import json\n")
+        Path(cwd, "test_one.py").write_text("def test_one(): pass\n")
+        _clear_project_config_cache()
+        self.addCleanup(_clear_project_config_cache)
+        lock = Path(f"{_sdd_warm.socket_path(cwd)}.lock")
+        self.addCleanup(lock.unlink, missing_ok=True)
+        self.addCleanup(_sdd_warm.stop_server, cwd)
+        command = "pytest -q test_one.py"
+        _sdd_warm.run_warm(cwd, command, 60)
+        deadline = time.time() + 30
+        while _sdd_warm.run_warm(cwd, command, 60) is None:
+            self.assertLess(time.time(), deadline, "warm server did not start")
+            time.sleep(0.1)
+        cold = _median_ms(lambda: run_in_process_group(command, cwd, 60), runs=5)
+        warm = _median_ms(lambda: _sdd_warm.run_warm(cwd, command, 60), runs=5)
+        print(f"\n[PHASE7_PERF] scoped pytest run: cold {cold:.0f} ms, "
+              f"warm {warm:.0f} ms", file=sys.stderr)
+        self.assertLess(warm * 2, cold)
+
+
+class TestHookBenchRegression(unittest.TestCase):
+    """Every hooks.json hook, cold + warm, vs the committed baseline.
+
+    Smallest fixture only (size 10) to keep the gated suite short; the
+    full 10/1k/10k sweep runs via `python3 hooks/_hook_bench.py`.
+    Tolerance: SDD_BENCH_TOLERANCE (default 0.5 — baseline machines differ).
+    """
+
+    def test_no_regression_vs_baseline_at_size_10(self):
+        import _hook_bench as bench
+        baseline = json.loads(bench.DEFAULT_BASELINE.read_text(encoding="utf-8"))
+        results = bench.run_benchmarks(sizes=(10,), runs=_RUNS)
+        tolerance = float(os.environ.get("SDD_BENCH_TOLERANCE", "0.5"))
+        regressions = bench.compare(results, baseline, tolerance=tolerance)
+        for r in regressions:
+            print(f"\n[PHASE7_PERF] regression {r['key']} {r['metric']}: "
+                  f"{r['baseline_ms']:.1f} -> {r['current_ms']:.1f} ms", file=sys.stderr)
+        self.assertEqual(regressions, [])
+
+
 if __name__ == "__main__":
     unittest.main()
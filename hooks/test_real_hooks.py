@@ -99,7 +99,9 @@ class TestContract(unittest.TestCase):
         """Timeouts within expected ceilings per event type."""
         ceilings = {
             "PreToolUse": 5, "PostToolUse": 10, "UserPromptSubmit": 5,
-            "SubagentStart": 5, "SessionStart": 10, "Stop": 5,
+            # SessionStart: one dispatcher running session-start.py and
+            # agent-browser-check.py in turn, 10s each.
+            "SubagentStart": 5, "SessionStart": 20, "Stop": 5,
             "Notification": 5, "TeammateIdle": 10, "TaskCompleted": 300,
         }
         for event, _, hook in self.entries:
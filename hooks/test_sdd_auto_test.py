@@ -71,7 +71,7 @@ class TestRunTestsWorker(unittest.TestCase):
         sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
         mock_write.assert_called_once_with(
             self.tmpdir, True, "5 passed",
-            raw_output=ANY, started_at=ANY,
+            raw_output=ANY, started_at=ANY, failures=None,
         )
         self.assertEqual(mock_telemetry.call_count, 2)
         start_event = mock_telemetry.call_args_list[0].args[1]
@@ -95,7 +95,7 @@ class TestRunTestsWorker(unittest.TestCase):
         sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
         mock_write.assert_called_once_with(
             self.tmpdir, False, "2 failed",
-            raw_output=ANY, started_at=ANY,
+            raw_output=ANY, started_at=ANY, failures=None,
         )
 
     @patch.object(sdd_auto_test, "release_runner_lock")
@@ -284,6 +284,386 @@ class TestCoalescingWorker(unittest.TestCase):
         marker.unlink(missing_ok=True)
 
 
+class TestImpactIndexRun(unittest.TestCase):
+    """_run_command: per-test coverage for the opt-in impact index."""
+
+    def setUp(self):
+        import _sdd_impact
+        self.impact = _sdd_impact
+        self.env = {"COVERAGE_FILE": "/tmp/x.coverage"}
+
+    @patch.object(sdd_auto_test, "run_in_process_group",
+                  return_value=(0, "1 passed", "", False))
+    def test_not_instrumented_when_disabled(self, mock_run):
+        with patch.object(self.impact, "instrument", return_value=None):
+            result = sdd_auto_test._run_command("/p", "pytest", 60, None)
+        self.assertEqual(result, (0, "1 passed", "", False, False))
+        mock_run.assert_called_once_with("pytest", "/p", 60, pgid_file=None,
+                                         on_progress=None, usage=None)
+
+    @patch.object(sdd_auto_test, "run_in_process_group",
+                  return_value=(1, "1 failed", "", False))
+    def test_instrumented_run_reports_coverage_taken(self, mock_run):
+        with patch.object(self.impact, "instrument",
+                          return_value=("pytest --cov=.", self.env)):
+            result = sdd_auto_test._run_command("/p", "pytest", 60, None)
+        self.assertEqual(result, (1, "1 failed", "", False, True))
+        mock_run.assert_called_once_with("pytest --cov=.", "/p", 60,
+                                         env=self.env, pgid_file=None,
+                                         on_progress=None, usage=None)
+
+    @patch.object(sdd_auto_test, "run_in_process_group", side_effect=[
+        (4, "", "error: unrecognized arguments: --cov=.", False),
+        (0, "1 passed", "", False),
+    ])
+    def test_missing_pytest_cov_reruns_plain(self, mock_run):
+        with patch.object(self.impact, "instrument",
+                          return_value=("pytest --cov=.", self.env)), \
+             patch.object(self.impact, "coverage_plugin_missing",
+                          return_value=True):
+            result = sdd_auto_test._run_command("/p", "pytest", 60, None)
+        self.assertEqual(result, (0, "1 passed", "", False, False))
+        self.assertEqual(mock_run.call_args.args[0], "pytest")
+
+
+class TestWarmRun(unittest.TestCase):
+    """_run_command: plain pytest runs go to the warm server when it answers."""
+
+    def setUp(self):
+        import _sdd_impact
+        import _sdd_warm
+        self.warm = _sdd_warm
+        patcher = patch.object(_sdd_impact, "instrument", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(sdd_auto_test, "run_in_process_group")
+    def test_warm_result_used(self, mock_run):
+        with patch.object(self.warm, "run_warm",
+                          return_value=(0, "1 passed", "", False)) as warm:
+            result = sdd_auto_test._run_command("/p", "pytest tests/a.py", 60, "/pg")
+        self.assertEqual(result, (0, "1 passed", "", False, False))
+        warm.assert_called_once_with("/p", "pytest tests/a.py", 60, "/pg")
+        mock_run.assert_not_called()
+
+    @patch.object(sdd_auto_test, "run_in_process_group",
+                  return_value=(0, "1 passed", "", False))
+    def test_no_server_runs_cold(self, mock_run):
+        with patch.object(self.warm, "run_warm", return_value=None):
+            result = sdd_auto_test._run_command("/p", "pytest tests/a.py", 60, None)
+        self.assertEqual(result, (0, "1 passed", "", False, False))
+        mock_run.assert_called_once_with("pytest tests/a.py", "/p", 60, pgid_file=None,
+                                         on_progress=None, usage=None)
+
+
+class TestFailedFirst(unittest.TestCase):
+    """_run_tests_worker: last run's failures rerun first as a partial state."""
+
+    def setUp(self):
+        import _sdd_failed
+        self.failed = _sdd_failed
+        self.tmpdir = tempfile.mkdtemp()
+        Path(self.tmpdir, "pyproject.toml").touch()
+        for name, value in (("release_runner_lock", None), ("acquire_runner_lock", 99),
+                            ("detect_test_command", "pytest"),
+                            ("has_exit_suppression", False),
+                            ("has_rerun_marker", False)):
+            patcher = patch.object(sdd_auto_test, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        import _sdd_history
+        self.failed._failed_path(self.tmpdir).unlink(missing_ok=True)
+        _sdd_history._history_path(self.tmpdir).unlink(missing_ok=True)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _run(self, *results):
+        with patch.object(sdd_auto_test, "_run_command",
+                          side_effect=[(*r, False) for r in results]) as run, \
+             patch.object(sdd_auto_test, "write_state") as write, \
+             patch.object(sdd_auto_test, "append_telemetry"):
+            sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
+        self.timeouts = [c.args[2] for c in run.call_args_list]
+        return [c.args[1] for c in run.call_args_list], write.call_args_list
+
+    def test_failures_rerun_first_as_partial_then_full_command(self):
+        failing = "FAILED tests/test_a.py::test_x - assert 0\n= 1 failed, 3 passed in 0.1s =\n"
+        commands, _ = self._run((1, failing, "", False))
+        self.assertEqual(commands, ["pytest"])
+        commands, writes = self._run((0, "= 1 passed in 0.1s =", "", False),
+                                     (0, "= 4 passed in 0.2s =", "", False))
+        self.assertEqual(commands, ["pytest tests/test_a.py::test_x", "pytest"])
+        self.assertEqual([(w.args[1], w.kwargs.get("partial", False)) for w in writes],
+                         [(True, True), (True, False)])
+        commands, _ = self._run((0, "= 4 passed in 0.2s =", "", False))
+        self.assertEqual(commands, ["pytest"])  # cleared by the passing run
+
+    def test_quick_stage_timeout_sized_to_the_subset(self):
+        failing = "FAILED tests/test_a.py::test_x - assert 0\n= 1 failed, 3 passed in 0.1s =\n"
+        with patch.object(sdd_auto_test, "adaptive_gate_timeout", return_value=600):
+            self._run((1, failing, "", False))
+            self._run((1, failing, "", False), (1, failing, "", False))
+            self.assertEqual(self.timeouts, [150, 600])  # FAILED_FIRST_TIMEOUT_SHARE
+            self._run((1, failing, "", False), (1, failing, "", False))
+            self.assertEqual(self.timeouts, [30, 600])  # from its history, floored
+
+
+class TestResultCache(unittest.TestCase):
+    """_run_tests_worker: opt-in replay of a result recorded for the same tree."""
+
+    def setUp(self):
+        import _sdd_results
+        self.results = _sdd_results
+        self.tmpdir = tempfile.mkdtemp()
+        Path(self.tmpdir, ".claude").mkdir()
+        Path(self.tmpdir, ".claude/config.json").write_text(
+            json.dumps({"RESULT_CACHE": True, "FAILED_FIRST": False}))
+        Path(self.tmpdir, "app.py").write_text("x = 1\n")
+        sdd_auto_test._sdd_config._clear_project_config_cache()
+        for name, value in (("release_runner_lock", None), ("acquire_runner_lock", 99),
+                            ("detect_test_command", "pytest"),
+                            ("has_exit_suppression", False),
+                            ("has_rerun_marker", False)):
+            patcher = patch.object(sdd_auto_test, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.results._results_path(self.tmpdir).unlink(missing_ok=True)
+        self.results._stat_path(self.tmpdir).unlink(missing_ok=True)
+        sdd_auto_test._sdd_config._clear_project_config_cache()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _run(self):
+        with patch.object(sdd_auto_test, "_run_command",
+                          return_value=(0, "= 4 passed in 0.2s =", "", False, False)) as run, \
+             patch.object(sdd_auto_test, "write_state") as write, \
+             patch.object(sdd_auto_test, "append_telemetry") as telemetry:
+            sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
+        events = [c.args[1]["event"] for c in telemetry.call_args_list]
+        return run.call_count, write.call_args, events
+
+    def test_same_tree_replays_recorded_result(self):
+        runs, _, _ = self._run()
+        self.assertEqual(runs, 1)
+        runs, write, events = self._run()
+        self.assertEqual(runs, 0)
+        self.assertEqual(write.args[1:3], (True, "4 passed"))
+        self.assertIsNotNone(write.kwargs["cached_duration"])
+        self.assertEqual(events, ["test_run_cached"])
+
+    def test_changed_tree_runs_again(self):
+        self._run()
+        Path(self.tmpdir, "app.py").write_text("x = 2\n")
+        runs, _, _ = self._run()
+        self.assertEqual(runs, 1)
+
+
+class TestStructuredReport(unittest.TestCase):
+    """_run_tests_worker: summary and failures from the runner's report."""
+
+    JUNIT = ('<testsuite><testcase classname="test_a" name="test_ok" file="test_a.py" '
+             'time="0.1"/><testcase classname="test_a" name="test_bad" file="test_a.py" '
+             'line="4" time="0.2"><failure message="assert 0">test_a.py:6: assert 0'
+             '</failure></testcase></testsuite>')
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        Path(self.tmpdir, ".claude").mkdir()
+        Path(self.tmpdir, ".claude/config.json").write_text(
+            json.dumps({"STRUCTURED_REPORT": True, "FAILED_FIRST": False}))
+        sdd_auto_test._sdd_config._clear_project_config_cache()
+        for name, value in (("release_runner_lock", None), ("acquire_runner_lock", 99),
+                            ("detect_test_command", "pytest"),
+                            ("has_exit_suppression", False),
+                            ("has_rerun_marker", False)):
+            patcher = patch.object(sdd_auto_test, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        import _sdd_report
+        _sdd_report._test_report_path(self.tmpdir).unlink(missing_ok=True)
+        sdd_auto_test._sdd_config._clear_project_config_cache()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _fake_run(self, cwd, command, *args, **kwargs):
+        Path(command.rpartition("--junitxml=")[2]).write_text(self.JUNIT)
+        return 1, "...truncated tail without a summary", "", False, False
+
+    def test_state_from_report(self):
+        with patch.object(sdd_auto_test, "_run_command", side_effect=self._fake_run), \
+             patch.object(sdd_auto_test, "write_state") as write, \
+             patch.object(sdd_auto_test, "append_telemetry"), \
+             patch("_sdd_shard.record_durations") as durations:
+            sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
+        self.assertEqual(write.call_args.args[1:], (False, "1 passed, 1 failed"))
+        self.assertEqual(write.call_args.kwargs["failures"], [
+            {"id": "test_a.py::test_bad", "location": "test_a.py:6", "message": "assert 0"}])
+        durations.assert_called_once_with(self.tmpdir, {"pytest:test_a.py": 0.3})
+
+
+class TestCoalescing(unittest.TestCase):
+    """"restart" policy: quiet-period debounce and cancel-and-restart."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        Path(self.tmpdir, ".claude").mkdir()
+        Path(self.tmpdir, ".claude/config.json").write_text(
+            json.dumps({"COALESCE": "restart"}))
+        sdd_auto_test._sdd_config._clear_project_config_cache()
+
+    def tearDown(self):
+        sdd_auto_test.clear_rerun_marker(self.tmpdir)
+        sdd_auto_test._sdd_config._clear_project_config_cache()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_quiet_period_waits_for_the_last_edit(self):
+        import time
+        sdd_auto_test.write_rerun_marker(self.tmpdir)
+        started = time.time()
+        with patch.object(sdd_auto_test._sdd_config, "COALESCE_QUIET_SECONDS", 0.3):
+            sdd_auto_test._await_quiet_period(self.tmpdir)
+        self.assertGreaterEqual(time.time() - started, 0.25)
+        with patch.object(sdd_auto_test, "rerun_requested_at",
+                          side_effect=lambda cwd: time.time()), \
+             patch.object(sdd_auto_test._sdd_config, "COALESCE_QUIET_MAX_WAIT", 0.2):
+            started = time.time()
+            sdd_auto_test._await_quiet_period(self.tmpdir)
+        self.assertLess(time.time() - started, 1)
+
+    def test_restart_only_early_in_the_expected_duration(self):
+        import time
+        now = time.time()
+        sdd_auto_test.write_state(self.tmpdir, True, "ok", started_at=now - 10)
+        early, expected = sdd_auto_test._restart_check(self.tmpdir, now - 2)
+        late, _ = sdd_auto_test._restart_check(self.tmpdir, now - 8)
+        self.assertGreaterEqual(expected, 10)
+        self.assertFalse(early())  # no newer edit yet
+        sdd_auto_test.write_rerun_marker(self.tmpdir)
+        self.assertTrue(early())
+        self.assertFalse(late())
+
+    def test_restart_check_measures_the_full_run_only(self):
+        import time
+        quick_done = []
+
+        def quick_stage(*args):
+            time.sleep(0.05)
+            quick_done.append(time.time())
+        with patch.object(sdd_auto_test, "_run_failed_first", side_effect=quick_stage), \
+             patch.object(sdd_auto_test, "_restart_check",
+                          return_value=(lambda: False, None)) as check, \
+             patch.object(sdd_auto_test, "_run_command",
+                          return_value=(0, "1 passed", "", False, False)), \
+             patch.object(sdd_auto_test, "append_telemetry"):
+            sdd_auto_test._run_tests_worker(self.tmpdir, "true")
+        self.assertGreaterEqual(check.call_args.args[1], quick_done[0])
+
+    def test_stale_run_killed_and_restarted(self):
+        import time
+        sdd_auto_test.write_state(self.tmpdir, True, "ok", started_at=time.time() - 60)
+        script = ("import os, time; first = not os.path.exists('ran'); "
+                  "open('ran', 'a').close(); time.sleep(30 if first else 0); "
+                  "print('1 passed')")
+        command = f'"{sys.executable}" -c "{script}"'
+
+        def edit_soon(cwd):
+            time.sleep(0.5)
+            sdd_auto_test.write_rerun_marker(cwd)
+        import threading
+        with patch.object(sdd_auto_test, "append_telemetry") as telemetry, \
+             patch.object(sdd_auto_test._sdd_config, "COALESCE_QUIET_SECONDS", 0):
+            threading.Thread(target=edit_soon, args=(self.tmpdir,)).start()
+            started = time.time()
+            sdd_auto_test._run_tests_worker(self.tmpdir, command)
+        self.assertLess(time.time() - started, 15)
+        events = [c.args[1] for c in telemetry.call_args_list]
+        aborted = [e for e in events if e["event"] == "test_run_aborted"]
+        self.assertEqual(len(aborted), 1)
+        self.assertGreater(aborted[0]["saved_s"], 50)
+        state = sdd_auto_test.read_state(self.tmpdir)
+        self.assertEqual((state["passing"], state["summary"]), (True, "1 passed"))
+
+
+class TestShardedRun(unittest.TestCase):
+    """_run_tests_worker: full-suite runs through _sdd_shard when it shards."""
+
+    def setUp(self):
+        import _sdd_shard
+        self.shard = _sdd_shard
+        self.tmpdir = tempfile.mkdtemp()
+        for name, value in (("release_runner_lock", None), ("acquire_runner_lock", 99),
+                            ("detect_test_command", "pytest"),
+                            ("has_exit_suppression", False)):
+            patcher = patch.object(sdd_auto_test, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _run(self, *results, rerun=(False,)):
+        runs = [self.shard.ShardedRun(*r) for r in results]
+        with patch.object(self.shard, "run_sharded", side_effect=runs) as sharded, \
+             patch.object(sdd_auto_test, "has_rerun_marker", side_effect=rerun), \
+             patch.object(sdd_auto_test, "run_in_process_group") as cold, \
+             patch.object(sdd_auto_test, "write_state") as write, \
+             patch.object(sdd_auto_test, "append_telemetry") as telemetry:
+            sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
+        cold.assert_not_called()
+        return sharded, write, [c.args[1] for c in telemetry.call_args_list]
+
+    def test_merged_summary_written(self):
+        _, write, events = self._run((1, "out", "", False, "1 failed, 7 passed", False, 3))
+        write.assert_called_once_with(self.tmpdir, False, "1 failed, 7 passed",
+                                      raw_output=ANY, started_at=ANY,
+                                      failures=None)
+        self.assertEqual(events[-1]["shards"], 3)
+
+    def test_aborted_run_writes_no_state_and_reruns(self):
+        with patch.object(sdd_auto_test._sdd_config, "get_coalesce_policy",
+                          return_value="restart"):
+            sharded, write, events = self._run(
+                (-1, "", "", False, None, True, 3),
+                (0, "out", "", False, "8 passed", False, 3))
+        write.assert_called_once_with(self.tmpdir, True, "8 passed",
+                                      raw_output=ANY, started_at=ANY,
+                                      failures=None)
+        self.assertIn("test_run_aborted", [e["event"] for e in events])
+        self.assertIsNotNone(sharded.call_args_list[0].kwargs["should_abort"])
+
+    def test_finish_policy_never_aborts_shards(self):
+        sharded, _, _ = self._run((0, "out", "", False, "8 passed", False, 3))
+        self.assertIsNone(sharded.call_args.kwargs["should_abort"])
+
+
+class TestHostSlot(unittest.TestCase):
+    """_run_tests_worker: host queue (_sdd_slots) before the runner lock."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+
+    def test_queues_before_taking_the_runner_lock(self):
+        order = []
+        with patch("_sdd_slots.acquire",
+                   side_effect=lambda *a: order.append("slot") or (7, 0.0, 0)), \
+             patch("_sdd_slots.release") as release, \
+             patch.object(sdd_auto_test, "acquire_runner_lock",
+                          side_effect=lambda cwd: order.append("lock")):
+            sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
+        self.assertEqual(order, ["slot", "lock"])
+        release.assert_called_once_with(7)  # lock busy: slot given back
+
+    def test_second_queued_worker_of_a_project_exits(self):
+        with patch("_sdd_slots.acquire", return_value=(None, 0.0, None)), \
+             patch.object(sdd_auto_test, "acquire_runner_lock") as lock:
+            sdd_auto_test._run_tests_worker(self.tmpdir, "pytest")
+        lock.assert_not_called()
+
+
 class TestFormatFeedback(unittest.TestCase):
     """Test format_feedback() message formatting."""
 
@@ -300,10 +680,28 @@ class TestFormatFeedback(unittest.TestCase):
         self.assertIn("[FAIL]", result)
         self.assertIn("fix implementation", result)
 
+    def test_report_failures_listed(self):
+        result = sdd_auto_test.format_feedback({
+            "passing": False, "summary": "3 passed, 1 failed",
+            "failures": [{"id": "t.py::test_x", "location": "t.py:7",
+                          "message": "assert 1 == 2"}]})
+        self.assertEqual(result, "SDD Auto-Test [FAIL]: 3 passed, 1 failed — fix implementation "
+                                 "before continuing.\n  t.py::test_x (t.py:7): assert 1 == 2")
+
     def test_missing_summary(self):
         result = sdd_auto_test.format_feedback({"passing": True})
         self.assertIn("unknown", result)
 
+    def test_partial_states_name_the_subset(self):
+        result = sdd_auto_test.format_feedback(
+            {"passing": True, "summary": "2 passed", "partial": True})
+        self.assertEqual(result, "SDD Auto-Test [PASS] (previously failing tests): "
+                                 "2 passed — full run in progress.")
+        result = sdd_auto_test.format_feedback(
+            {"passing": False, "summary": "tests failed", "partial": True})
+        self.assertIn("[FAIL] (previously failing tests)", result)
+        self.assertIn("fix implementation", result)
+
 
 class TestMain(unittest.TestCase):
     """Test main() hook entry point."""
@@ -329,12 +727,13 @@ class TestMain(unittest.TestCase):
 
         return stdout_capture.getvalue(), exit_code
 
+    @patch("_sdd_slots.deprioritize")
     @patch.object(sdd_auto_test, "_run_tests_worker")
-    def test_worker_mode_dispatches(self, mock_worker):
+    def test_worker_mode_dispatches(self, mock_worker, _deprioritize):
         _, exit_code = self._run_main(
-            argv=["sdd-auto-test.py", "--run-tests", "/tmp/proj", "pytest", ""],
+            argv=["sdd-auto-test.py", "--run-tests", "/tmp/proj", "pytest", "", "1a"],
         )
-        mock_worker.assert_called_once_with("/tmp/proj", "pytest", None)
+        mock_worker.assert_called_once_with("/tmp/proj", "pytest", None, "1a")
 
     def test_invalid_json_exits_0(self):
         with patch.object(sys, "stdin", io.StringIO("not json")), \
@@ -370,7 +769,7 @@ class TestMain(unittest.TestCase):
             "cwd": "/tmp/proj",
             "tool_input": {"file_path": "app/main.py"},
         })
-        mock_bg.assert_called_once_with("/tmp/proj", "pytest", None)
+        mock_bg.assert_called_once_with("/tmp/proj", "pytest", None, rung="3")
 
     @patch.object(sdd_auto_test, "run_tests_background")
     @patch.object(sdd_auto_test, "has_exit_suppression", return_value=False)
@@ -587,6 +986,25 @@ class TestSddOrderingNudge(unittest.TestCase):
         self.assertIn("[FAIL]", stdout)
         self.assertNotIn("SDD ordering", stdout)
 
+    @patch.object(sdd_auto_test, "run_tests_background")
+    @patch.object(sdd_auto_test, "is_test_running", return_value=False)
+    @patch.object(sdd_auto_test, "read_state", return_value={"passing": False, "summary": "1 failed"})
+    @patch.object(sdd_auto_test, "cascade_impacted_test_command", return_value={
+        "command": "pytest tests/test_a.py", "rung": "2",
+        "forced_full_reason": None, "session_test_files_count": 0,
+        "ordering_warning": True,
+    })
+    def test_rung2_ordering_signal_follows_failure(self, _cascade, _state,
+                                                   _running, _bg):
+        """Rung 2's [SDD:ORDERING] is appended to failure feedback, never replaces it."""
+        stdout, _ = self._run_main(input_data={
+            "cwd": "/tmp/proj",
+            "tool_input": {"file_path": "src/b.py"},
+        })
+        context = json.loads(stdout)["hookSpecificOutput"]["additionalContext"]
+        self.assertIn("[FAIL]", context)
+        self.assertGreater(context.index("[SDD:ORDERING]"), context.index("[FAIL]"))
+
 
 class TestSourceExtensionsNew(unittest.TestCase):
     """Test new source file extensions (Gap 5)."""
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Tests for the compiled critical-paths matcher (_sdd_critical.py)."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_critical
+from _sdd_critical import compile_patterns, load_matcher, matcher_for
+
+REL = ".claude/critical-paths.md"
+
+PATTERNS = [
+    "auth/**", "src/payments/**", "*.sql", ".env*", "src/*/secrets.py",
+    "config/prod.yaml", "Dockerfile", "migrations/[0-9]*.py",
+    "**/deploy/*.sh", "lib/?.c", "docs/[!a]*.md",
+]
+
+
+def _reference(file_rel, patterns):
+    """The per-pattern loop sdd-test-guard used before the index."""
+    rel_path = PurePosixPath(file_rel)
+    for pattern in patterns:
+        if fnmatch(file_rel, pattern) or rel_path.match(pattern):
+            return True
+        if pattern.endswith("/**"):
+            prefix = pattern[:-3].rstrip("/")
+            if file_rel == prefix or file_rel.startswith(prefix + "/"):
+                return True
+    return False
+
+
+class TestMatch(unittest.TestCase):
+
+    def test_agrees_with_per_pattern_loop(self):
+        matcher = matcher_for(tuple(PATTERNS))
+        paths = [
+            "auth", "auth/login.py", "authx/a.py", "x/auth/y", "src/payments",
+            "src/payments/a/b.ts", "db/schema.sql", "schema.sql", ".env.local",
+            "a/.env", "src/api/secrets.py", "src/api/v1/secrets.py",
+            "other/src/api/secrets.py", "config/prod.yaml", "x/config/prod.yaml",
+            "Dockerfile", "a/Dockerfile", "migrations/001_init.py",
+            "migrations/init.py", "ops/deploy/run.sh", "deploy/run.sh",
+            "lib/a.c", "lib/ab.c", "docs/b.md", "docs/a.md", "docs/x/b.md",
+            "src/main.py", "./auth/x", "a//b.sql", "",
+        ]
+        for path in paths:
+            self.assertEqual(matcher.match(path), _reference(path, PATTERNS), path)
+
+    def test_absolute_paths_use_per_pattern_loop(self):
+        matcher = matcher_for(("*/", "/etc/*"))
+        for path in ("/", "/etc/hosts", "/etc/a/b"):
+            self.assertEqual(matcher.match(path),
+                             _reference(path, ("*/", "/etc/*")), path)
+
+    def test_wildcards_in_suffix_rule_stay_in_one_component(self):
+        # PurePosixPath.match: "x[!a]y" is one component, never "x/y".
+        matcher = matcher_for(("q/x[!a]y",))
+        self.assertFalse(matcher.match("p/x/y"))
+        self.assertTrue(matcher.match("p/q/xby"))
+
+    def test_literal_directories_index_into_trie(self):
+        index = compile_patterns(["src/a/**", "src/a/*.py", "*.sql"])
+        node = index["trie"]["c"]["src"]["c"]["a"]
+        self.assertEqual(node["a"], 1)
+        self.assertIn("t", node)
+        self.assertIn("t", index["trie"])
+        self.assertEqual(index["names"], {})
+        # Suffix rules by literal ending: "src/a/**", "src/a/*.py", "*.sql".
+        self.assertEqual(sorted(index["float"]), ["", ".py", ".sql"])
+
+    def test_index_is_json_serialisable(self):
+        index = compile_patterns(PATTERNS)
+        matcher = _sdd_critical.CriticalPathMatcher(json.loads(json.dumps(index)))
+        self.assertTrue(matcher.match("src/payments/x.py"))
+
+
+class TestLoadMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="sdd-critical-test-")
+        self.cache = Path(self.tmp, "cache.json")
+        self._patch = mock.patch.object(_sdd_critical, "_cache_path",
+                                        return_value=self.cache)
+        self._patch.start()
+        self.file = Path(self.tmp, REL)
+        self.file.parent.mkdir(parents=True)
+        self.file.write_text("# critical\n\nauth/**\n*.sql\n", encoding="utf-8")
+        _sdd_critical._load.cache_clear()
+
+    def tearDown(self):
+        self._patch.stop()
+        _sdd_critical._load.cache_clear()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_missing_or_empty_file_gives_none(self):
+        self.assertIsNone(load_matcher(self.tmp, ".claude/absent.md"))
+        self.file.write_text("# only comments\n", encoding="utf-8")
+        self.assertIsNone(load_matcher(self.tmp, REL))
+
+    def test_unchanged_file_served_from_disk(self):
+        self.assertTrue(load_matcher(self.tmp, REL).match("auth/x.py"))
+        _sdd_critical._load.cache_clear()
+        with mock.patch.object(_sdd_critical, "read_patterns") as read:
+            self.assertTrue(load_matcher(self.tmp, REL).match("db/a.sql"))
+        read.assert_not_called()
+
+    def test_edit_invalidates_cache(self):
+        self.assertFalse(load_matcher(self.tmp, REL).match("billing/x.py"))
+        self.file.write_text("billing/**\n", encoding="utf-8")
+        st = self.file.stat()
+        os.utime(self.file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        matcher = load_matcher(self.tmp, REL)
+        self.assertTrue(matcher.match("billing/x.py"))
+        self.assertFalse(matcher.match("auth/x.py"))
+
+    def test_corrupt_cache_ignored(self):
+        self.cache.write_text("{not json", encoding="utf-8")
+        self.assertTrue(load_matcher(self.tmp, REL).match("auth/x.py"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1006,6 +1006,14 @@ class TestWriteStateDuration(unittest.TestCase):
         state = read_state(self.tmpdir, max_age_seconds=60)
         self.assertNotIn("duration", state)
 
+    def test_partial_state_keeps_last_full_duration(self):
+        import time as time_mod
+        write_state(self.tmpdir, False, "1 failed", started_at=time_mod.time() - 90)
+        write_state(self.tmpdir, True, "1 passed", partial=True)
+        state = read_state(self.tmpdir, max_age_seconds=60)
+        self.assertTrue(state["partial"])
+        self.assertGreaterEqual(state["duration"], 89)
+
 
 class TestAdaptiveTimeoutFeedbackLoop(unittest.TestCase):
     """Integration: verify the full duration -> adaptive timeout cycle.
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Tests for failed-first ordering (_sdd_failed.py)."""
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_failed
+from _sdd_config import _clear_project_config_cache
+from _sdd_failed import failing_ids, quick_command, read_failed, record
+
+PYTEST_OUT = """\
+tests/test_a.py F.                                                      [100%]
+=========================== short test summary info ============================
+FAILED tests/test_a.py::test_x - assert 0
+FAILED tests/test_a.py::test_p[a - b] - ValueError
+ERROR tests/test_b.py - ImportError: no module
+==================== 2 failed, 1 passed, 1 error in 0.10s ======================
+"""
+
+GO_OUT = """\
+--- FAIL: TestAdd (0.00s)
+    --- FAIL: TestAdd/neg (0.00s)
+        math_test.go:8: got 1
+FAIL
+FAIL\texample.com/m/calc\t0.002s
+ok  \texample.com/m/util\t0.001s
+--- FAIL: TestParse (0.00s)
+FAIL\texample.com/m/parse\t0.003s
+"""
+
+
+class TestFailingIds(unittest.TestCase):
+
+    def test_pytest_nodeids_from_short_summary(self):
+        self.assertEqual(failing_ids("pytest", PYTEST_OUT),
+                         ["tests/test_a.py::test_p[a - b]", "tests/test_a.py::test_x",
+                          "tests/test_b.py"])
+
+    def test_js_failing_files_through_ansi_colour(self):
+        out = "\x1b[1m\x1b[41m FAIL \x1b[49m\x1b[22m src/a.test.ts\n PASS src/b.test.ts\n" \
+              " FAIL  src/c.spec.jsx > suite > case\n"
+        self.assertEqual(failing_ids("jest", out), ["src/a.test.ts", "src/c.spec.jsx"])
+
+    def test_go_top_level_tests_with_their_package(self):
+        self.assertEqual(failing_ids("go", GO_OUT),
+                         ["example.com/m/calc:TestAdd", "example.com/m/parse:TestParse"])
+
+    def test_unknown_framework_has_none(self):
+        self.assertEqual(failing_ids("cargo", "test foo ... FAILED"), [])
+
+
+class TestRecordAndQuickCommand(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-failed-test-")
+        Path(self.cwd, "pyproject.toml").touch()
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        _sdd_failed._failed_path(self.cwd).unlink(missing_ok=True)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def test_scoped_failures_rerun_for_same_command_or_full_suite(self):
+        Path(self.cwd, "tests").mkdir()
+        Path(self.cwd, "tests/test_a.py").touch()
+        record(self.cwd, "pytest tests/test_a.py", False, 1, PYTEST_OUT)
+        quick = ("pytest 'tests/test_a.py::test_p[a - b]' tests/test_a.py::test_x "
+                 "tests/test_b.py")
+        self.assertEqual(quick_command(self.cwd, "pytest tests/test_a.py", False), quick)
+        self.assertEqual(quick_command(self.cwd, "pytest", True), quick)
+        self.assertIsNone(quick_command(self.cwd, "pytest tests/test_c.py", False))
+
+    def test_quick_stage_keeps_the_projects_runner(self):
+        record(self.cwd, "pytest", True, 1, PYTEST_OUT)
+        ids = "'tests/test_a.py::test_p[a - b]' tests/test_a.py::test_x tests/test_b.py"
+        for command, runner in (
+                ("python -m pytest -q", "python -m pytest -q"),
+                ("uv run pytest -x tests/test_a.py::test_x", "uv run pytest -x"),
+                ("PYTHONPATH=src poetry run pytest", "PYTHONPATH=src poetry run pytest"),
+                (".venv/bin/pytest -p no:cacheprovider", ".venv/bin/pytest -p no:cacheprovider")):
+            self.assertEqual(quick_command(self.cwd, command, True), f"{runner} {ids}")
+        self.assertIsNone(quick_command(self.cwd, "make test", True))
+        self.assertIsNone(quick_command(self.cwd, "pytest && ruff check .", True))
+
+    def test_passing_run_clears_only_its_own_failures(self):
+        record(self.cwd, "pytest", True, 1, PYTEST_OUT)
+        record(self.cwd, "pytest tests/test_c.py", False, 0, "1 passed")
+        self.assertEqual(len(read_failed(self.cwd)["ids"]), 3)
+        record(self.cwd, "pytest", True, 0, "4 passed")
+        self.assertEqual(read_failed(self.cwd), {})
+        self.assertIsNone(quick_command(self.cwd, "pytest", True))
+
+    def test_go_quick_command_selects_tests_per_package(self):
+        Path(self.cwd, "pyproject.toml").unlink()
+        Path(self.cwd, "go.mod").write_text("module example.com/m\n")
+        record(self.cwd, "go test ./...", True, 1, GO_OUT)
+        self.assertEqual(quick_command(self.cwd, "go test ./...", True),
+                         "go test -run '^(TestAdd|TestParse)$' "
+                         "example.com/m/calc example.com/m/parse")
+
+    def test_too_many_failures_or_opt_out_gives_no_quick_stage(self):
+        record(self.cwd, "pytest", True, 1, PYTEST_OUT)
+        with mock.patch.object(_sdd_failed, "FAILED_FIRST_MAX_IDS", 2):
+            self.assertIsNone(quick_command(self.cwd, "pytest", True))
+        Path(self.cwd, ".claude").mkdir()
+        Path(self.cwd, ".claude/config.json").write_text(json.dumps({"FAILED_FIRST": False}))
+        _clear_project_config_cache()
+        self.assertIsNone(quick_command(self.cwd, "pytest", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Tests for fork-free git access (_sdd_git.py): the in-process .git
+reader and the long-lived `git cat-file --batch` object reader.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_git
+from _sdd_git import GitObjectReader
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", "-C", cwd, "-c", "user.email=t@t", "-c", "user.name=t", *args],
+        check=True, capture_output=True,
+    ).stdout.decode().strip()
+
+
+class TestGitObjectReader(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-git-")
+        _git(self.cwd, "init", "-q")
+        Path(self.cwd, "docs").mkdir()
+        Path(self.cwd, "docs", "a.txt").write_bytes(b"alpha\r\n")
+        Path(self.cwd, "empty.txt").write_bytes(b"")
+        _git(self.cwd, "add", "-A")
+        _git(self.cwd, "commit", "-q", "-m", "init")
+        self.head = _git(self.cwd, "rev-parse", "HEAD")
+
+    def tearDown(self):
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def test_lookups_share_one_process_per_mode(self):
+        empty = _git(self.cwd, "rev-parse", "HEAD:empty.txt")
+        with mock.patch.object(_sdd_git.subprocess, "Popen",
+                               wraps=subprocess.Popen) as popen:
+            with GitObjectReader(self.cwd) as git:
+                self.assertEqual(git.resolve("HEAD"), self.head)
+                self.assertEqual(git.object_type(f"{self.head}:docs"), "tree")
+                self.assertEqual(git.object_type(f"{self.head}:docs/a.txt"), "blob")
+                self.assertEqual(popen.call_count, 1)
+                self.assertEqual(git.read(f"{self.head}:docs/a.txt"), b"alpha\r\n")
+                self.assertEqual(git.read(f"{self.head}:empty.txt"), b"")
+                self.assertEqual(git.resolve(f"{self.head}:empty.txt"), empty)
+        self.assertEqual([call.args[0][-1] for call in popen.call_args_list],
+                         ["--batch-check", "--batch"])
+
+    def test_missing_and_non_blob_answer_none(self):
+        with GitObjectReader(self.cwd) as git:
+            self.assertIsNone(git.read(f"{self.head}:nope.txt"))
+            self.assertIsNone(git.read(f"{self.head}:docs"))
+            self.assertIsNone(git.resolve("no-such-branch"))
+            self.assertIsNone(git.read("HEAD:docs/a.txt\nHEAD:empty.txt"))
+            # The channel stays usable after misses.
+            self.assertEqual(git.read("HEAD:docs/a.txt"), b"alpha\r\n")
+
+    def test_not_a_repository(self):
+        outside = tempfile.mkdtemp(prefix="sdd-git-norepo-")
+        try:
+            with GitObjectReader(outside) as git:
+                self.assertIsNone(git.resolve("HEAD"))
+                self.assertIsNone(git.read("HEAD:x"))
+        finally:
+            shutil.rmtree(outside, ignore_errors=True)
+
+    def test_timeout_kills_coprocess_and_stays_down(self):
+        git = GitObjectReader(self.cwd, timeout=0.2)
+        hung = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        git._procs["--batch-check"] = hung
+        self.assertIsNone(git.resolve("HEAD"))
+        self.assertIsNotNone(hung.poll())
+        with mock.patch.object(_sdd_git.subprocess, "Popen") as popen:
+            self.assertIsNone(git.resolve("HEAD"))
+        popen.assert_not_called()
+        git.close()
+
+    def test_close_is_idempotent(self):
+        git = GitObjectReader(self.cwd)
+        self.assertEqual(git.resolve("HEAD"), self.head)
+        git.close()
+        git.close()
+
+
+
+class TestInProcessReader(unittest.TestCase):
+    """Every answer must match what git itself reports."""
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-git-dotgit-")
+        _git(self.cwd, "init", "-q")
+        for i in range(40):
+            path = Path(self.cwd, "pkg", f"sub{i % 3}", f"module_{i:02d}.py")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"x = {i}\n")
+        _git(self.cwd, "add", "-A")
+        _git(self.cwd, "commit", "-q", "-m", "init")
+        self._env = mock.patch.dict(os.environ)
+        self._env.start()
+        for name in _sdd_git._OVERRIDE_ENV:
+            os.environ.pop(name, None)
+
+    def tearDown(self):
+        self._env.stop()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _tracked_matches_git(self, cwd=None):
+        cwd = cwd or self.cwd
+        listed = set(_git(cwd, "ls-files").splitlines())
+        self.assertTrue(listed)
+        for rel in listed:
+            self.assertIs(_sdd_git.is_tracked(cwd, rel), True, rel)
+        self.assertIs(_sdd_git.is_tracked(cwd, "pkg/sub0"), True)
+        self.assertIs(_sdd_git.is_tracked(cwd, "pkg/nope.py"), False)
+        self.assertIs(_sdd_git.is_tracked(cwd, "pkg/sub"), False)
+
+    def test_head_and_tracked_without_forking(self):
+        head = _git(self.cwd, "rev-parse", "HEAD")
+        with mock.patch.object(subprocess, "run", side_effect=AssertionError), \
+                mock.patch.object(subprocess, "Popen", side_effect=AssertionError):
+            self.assertEqual(_sdd_git.head_sha(self.cwd), head)
+            self.assertIs(_sdd_git.is_linked_worktree(self.cwd), False)
+            self.assertIs(_sdd_git.is_tracked(self.cwd, "pkg/sub1/module_01.py"), True)
+
+    def test_index_versions(self):
+        Path(self.cwd, "later.py").write_text("")
+        _git(self.cwd, "add", "-N", "later.py")  # extended flags (v3+)
+        for version in ("2", "3", "4"):
+            with self.subTest(version=version):
+                _git(self.cwd, "update-index", "--index-version", version)
+                self._tracked_matches_git()
+        self.assertIs(_sdd_git.is_tracked(self.cwd, "later.py"), True)
+
+    def test_subdirectory_cwd(self):
+        sub = str(Path(self.cwd, "pkg"))
+        self.assertIs(_sdd_git.is_tracked(sub, "sub2/module_02.py"), True)
+        self.assertIs(_sdd_git.is_tracked(sub, "../pkg/sub2/module_02.py"), True)
+        self.assertEqual(_sdd_git.head_sha(sub), _git(self.cwd, "rev-parse", "HEAD"))
+
+    def test_packed_and_detached_refs(self):
+        _git(self.cwd, "pack-refs", "--all")
+        head = _git(self.cwd, "rev-parse", "HEAD")
+        self.assertEqual(_sdd_git.head_sha(self.cwd), head)
+        Path(self.cwd, "new.py").write_text("")
+        _git(self.cwd, "add", "new.py")
+        _git(self.cwd, "commit", "-q", "-m", "second")
+        self.assertEqual(_sdd_git.head_sha(self.cwd), _git(self.cwd, "rev-parse", "HEAD"))
+        _git(self.cwd, "checkout", "-q", "--detach", head)
+        self.assertEqual(_sdd_git.head_sha(self.cwd), head)
+
+    def test_unborn_branch_and_no_repo(self):
+        fresh = tempfile.mkdtemp(prefix="sdd-git-unborn-")
+        try:
+            _git(fresh, "init", "-q")
+            self.assertIsNone(_sdd_git.head_sha(fresh))
+            self.assertIs(_sdd_git.is_tracked(fresh, "x.py"), False)
+        finally:
+            shutil.rmtree(fresh, ignore_errors=True)
+        outside = tempfile.mkdtemp(prefix="sdd-git-outside-")
+        try:
+            self.assertIsNone(_sdd_git.head_sha(outside))
+            self.assertIs(_sdd_git.is_linked_worktree(outside), False)
+            self.assertIs(_sdd_git.is_tracked(outside, "x.py"), False)
+        finally:
+            shutil.rmtree(outside, ignore_errors=True)
+
+    def test_linked_worktree(self):
+        wt = self.cwd + "-wt"
+        _git(self.cwd, "worktree", "add", "-q", wt)
+        try:
+            self.assertIs(_sdd_git.is_linked_worktree(wt), True)
+            self.assertEqual(_sdd_git.head_sha(wt), _git(wt, "rev-parse", "HEAD"))
+            self._tracked_matches_git(wt)
+        finally:
+            shutil.rmtree(wt, ignore_errors=True)
+
+    def test_unsupported_layouts_answer_unknown(self):
+        _git(self.cwd, "update-index", "--split-index")
+        self.assertIs(_sdd_git.is_tracked(self.cwd, "pkg/sub0/module_00.py"),
+                      _sdd_git.UNKNOWN)
+        with mock.patch.dict(os.environ, {"GIT_DIR": str(Path(self.cwd, ".git"))}):
+            self.assertIs(_sdd_git.head_sha(self.cwd), _sdd_git.UNKNOWN)
+
+    def test_cache_reparses_after_change(self):
+        index = Path(self.cwd, ".git", "index")
+        old = index.stat().st_mtime - 60
+        os.utime(index, (old, old))
+        self.assertIs(_sdd_git.is_tracked(self.cwd, "added.py"), False)
+        Path(self.cwd, "added.py").write_text("")
+        _git(self.cwd, "add", "added.py")
+        self.assertIs(_sdd_git.is_tracked(self.cwd, "added.py"), True)
+
+
+if __name__ == "__main__":
+    unittest.main()
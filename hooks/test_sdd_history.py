@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Tests for the per-(command, rung) duration history (_sdd_history.py)."""
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_history
+from _sdd_history import p95, predict, record_run
+from _sdd_state import adaptive_gate_timeout, state_path, write_state
+
+
+class _Project(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-history-test-")
+
+    def tearDown(self):
+        _sdd_history._history_path(self.cwd).unlink(missing_ok=True)
+        state_path(self.cwd).unlink(missing_ok=True)
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+
+class TestHistory(_Project):
+
+    def test_ewma_and_samples(self):
+        for seconds in (10, 20):
+            record_run(self.cwd, "pytest", "3", seconds)
+        self.assertEqual(predict(self.cwd, "pytest", "3"),
+                         {"ewma": 13.0, "p95": 20, "n": 2})
+
+    def test_p95_ignores_one_outlier_in_twenty(self):
+        self.assertEqual(p95([1.0] * 19 + [100.0]), 1.0)
+        self.assertEqual(p95([1.0] * 18 + [100.0, 100.0]), 100.0)
+        self.assertEqual(p95([3.0]), 3.0)
+
+    def test_samples_bounded(self):
+        with mock.patch.object(_sdd_history, "DURATION_HISTORY_SAMPLES", 3):
+            for seconds in (1, 2, 3, 4):
+                record_run(self.cwd, "pytest", "3", seconds)
+        self.assertEqual(predict(self.cwd, "pytest", "3")["n"], 3)
+
+    def test_unknown_command_falls_back_to_its_rung(self):
+        record_run(self.cwd, "pytest tests/test_a.py", "1a", 0.5)
+        self.assertEqual(predict(self.cwd, "pytest tests/test_b.py", "1a")["ewma"], 0.5)
+        self.assertIsNone(predict(self.cwd, "pytest", "3"))
+
+    def test_least_recent_commands_dropped_rung_kept(self):
+        with mock.patch.object(_sdd_history, "DURATION_HISTORY_MAX_COMMANDS", 2):
+            for i in range(3):
+                record_run(self.cwd, f"pytest t{i}.py", "1a", float(i + 1))
+        keys = _sdd_history._read(self.cwd)
+        self.assertEqual(sorted(keys), ["1a\0*", "1a\0pytest t1.py", "1a\0pytest t2.py"])
+        self.assertEqual(keys["1a\0*"]["samples"], [1.0, 2.0, 3.0])
+
+
+class TestAdaptiveTimeout(_Project):
+
+    def test_scoped_run_does_not_shrink_full_suite_timeout(self):
+        record_run(self.cwd, "pytest", "3", 60)
+        record_run(self.cwd, "pytest tests/test_a.py", "1a", 1)
+        write_state(self.cwd, True, "1 passed", started_at=time.time() - 1)
+        self.assertEqual(adaptive_gate_timeout(self.cwd, command="pytest", rung="3"), 180)
+        self.assertEqual(adaptive_gate_timeout(self.cwd, command="pytest tests/test_a.py",
+                                               rung="1a"), 30)
+
+    def test_no_history_uses_last_state_then_default(self):
+        self.assertEqual(adaptive_gate_timeout(self.cwd, command="pytest", rung="3"), 120)
+        write_state(self.cwd, True, "1 passed", started_at=time.time() - 20)
+        self.assertEqual(adaptive_gate_timeout(self.cwd, command="pytest", rung="3"), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
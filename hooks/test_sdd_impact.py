@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Tests for the coverage-context impact index (_sdd_impact.py).
+
+coverage.py is not needed: data files are written with its SQLite
+schema (file, context, line_bits with numbits blobs) directly.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_impact
+from _sdd_config import _clear_project_config_cache
+from _sdd_impact import (
+    coverage_data_path, impacted_pytest_command, impacted_tests, instrument,
+    read_index, update_index,
+)
+
+_GIT = shutil.which("git") is not None
+
+SOURCE = "".join(f"line {i}\n" for i in range(1, 21))  # 20 lines
+
+
+def _numbits(lines):
+    bits = bytearray(max(lines) // 8 + 1)
+    for ln in lines:
+        bits[ln // 8] |= 1 << (ln % 8)
+    return bytes(bits)
+
+
+def write_coverage_data(path, cwd, measured):
+    """measured: {rel: {context: lines}} → coverage.py SQLite data file."""
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT UNIQUE);"
+        "CREATE TABLE context (id INTEGER PRIMARY KEY, context TEXT UNIQUE);"
+        "CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER,"
+        " numbits BLOB);")
+    contexts = {}
+    for file_id, (rel, per_context) in enumerate(measured.items(), 1):
+        conn.execute("INSERT INTO file VALUES (?, ?)",
+                     (file_id, str(Path(cwd, rel).resolve())))
+        for context, lines in per_context.items():
+            if context not in contexts:
+                contexts[context] = len(contexts) + 1
+                conn.execute("INSERT INTO context VALUES (?, ?)",
+                             (contexts[context], context))
+            conn.execute("INSERT INTO line_bits VALUES (?, ?, ?)",
+                         (file_id, contexts[context], _numbits(lines)))
+    conn.commit()
+    conn.close()
+
+
+class _IndexBase(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-impact-test-")
+        self._write(".claude/config.json", json.dumps({"IMPACT_INDEX": True}))
+        self._write("app/core.py", SOURCE)
+        for name in ("test_a", "test_b", "test_c"):
+            self._write(f"tests/{name}.py", "def test(): pass\n")
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        for path in (_sdd_impact._index_path(self.cwd), coverage_data_path(self.cwd)):
+            path.unlink(missing_ok=True)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _write(self, rel, text):
+        path = Path(self.cwd, rel)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def _run(self, measured):
+        write_coverage_data(coverage_data_path(self.cwd), self.cwd, measured)
+        self.assertTrue(update_index(self.cwd))
+
+    def _edit_line(self, n, text="changed"):
+        lines = SOURCE.splitlines(keepends=True)
+        lines[n - 1] = f"{text}\n"
+        self._write("app/core.py", "".join(lines))
+
+
+class TestBuild(_IndexBase):
+
+    def test_run_contexts_become_line_ranges(self):
+        self._run({"app/core.py": {
+            "tests/test_a.py::test|run": {1, 2, 3, 7},
+            "tests/test_a.py::test|setup": {9},
+            "": {15, 16},  # import time: no test
+        }})
+        entry = read_index(self.cwd)["files"]["app/core.py"]
+        self.assertEqual(entry["cov"], {"tests/test_a.py::test": [[1, 3], [7, 7], [9, 9]]})
+        self.assertFalse(coverage_data_path(self.cwd).exists())
+
+    def test_rerun_replaces_only_tests_that_ran(self):
+        self._run({"app/core.py": {"tests/test_a.py::test|run": {1},
+                                   "tests/test_b.py::test|run": {5}}})
+        self._run({"app/core.py": {"tests/test_a.py::test|run": {2}}})
+        cov = read_index(self.cwd)["files"]["app/core.py"]["cov"]
+        self.assertEqual(cov, {"tests/test_a.py::test": [[2, 2]],
+                               "tests/test_b.py::test": [[5, 5]]})
+
+    def test_tests_that_did_not_run_follow_line_shifts(self):
+        self._run({"app/core.py": {"tests/test_b.py::test|run": {10, 11}}})
+        self._write("app/core.py", "new 1\nnew 2\n" + SOURCE)
+        self._write("app/other.py", "x\n")
+        self._run({"app/other.py": {"tests/test_a.py::test|run": {1}}})
+        # core.py is re-snapshotted only when measured again; query remaps.
+        self._run({"app/core.py": {"tests/test_a.py::test|run": {1}}})
+        cov = read_index(self.cwd)["files"]["app/core.py"]["cov"]
+        self.assertEqual(cov["tests/test_b.py::test"], [[12, 13]])
+
+    def test_missing_data_file_is_a_no_op(self):
+        self.assertFalse(update_index(self.cwd))
+        self.assertEqual(read_index(self.cwd), {})
+
+
+class TestQuery(_IndexBase):
+
+    def setUp(self):
+        super().setUp()
+        self._run({"app/core.py": {
+            "tests/test_a.py::test|run": {1, 2, 3},
+            "tests/test_b.py::test|run": {10, 11, 12},
+            "tests/test_c.py::test[x-1]|run": {11},
+        }})
+
+    def test_edited_lines_select_covering_tests(self):
+        self._edit_line(11)
+        self.assertEqual(impacted_tests(self.cwd, "app/core.py"),
+                         ["tests/test_b.py::test", "tests/test_c.py::test[x-1]"])
+        self.assertEqual(
+            impacted_pytest_command(self.cwd, "app/core.py"),
+            "pytest tests/test_b.py::test 'tests/test_c.py::test[x-1]'")
+
+    def test_edit_of_uncovered_lines_runs_every_test_of_the_file(self):
+        self._edit_line(18)
+        self.assertEqual(len(impacted_tests(self.cwd, "app/core.py")), 3)
+
+    def test_stale_index_falls_back(self):
+        self.assertIsNone(impacted_tests(self.cwd, "app/unknown.py"))
+        self._write("app/core.py", "rewritten\n" * 20)
+        self.assertIsNone(impacted_tests(self.cwd, "app/core.py"))  # drift
+
+    def test_old_index_falls_back(self):
+        self._edit_line(2)
+        index = read_index(self.cwd)
+        index["built_at"] = time.time() - _sdd_impact.IMPACT_INDEX_MAX_AGE - 1
+        _sdd_impact._write_index(self.cwd, index)
+        self.assertIsNone(impacted_pytest_command(self.cwd, "app/core.py"))
+
+    def test_deleted_test_files_dropped(self):
+        self._edit_line(11)
+        os.unlink(Path(self.cwd, "tests/test_b.py"))
+        self.assertEqual(impacted_tests(self.cwd, "app/core.py"),
+                         ["tests/test_c.py::test[x-1]"])
+
+    def test_many_nodeids_collapse_to_files(self):
+        self._edit_line(11)
+        from unittest import mock
+        with mock.patch.object(_sdd_impact, "IMPACT_INDEX_MAX_NODEIDS", 1):
+            self.assertIsNone(impacted_pytest_command(self.cwd, "app/core.py"))
+        with mock.patch.object(_sdd_impact, "IMPACT_INDEX_MAX_NODEIDS", 2):
+            self.assertEqual(impacted_pytest_command(self.cwd, "app/core.py"),
+                             "pytest tests/test_b.py::test 'tests/test_c.py::test[x-1]'")
+
+    def test_disabled_by_default(self):
+        os.unlink(Path(self.cwd, ".claude/config.json"))
+        _clear_project_config_cache()
+        self._edit_line(11)
+        self.assertIsNone(impacted_pytest_command(self.cwd, "app/core.py"))
+
+    @unittest.skipUnless(_GIT, "git required")
+    def test_uncommitted_lines_count_when_snapshot_is_current(self):
+        def git(*args):
+            subprocess.run(["git", *args], cwd=self.cwd, check=True,
+                           capture_output=True)
+        git("init", "-q")
+        git("-c", "user.email=t@e", "-c", "user.name=t", "commit", "-q",
+            "--allow-empty", "-m", "base")
+        git("add", "app/core.py")
+        git("-c", "user.email=t@e", "-c", "user.name=t", "commit", "-q", "-m", "src")
+        self._edit_line(2)
+        # Re-measured after the edit: the snapshot now matches the file,
+        # and only `git diff HEAD` still shows line 2 as changed.
+        self._run({"app/core.py": {"tests/test_a.py::test|run": {1, 2, 3}}})
+        self.assertEqual(impacted_tests(self.cwd, "app/core.py"),
+                         ["tests/test_a.py::test"])
+
+
+class TestInstrument(_IndexBase):
+
+    def test_only_single_pytest_statements(self):
+        for cmd in ("pytest", "pytest -q tests", "python3 -m pytest -x"):
+            command, env = instrument(self.cwd, cmd)
+            self.assertTrue(command.startswith(cmd + " --cov=."), cmd)
+            self.assertEqual(env["COVERAGE_FILE"], str(coverage_data_path(self.cwd)))
+        for cmd in ("npm test", "pytest && ruff check .", "pytest > log", "make test"):
+            self.assertIsNone(instrument(self.cwd, cmd), cmd)
+
+    def test_missing_plugin_remembered(self):
+        out = "pytest: error: unrecognized arguments: --cov=. --cov-context=test"
+        self.assertFalse(_sdd_impact.coverage_plugin_missing(self.cwd, 1, out))
+        self.assertTrue(_sdd_impact.coverage_plugin_missing(self.cwd, 4, out))
+        self.assertIsNone(instrument(self.cwd, "pytest"))
+
+
+if __name__ == "__main__":
+    unittest.main()
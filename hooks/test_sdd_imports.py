@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Tests for the static import graph (_sdd_imports.py) and its Rung 2 use."""
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_imports
+from _sdd_config import _clear_project_config_cache
+from _sdd_detect import cascade_impacted_test_command
+from _sdd_imports import impacted_test_files, read_graph, refresh
+
+
+class _GraphBase(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-imports-test-")
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        _sdd_imports._graph_path(self.cwd).unlink(missing_ok=True)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _write(self, rel, text=""):
+        path = Path(self.cwd, rel)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def _deps(self, rel):
+        return read_graph(self.cwd)["files"][rel][2]
+
+
+class TestPython(_GraphBase):
+
+    def setUp(self):
+        super().setUp()
+        self._write("pyproject.toml")
+        self._write("app/__init__.py")
+        self._write("app/core.py", "X = 1\n")
+        self._write("app/util.py", "from .core import X\n")
+        self._write("app/api/__init__.py")
+        self._write("app/api/views.py", "from ..util import X\n")
+        self._write("tests/conftest.py")
+        self._write("tests/test_core.py", "from app.core import X\n")
+        self._write("tests/test_views.py", "from app.api import views\n")
+        self._write("tests/test_other.py", "import json\n")
+
+    def test_edges_resolve_absolute_relative_and_submodule_imports(self):
+        self.assertTrue(refresh(self.cwd))
+        self.assertEqual(self._deps("app/util.py"), ["app/core.py"])
+        self.assertEqual(self._deps("app/api/views.py"), ["app/util.py"])
+        self.assertEqual(self._deps("tests/test_core.py"),
+                         ["app/__init__.py", "app/core.py"])
+        self.assertIn("app/api/views.py", self._deps("tests/test_views.py"))
+        self.assertEqual(self._deps("tests/test_other.py"), [])
+
+    def test_reverse_walk_reaches_transitive_importers(self):
+        refresh(self.cwd)
+        self.assertEqual(impacted_test_files(self.cwd, "app/core.py"),
+                         ["tests/test_core.py", "tests/test_views.py"])
+        self.assertEqual(impacted_test_files(self.cwd, "app/api/views.py"),
+                         ["tests/test_views.py"])
+
+    def test_conftest_dependency_selects_its_directory(self):
+        self._write("app/fixtures.py")
+        self._write("tests/conftest.py", "import app.fixtures\n")
+        refresh(self.cwd)
+        self.assertEqual(impacted_test_files(self.cwd, "app/fixtures.py"),
+                         ["tests/test_core.py", "tests/test_other.py",
+                          "tests/test_views.py"])
+
+    def test_sibling_and_src_layout_and_import_module_literals(self):
+        self._write("hooks/_helper.py")
+        self._write("hooks/my-hook.py", "import _helper\n")
+        self._write("hooks/test_hook.py",
+                    "import importlib\nhook = importlib.import_module('my-hook')\n")
+        self._write("src/lib/__init__.py")
+        self._write("src/lib/mod.py")
+        self._write("tests/test_lib.py", "from lib import mod\n")
+        refresh(self.cwd)
+        self.assertEqual(impacted_test_files(self.cwd, "hooks/_helper.py"),
+                         ["hooks/test_hook.py"])
+        self.assertEqual(impacted_test_files(self.cwd, "src/lib/mod.py"),
+                         ["tests/test_lib.py"])
+
+    def test_unparsable_file_falls_back_to_line_scan(self):
+        self._write("tests/test_core.py", "from app.core import X\ndef broken(:\n")
+        refresh(self.cwd)
+        self.assertIn("app/core.py", self._deps("tests/test_core.py"))
+
+    def test_unreached_or_unknown_file_gives_none(self):
+        self.assertIsNone(impacted_test_files(self.cwd, "app/core.py"))  # no graph
+        self._write("app/orphan.py")
+        refresh(self.cwd)
+        self.assertIsNone(impacted_test_files(self.cwd, "app/orphan.py"))
+        self.assertIsNone(impacted_test_files(self.cwd, "app/absent.py"))
+
+
+class TestJavaScript(_GraphBase):
+
+    def test_relative_specifiers_resolve_through_extensions_and_index(self):
+        self._write("src/math.ts", "export const add = (a, b) => a + b;\n")
+        self._write("src/lib/index.js", "module.exports = require('../math.js');\n")
+        self._write("src/app.tsx", "import { add } from './math';\nexport * from './lib';\n")
+        self._write("test/app.test.ts", "import React from 'react';\n"
+                                        "const app = await import('../src/app');\n")
+        refresh(self.cwd)
+        self.assertEqual(self._deps("src/lib/index.js"), ["src/math.ts"])
+        self.assertEqual(self._deps("src/app.tsx"), ["src/lib/index.js", "src/math.ts"])
+        self.assertEqual(impacted_test_files(self.cwd, "src/math.ts"),
+                         ["test/app.test.ts"])
+
+
+class TestMaintenance(_GraphBase):
+
+    def setUp(self):
+        super().setUp()
+        self._write("app.py")
+        self._write("lib.py")
+        self._write("test_app.py", "import app\n")
+        self._write("node_modules/pkg/index.js", "require('./x')\n")
+
+    def test_refresh_parses_only_changed_files(self):
+        refresh(self.cwd)
+        self.assertNotIn("node_modules/pkg/index.js", read_graph(self.cwd)["files"])
+        self._write("test_app.py", "import app\nimport lib\n")
+        with mock.patch.object(_sdd_imports, "_parse",
+                               wraps=_sdd_imports._parse) as parse:
+            refresh(self.cwd)
+        self.assertEqual([c.args[1] for c in parse.call_args_list], ["test_app.py"])
+        self.assertEqual(impacted_test_files(self.cwd, "lib.py"), ["test_app.py"])
+
+    def test_edit_path_leaves_the_graph_to_the_worker(self):
+        from _sdd_coverage import record_file_edit
+        from _sdd_state import coverage_path
+        self.addCleanup(coverage_path(self.cwd).unlink, missing_ok=True)
+        refresh(self.cwd)
+        before = read_graph(self.cwd)
+        self._write("test_lib.py", "import lib\n")
+        with mock.patch.object(_sdd_imports, "_parse") as parse:
+            record_file_edit(self.cwd, str(Path(self.cwd, "test_lib.py")))
+        parse.assert_not_called()
+        self.assertEqual(read_graph(self.cwd), before)
+        refresh(self.cwd)
+        self.assertEqual(impacted_test_files(self.cwd, "lib.py"), ["test_lib.py"])
+
+    def test_file_cap_and_opt_out_leave_no_graph(self):
+        with mock.patch.object(_sdd_imports, "IMPORT_GRAPH_MAX_FILES", 2):
+            self.assertFalse(refresh(self.cwd))
+        self._write(".claude/config.json", json.dumps({"IMPORT_GRAPH": False}))
+        _clear_project_config_cache()
+        self.assertFalse(refresh(self.cwd))
+        self.assertEqual(read_graph(self.cwd), {})
+
+
+class TestCascadeRung2(_GraphBase):
+
+    def test_pytest_source_edit_runs_importing_tests(self):
+        self._write("pyproject.toml")
+        self._write("app.py")
+        self._write("tests/test_app.py", "import app\n")
+        self.assertEqual(cascade_impacted_test_command(self.cwd, "app.py")["rung"], "3")
+        refresh(self.cwd)
+        result = cascade_impacted_test_command(self.cwd, "app.py")
+        self.assertEqual((result["rung"], result["command"]),
+                         ("2", "pytest tests/test_app.py"))
+
+    def test_node_test_script_keeps_flags_and_replaces_paths(self):
+        self._write("package.json", json.dumps({"scripts": {
+            "test": "node --import tsx --test --test-reporter=spec 'test/**/*.test.ts'"}}))
+        self._write("src/math.ts")
+        self._write("test/math.test.ts", "import { add } from '../src/math';\n")
+        refresh(self.cwd)
+        self.assertEqual(
+            cascade_impacted_test_command(self.cwd, "src/math.ts")["command"],
+            "node --import tsx --test --test-reporter=spec test/math.test.ts")
+        self.assertEqual(
+            cascade_impacted_test_command(self.cwd, "test/math.test.ts")["command"],
+            "node --import tsx --test --test-reporter=spec test/math.test.ts")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent))
 sdd_auto_test = importlib.import_module("sdd-auto-test")
 sdd_test_guard = importlib.import_module("sdd-test-guard")
 task_completed = importlib.import_module("task-completed")
+import _sdd_config
 import _sdd_detect
 
 
@@ -810,6 +811,12 @@ class TestFullSDDCycle(unittest.TestCase):
                 "def test_add(): assert add(1, 2) == 3\n"
             ),
         )
+        # Feedback only: keep the import graph from turning app.py edits
+        # into Rung 2 (whose [SDD:ORDERING] signal would join the output).
+        (proj / ".claude").mkdir(exist_ok=True)
+        (proj / ".claude" / "config.json").write_text('{"IMPORT_GRAPH": false}')
+        _sdd_config._clear_project_config_cache()
+        self.addCleanup(_sdd_config._clear_project_config_cache)
 
         # Edit 1: No state yet → no feedback
         with patch.object(sdd_auto_test, "run_tests_background"), \
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Tests for structured test reports (_sdd_report.py)."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_report
+from _sdd_config import _clear_project_config_cache
+from _sdd_report import (
+    Reporting, failing_ids, failure_lines, read_report, read_test_report,
+    record_report, reporting_command, summary,
+)
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+<testcase classname="tests.test_a" name="test_ok" file="tests/test_a.py" line="3" time="0.25"/>
+<testcase classname="tests.test_a.TestX" name="test_bad[1]" file="tests/test_a.py" line="9" time="0.5">
+<failure message="assert 1 == 2">def test_bad(n):
+&gt;       assert n == 2
+E       assert 1 == 2
+
+tests/test_a.py:11: AssertionError</failure></testcase>
+<testcase classname="tests.test_b" name="test_skip" file="tests/test_b.py" line="0" time="0.0">
+<skipped message="later"/></testcase>
+<testcase classname="tests.test_b" name="test_err" file="tests/test_b.py" line="4" time="0.1">
+<error message="failed on setup with &quot;fixture 'db' not found&quot;">...</error></testcase>
+</testsuite></testsuites>
+"""
+
+GO_EVENTS = [
+    {"Action": "run", "Package": "m/calc", "Test": "TestAdd"},
+    {"Action": "output", "Package": "m/calc", "Test": "TestAdd", "Output": "=== RUN   TestAdd\n"},
+    {"Action": "output", "Package": "m/calc", "Test": "TestAdd",
+     "Output": "    calc_test.go:8: got 1, want 2\n"},
+    {"Action": "output", "Package": "m/calc", "Test": "TestAdd",
+     "Output": "--- FAIL: TestAdd (0.01s)\n"},
+    {"Action": "fail", "Package": "m/calc", "Test": "TestAdd", "Elapsed": 0.01},
+    {"Action": "output", "Package": "m/calc", "Test": "TestSub", "Output": "--- PASS: TestSub\n"},
+    {"Action": "pass", "Package": "m/calc", "Test": "TestSub", "Elapsed": 0.02},
+    {"Action": "output", "Package": "m/calc", "Output": "FAIL\n"},
+    {"Action": "output", "Package": "m/calc", "Output": "FAIL\tm/calc\t0.03s\n"},
+    {"Action": "fail", "Package": "m/calc", "Elapsed": 0.03},
+    {"Action": "output", "Package": "m/util", "Output": "ok  \tm/util\t0.01s\n"},
+    {"Action": "pass", "Package": "m/util", "Test": "TestTrim", "Elapsed": 0.0},
+    {"Action": "pass", "Package": "m/util", "Elapsed": 0.01},
+]
+
+
+class _Project(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-report-test-")
+        Path(self.cwd, ".claude").mkdir()
+        Path(self.cwd, ".claude/config.json").write_text(
+            json.dumps({"STRUCTURED_REPORT": True}))
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        _sdd_report._test_report_path(self.cwd).unlink(missing_ok=True)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _reporting(self, kind, content):
+        path = Path(self.cwd, f"report.{kind}")
+        path.write_text(content)
+        return Reporting("cmd", path, kind)
+
+
+class TestReportingCommand(_Project):
+
+    def test_disabled_by_default(self):
+        Path(self.cwd, ".claude/config.json").write_text("{}")
+        _clear_project_config_cache()
+        self.assertIsNone(reporting_command(self.cwd, "pytest -q"))
+
+    def test_pytest_gets_junitxml(self):
+        for command in ("pytest -q tests/test_a.py", "python3 -m pytest"):
+            reporting = reporting_command(self.cwd, command)
+            self.assertEqual(reporting.kind, "junit")
+            self.assertEqual(reporting.command,
+                             f"{command} -o junit_family=xunit1 --junitxml={reporting.path}")
+
+    def test_jest_and_vitest_flags(self):
+        reporting = reporting_command(self.cwd, "npx jest src/a.test.ts")
+        self.assertEqual(reporting.command,
+                         f"npx jest src/a.test.ts --json --outputFile={reporting.path}")
+        reporting = reporting_command(self.cwd, "npx vitest run src/a.test.ts")
+        self.assertIn("--reporter=default --reporter=json --outputFile=", reporting.command)
+
+    def test_npm_script_running_jest_gets_flags_after_separator(self):
+        Path(self.cwd, "package.json").write_text(json.dumps({"scripts": {"test": "jest"}}))
+        reporting = reporting_command(self.cwd, "npm test")
+        self.assertEqual(reporting.command, f"npm test -- --json --outputFile={reporting.path}")
+        Path(self.cwd, "package.json").write_text(
+            json.dumps({"scripts": {"test": "tsc && jest"}}))
+        self.assertIsNone(reporting_command(self.cwd, "npm test"))
+
+    def test_go_test_json_redirected(self):
+        reporting = reporting_command(self.cwd, "go test -count=1 ./...")
+        self.assertEqual(reporting.command,
+                         f"go test -json -count=1 ./... > {reporting.path}")
+
+    def test_unsupported_shapes(self):
+        for command in ("pytest && ruff check", "pytest > out.txt",
+                        "pytest --junitxml=mine.xml", "go test -json ./...",
+                        "cargo test", "npx jest --json"):
+            self.assertIsNone(reporting_command(self.cwd, command), command)
+
+
+class TestReadReport(_Project):
+
+    def test_junit(self):
+        reporting = self._reporting("junit", JUNIT)
+        report = read_report(self.cwd, reporting, 1)
+        self.assertFalse(reporting.path.exists())
+        self.assertEqual(report["counts"], {"passed": 1, "failed": 1, "errors": 1, "skipped": 1})
+        self.assertEqual(report["tests"]["tests/test_a.py::TestX::test_bad[1]"], ["f", 0.5])
+        self.assertEqual(report["failures"][0], {
+            "id": "tests/test_a.py::TestX::test_bad[1]",
+            "location": "tests/test_a.py:11", "message": "assert 1 == 2"})
+        self.assertEqual(report["failures"][1]["location"], "tests/test_b.py:5")
+        self.assertEqual(report["units"], {"pytest:tests/test_a.py": 0.75,
+                                           "pytest:tests/test_b.py": 0.1})
+        self.assertEqual(summary(report), "1 passed, 1 failed, 1 errors, 1 skipped")
+
+    def test_jest(self):
+        name = os.path.join(self.cwd, "src/a.test.ts")
+        data = {"testResults": [
+            {"name": name, "status": "failed", "assertionResults": [
+                {"fullName": "adds", "status": "passed", "duration": 12},
+                {"fullName": "math subtracts", "status": "failed", "duration": 3,
+                 "failureMessages": [f"Error: expect(received).toBe(expected)\n"
+                                     f"    at Object.<anonymous> ({name}:14:5)"]},
+                {"fullName": "later", "status": "todo"}]},
+            {"name": os.path.join(self.cwd, "src/b.test.ts"), "status": "failed",
+             "message": "SyntaxError: Unexpected token", "assertionResults": []}]}
+        report = read_report(self.cwd, self._reporting("jest", json.dumps(data)), 1)
+        self.assertEqual(report["counts"], {"passed": 1, "failed": 1, "errors": 1, "skipped": 1})
+        self.assertEqual(report["tests"]["src/a.test.ts > adds"], ["p", 0.012])
+        self.assertEqual(failure_lines(report), [
+            "src/a.test.ts > math subtracts (src/a.test.ts:14): "
+            "Error: expect(received).toBe(expected)",
+            "src/b.test.ts: SyntaxError: Unexpected token"])
+        self.assertEqual(failing_ids(report, "jest"), ["src/a.test.ts", "src/b.test.ts"])
+
+    def test_oversized_jest_report_ignored(self):
+        with mock.patch.object(_sdd_report, "REPORT_MAX_BYTES", 10):
+            self.assertIsNone(read_report(
+                self.cwd, self._reporting("jest", json.dumps({"testResults": []})), 0))
+
+    def test_go_json_rebuilds_plain_output(self):
+        content = "".join(json.dumps(e) + "\n" for e in GO_EVENTS)
+        report = read_report(self.cwd, self._reporting("go-json", content), 1)
+        self.assertEqual(report["counts"]["failed"], 1)
+        self.assertEqual(report["failures"], [{"id": "m/calc:TestAdd",
+                                               "location": "calc_test.go:8",
+                                               "message": "got 1, want 2"}])
+        self.assertEqual(report["output"],
+                         "    calc_test.go:8: got 1, want 2\n--- FAIL: TestAdd (0.01s)\n"
+                         "FAIL\nFAIL\tm/calc\t0.03s\nok  \tm/util\t0.01s\n")
+        self.assertEqual(report["units"], {"go:m/calc": 0.03, "go:m/util": 0.01})
+        self.assertEqual(failing_ids(report, "go-json"), ["m/calc:TestAdd"])
+
+    def test_go_build_failure_is_an_error(self):
+        events = [{"Action": "output", "Package": "m/x", "Output": "FAIL\tm/x [build failed]\n"},
+                  {"Action": "fail", "Package": "m/x", "Elapsed": 0}]
+        content = "".join(json.dumps(e) + "\n" for e in events)
+        report = read_report(self.cwd, self._reporting("go-json", content), 2)
+        self.assertEqual(report["counts"]["errors"], 1)
+
+    def test_unusable_reports_are_none(self):
+        self.assertIsNone(read_report(self.cwd, None, 0))
+        self.assertIsNone(read_report(self.cwd, Reporting("c", Path(self.cwd, "none.xml"),
+                                                          "junit"), 0))
+        self.assertIsNone(read_report(self.cwd, self._reporting("junit", "<testsuites"), 1))
+        # A failing exit with no failing test: keep the regex path.
+        passing = JUNIT.split("<testcase classname=\"tests.test_a.TestX\"")[0] + "</testsuite></testsuites>"
+        self.assertIsNone(read_report(self.cwd, self._reporting("junit", passing), 1))
+
+    def test_real_pytest_run(self):
+        from _sdd_state import run_in_process_group
+        Path(self.cwd, "test_real.py").write_text(
+            "def test_ok():\n    pass\n\ndef test_bad():\n    assert 1 == 2\n")
+        reporting = reporting_command(self.cwd, f"{sys.executable} -m pytest -q -p no:cacheprovider")
+        rc, _, _, _ = run_in_process_group(reporting.command, self.cwd, 60)
+        report = read_report(self.cwd, reporting, rc)
+        self.assertEqual(summary(report), "1 passed, 1 failed")
+        self.assertEqual(report["failures"][0]["id"], "test_real.py::test_bad")
+        self.assertEqual(report["failures"][0]["location"], "test_real.py:5")
+
+
+class TestRecordReport(_Project):
+
+    def test_keeps_tests_and_feeds_durations_for_full_suites(self):
+        report = read_report(self.cwd, self._reporting("junit", JUNIT), 1)
+        with mock.patch("_sdd_shard.record_durations") as durations:
+            record_report(self.cwd, "pytest tests/test_a.py", report, False)
+            durations.assert_not_called()
+            record_report(self.cwd, "pytest", report, True)
+        durations.assert_called_once_with(self.cwd, report["units"])
+        stored = read_test_report(self.cwd)
+        self.assertEqual(stored["command"], "pytest")
+        self.assertEqual(stored["tests"]["tests/test_b.py::test_skip"], ["s", 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Tests for the opt-in test result cache (_sdd_results.py)."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_results
+from _sdd_config import _clear_project_config_cache
+from _sdd_results import lookup, remember, result_key, tree_hash
+
+
+def _age(path, seconds=10):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+class _Project(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-results-test-")
+        Path(self.cwd, ".claude").mkdir()
+        Path(self.cwd, ".claude/config.json").write_text(json.dumps({"RESULT_CACHE": True}))
+        Path(self.cwd, "pyproject.toml").write_text("[project]\n")
+        Path(self.cwd, "app.py").write_text("x = 1\n")
+        Path(self.cwd, "test_app.py").write_text("def test_x(): pass\n")
+        for name in ("pyproject.toml", "app.py", "test_app.py"):
+            _age(Path(self.cwd, name))
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        _sdd_results._stat_path(self.cwd).unlink(missing_ok=True)
+        _sdd_results._results_path(self.cwd).unlink(missing_ok=True)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+
+class TestTreeHash(_Project):
+
+    def test_content_change_and_revert(self):
+        before = tree_hash(self.cwd)
+        Path(self.cwd, "app.py").write_text("x = 2\n")
+        changed = tree_hash(self.cwd)
+        self.assertNotEqual(before, changed)
+        Path(self.cwd, "app.py").write_text("x = 1\n")
+        self.assertEqual(tree_hash(self.cwd), before)
+
+    def test_unrelated_files_and_skipped_dirs_ignored(self):
+        before = tree_hash(self.cwd)
+        Path(self.cwd, "notes.txt").write_text("todo\n")
+        Path(self.cwd, "node_modules").mkdir()
+        Path(self.cwd, "node_modules/dep.js").write_text("x\n")
+        Path(self.cwd, ".venv").mkdir()
+        Path(self.cwd, ".venv/site.py").write_text("x\n")
+        self.assertEqual(tree_hash(self.cwd), before)
+
+    def test_lockfile_is_part_of_the_tree(self):
+        before = tree_hash(self.cwd)
+        Path(self.cwd, "poetry.lock").write_text("[[package]]\n")
+        self.assertNotEqual(tree_hash(self.cwd), before)
+
+    def test_unchanged_stat_is_not_reread(self):
+        tree_hash(self.cwd)
+        with mock.patch.object(_sdd_results, "_digest") as digest:
+            tree_hash(self.cwd)
+        digest.assert_not_called()
+
+    def test_racy_file_is_reread(self):
+        Path(self.cwd, "app.py").write_text("x = 3\n")
+        tree_hash(self.cwd)
+        with mock.patch.object(_sdd_results, "_digest", return_value="d") as digest:
+            tree_hash(self.cwd)
+        self.assertEqual([c.args[0] for c in digest.call_args_list],
+                         [os.path.join(self.cwd, "app.py")])
+
+    def test_too_many_files_disables(self):
+        with mock.patch.object(_sdd_results, "RESULT_CACHE_MAX_FILES", 1):
+            self.assertIsNone(tree_hash(self.cwd))
+
+
+class TestResults(_Project):
+
+    def test_disabled_by_default(self):
+        Path(self.cwd, ".claude/config.json").write_text("{}")
+        _clear_project_config_cache()
+        self.assertIsNone(result_key(self.cwd, "pytest"))
+        self.assertIsNone(lookup(self.cwd, None))
+
+    def test_key_depends_on_command(self):
+        self.assertNotEqual(result_key(self.cwd, "pytest"), result_key(self.cwd, "pytest -x"))
+
+    def test_remember_then_lookup(self):
+        key = result_key(self.cwd, "pytest")
+        remember(self.cwd, "pytest", key, True, "3 passed", "ok\n", duration=4.2)
+        hit = lookup(self.cwd, key)
+        self.assertEqual((hit["passing"], hit["summary"], hit["raw_output"], hit["duration"]),
+                         (True, "3 passed", "ok\n", 4.2))
+
+    def test_not_stored_when_tree_changed_during_run(self):
+        key = result_key(self.cwd, "pytest")
+        Path(self.cwd, "app.py").write_text("x = 2\n")
+        remember(self.cwd, "pytest", key, True, "3 passed")
+        self.assertIsNone(lookup(self.cwd, key))
+
+    def test_expired_entry_is_a_miss(self):
+        key = result_key(self.cwd, "pytest")
+        remember(self.cwd, "pytest", key, False, "1 failed")
+        with mock.patch.object(_sdd_results, "RESULT_CACHE_TTL", -1):
+            self.assertIsNone(lookup(self.cwd, key))
+
+    def test_oldest_entries_evicted(self):
+        keys = []
+        with mock.patch.object(_sdd_results, "RESULT_CACHE_ENTRIES", 2):
+            for command in ("a", "b", "c"):
+                keys.append(result_key(self.cwd, command))
+                remember(self.cwd, command, keys[-1], True, "1 passed")
+        self.assertEqual([lookup(self.cwd, k) is not None for k in keys], [False, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Tests for process-group resource accounting (_sdd_rusage.py) and the
+mission report's gate cost section.
+"""
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_rusage
+from _sdd_config import _clear_project_config_cache, get_resource_limits
+from _sdd_rusage import USAGE_KEYS, combine
+from _sdd_state import run_in_process_group
+
+HOOKS_DIR = Path(__file__).resolve().parent
+AGGREGATE_SCRIPT = (HOOKS_DIR.parent / "skills" / "mission-report"
+                    / "scripts" / "aggregate.py")
+BUSY = f"{sys.executable} -c \"import time; t = time.process_time()\nwhile time.process_time() - t < 0.3: pass\""
+
+
+class _Project(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-rusage-test-")
+        Path(self.cwd, ".claude").mkdir()
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _config(self, **config):
+        Path(self.cwd, ".claude/config.json").write_text(json.dumps(config))
+        _clear_project_config_cache()
+
+
+class TestLimitsConfig(_Project):
+
+    def test_defaults_off(self):
+        self.assertEqual(get_resource_limits(self.cwd), (0, 0))
+        self.assertEqual(_sdd_rusage.limit_prefix(self.cwd), "")
+
+    def test_only_positive_integers_count(self):
+        self._config(RLIMIT_AS_MB=2048, RLIMIT_CPU_SECONDS=True)
+        self.assertEqual(get_resource_limits(self.cwd), (2048, 0))
+        self._config(RLIMIT_AS_MB=-1, RLIMIT_CPU_SECONDS=60)
+        self.assertEqual(get_resource_limits(self.cwd), (0, 60))
+
+    @unittest.skipIf(_sdd_rusage.resource is None, "POSIX only")
+    def test_prefix_is_a_ulimit_line(self):
+        self._config(RLIMIT_AS_MB=2048, RLIMIT_CPU_SECONDS=60)
+        with mock.patch.object(_sdd_rusage.resource, "getrlimit",
+                               return_value=(-1, _sdd_rusage.resource.RLIM_INFINITY)):
+            self.assertEqual(_sdd_rusage.limit_prefix(self.cwd),
+                             "ulimit -v 2097152; ulimit -t 60\n")
+        with mock.patch.object(_sdd_rusage.resource, "getrlimit",
+                               return_value=(-1, 1024 ** 3)):  # capped at the hard limit
+            self.assertEqual(_sdd_rusage.limit_prefix(self.cwd),
+                             "ulimit -v 1048576; ulimit -t 60\n")
+
+
+@unittest.skipUnless(hasattr(os, "wait4"), "POSIX only")
+class TestRunUsage(_Project):
+
+    def test_child_cpu_counted_through_the_shell(self):
+        usage = {}
+        rc, _, _, timed_out = run_in_process_group(
+            f"{BUSY} && echo done", self.cwd, 30, usage=usage)
+        self.assertEqual((rc, timed_out), (0, False))
+        self.assertEqual(set(usage), set(USAGE_KEYS))
+        self.assertGreaterEqual(usage["cpu_user_s"] + usage["cpu_sys_s"], 0.25)
+        self.assertGreater(usage["max_rss_mb"], 1)
+
+    def test_exit_code_and_output_unchanged(self):
+        usage = {}
+        result = run_in_process_group("echo out; echo err >&2; exit 3", self.cwd, 30,
+                                      usage=usage)
+        self.assertEqual(result, (3, "out\n", "err\n", False))
+        self.assertTrue(usage)
+
+    def test_timed_out_run_still_measured(self):
+        usage = {}
+        result = run_in_process_group(f"{BUSY}; sleep 30", self.cwd, 1, usage=usage)
+        self.assertEqual(result, (-1, "", "", True))
+        self.assertGreaterEqual(usage["cpu_user_s"] + usage["cpu_sys_s"], 0.25)
+
+    def test_cpu_limit_kills_the_run(self):
+        self._config(RLIMIT_CPU_SECONDS=1)
+        rc, _, _, timed_out = run_in_process_group(
+            f"{sys.executable} -c \"while True: pass\"", self.cwd, 30)
+        self.assertFalse(timed_out)
+        self.assertNotEqual(rc, 0)
+
+    def test_address_space_limit_applies(self):
+        self._config(RLIMIT_AS_MB=512)
+        rc, out, _, _ = run_in_process_group(
+            f"{sys.executable} -c \"import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0])\"",
+            self.cwd, 30)
+        self.assertEqual((rc, out.strip()), (0, str(512 * 1024 * 1024)))
+
+
+class TestCombine(unittest.TestCase):
+
+    def test_shards_add_up(self):
+        a = dict(zip(USAGE_KEYS, (1.0, 0.5, 100.0, 10, 2)))
+        b = dict(zip(USAGE_KEYS, (2.0, 0.25, 50.5, 0, 8)))
+        self.assertEqual(combine([a, {}, b]), dict(zip(USAGE_KEYS, (3.0, 0.75, 150.5, 10, 10))))
+        self.assertEqual(combine([{}, {}]), {})
+
+
+@unittest.skipUnless(AGGREGATE_SCRIPT.exists(), "mission-report missing")
+class TestGateCostReport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        spec = importlib.util.spec_from_file_location(
+            "mission_report_aggregate", AGGREGATE_SCRIPT)
+        cls.mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.mod)
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-rusage-report-")
+        Path(self.cwd, ".claude").mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _seed(self, events):
+        Path(self.cwd, ".claude/metrics.jsonl").write_text(
+            "".join(json.dumps(e) + "\n" for e in events))
+
+    def test_gates_ranked_by_cpu_time(self):
+        self._seed([
+            {"event": "gate_run", "gate": "lint", "passed": True, "duration_s": 9.0,
+             "cpu_user_s": 2.0, "cpu_sys_s": 0.5, "max_rss_mb": 80,
+             "io_read_blocks": 4, "io_write_blocks": 0},
+            {"event": "gate_run", "gate": "test", "passed": False, "duration_s": 30.0,
+             "cpu_user_s": 50.0, "cpu_sys_s": 5.0, "max_rss_mb": 900,
+             "io_read_blocks": 100, "io_write_blocks": 20},
+            {"event": "gate_run", "gate": "test", "passed": True, "duration_s": 20.0,
+             "cpu_user_s": 40.0, "cpu_sys_s": 5.0, "max_rss_mb": 700},
+            {"event": "gate_run", "gate": "typecheck", "passed": True, "duration_s": 4.0},
+        ])
+        report = self.mod.build_report(self.cwd)
+        section = report.split("## Gate cost", 1)[1]
+        rows = [line for line in section.splitlines() if line.startswith("| ")][1:]
+        self.assertEqual(rows[0], "| test | 2 | 1 | 100.0 | 50.0 | 900 | 120 |")
+        self.assertEqual(rows[1], "| lint | 1 | 0 | 2.5 | 9.0 | 80 | 4 |")
+        self.assertTrue(rows[2].startswith("| typecheck | 1 | 0 | 0.0 |"))
+
+    def test_section_absent_without_gate_runs(self):
+        self._seed([{"event": "task_completed", "teammate": "a"}])
+        self.assertNotIn("Gate cost", self.mod.build_report(self.cwd))
+
+
+class TestGateEvent(unittest.TestCase):
+
+    def test_run_gate_emits_usage(self):
+        task_completed = importlib.import_module("task-completed")
+        cwd = tempfile.mkdtemp(prefix="sdd-rusage-gate-")
+        self.addCleanup(shutil.rmtree, cwd, True)
+
+        def _run(*args, usage=None, **kwargs):
+            usage.update(cpu_user_s=1.5, max_rss_mb=42.0)
+            return 0, "ok", "", False
+
+        with mock.patch.object(task_completed, "run_in_process_group", side_effect=_run), \
+             mock.patch.object(task_completed, "append_telemetry") as telemetry:
+            self.assertEqual(task_completed.run_gate("lint", "echo ok", cwd, timeout=10),
+                             (True, "ok"))
+        event = telemetry.call_args.args[1]
+        self.assertEqual((event["event"], event["gate"], event["passed"]),
+                         ("gate_run", "lint", True))
+        self.assertEqual((event["cpu_user_s"], event["max_rss_mb"]), (1.5, 42.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
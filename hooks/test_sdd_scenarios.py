@@ -541,6 +541,7 @@ class TestBaselineHashFirstCommit(unittest.TestCase):
         self.rel = _scenario_rel("x")
 
     def tearDown(self):
+        S._baseline_cache_path(self.tmpdir).unlink(missing_ok=True)
         shutil.rmtree(self.tmpdir, ignore_errors=True)
 
     def test_modified_file_uses_first_add_commit_as_baseline(self):
@@ -593,6 +594,97 @@ class TestBaselineHashFirstCommit(unittest.TestCase):
                     )
 
 
+
+class TestBaselineCache(unittest.TestCase):
+    """First-add baselines are cached per project until history is rewritten."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="sdd-scen-cache-")
+        self.rel = _scenario_rel("x")
+        self.initial_hash = S.hashlib.sha256(_VALID_FILE.encode("utf-8")).hexdigest()
+
+    def tearDown(self):
+        S._baseline_cache_path(self.tmpdir).unlink(missing_ok=True)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _git_calls(self, fn, *args):
+        calls = []
+        real = S._run_git
+
+        def spy(cwd, *git_args):
+            calls.append(git_args[0])
+            return real(cwd, *git_args)
+
+        with patch.object(S, "_run_git", side_effect=spy):
+            result = fn(*args)
+        return result, calls
+
+    def test_hit_skips_history_walk(self):
+        _git_init_with_commit(self.tmpdir, self.rel, _VALID_FILE)
+        first, calls = self._git_calls(S.scenario_baseline_hash, self.tmpdir, self.rel)
+        self.assertEqual(first, self.initial_hash)
+        self.assertIn("log", calls)
+
+        again, calls = self._git_calls(S.scenario_baseline_hash, self.tmpdir, self.rel)
+        self.assertEqual(again, self.initial_hash)
+        self.assertEqual(calls, ["merge-base"])
+
+    def test_history_rewrite_invalidates_entry(self):
+        _git_init_with_commit(self.tmpdir, self.rel, _VALID_FILE)
+        S.scenario_baseline_hash(self.tmpdir, self.rel)
+
+        rewritten = _VALID_FILE.replace("/dashboard", "/welcome")
+        (Path(self.tmpdir) / self.rel).write_text(rewritten, encoding="utf-8")
+        subprocess.run(["git", "-C", self.tmpdir, "commit", "-q", "-a",
+                        "--amend", "-m", "rewritten"], check=True)
+
+        self.assertEqual(
+            S.scenario_baseline_hash(self.tmpdir, self.rel),
+            S.hashlib.sha256(rewritten.encode("utf-8")).hexdigest(),
+        )
+        cached = S._read_baseline_cache(self.tmpdir)[self.rel]
+        self.assertEqual(cached["commit"], S.current_head_sha(self.tmpdir))
+
+    def test_untracked_file_not_cached(self):
+        _git_init_with_commit(self.tmpdir, _scenario_rel("y"), _VALID_FILE)
+        path = Path(self.tmpdir) / self.rel
+        path.write_text(_VALID_FILE, encoding="utf-8")
+        self.assertIsNone(S.scenario_baseline_hash(self.tmpdir, self.rel))
+        self.assertNotIn(self.rel, S._read_baseline_cache(self.tmpdir))
+
+    def test_prewarm_fills_cache_with_one_walk(self):
+        other = _scenario_rel("y")
+        _git_init_with_commit(self.tmpdir, self.rel, _VALID_FILE)
+        (Path(self.tmpdir) / other).write_text(_VALID_FILE, encoding="utf-8")
+        _git_commit_all(self.tmpdir, "add y")
+
+        written, calls = self._git_calls(S.prewarm_baseline_cache, self.tmpdir)
+        self.assertEqual(written, 2)
+        self.assertEqual(calls.count("-c"), 1)  # single `git -c … log` walk
+        _, calls = self._git_calls(S.scenario_baseline_hash, self.tmpdir, other)
+        self.assertEqual(calls, ["merge-base"])
+
+    def test_prewarm_in_a_repository_subdirectory(self):
+        project = Path(self.tmpdir) / "services" / "api"
+        project.mkdir(parents=True)
+        _git_init_repo(self.tmpdir)
+        (project / self.rel).parent.mkdir(parents=True)
+        (project / self.rel).write_text(_VALID_FILE, encoding="utf-8")
+        _git_commit_all(self.tmpdir, "add api scenario")
+        self.addCleanup(S._baseline_cache_path(str(project)).unlink, missing_ok=True)
+
+        self.assertEqual(S.prewarm_baseline_cache(str(project)), 1)
+        self.assertEqual(S._read_baseline_cache(str(project))[self.rel]["sha256"],
+                         self.initial_hash)
+        self.assertEqual(S.scenario_baseline_hash(str(project), self.rel),
+                         self.initial_hash)
+
+    def test_prewarm_without_scenarios_is_a_no_op(self):
+        _git_init_repo(self.tmpdir)
+        self.assertEqual(S.prewarm_baseline_cache(self.tmpdir), 0)
+        self.assertFalse(S._baseline_cache_path(self.tmpdir).exists())
+
+
 # ─────────────────────────────────────────────────────────────────
 # Discovery path safety — Phase 10 replaces flat-name resolution
 # (`safe_scenario_path`) with config-bound glob across spec roots.
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Tests for duration-balanced full-suite sharding (_sdd_shard.py)."""
+import json
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_shard
+from _sdd_config import _clear_project_config_cache
+from _sdd_shard import balance, merge_summaries, plan, read_durations, run_sharded
+
+
+class TestBalance(unittest.TestCase):
+
+    def test_longest_first_evens_totals(self):
+        durations = {"a": 8, "b": 7, "c": 5, "d": 4, "e": 1}
+        shards = balance(list(durations), durations, 2)
+        self.assertEqual(sorted(sum(durations[u] for u in s) for s in shards), [12, 13])
+
+    def test_unknown_units_cost_the_mean(self):
+        shards = balance(["slow", "fast", "new"], {"slow": 10, "fast": 2}, 2)
+        self.assertEqual(shards, [["slow"], ["new", "fast"]])
+
+    def test_summaries_summed_per_word(self):
+        self.assertEqual(merge_summaries(["3 passed", "1 failed, 2 passed", "tests failed"]),
+                         "5 passed, 1 failed")
+        self.assertEqual(merge_summaries(["Tests: 2 passed, 2 total",
+                                          "Tests: 1 failed, 1 total"]),
+                         "Tests: 2 passed, 3 total, 1 failed")
+        self.assertIsNone(merge_summaries(["tests passed"]))
+
+
+class _ProjectBase(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-shard-test-")
+        self._write(".claude/config.json", json.dumps({"SHARDING": True}))
+        _clear_project_config_cache()
+        patcher = mock.patch.object(_sdd_shard, "shard_count",
+                                    side_effect=lambda units: min(3, units))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        _sdd_shard._durations_path(self.cwd).unlink(missing_ok=True)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _write(self, rel, text=""):
+        path = Path(self.cwd, rel)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+class TestPlan(_ProjectBase):
+
+    def test_pytest_shards_name_only_collected_files(self):
+        files = [f"tests/test_{i}.py" for i in range(5)] + ["pkg/thing_test.py"]
+        with mock.patch.object(_sdd_shard, "_pytest_files", return_value=files) as collect:
+            framework, shards = plan(self.cwd, "pytest -q")
+        collect.assert_called_once_with(self.cwd, "pytest -q")
+        self.assertEqual(framework, "pytest")
+        self.assertEqual(len(shards), 3)
+        owned = [[k[len("pytest:"):] for k in units] for _, units in shards]
+        self.assertEqual(sorted(f for group in owned for f in group), sorted(files))
+        for (command, _), group in zip(shards, owned):
+            self.assertEqual(command.split(), ["pytest", "-q", *group])
+
+    def test_no_shards_when_collection_fails(self):
+        with mock.patch.object(_sdd_shard, "_pytest_files", return_value=None):
+            self.assertIsNone(plan(self.cwd, "pytest"))
+
+    def test_commands_that_do_not_shard(self):
+        self._write("tests/test_a.py")
+        self._write("tests/test_b.py")
+        for cmd in ("pytest tests/", "pytest -n auto", "pytest --junitxml=r.xml",
+                    "pytest && ruff check .", "make test"):
+            self.assertIsNone(plan(self.cwd, cmd), cmd)
+
+    def test_go_packages_balanced_by_recorded_durations(self):
+        _sdd_shard.record_durations(self.cwd, {"go:m/a": 9.0, "go:m/b": 1.0})
+        with mock.patch.object(_sdd_shard, "_go_packages",
+                               return_value=["m/a", "m/b", "m/c"]):
+            framework, shards = plan(self.cwd, "go test -race ./...")
+        self.assertEqual(framework, "go")
+        self.assertEqual([c for c, _ in shards][0], "go test -race m/a")
+
+    def test_js_runners_use_native_shard_flag_when_installed_version_has_it(self):
+        self._write("package.json", json.dumps({"scripts": {"test": "jest --ci"}}))
+        self._write("node_modules/jest/package.json", json.dumps({"version": "27.5.1"}))
+        self.assertIsNone(plan(self.cwd, "npm test"))
+        self._write("node_modules/jest/package.json", json.dumps({"version": "29.7.0"}))
+        framework, shards = plan(self.cwd, "npm test")
+        self.assertEqual(framework, "jest")
+        self.assertEqual(shards[0][0], "npm test -- --shard=1/3")
+
+
+@unittest.skipUnless(shutil.which("pytest"), "pytest required")
+class TestRunSharded(_ProjectBase):
+
+    def setUp(self):
+        super().setUp()
+        self.pgid_file = str(Path(self.cwd, "pgid"))
+        self._write("pyproject.toml")
+        for i in range(4):
+            self._write(f"tests/test_{i}.py", "def test_a(): pass\ndef test_b(): pass\n")
+
+    def test_results_merged_and_durations_recorded(self):
+        self._write("tests/test_3.py", "def test_a(): assert 0\ndef test_b(): pass\n")
+        result = run_sharded(self.cwd, "pytest", 60, self.pgid_file)
+        self.assertEqual((result.returncode, result.shards), (1, 3))
+        self.assertEqual(result.summary, "1 failed, 7 passed")
+        self.assertTrue(result.stdout.rstrip().endswith("=="))
+        self.assertIn("test_3.py::test_a", result.stdout[-2000:])
+        self.assertEqual(sorted(read_durations(self.cwd)),
+                         [f"pytest:tests/test_{i}.py" for i in range(4)])
+
+    def test_custom_python_files_run_once(self):
+        self._write("pyproject.toml",
+                    "[tool.pytest.ini_options]\npython_files = ['test_*.py', 'check_*.py']\n")
+        self._write("tests/check_extra.py", "def test_x(): pass\n")
+        result = run_sharded(self.cwd, "pytest", 60, self.pgid_file)
+        self.assertEqual((result.returncode, result.shards), (0, 3))
+        self.assertEqual(result.summary, "9 passed")
+
+    def test_excluded_directory_stays_excluded(self):
+        self._write("pytest.ini", "[pytest]\nnorecursedirs = fixtures\n")
+        self._write("tests/fixtures/test_sample.py", "def test_x(): assert 0\n")
+        self.assertEqual(_sdd_shard._pytest_files(self.cwd, "pytest"),
+                         [f"tests/test_{i}.py" for i in range(4)])
+        result = run_sharded(self.cwd, "pytest", 60, self.pgid_file)
+        self.assertEqual((result.returncode, result.summary), (0, "8 passed"))
+
+    def test_abort_kills_all_shards(self):
+        self._write("tests/test_0.py", "import time\ndef test_slow(): time.sleep(30)\n")
+        started = time.time()
+        result = run_sharded(self.cwd, "pytest", 60, self.pgid_file,
+                             should_abort=lambda: time.time() - started > 0.5)
+        self.assertTrue(result.aborted)
+        self.assertLess(time.time() - started, 10)
+        self.assertEqual(read_durations(self.cwd), {})
+        self.assertEqual(list(Path(self.cwd).glob("pgid*")), [])
+
+    def test_disabled_by_default(self):
+        Path(self.cwd, ".claude/config.json").unlink()
+        _clear_project_config_cache()
+        self.assertIsNone(run_sharded(self.cwd, "pytest", 60, self.pgid_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Tests for the single-pass shell lexer (_sdd_shell.py)."""
+import json
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_shell
+from _sdd_shell import lex, summarize
+
+SCEN = ".ralph/specs/auth/scenarios/login.scenarios.md"
+
+
+class TestLex(unittest.TestCase):
+
+    def test_separators_outside_quotes_only(self):
+        stmts = lex('git commit -m "a; b && c" && echo ok | wc -l')
+        self.assertEqual([s.words for s in stmts], [
+            ["git", "commit", "-m", "a; b && c"], ["echo", "ok"], ["wc", "-l"]])
+
+    def test_fd_redirects_are_not_separators(self):
+        [stmt] = lex("diff -r a b 2>&1 >out.txt &>log")
+        self.assertEqual(stmt.words, ["diff", "-r", "a", "b"])
+        self.assertEqual(stmt.redirects,
+                         [("2>&", "1"), (">", "out.txt"), ("&>", "log")])
+
+    def test_heredoc_body_skipped(self):
+        stmts = lex("cat <<'EOF' > out.md\nrm -rf / ; git commit\nEOF\necho done")
+        self.assertEqual([s.text for s in stmts],
+                         ["cat <<'EOF' > out.md", "echo done"])
+
+    def test_dash_heredoc_and_two_heredocs_on_one_line(self):
+        stmts = lex("cmd <<-A <<B\n\tx\n\tA\ny\nB\nls")
+        self.assertEqual([s.words for s in stmts], [["cmd"], ["ls"]])
+
+    def test_unterminated_heredoc_runs_to_end(self):
+        self.assertEqual([s.words for s in lex("cat <<EOF\ngit commit")], [["cat"]])
+
+    def test_comment_only_at_word_start(self):
+        [stmt] = lex("echo a#b '#x' # tail")
+        self.assertEqual(stmt.words, ["echo", "a#b", "#x"])
+        self.assertEqual(stmt.text, "echo a#b '#x'")
+
+    def test_substitutions_lexed_recursively(self):
+        words = [s.words for s in lex('x="$(git commit -m "m")"; echo `rm y`')]
+        self.assertIn(["git", "commit", "-m", "m"], words)
+        self.assertIn(["rm", "y"], words)
+
+    def test_nested_subshell_inside_substitution(self):
+        words = [s.words for s in lex("v=$( (cd a && ls) ); echo done")]
+        self.assertEqual(words[-1], ["echo", "done"])
+        self.assertIn(["cd", "a"], words)
+
+    def test_large_heredoc_script_is_linear(self):
+        body = "".join(f"line {i}: it's \"q\"; rm x && echo $HOME # c\n"
+                       for i in range(2000))
+        start = time.perf_counter()
+        stmts = lex(f"cat <<'EOF' > /tmp/s.py\n{body}EOF\npython /tmp/s.py")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(len(stmts), 2)
+
+
+class TestFacts(unittest.TestCase):
+
+    def setUp(self):
+        summarize.cache_clear()
+
+    def test_git_commit(self):
+        self.assertTrue(summarize("git add . && git commit -m wip")[0])
+        self.assertTrue(summarize("/usr/bin/git commit")[0])
+        for cmd in ('echo "git commit"', "git commit-wrapper x",
+                    "my-git commit", "# git commit", "git -C x log"):
+            self.assertFalse(summarize(cmd)[0], cmd)
+
+    def test_write_paths(self):
+        self.assertEqual(summarize(f"echo x 1> {SCEN}")[1], (SCEN,))
+        self.assertEqual(summarize(f"rm {SCEN}")[1], (SCEN,))
+        self.assertEqual(summarize(f"cat <<'EOF' > {SCEN}\nbody\nEOF")[1], (SCEN,))
+        self.assertEqual(summarize(f"cat {SCEN} 2>&1 | grep x")[1], ())
+        self.assertEqual(summarize(f'echo "#" > {SCEN}')[1], (SCEN,))
+        self.assertEqual(summarize(f"cp a b ; cat {SCEN}")[1], ())
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="sdd-shell-test-")
+        self.path = Path(self.tmp, "sdd-shell-cache.json")
+        self._patch = mock.patch.object(_sdd_shell, "_cache_path",
+                                        return_value=self.path)
+        self._patch.start()
+        summarize.cache_clear()
+
+    def tearDown(self):
+        self._patch.stop()
+        summarize.cache_clear()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _long(self, tag):
+        return f"git commit -m {tag}\n" + "echo padding\n" * 100
+
+    def test_short_commands_not_persisted(self):
+        summarize("git commit")
+        self.assertFalse(self.path.exists())
+
+    def test_long_command_served_from_disk(self):
+        cmd = self._long("a")
+        self.assertEqual(summarize(cmd), (True, ()))
+        summarize.cache_clear()
+        with mock.patch.object(_sdd_shell, "_facts") as facts:
+            self.assertEqual(summarize(cmd), (True, ()))
+        facts.assert_not_called()
+
+    def test_lru_evicts_least_recently_used(self):
+        with mock.patch("_sdd_config.SHELL_CACHE_ENTRIES", 2):
+            first, second, third = (self._long(t) for t in "abc")
+            summarize(first)
+            summarize(second)
+            summarize.cache_clear()
+            summarize(first)  # hit: first becomes most recent
+            summarize(third)
+        self.assertEqual(len(json.loads(self.path.read_text())), 2)
+        summarize.cache_clear()
+        with mock.patch.object(_sdd_shell, "_facts",
+                               return_value=(False, ())) as facts:
+            summarize(first)
+            summarize(second)
+        self.assertEqual(facts.call_count, 1)  # only second was evicted
+
+    def test_corrupt_cache_ignored(self):
+        self.path.write_text("{not json")
+        self.assertEqual(summarize(self._long("z")), (True, ()))
+
+
+if __name__ == "__main__":
+    unittest.main()
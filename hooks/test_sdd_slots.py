@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Tests for the host-wide test slots (_sdd_slots.py)."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_slots
+from _sdd_config import _clear_project_config_cache
+from _sdd_slots import acquire, deprioritize, priority, release
+
+
+@unittest.skipIf(_sdd_slots.fcntl is None, "POSIX only")
+class TestAcquire(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-slots-test-")
+        Path(self.cwd, ".claude").mkdir()
+        Path(self.cwd, ".claude/config.json").write_text(json.dumps({"HOST_SCHEDULER": True}))
+        self.dir = Path(self.cwd, "slots")
+        self.held = []
+        for target, value in (("_slots_dir", self.dir), ("capacity", 2),
+                              ("_overloaded", False)):
+            patcher = mock.patch.object(_sdd_slots, target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        for slot in self.held:
+            release(slot)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _acquire(self, rung, max_wait=0.3, cwd=None):
+        slot, waited, depth = acquire(cwd or self.cwd, rung, max_wait=max_wait)
+        if slot is not None:
+            self.held.append(slot)
+        return slot, waited, depth
+
+    def test_priorities(self):
+        self.assertEqual([priority(r) for r in ("1a", "1b", "2", "3", "scoped")],
+                         [0, 0, 1, 2, 2])
+
+    def _other_project(self):
+        other = tempfile.mkdtemp(prefix="sdd-slots-other-")
+        self.addCleanup(shutil.rmtree, other, True)
+        Path(other, ".claude").mkdir()
+        Path(other, ".claude/config.json").write_text(json.dumps({"HOST_SCHEDULER": True}))
+        return other
+
+    def test_last_slot_reserved_for_rung_1(self):
+        other = self._other_project()
+        self.assertIsNotNone(self._acquire("3")[0])
+        slot, waited, _ = self._acquire("3", cwd=other)
+        self.assertIsNone(slot)
+        self.assertGreaterEqual(waited, 0.3)
+        self.assertIsNotNone(self._acquire("1a", cwd=other)[0])
+        self.assertIsNone(self._acquire("1b", cwd=self._other_project())[0])  # all slots busy
+
+    def test_one_queued_worker_per_project(self):
+        import fcntl
+        from _sdd_state import project_hash
+        self.dir.mkdir()
+        held = os.open(self.dir / f"p-{project_hash(self.cwd)}.lock", os.O_CREAT | os.O_RDWR)
+        self.addCleanup(os.close, held)
+        fcntl.flock(held, fcntl.LOCK_EX)
+        self.assertEqual(self._acquire("3"), (None, 0.0, None))
+        self.assertEqual(self._acquire("3", cwd=self._other_project())[2], 1)
+
+    def test_released_slot_is_reusable(self):
+        slot = self._acquire("3")[0]
+        release(slot)
+        self.held.remove(slot)
+        self.assertIsNotNone(self._acquire("3", max_wait=0)[0])
+
+    def test_live_ticket_ahead_blocks_dead_one_does_not(self):
+        self.dir.mkdir()
+        dead = self.dir / "q-0-1-999999999"
+        dead.touch()
+        slot, _, depth = self._acquire("3")
+        self.assertIsNotNone(slot)
+        self.assertFalse(dead.exists())
+        self.assertEqual(depth, 1)
+        (self.dir / f"q-0-1-{os.getppid()}").touch()
+        slot, _, depth = self._acquire("1a")
+        self.assertIsNone(slot)
+        self.assertEqual(depth, 2)
+        self.assertEqual([p.name for p in self.dir.glob("q-*")], [f"q-0-1-{os.getppid()}"])
+
+    def test_load_holds_back_a_second_run(self):
+        with mock.patch.object(_sdd_slots, "_overloaded", return_value=True):
+            self.assertIsNotNone(self._acquire("3")[0])  # nothing else running
+            self.assertIsNone(self._acquire("1a", cwd=self._other_project())[0])
+
+    def test_off_by_default(self):
+        Path(self.cwd, ".claude/config.json").write_text("{}")
+        _clear_project_config_cache()
+        self.assertEqual(acquire(self.cwd, "3"), (None, 0.0, 0))
+        self.assertFalse(self.dir.exists())
+
+
+class TestDeprioritize(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-slots-nice-")
+        self.addCleanup(shutil.rmtree, self.cwd, True)
+        Path(self.cwd, ".claude").mkdir()
+        Path(self.cwd, ".claude/config.json").write_text(json.dumps({"HOST_SCHEDULER": True}))
+        _clear_project_config_cache()
+        self.addCleanup(_clear_project_config_cache)
+
+    def test_off_by_default(self):
+        with mock.patch("os.nice") as nice:
+            deprioritize(tempfile.gettempdir())
+        nice.assert_not_called()
+
+    def test_nice_and_ionice(self):
+        with mock.patch("os.nice") as nice, \
+             mock.patch("shutil.which", return_value="/usr/bin/ionice"), \
+             mock.patch("subprocess.run") as run:
+            deprioritize(self.cwd)
+        nice.assert_called_once_with(_sdd_slots.HOST_NICE)
+        self.assertEqual(run.call_args.args[0],
+                         ["/usr/bin/ionice", "-c", "2", "-n", "7", "-p", str(os.getpid())])
+
+    def test_without_ionice(self):
+        with mock.patch("os.nice") as nice, \
+             mock.patch("shutil.which", return_value=None), \
+             mock.patch("subprocess.run") as run:
+            deprioritize(self.cwd)
+        nice.assert_called_once()
+        run.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
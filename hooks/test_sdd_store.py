@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Tests for the opt-in SQLite state backend (_sdd_store.py).
+
+Contract under test: with STATE_BACKEND="sqlite" the public state API
+(_sdd_state / _sdd_coverage) behaves exactly as on the files backend —
+TTLs, write-once baselines, one-shot skill flags, lost-update-free
+record_file_edit — while writing no per-record temp files.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_config
+import _sdd_state
+import _sdd_store
+from _sdd_coverage import _session_max_edit_time, read_coverage, record_file_edit
+from _subprocess_harness import HOOKS_DIR, cleanup_all_state, invoke_hook
+
+session_start = import_module("session-start")
+
+_SQLITE_ENV = {"SDD_STATE_BACKEND": "sqlite"}
+
+
+class _StoreCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-store-test-")
+        self._env = mock.patch.dict(os.environ, _SQLITE_ENV)
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        _sdd_store.close_connections()
+        cleanup_all_state(self.cwd, "s1")
+        _sdd_config._clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-store-cfg-")
+        (Path(self.cwd) / ".claude").mkdir()
+
+    def tearDown(self):
+        _sdd_config._clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _config(self, value):
+        (Path(self.cwd) / ".claude" / "config.json").write_text(
+            json.dumps({"STATE_BACKEND": value}))
+        _sdd_config._clear_project_config_cache()
+
+    def test_default_is_files(self):
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("SDD_STATE_BACKEND", None)
+            self.assertEqual(_sdd_config.get_state_backend(self.cwd), "files")
+            self.assertIsNone(_sdd_state._store(self.cwd))
+
+    def test_config_selects_sqlite_and_env_wins(self):
+        self._config("sqlite")
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("SDD_STATE_BACKEND", None)
+            self.assertEqual(_sdd_config.get_state_backend(self.cwd), "sqlite")
+        with mock.patch.dict(os.environ, {"SDD_STATE_BACKEND": "files"}):
+            self.assertEqual(_sdd_config.get_state_backend(self.cwd), "files")
+
+    def test_unknown_value_falls_back(self):
+        self._config("redis")
+        with mock.patch.dict(os.environ, {"SDD_STATE_BACKEND": "bogus"}):
+            self.assertEqual(_sdd_config.get_state_backend(self.cwd), "files")
+
+
+class TestStateRecords(_StoreCase):
+
+    def test_state_round_trip_without_files(self):
+        _sdd_state.write_state(self.cwd, False, "1 failed", sid="s1")
+        state = _sdd_state.read_state(self.cwd, sid="s1")
+        self.assertEqual((state["passing"], state["summary"]), (False, "1 failed"))
+        self.assertIsNone(_sdd_state.read_state(self.cwd))  # project-scoped key
+        self.assertFalse(_sdd_state.state_path(self.cwd, "s1").exists())
+        self.assertTrue(_sdd_store.store_path(self.cwd).exists())
+
+    def test_ttl_applies(self):
+        _sdd_store.put(self.cwd, "state", "", {
+            "passing": True, "summary": "old", "timestamp": "2000-01-01T00:00:00Z"})
+        self.assertIsNone(_sdd_state.read_state(self.cwd))
+        self.assertIsNotNone(_sdd_state.read_state(self.cwd, max_age_seconds=-1))
+
+    def test_baseline_is_write_once(self):
+        _sdd_state.write_baseline(self.cwd, "s1", False, "first")
+        _sdd_state.write_baseline(self.cwd, "s1", True, "second")
+        self.assertEqual(_sdd_state.read_baseline(self.cwd, "s1")["summary"], "first")
+        _sdd_state.clear_baseline(self.cwd, "s1")
+        self.assertIsNone(_sdd_state.read_baseline(self.cwd, "s1"))
+
+    def test_skill_flag_consumed_once(self):
+        _sdd_state.write_skill_invoked(self.cwd, "ai-framework:sop-reviewer")
+        self.assertIsNotNone(_sdd_state.read_skill_invoked(self.cwd, "sop-reviewer"))
+        self.assertIsNotNone(_sdd_state.consume_skill_invoked(self.cwd, "sop-reviewer"))
+        self.assertIsNone(_sdd_state.consume_skill_invoked(self.cwd, "sop-reviewer"))
+
+    def test_stale_skill_flag_not_consumed(self):
+        _sdd_store.put(self.cwd, "skill", "sop-reviewer", {
+            "skill": "sop-reviewer", "timestamp": "2000-01-01T00:00:00Z"})
+        self.assertIsNone(_sdd_state.consume_skill_invoked(self.cwd, "sop-reviewer"))
+        self.assertTrue(_sdd_store.exists(self.cwd, "skill", "sop-reviewer"))
+
+    def test_clear_skill_invoked(self):
+        _sdd_state.write_skill_invoked(self.cwd, "sop-code-assist")
+        _sdd_state.clear_skill_invoked(self.cwd, "sop-code-assist", "s1")
+        self.assertIsNone(_sdd_state.read_skill_invoked(self.cwd))
+
+    def test_rerun_marker(self):
+        self.assertFalse(_sdd_state.has_rerun_marker(self.cwd))
+        _sdd_state.write_rerun_marker(self.cwd)
+        self.assertTrue(_sdd_state.has_rerun_marker(self.cwd))
+        self.assertFalse(_sdd_state.rerun_marker_path(self.cwd).exists())
+        _sdd_state.clear_rerun_marker(self.cwd)
+        self.assertFalse(_sdd_state.has_rerun_marker(self.cwd))
+
+
+    def test_amend_attempts_counted_in_store(self):
+        guard = import_module("sdd-test-guard")
+        rel = "specs/login.scenarios.md"
+        self.assertEqual(guard._read_amend_attempts(self.cwd, "s1", rel), 0)
+        self.assertEqual(guard._increment_amend_attempts(self.cwd, "s1", rel), 1)
+        self.assertEqual(guard._increment_amend_attempts(self.cwd, "s1", rel), 2)
+        self.assertEqual(guard._read_amend_attempts(self.cwd, "s2", rel), 0)
+        self.assertFalse(guard._amend_attempts_path(self.cwd, "s1", rel).exists())
+        guard._reset_amend_attempts(self.cwd, "s1", rel)
+        self.assertEqual(guard._read_amend_attempts(self.cwd, "s1", rel), 0)
+
+
+class TestCoverageRecords(_StoreCase):
+
+    def test_record_file_edit_and_edit_time(self):
+        before = time.time()
+        record_file_edit(self.cwd, "src/a.py", sid="s1")
+        record_file_edit(self.cwd, "tests/test_a.py", sid="s1")
+        cov = read_coverage(self.cwd, sid="s1")
+        self.assertEqual(cov["source_files"], ["src/a.py"])
+        self.assertEqual(cov["test_files"], ["tests/test_a.py"])
+        self.assertGreaterEqual(_sdd_state.read_edit_time(self.cwd, "s1"), before)
+        self.assertGreaterEqual(_session_max_edit_time(self.cwd, "s1"), before)
+        self.assertGreaterEqual(_session_max_edit_time(self.cwd), before)
+        self.assertFalse(_sdd_state.coverage_path(self.cwd, "s1").exists())
+
+    def test_concurrent_writers_lose_no_edit(self):
+        code = (
+            "import sys; sys.path.insert(0, sys.argv[1]); "
+            "from _sdd_coverage import record_file_edit; "
+            "[record_file_edit(sys.argv[2], f'src/w{sys.argv[3]}_{i}.py', sid='s1') "
+            "for i in range(10)]"
+        )
+        env = dict(os.environ, **_SQLITE_ENV)
+        procs = [
+            subprocess.Popen([sys.executable, "-B", "-c", code,
+                              str(HOOKS_DIR), self.cwd, str(n)], env=env)
+            for n in range(8)
+        ]
+        for p in procs:
+            self.assertEqual(p.wait(timeout=60), 0)
+        cov = read_coverage(self.cwd, sid="s1")
+        self.assertEqual(len(cov["source_files"]), 80)
+
+
+class TestPurgeAndCleanup(_StoreCase):
+
+    def test_purge_expired_removes_only_expired_rows(self):
+        _sdd_state.write_state(self.cwd, True, "ok")
+        _sdd_state.write_rerun_marker(self.cwd)
+        future = time.time() + _sdd_config.STATE_STORE_RETENTION + 1
+        self.assertEqual(_sdd_store.purge_expired(self.cwd, now=time.time()), 0)
+        self.assertEqual(_sdd_store.purge_expired(self.cwd, now=future), 2)
+        self.assertIsNone(_sdd_state.read_state(self.cwd, max_age_seconds=-1))
+
+    def test_session_start_purges_store(self):
+        _sdd_state.write_state(self.cwd, True, "ok")
+        with mock.patch.object(_sdd_store.time, "time",
+                               return_value=time.time() + 2 * 86400):
+            session_start.purge_state_store(Path(self.cwd))
+        self.assertIsNone(_sdd_state.read_state(self.cwd, max_age_seconds=-1))
+
+    def test_cleanup_keeps_store_while_wal_is_fresh(self):
+        tmp = tempfile.mkdtemp(prefix="sdd-store-sweep-")
+        try:
+            db = Path(tmp, "sdd-store-abc.sqlite3")
+            wal = Path(tmp, "sdd-store-abc.sqlite3-wal")
+            db.write_text("")
+            wal.write_text("")
+            old = time.time() - 2 * 86400
+            os.utime(db, (old, old))
+            with mock.patch.object(session_start.tempfile, "gettempdir",
+                                   return_value=tmp):
+                session_start.cleanup_stale_sdd(max_age=86400)
+                self.assertTrue(db.exists())
+                os.utime(wal, (old, old))
+                session_start.cleanup_stale_sdd(max_age=86400)
+            self.assertFalse(db.exists() or wal.exists())
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+class TestHookParity(_StoreCase):
+
+    def test_guard_blocks_on_failing_state_from_store(self):
+        _sdd_state.write_state(self.cwd, False, "1 failed")
+        payload = {
+            "tool_name": "Edit",
+            "tool_input": {
+                "file_path": f"{self.cwd}/test_foo.py",
+                "old_string": "assert x == 42\nassert y == 10",
+                "new_string": "assert x == 42",
+            },
+            "cwd": self.cwd,
+        }
+        rc, _, _, _ = invoke_hook("sdd-test-guard.py", payload, env=_SQLITE_ENV)
+        self.assertEqual(rc, 2)
+        self.assertFalse(_sdd_state.state_path(self.cwd).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Tests for bounded streaming capture (_sdd_stream.py)."""
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _sdd_state import read_state, run_in_process_group, write_progress, write_state
+from _sdd_stream import ProgressParser, TailBuffer, read_bounded
+
+PY = f'"{sys.executable}" -c'
+
+
+class TestTailBuffer(unittest.TestCase):
+
+    def test_short_stream_kept_whole(self):
+        buffer = TailBuffer(head_size=4, tail_size=8)
+        buffer.feed(b"abc")
+        buffer.feed(b"def\r\n")
+        self.assertEqual(buffer.text(), "abcdef\n")
+
+    def test_middle_elided_with_byte_count(self):
+        buffer = TailBuffer(head_size=4, tail_size=8)
+        for i in range(10):
+            buffer.feed(f"{i:02d}...\n".encode())
+        self.assertEqual(buffer.text(), "00..\n... [48 bytes omitted] ...\n.\n09...\n")
+
+    def test_read_bounded_seeks_past_the_middle(self):
+        with tempfile.NamedTemporaryFile("wb", delete=False) as f:
+            f.write(b"first\n" + b"x" * 10_000_000 + b"\nlast\n")
+        try:
+            text = read_bounded(f.name)
+        finally:
+            Path(f.name).unlink()
+        self.assertTrue(text.startswith("first\n"))
+        self.assertTrue(text.endswith("\nlast\n"))
+        self.assertLess(len(text), 100_000)
+
+
+class TestProgressParser(unittest.TestCase):
+
+    def _parse(self, lines):
+        seen = []
+        parser = ProgressParser(lambda done, total: seen.append((done, total)), interval=0)
+        for line in lines:
+            parser.feed(line.encode())
+        return seen[-1] if seen else None
+
+    def test_pytest_progress_and_verbose_lines(self):
+        self.assertEqual(self._parse([
+            "collected 9 items / 2 deselected / 7 selected",
+            "tests/test_a.py ..F.                                     [ 57%]",
+            "\x1b[32m..s\x1b[0m                                       [100%]",
+        ]), (7, 7))
+        self.assertEqual(self._parse([
+            "collected 2 items",
+            "tests/test_a.py::test_x PASSED                           [ 50%]",
+            "tests/test_a.py::test_y[a b] FAILED                      [100%]",
+        ]), (2, 2))
+
+    def test_tap_go_and_js_units(self):
+        self.assertEqual(self._parse(["ok 1 - adds", "not ok 2 - subtracts",
+                                      "    ok 1 - nested", "1..2"]), (2, 2))
+        self.assertEqual(self._parse(["ok  \texample.com/m/a\t0.01s",
+                                      "FAIL\texample.com/m/b\t0.02s",
+                                      "?   \texample.com/m/c\t[no test files]"]), (3, None))
+        self.assertEqual(self._parse([" PASS  src/a.test.ts", " FAIL src/b.test.js",
+                                      " ✓ src/c.spec.tsx (3 tests) 4ms"]), (3, None))
+
+    def test_unrelated_output_reports_nothing(self):
+        self.assertIsNone(self._parse(["Building...", "=== 3 passed in 0.1s ==="]))
+
+
+class TestRunInProcessGroupCapture(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-stream-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def test_memory_flat_for_large_output(self):
+        script = ("import sys; sys.stdout.write('first\\n'); "
+                  "[sys.stdout.write('x' * 1023 + '\\n') for _ in range(40 * 1024)]; "
+                  "sys.stdout.write('3 passed\\n'); sys.stderr.write('err\\n')")
+        tracemalloc.start()
+        try:
+            rc, out, err, timed_out = run_in_process_group(
+                f"{PY} \"{script}\"", self.cwd, 60)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual((rc, err, timed_out), (0, "err\n", False))
+        self.assertTrue(out.startswith("first\n"))
+        self.assertTrue(out.endswith("3 passed\n"))
+        self.assertIn("bytes omitted", out)
+        self.assertLess(peak, 4 * 1024 * 1024)  # 40 MB printed
+
+    def test_live_progress_reaches_existing_state(self):
+        write_state(self.cwd, False, "1 failed")
+        script = "print('collected 3 items'); print('t.py ...  [100%]')"
+        run_in_process_group(
+            f"{PY} \"{script}\"", self.cwd, 60,
+            on_progress=lambda d, t: write_progress(self.cwd, "pytest", d, t))
+        state = read_state(self.cwd)
+        self.assertEqual(state["summary"], "1 failed")
+        self.assertEqual(state["progress"]["command"], "pytest")
+        self.assertEqual(state["progress"]["total"], 3)
+        write_state(self.cwd, True, "3 passed")
+        self.assertNotIn("progress", read_state(self.cwd))
+
+    def test_progress_needs_an_existing_state(self):
+        write_progress(self.cwd, "pytest", 1, 3)
+        self.assertIsNone(read_state(self.cwd))
+
+    def test_timeout_still_kills_the_group(self):
+        rc, out, err, timed_out = run_in_process_group(
+            f"{PY} \"import time; print('x', flush=True); time.sleep(30)\"",
+            self.cwd, 1)
+        self.assertEqual((rc, out, err, timed_out), (-1, "", "", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
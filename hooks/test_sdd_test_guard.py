@@ -165,6 +165,100 @@ class TestAnalyzeEdit(unittest.TestCase):
         self.assertEqual(new_text, "")
 
 
+class TestEditHunks(unittest.TestCase):
+    """Diff-scoped analysis: only changed hunks are counted and scanned."""
+
+    PLACEHOLDER = "def test_legacy():\n    assert True\n\n"
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _run_main(self, input_data):
+        with patch("sys.stdin", io.StringIO(json.dumps(input_data))), \
+             patch("sys.stdout", io.StringIO()), \
+             patch("sys.stderr", io.StringIO()) as stderr:
+            try:
+                main()
+            except SystemExit as e:
+                return (e.code or 0), stderr.getvalue()
+        return 0, stderr.getvalue()
+
+    def test_identical_texts_have_no_hunks(self):
+        self.assertEqual(sdd_test_guard._diff_hunks("a\nb\n", "a\nb\n"), [])
+
+    def test_write_counts_only_changed_region(self):
+        body = "".join(f"def test_{i}():\n    assert f({i}) == {i}\n\n"
+                       for i in range(200))
+        path = Path(self.tmpdir, "test_big.py")
+        path.write_text(body, encoding="utf-8")
+        content = body.replace("    assert f(100) == 100\n", "    f(100)\n")
+        old, new, old_text, new_text = analyze_edit(
+            "Write", {"file_path": str(path), "content": content})
+        self.assertEqual(old - new, 1)  # context lines count on both sides
+        self.assertLess(len(old_text), 200)
+        self.assertIn("assert f(100) == 100", old_text)
+        self.assertNotIn("assert f(100) == 100", new_text)
+
+    def test_multiedit_sums_hunks(self):
+        tool_input = {"file_path": "test_foo.py", "edits": [
+            {"old_string": "assert a == 1\nassert b == 2\n",
+             "new_string": "assert a == 1\n"},
+            {"old_string": "x = 1\n", "new_string": "x = 2\n"},
+        ]}
+        old, new, _, _ = analyze_edit("MultiEdit", tool_input)
+        self.assertEqual((old, new), (2, 1))
+
+    def test_preexisting_tautology_in_context_not_flagged(self):
+        hunks = sdd_test_guard._edit_hunks("Edit", {
+            "old_string": self.PLACEHOLDER + "def test_b():\n    assert x == 1\n",
+            "new_string": self.PLACEHOLDER + "def test_b():\n    assert x == 2\n",
+        })
+        self.assertIsNone(sdd_test_guard._find_tautological_hunk(hunks))
+
+    def test_tautology_added_next_to_existing_one_flagged(self):
+        hunks = sdd_test_guard._edit_hunks("Edit", {
+            "old_string": "def test_a():\n    assert True\n\ndef test_b():\n    assert x == 1\n",
+            "new_string": "def test_a():\n    assert True\n\ndef test_b():\n    assert True\n",
+        })
+        self.assertEqual(sdd_test_guard._find_tautological_hunk(hunks), "assert True")
+
+    def test_tautology_added_next_to_unchanged_def_flagged(self):
+        hunks = sdd_test_guard._edit_hunks("Edit", {
+            "old_string": "def test_b():\n    assert x == 1\n",
+            "new_string": "def test_b():\n    pass\n",
+        })
+        self.assertEqual(sdd_test_guard._find_tautological_hunk(hunks),
+                         "empty test function")
+
+    def test_multiedit_tautology_denied(self):
+        code, stderr = self._run_main({
+            "cwd": self.tmpdir,
+            "tool_name": "MultiEdit",
+            "tool_input": {"file_path": "test_foo.py", "edits": [
+                {"old_string": "assert x == 1", "new_string": "assert True"},
+            ]},
+        })
+        self.assertEqual(code, 2)
+        self.assertIn("tautological test detected (assert True)", stderr)
+
+    @patch.object(sdd_test_guard, "read_state",
+                  return_value={"passing": False, "summary": "1 failed"})
+    def test_multiedit_assertion_removal_denied(self, _mock):
+        code, stderr = self._run_main({
+            "cwd": self.tmpdir,
+            "tool_name": "MultiEdit",
+            "tool_input": {"file_path": "test_foo.py", "edits": [
+                {"old_string": "assert a == 1\nassert b == 2",
+                 "new_string": "assert a == 1"},
+            ]},
+        })
+        self.assertEqual(code, 2)
+        self.assertIn("assertions reduced (2→1)", stderr)
+
+
 class TestFailHelper(unittest.TestCase):
     """Direct tests for _fail() formatting."""
 
@@ -345,6 +439,45 @@ class TestCountPrecise(unittest.TestCase):
         self.assertEqual(count_precise(text), 3)
 
 
+class TestScanText(unittest.TestCase):
+    """_scan_text: one cached scan feeding counts, stripping and tautology."""
+
+    SAMPLE = (
+        'def test_a():\n'
+        '    """Docstring: assert True, \'quoted\' and # not a comment."""\n'
+        '    msg = "expect(true).toBe(true) # label"  # assert True\n'
+        '    assert value == 42, "value"\n'
+        '    expect(x).toBe(1); t.Error("x"); assert_eq!(a, b)\n'
+        '    @Test\n'
+        '    self.assertEqual(y, [1])\n'
+    )
+
+    def setUp(self):
+        sdd_test_guard._scan_text.cache_clear()
+
+    def test_counts_match_assertion_regexes(self):
+        assertions, precise, _, _ = sdd_test_guard._scan_text(self.SAMPLE)
+        self.assertEqual(
+            assertions, len(sdd_test_guard.ASSERTION_RE.findall(self.SAMPLE)))
+        self.assertEqual(
+            precise, len(sdd_test_guard.PRECISE_ASSERTION_RE.findall(self.SAMPLE)))
+
+    def test_strings_and_comments_stripped_in_one_pass(self):
+        stripped = sdd_test_guard._strip_docstrings(self.SAMPLE)
+        self.assertNotIn("Docstring", stripped)
+        self.assertNotIn("label", stripped)
+        self.assertNotIn("assert True", stripped)
+        self.assertIn("assert value == 42,", stripped)
+        self.assertIsNone(sdd_test_guard._find_tautological_test_addition(self.SAMPLE))
+
+    def test_payload_scanned_once_across_callers(self):
+        count_assertions(self.SAMPLE)
+        count_precise(self.SAMPLE)
+        sdd_test_guard._find_tautological_test_addition(self.SAMPLE)
+        info = sdd_test_guard._scan_text.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+
 class TestPrecisionDenyInMain(unittest.TestCase):
     """Tests failing + same assertion count + precision decreased → DENY."""
 
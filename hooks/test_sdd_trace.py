@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Tests for opt-in hook span tracing (_sdd_trace.py) and the mission
+report's hook latency section.
+"""
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_trace
+from _sdd_detect import write_state
+from _subprocess_harness import HOOKS_DIR, cleanup_all_state, invoke_hook
+
+AGGREGATE_SCRIPT = (HOOKS_DIR.parent / "skills" / "mission-report"
+                    / "scripts" / "aggregate.py")
+
+
+def _metrics(cwd):
+    path = Path(cwd) / ".claude" / "metrics.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line]
+
+
+class TestSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-trace-")
+        self._env = mock.patch.dict(os.environ, {
+            "SDD_TRACE": "1", "CLAUDE_PROJECT_DIR": self.cwd})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def test_span_is_noop_outside_traced_main(self):
+        self.assertIs(_sdd_trace.span("x"), _sdd_trace._NOOP)
+
+    def test_nested_spans_aggregate_by_path(self):
+        @_sdd_trace.traced_main("demo")
+        def main():
+            with _sdd_trace.span("outer"):
+                for _ in range(3):
+                    with _sdd_trace.span("git"):
+                        pass
+            with _sdd_trace.span("git"):
+                pass
+            sys.exit(2)
+
+        with self.assertRaises(SystemExit):
+            main()
+        [event] = _metrics(self.cwd)
+        self.assertEqual(event["event"], "hook_timing")
+        self.assertEqual((event["hook"], event["exit_code"]), ("demo", 2))
+        self.assertEqual(event["spans"]["outer/git"]["count"], 3)
+        self.assertEqual(event["spans"]["git"]["count"], 1)
+        self.assertGreaterEqual(event["total_ms"],
+                                event["spans"]["outer"]["total_ms"])
+
+    def test_nested_traced_main_records_as_span(self):
+        @_sdd_trace.traced_main("inner")
+        def inner():
+            with _sdd_trace.span("work"):
+                pass
+
+        @_sdd_trace.traced_main("outer")
+        def outer():
+            inner()
+            inner()
+
+        outer()
+        [event] = _metrics(self.cwd)
+        self.assertEqual(event["hook"], "outer")
+        self.assertEqual(event["spans"]["inner"]["count"], 2)
+        self.assertIn("inner/work", event["spans"])
+
+    def test_traced_main_inside_a_span_adds_no_level(self):
+        @_sdd_trace.traced_main("session-start")
+        def handler():
+            with _sdd_trace.span("work"):
+                pass
+
+        @_sdd_trace.traced_main("hook-dispatch")
+        def dispatcher():
+            with _sdd_trace.span("session-start.py"):
+                handler()
+
+        dispatcher()
+        [event] = _metrics(self.cwd)
+        self.assertEqual(set(event["spans"]), {"session-start.py", "session-start.py/work"})
+
+    def test_auto_test_worker_mode_not_traced(self):
+        import importlib
+        sdd_auto_test = importlib.import_module("sdd-auto-test")
+        argv = ["sdd-auto-test.py", "--run-tests", self.cwd, "pytest", "", "3"]
+        with mock.patch.object(sys, "argv", argv), \
+             mock.patch.object(sdd_auto_test, "_run_tests_worker") as worker, \
+             mock.patch("_sdd_slots.deprioritize"):
+            sdd_auto_test.main()
+        worker.assert_called_once()
+        self.assertEqual(_metrics(self.cwd), [])
+
+    def test_disabled_emits_nothing(self):
+        @_sdd_trace.traced_main("demo")
+        def main():
+            with _sdd_trace.span("git"):
+                return 7
+
+        with mock.patch.dict(os.environ, {"SDD_TRACE": "0"}):
+            self.assertEqual(main(), 7)
+        self.assertEqual(_metrics(self.cwd), [])
+
+
+class TestGuardTiming(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-trace-hook-")
+
+    def tearDown(self):
+        cleanup_all_state(self.cwd)
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def test_guard_emits_hook_timing_with_analyze_edit(self):
+        write_state(self.cwd, passing=False, summary="1 failed")
+        payload = {
+            "tool_name": "Edit",
+            "tool_input": {
+                "file_path": f"{self.cwd}/test_foo.py",
+                "old_string": "assert x == 42\nassert y == 10",
+                "new_string": "assert x == 42",
+            },
+            "cwd": self.cwd,
+        }
+        rc, _, _, _ = invoke_hook("sdd-test-guard.py", payload,
+                                  env={"SDD_TRACE": "1"})
+        self.assertEqual(rc, 2)
+        timing = [e for e in _metrics(self.cwd) if e["event"] == "hook_timing"]
+        self.assertEqual(len(timing), 1)
+        self.assertEqual(timing[0]["hook"], "sdd-test-guard")
+        self.assertEqual(timing[0]["exit_code"], 2)
+        self.assertIn("analyze_edit", timing[0]["spans"])
+
+
+@unittest.skipUnless(AGGREGATE_SCRIPT.exists(), "mission-report missing")
+class TestLatencyReport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        spec = importlib.util.spec_from_file_location(
+            "mission_report_aggregate", AGGREGATE_SCRIPT)
+        cls.mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.mod)
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-trace-report-")
+
+    def tearDown(self):
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _seed(self, events):
+        path = Path(self.cwd) / ".claude" / "metrics.jsonl"
+        path.parent.mkdir(parents=True)
+        path.write_text("".join(json.dumps(e) + "\n" for e in events))
+
+    def test_latency_table_and_top_offenders(self):
+        self._seed([
+            {"event": "hook_timing", "hook": "sdd-test-guard", "total_ms": 40,
+             "spans": {"git": {"count": 2, "total_ms": 30, "max_ms": 20}}},
+            {"event": "hook_timing", "hook": "sdd-test-guard", "total_ms": 60,
+             "spans": {"git": {"count": 1, "total_ms": 25, "max_ms": 25}}},
+            {"event": "hook_timing", "hook": "task-completed", "total_ms": 900,
+             "spans": {"await_test_completion":
+                       {"count": 1, "total_ms": 800, "max_ms": 800}}},
+        ])
+        report = self.mod.build_report(self.cwd)
+        self.assertIn("## Hook latency", report)
+        self.assertIn("| sdd-test-guard | 2 | 40.0 | 60.0 | 60.0 |", report)
+        offenders = report.split("Top offenders", 1)[1]
+        self.assertLess(offenders.index("await_test_completion"),
+                        offenders.index("git"))
+        self.assertIn("sdd-test-guard › git: 55.0 ms over 3 call(s)", report)
+
+    def test_section_absent_without_timing_events(self):
+        self._seed([{"event": "task_completed", "teammate": "a"}])
+        self.assertNotIn("Hook latency", self.mod.build_report(self.cwd))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for the warm pre-forked pytest runner (_sdd_warm.py)."""
+import json
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _sdd_warm
+from _sdd_config import _clear_project_config_cache
+from _sdd_warm import run_warm, socket_path, stop_server, warm_args
+
+
+class TestWarmArgs(unittest.TestCase):
+
+    def test_plain_pytest_commands_only(self):
+        self.assertEqual(warm_args("pytest tests/test_a.py"), ["tests/test_a.py"])
+        self.assertEqual(warm_args("pytest -q 'tests/test b.py'"),
+                         ["-q", "tests/test b.py"])
+        for cmd in ("pytest", "npm test", "python -m pytest x", "pytest x > log",
+                    "pytest x && ruff check .", "pytest $TESTS", "pytest tests/*.py"):
+            self.assertIsNone(warm_args(cmd), cmd)
+
+
+@unittest.skipUnless(_sdd_warm.supported() and shutil.which("pytest"),
+                     "fork, AF_UNIX and pytest required")
+class TestWarmServer(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp(prefix="sdd-warm-test-")
+        self._write(".claude/config.json", json.dumps({"WARM_RUNNER": True}))
+        self._write("conftest.py", "import json\n")
+        self._write("app.py", "def add(a, b): return a + b\n")
+        self._write("tests/test_app.py",
+                    "from app import add\ndef test_add(): assert add(1, 2) == 3\n")
+        _clear_project_config_cache()
+
+    def tearDown(self):
+        stop_server(self.cwd)
+        for suffix in ("", ".lock"):
+            Path(f"{socket_path(self.cwd)}{suffix}").unlink(missing_ok=True)
+        _clear_project_config_cache()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def _write(self, rel, text):
+        path = Path(self.cwd, rel)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def _warm(self, command="pytest -q tests/test_app.py"):
+        return run_warm(self.cwd, command, timeout=60)
+
+    def _wait_for_server(self):
+        """First warm result, once a server is up (runs pytest -q tests/)."""
+        deadline = time.time() + 30
+        while True:
+            result = self._warm("pytest -q tests/")
+            if result is not None:
+                return result
+            if time.time() > deadline:
+                self.fail("warm server did not start")
+            time.sleep(0.05)
+
+    def test_first_run_cold_then_forked_runs_see_source_edits(self):
+        self.assertIsNone(self._warm())  # starts the server
+        self._wait_for_server()
+        self.assertTrue(_sdd_warm._server_alive(self.cwd))
+        rc, out, _, timed_out = self._warm()
+        self.assertEqual((rc, timed_out), (0, False))
+        self.assertIn("1 passed", out)
+        self._write("app.py", "def add(a, b): return a - b\n")
+        rc, out, _, _ = self._warm()
+        self.assertEqual(rc, 1)
+        self.assertIn("1 failed", out)
+
+    def test_conftest_change_makes_server_stale(self):
+        self._wait_for_server()
+        self._write("conftest.py", "import os\n")
+        self.assertIsNone(self._warm())  # stale → cold
+        self.assertEqual(self._wait_for_server()[0], 0)  # fresh server
+
+    def test_timeout_kills_the_forked_run(self):
+        self._wait_for_server()
+        self._write("tests/test_slow.py",
+                    "import time\ndef test_slow(): time.sleep(30)\n")
+        started = time.time()
+        result = run_warm(self.cwd, "pytest tests/test_slow.py", timeout=1)
+        self.assertEqual(result, (-1, "", "", True))
+        self.assertLess(time.time() - started, 10)
+
+    def test_disabled_by_default(self):
+        Path(self.cwd, ".claude/config.json").unlink()
+        _clear_project_config_cache()
+        self.assertIsNone(self._warm())
+        time.sleep(0.2)
+        self.assertFalse(socket_path(self.cwd).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
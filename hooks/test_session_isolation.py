@@ -370,23 +370,25 @@ class TestAutoTestWorkerSid(unittest.TestCase):
     def tearDown(self):
         shutil.rmtree(self.tmpdir, ignore_errors=True)
 
+    @patch("_sdd_slots.deprioritize")
     @patch.object(sdd_auto_test, "_run_tests_worker")
-    def test_worker_receives_sid(self, mock_worker):
+    def test_worker_receives_sid(self, mock_worker, _deprioritize):
         """Background worker gets session_id as argv[4]."""
         with patch.object(sys, "argv", ["sdd-auto-test.py", "--run-tests", "/tmp/proj", "pytest", "abc12345"]):
             with patch.object(sys, "stdin", io.StringIO("")):
                 with patch.object(sys, "stdout", io.StringIO()):
                     sdd_auto_test.main()
-        mock_worker.assert_called_once_with("/tmp/proj", "pytest", "abc12345")
+        mock_worker.assert_called_once_with("/tmp/proj", "pytest", "abc12345", None)
 
+    @patch("_sdd_slots.deprioritize")
     @patch.object(sdd_auto_test, "_run_tests_worker")
-    def test_worker_empty_sid_is_none(self, mock_worker):
+    def test_worker_empty_sid_is_none(self, mock_worker, _deprioritize):
         """Empty sid string becomes None."""
         with patch.object(sys, "argv", ["sdd-auto-test.py", "--run-tests", "/tmp/proj", "pytest", ""]):
             with patch.object(sys, "stdin", io.StringIO("")):
                 with patch.object(sys, "stdout", io.StringIO()):
                     sdd_auto_test.main()
-        mock_worker.assert_called_once_with("/tmp/proj", "pytest", None)
+        mock_worker.assert_called_once_with("/tmp/proj", "pytest", None, None)
 
     @patch.object(sdd_auto_test, "baseline_path")
     @patch.object(sdd_auto_test, "pid_path")
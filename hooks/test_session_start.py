@@ -5,6 +5,7 @@ import io
 import json
 import os
 import shutil
+import subprocess
 import sys
 import tempfile
 import time
@@ -485,6 +486,53 @@ class TestConsumeStdinSessionStart(unittest.TestCase):
             session_start.consume_stdin()
 
 
+class TestBaselinePrewarm(unittest.TestCase):
+    """SessionStart warms the scenario baseline cache in a detached child."""
+
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp(prefix="session-prewarm-")).resolve()
+        self.rel = "docs/specs/auth/scenarios/auth.scenarios.md"
+
+    def tearDown(self):
+        import _sdd_scenarios
+        _sdd_scenarios._baseline_cache_path(str(self.tmpdir)).unlink(missing_ok=True)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _commit_scenario(self):
+        path = self.tmpdir / self.rel
+        path.parent.mkdir(parents=True)
+        path.write_text("---\nname: auth\n---\n", encoding="utf-8")
+        git = ["git", "-C", str(self.tmpdir)]
+        subprocess.run(git + ["init", "-q"], check=True)
+        subprocess.run(git + ["add", "-A"], check=True)
+        subprocess.run(git + ["-c", "user.email=t@t", "-c", "user.name=t",
+                              "commit", "-q", "-m", "init"], check=True)
+
+    def test_no_scenarios_spawns_nothing(self):
+        with patch("subprocess.Popen") as popen:
+            session_start.spawn_baseline_prewarm(self.tmpdir)
+        popen.assert_not_called()
+
+    def test_spawns_detached_prewarm_child(self):
+        self._commit_scenario()
+        with patch("subprocess.Popen") as popen:
+            session_start.spawn_baseline_prewarm(self.tmpdir)
+        args, kwargs = popen.call_args
+        self.assertEqual(args[0][-2:], [session_start.PREWARM_FLAG, str(self.tmpdir)])
+        self.assertTrue(kwargs["start_new_session"])
+
+    def test_prewarm_entry_point_fills_cache(self):
+        import _sdd_scenarios
+        self._commit_scenario()
+        subprocess.run(
+            [sys.executable, "-B", str(Path(session_start.__file__)),
+             session_start.PREWARM_FLAG, str(self.tmpdir)],
+            check=True, timeout=30,
+        )
+        cache = _sdd_scenarios._read_baseline_cache(str(self.tmpdir))
+        self.assertIn(self.rel, cache)
+
+
 class TestGitignoreSeparatorBranch(unittest.TestCase):
     """Covers ensure_gitignore_rules inserting a blank-line separator when the
     existing .gitignore lacks a trailing newline — a branch not exercised by
@@ -174,6 +174,41 @@ class TestRunGate(unittest.TestCase):
         self.assertFalse(passed)
         self.assertIn("failed to execute", output)
 
+    def test_structured_report_output(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        Path(tmpdir, ".claude").mkdir()
+        Path(tmpdir, ".claude/config.json").write_text(json.dumps({"STRUCTURED_REPORT": True}))
+
+        def run(command, *args, **kwargs):
+            Path(command.rpartition("--junitxml=")[2]).write_text(
+                '<testsuite><testcase classname="t" name="test_x" file="t.py" time="0">'
+                '<failure message="assert 0">t.py:3: assert 0</failure></testcase></testsuite>')
+            return 1, "x" * 5000, "", False
+
+        with patch.object(task_completed, "run_in_process_group", side_effect=run):
+            passed, output = task_completed.run_gate("test", "pytest", tmpdir)
+        self.assertFalse(passed)
+        self.assertEqual(output, "0 passed, 1 failed\nt.py::test_x (t.py:3): assert 0")
+
+    def test_result_cache_replays_identical_tree(self):
+        import _sdd_results
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        self.addCleanup(_sdd_results._results_path(tmpdir).unlink, missing_ok=True)
+        self.addCleanup(_sdd_results._stat_path(tmpdir).unlink, missing_ok=True)
+        Path(tmpdir, ".claude").mkdir()
+        Path(tmpdir, ".claude/config.json").write_text(json.dumps({"RESULT_CACHE": True}))
+        Path(tmpdir, "app.py").write_text("x = 1\n")
+        with patch.object(task_completed, "run_in_process_group",
+                          return_value=(1, "= 1 failed, 2 passed in 0.1s =\n", "", False)) as run:
+            first = task_completed.run_gate("test", "pytest", tmpdir)
+            second = task_completed.run_gate("test", "pytest", tmpdir)
+            task_completed.run_gate("lint", "ruff check", tmpdir)
+        self.assertEqual(first, second)
+        self.assertFalse(second[0])
+        self.assertEqual(run.call_count, 2)  # test gate once, lint uncached
+
 
 # ─────────────────────────────────────────────────────────────────
 # TestExtractCoveragePct
@@ -906,6 +941,15 @@ class TestTryCachedTestGate(unittest.TestCase):
         resolved, passed, output = task_completed._try_cached_test_gate(self.tmpdir, sid="abc")
         self.assertFalse(resolved)
 
+    @patch.object(task_completed, "can_trust_state", return_value=True)
+    @patch.object(task_completed, "is_test_running", return_value=False)
+    @patch.object(task_completed, "read_state", return_value={
+        "passing": True, "summary": "2 passed", "partial": True})
+    def test_partial_state_unresolved(self, _mock_state, _mock_running, _mock_trust):
+        """Failed-first partial pass covers a subset → resolved=False."""
+        resolved, passed, output = task_completed._try_cached_test_gate(self.tmpdir, sid="abc")
+        self.assertFalse(resolved)
+
     @patch.object(task_completed, "is_test_running", return_value=False)
     @patch.object(task_completed, "read_state", return_value=None)
     def test_stale_state_unresolved(self, _mock_state, _mock_running):
@@ -1182,13 +1226,32 @@ class TestGateBudgetAdaptiveInteraction(unittest.TestCase):
         call_args = mock_run.call_args
         self.assertEqual(call_args[0][2], 42)
 
+    def test_gate_timeout_sized_from_history_within_budget(self):
+        """A gate's history sizes its timeout, capped by the remaining
+        budget; a prediction over the budget does not fail the task."""
+        import time
+        from _sdd_history import _history_path, record_run
+        self.addCleanup(_history_path(self.tmpdir).unlink, missing_ok=True)
+
+        def gate_timeout(budget):
+            with patch.object(task_completed, "run_gate", return_value=(True, "")) as run:
+                task_completed._run_gate_loop(
+                    self.tmpdir, None, None, None, "task",
+                    [("lint", "ruff check")], budget, time.monotonic())
+            return run.call_args.kwargs["timeout"]
+        self.assertEqual(gate_timeout(600), 120)  # no history
+        for seconds in (50, 60, 70):
+            record_run(self.tmpdir, "ruff check", "gate:lint", seconds)
+        self.assertEqual(gate_timeout(40), 39)   # over budget: runs, capped
+        self.assertEqual(gate_timeout(600), 210)  # 3 × p95
+
     @patch.object(task_completed, "run_in_process_group")
     @patch.object(task_completed, "adaptive_gate_timeout", return_value=60)
     def test_run_gate_none_timeout_triggers_adaptive(self, mock_adaptive, mock_run):
         """timeout=None (default) triggers adaptive_gate_timeout computation."""
         mock_run.return_value = (0, "pass", "", False)
         task_completed.run_gate("test", "echo pass", self.tmpdir)
-        mock_adaptive.assert_called_once_with(self.tmpdir)
+        mock_adaptive.assert_called_once_with(self.tmpdir, command="echo pass", rung="3")
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -1322,6 +1385,42 @@ class TestRunnerLockNonRalph(unittest.TestCase):
         self.assertEqual(ctx.exception.code, 2)
         mock_gate.assert_not_called()
 
+    @patch.object(task_completed, "read_coverage", return_value=None)
+    @patch.object(task_completed, "write_state")
+    @patch.object(task_completed, "release_runner_lock")
+    @patch.object(task_completed, "run_gate", return_value=(True, "5 passed"))
+    @patch.object(task_completed, "await_test_completion",
+                  return_value={"passing": True, "partial": True, "raw_output": "1 passed"})
+    @patch.object(task_completed, "acquire_runner_lock", side_effect=[None, 99])
+    @patch.object(task_completed, "_try_cached_test_gate", return_value=(False, False, ""))
+    @patch.object(task_completed, "detect_test_command", return_value="npm test")
+    def test_lock_busy_partial_state_runs_gate_fresh(
+        self, _detect, _cache, _lock, _await, mock_gate, mock_release, _write, _cov
+    ):
+        """Lock busy → await → only the failed-first subset finished → the
+        gate runs itself once the lock frees, instead of failing."""
+        task_completed._handle_non_ralph_completion(self.tmpdir, "my task")
+        mock_gate.assert_called_once()
+        mock_release.assert_called_once_with(99, self.tmpdir)
+
+    @patch.object(task_completed, "read_coverage", return_value=None)
+    @patch.object(task_completed, "run_gate")
+    @patch.object(task_completed, "await_test_completion",
+                  return_value={"passing": True, "partial": True, "raw_output": "1 passed"})
+    @patch.object(task_completed, "acquire_runner_lock", return_value=None)
+    @patch.object(task_completed, "_try_cached_test_gate", return_value=(False, False, ""))
+    @patch.object(task_completed, "detect_test_command", return_value="npm test")
+    def test_lock_busy_partial_state_still_locked_is_timeout(
+        self, _detect, _cache, _lock, _await, mock_gate, _cov
+    ):
+        """A partial state is no verdict: no "Tests failed" from a subset."""
+        with self.assertRaises(SystemExit) as ctx, \
+             patch("sys.stderr", new_callable=io.StringIO) as err:
+            task_completed._handle_non_ralph_completion(self.tmpdir, "my task")
+        self.assertEqual(ctx.exception.code, 2)
+        self.assertIn("Test gate timeout", err.getvalue())
+        mock_gate.assert_not_called()
+
     @patch.object(task_completed, "read_coverage", return_value=None)
     @patch.object(task_completed, "write_state")
     @patch.object(task_completed, "release_runner_lock")
@@ -1420,6 +1519,29 @@ class TestRunnerLockRalph(unittest.TestCase):
         mock_await.assert_called_once_with(self.tmpdir, timeout=60)
         mock_gate.assert_not_called()
 
+    @patch.object(task_completed, "clear_baseline")
+    @patch.object(task_completed, "read_coverage", return_value=None)
+    @patch.object(task_completed, "write_state")
+    @patch.object(task_completed, "release_runner_lock")
+    @patch.object(task_completed, "run_gate", return_value=(True, "5 passed"))
+    @patch.object(task_completed, "await_test_completion",
+                  return_value={"passing": True, "partial": True, "raw_output": "1 passed"})
+    @patch.object(task_completed, "acquire_runner_lock", side_effect=[None, 99])
+    @patch.object(task_completed, "_try_cached_test_gate", return_value=(False, False, ""))
+    @patch.object(task_completed, "_has_source_edits", return_value=True)
+    @patch.object(task_completed, "read_skill_invoked", return_value=True)
+    def test_ralph_test_gate_partial_state_runs_fresh(
+        self, _skill, _edits, _cache, _lock, _await, mock_gate, mock_release,
+        _write, _cov, _baseline
+    ):
+        """Ralph test gate: a partial state after the wait → run the gate."""
+        with patch("sys.stdin", self._make_stdin(self._default_input())):
+            with self.assertRaises(SystemExit) as ctx:
+                task_completed.main()
+            self.assertEqual(ctx.exception.code, 0)
+        mock_gate.assert_called_once()
+        mock_release.assert_called_once_with(99, self.tmpdir)
+
     @patch.object(task_completed, "read_coverage", return_value=None)
     @patch.object(task_completed, "run_gate")
     @patch.object(task_completed, "await_test_completion", return_value=None)
@@ -1603,7 +1725,6 @@ class TestTaskCompletedBranchCoverage(unittest.TestCase):
                 "MIN_TEST_COVERAGE": "0",
             }
         )
-        dummy_skill = Path(self.tmpdir) / "skill.marker"
 
         with patch.object(
             task_completed.sys, "stdin", io.StringIO(json.dumps(payload))
@@ -1621,8 +1742,6 @@ class TestTaskCompletedBranchCoverage(unittest.TestCase):
             task_completed, "append_telemetry"
         ) as append_telemetry, patch.object(
             task_completed, "_atomic_update_failures", return_value=0
-        ), patch.object(
-            task_completed, "skill_invoked_path", return_value=dummy_skill
         ), patch.object(
             task_completed, "clear_baseline"
         ) as clear_baseline, self.assertRaises(SystemExit) as exc:
@@ -18,6 +18,7 @@ write + telemetry line. Safe to invoke from hooks or by hand.
 from __future__ import annotations
 
 import json
+import math
 import sys
 import time
 from collections import Counter, defaultdict
@@ -25,6 +26,7 @@ from pathlib import Path
 
 
 METRICS_REL = Path(".claude") / "metrics.jsonl"
+TOP_OFFENDERS = 5
 
 
 def _events_from_metrics(cwd) -> list[dict]:
@@ -48,6 +50,73 @@ def _events_from_metrics(cwd) -> list[dict]:
     return events
 
 
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _aggregate_timing(timing: list[dict]) -> dict:
+    """hook_timing events → per-hook latency + top spans by total time."""
+    per_hook: dict[str, list[float]] = defaultdict(list)
+    spans: dict[tuple[str, str], list[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    for e in timing:
+        hook = str(e.get("hook", "?"))
+        try:
+            per_hook[hook].append(float(e.get("total_ms", 0.0)))
+        except (TypeError, ValueError):
+            continue
+        for path, rec in (e.get("spans") or {}).items():
+            if not isinstance(rec, dict):
+                continue
+            try:
+                agg = spans[(hook, str(path))]
+                agg[0] += int(rec.get("count", 0))
+                agg[1] += float(rec.get("total_ms", 0.0))
+                agg[2] = max(agg[2], float(rec.get("max_ms", 0.0)))
+            except (TypeError, ValueError):
+                continue
+    hooks = {
+        hook: {
+            "count": len(vals),
+            "p50_ms": _percentile(vals, 50),
+            "p95_ms": _percentile(vals, 95),
+            "max_ms": max(vals),
+        }
+        for hook, vals in per_hook.items() if vals
+    }
+    offenders = sorted(
+        ({"hook": h, "span": p, "count": c, "total_ms": t, "max_ms": m}
+         for (h, p), (c, t, m) in spans.items()),
+        key=lambda o: -o["total_ms"],
+    )[:TOP_OFFENDERS]
+    return {"hooks": hooks, "offenders": offenders}
+
+
+def _aggregate_gates(runs: list[dict]) -> list[dict]:
+    """gate_run events → per-gate cost, most CPU time first."""
+    per_gate: dict[str, dict] = {}
+    for e in runs:
+        gate = str(e.get("gate", "?"))
+        agg = per_gate.setdefault(gate, {
+            "gate": gate, "runs": 0, "failed": 0, "cpu_s": 0.0,
+            "duration_s": 0.0, "max_rss_mb": 0.0, "io_blocks": 0,
+        })
+        try:
+            agg["cpu_s"] += float(e.get("cpu_user_s", 0)) + float(e.get("cpu_sys_s", 0))
+            agg["duration_s"] += float(e.get("duration_s", 0))
+            agg["max_rss_mb"] = max(agg["max_rss_mb"], float(e.get("max_rss_mb", 0)))
+            agg["io_blocks"] += (int(e.get("io_read_blocks", 0))
+                                 + int(e.get("io_write_blocks", 0)))
+        except (TypeError, ValueError):
+            continue
+        agg["runs"] += 1
+        agg["failed"] += 0 if e.get("passed") else 1
+    return sorted(per_gate.values(),
+                  key=lambda g: (-g["cpu_s"], -g["duration_s"]))
+
+
 def _aggregate(events: list[dict]) -> dict:
     """Collapse event stream into counters the report needs."""
     completed = [e for e in events if e.get("event") == "task_completed"]
@@ -55,6 +124,8 @@ def _aggregate(events: list[dict]) -> dict:
     queued = [e for e in events if e.get("event") == "test_run_queued"]
     bypassed = [e for e in events if e.get("event") == "scenarios_bypassed"]
     dogfood = [e for e in events if e.get("event") == "milestone_dogfood_needed"]
+    timing = [e for e in events if e.get("event") == "hook_timing"]
+    gate_runs = [e for e in events if e.get("event") == "gate_run"]
 
     rung_counts: Counter = Counter(
         str(e.get("fast_path_rung", "?")) for e in queued
@@ -85,6 +156,8 @@ def _aggregate(events: list[dict]) -> dict:
         "fail_categories": dict(fail_categories),
         "forced_full_reasons": dict(forced_full_reasons),
         "teammates_completed": dict(teammates_completed),
+        "hook_timing": _aggregate_timing(timing),
+        "gate_cost": _aggregate_gates(gate_runs),
     }
 
 
@@ -146,6 +219,41 @@ def _render(agg: dict, now_iso: str) -> str:
         lines.append("- No task failures recorded.")
     lines.append("")
 
+    # Hook latency (SDD_TRACE=1)
+    timing = agg["hook_timing"]
+    if timing["hooks"]:
+        lines.append("## Hook latency\n")
+        lines.append("| Hook | Runs | p50 ms | p95 ms | max ms |")
+        lines.append("|------|------|--------|--------|--------|")
+        for hook, h in sorted(
+            timing["hooks"].items(), key=lambda kv: -kv[1]["p95_ms"]
+        ):
+            lines.append(
+                f"| {hook} | {h['count']} | {h['p50_ms']:.1f} "
+                f"| {h['p95_ms']:.1f} | {h['max_ms']:.1f} |"
+            )
+        if timing["offenders"]:
+            lines.append("")
+            lines.append("Top offenders (total time across runs):")
+            for o in timing["offenders"]:
+                lines.append(
+                    f"- {o['hook']} › {o['span']}: {o['total_ms']:.1f} ms "
+                    f"over {o['count']} call(s), max {o['max_ms']:.1f} ms"
+                )
+        lines.append("")
+
+    # Gate cost (gate_run events from TaskCompleted)
+    if agg["gate_cost"]:
+        lines.append("## Gate cost\n")
+        lines.append("| Gate | Runs | Failed | CPU s | Wall s | Peak RSS MB | I/O blocks |")
+        lines.append("|------|------|--------|-------|--------|-------------|------------|")
+        for g in agg["gate_cost"]:
+            lines.append(
+                f"| {g['gate']} | {g['runs']} | {g['failed']} | {g['cpu_s']:.1f} "
+                f"| {g['duration_s']:.1f} | {g['max_rss_mb']:.0f} | {g['io_blocks']} |"
+            )
+        lines.append("")
+
     # Follow-ups
     if agg["dogfood_signals"]:
         lines.append("## Follow-ups\n")